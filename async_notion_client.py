@@ -0,0 +1,364 @@
+"""
+非同期Notion APIクライアント
+
+Notion SDKの非同期クライアント（notion_client.AsyncClient）を使って、
+NotionClientと同じ取得を1つのイベントループ上で行います。
+ページ本文の子ブロックなどの読み込みをスレッドを使わずに並行して実行でき、
+全リクエストで1つのコネクションプールとレートリミッターを共有します。
+
+AsyncNotionClientはNotionClientを継承せずに包むため、NotionClientの同期メソッドは
+そのまま同期的に使用できます（データベースID、取得条件、スキーマキャッシュ、ページのパースは共有します）。
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from notion_client import AsyncClient as NotionAsyncSDKClient
+
+from notion_api_client import NotionClient, select_filter_property_ids
+from notion_filters import compile_query
+from rate_limiter import AsyncRateLimiter
+from concurrency import AsyncAdaptiveConcurrency
+from block_cache import BlockCache
+from markdown_converter import CHILD_PAGE_BLOCK_TYPES, blocks_to_markdown
+import config
+
+
+class AsyncNotionClient:
+    """
+    NotionClientの非同期版
+
+    I/Oを行うメソッドはすべてコルーチンです。ページのパースは包んでいるNotionClientで行います。
+    """
+
+    def __init__(self, api_key: Optional[str] = None, database_id: Optional[str] = None,
+                 client: Optional[NotionAsyncSDKClient] = None,
+                 rate_limiter: Optional[AsyncRateLimiter] = None,
+                 schema_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+                 query: Optional[Dict[str, Any]] = None,
+                 max_concurrency: Optional[int] = None,
+                 notion_client: Optional[NotionClient] = None):
+        """
+        AsyncNotionClientの初期化
+
+        Args:
+            api_key: Notion APIキー。指定しない場合は環境変数から取得
+            database_id: NotionデータベースのID。指定しない場合は環境変数から取得
+            client: 共有するNotion SDKの非同期クライアント。指定しない場合は新規に作成
+            rate_limiter: 共有する非同期レートリミッター。指定しない場合は設定ファイルのレートで作成
+            schema_cache: データベースIDをキーにした共有のスキーマキャッシュ
+            query: databases.queryに追加で渡すパラメータ（filter / sorts）
+            max_concurrency: 同時に実行するリクエストの上限。指定しない場合は設定ファイルの値
+            notion_client: 包むNotionClient。指定しない場合は上記の値で作成
+        """
+        api_key = api_key or config.NOTION_API_KEY
+        self.notion_client = notion_client or NotionClient(
+            api_key=api_key,
+            database_id=database_id,
+            schema_cache=schema_cache,
+            query=query
+        )
+        self.database_id = self.notion_client.database_id
+        self.client = client or NotionAsyncSDKClient(auth=self.notion_client.api_key)
+        self.concurrency = AsyncAdaptiveConcurrency("notion", max_concurrency or config.NOTION_MAX_CONCURRENCY)
+        self.async_rate_limiter = rate_limiter or AsyncRateLimiter(config.NOTION_REQUESTS_PER_SECOND)
+        self.max_concurrency = self.concurrency.max_window
+        self._filter_property_ids: Optional[List[str]] = None
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def query(self) -> Dict[str, Any]:
+        return self.notion_client.query
+
+    @query.setter
+    def query(self, query: Dict[str, Any]) -> None:
+        self.notion_client.query = query
+
+    @property
+    def schema_cache(self) -> Dict[str, Dict[str, Any]]:
+        return self.notion_client.schema_cache
+
+    async def _request(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        レート制限と同時実行数の範囲でリクエストを実行します。
+
+        同時実行数は max_concurrency を上限に、応答時間とエラーに応じて調整します。
+
+        Args:
+            call: リクエストを行うコルーチンを返す関数
+
+        Returns:
+            APIのレスポンス
+        """
+        await self.async_rate_limiter.acquire()
+        async with self.concurrency.request():
+            return await call()
+
+    async def get_database_schema(self) -> Dict[str, Any]:
+        """
+        データベースのスキーマ情報を取得します。
+
+        Returns:
+            データベースのプロパティ情報を含む辞書
+        """
+        if self.database_id in self.schema_cache:
+            return self.schema_cache[self.database_id]
+
+        try:
+            database = await self._request(lambda: self.client.databases.retrieve(self.database_id))
+            properties = database.get('properties', {})
+            self.schema_cache[self.database_id] = properties
+            return properties
+        except Exception as e:
+            self.logger.error(f"データベーススキーマの取得に失敗しました: {e}")
+            raise
+
+    async def get_filter_property_ids(self) -> List[str]:
+        """
+        クエリで取得するプロパティのIDを返します（filter_propertiesに指定するため）。
+
+        Returns:
+            プロパティIDのリスト
+        """
+        if self._filter_property_ids is None:
+            self._filter_property_ids = select_filter_property_ids(await self.get_database_schema())
+        return self._filter_property_ids
+
+    async def _query_database(self, query_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        databases.queryを実行します。NOTION_FILTER_PROPERTIESが有効なら、使用するプロパティだけを取得します。
+
+        Args:
+            query_params: クエリのパラメータ（database_idを含む）
+
+        Returns:
+            APIのレスポンス
+        """
+        property_ids = await self.get_filter_property_ids() if config.NOTION_FILTER_PROPERTIES else []
+        if not property_ids:
+            return await self._request(lambda: self.client.databases.query(**query_params))
+
+        body = {key: value for key, value in query_params.items() if key != "database_id"}
+        return await self._request(lambda: self.client.request(
+            path=f"databases/{query_params['database_id']}/query",
+            method="POST",
+            query={"filter_properties": property_ids},
+            body=body
+        ))
+
+    async def apply_criteria(self, criteria: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        取得条件をスキーマに合わせてNotionのfilter / sortsに変換し、以降のクエリに使用します。
+
+        Args:
+            criteria: 取得条件（notion_filters.compile_queryの形式）
+
+        Returns:
+            databases.queryに追加で渡すパラメータ
+        """
+        self.query = compile_query(criteria, await self.get_database_schema())
+        if self.query:
+            self.logger.info(f"Notionのクエリ条件: {self.query}")
+        return self.query
+
+    async def iter_tasks(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        データベースのタスクをページングしながら順に返します。
+
+        Yields:
+            パースされたタスク情報
+        """
+        seen_ids = set()
+        cursor = None
+        while True:
+            query_params = {
+                "database_id": self.database_id,
+                "page_size": 100,
+                **self.query
+            }
+            if cursor:
+                query_params["start_cursor"] = cursor
+
+            response = await self._query_database(query_params)
+            for page in response.get("results", []):
+                if page.get('id') in seen_ids:
+                    continue
+                seen_ids.add(page.get('id'))
+                yield self.notion_client._parse_page(page)
+
+            if not response.get("has_more", False):
+                return
+            cursor = response.get("next_cursor")
+
+    async def get_all_tasks(self) -> List[Dict[str, Any]]:
+        """
+        データベースから全てのタスクを取得します（チェックポイントには対応していません）。
+
+        Returns:
+            タスク情報を含む辞書のリスト
+        """
+        try:
+            return [task async for task in self.iter_tasks()]
+        except Exception as e:
+            self.logger.error(f"タスクの取得に失敗しました: {e}")
+            raise
+
+    async def iter_block_children(self, block_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        ブロック（またはページ）の子ブロックをページングしながら順に返します。
+
+        Args:
+            block_id: ブロックまたはページのID
+
+        Yields:
+            子ブロック
+        """
+        cursor = None
+        while True:
+            query_params = {
+                "block_id": block_id,
+                "page_size": 100
+            }
+            if cursor:
+                query_params["start_cursor"] = cursor
+
+            response = await self._request(lambda: self.client.blocks.children.list(**query_params))
+            for block in response.get("results", []):
+                yield block
+
+            if not response.get("has_more", False):
+                return
+            cursor = response.get("next_cursor")
+
+    async def _load_block_tree(self, block_id: str, children: Dict[str, List[Dict[str, Any]]]) -> None:
+        """
+        ブロックの子孫を取得し、ブロックIDから子ブロックへの辞書に格納します。
+        同じ階層の子ブロックの取得は並行して行います。
+        """
+        blocks = [block async for block in self.iter_block_children(block_id)]
+        children[block_id] = blocks
+        await asyncio.gather(*(
+            self._load_block_tree(block["id"], children) for block in blocks
+            if block.get("has_children") and block.get("type") not in CHILD_PAGE_BLOCK_TYPES
+        ))
+
+    async def get_page_markdown(self, page_id: str) -> str:
+        """
+        ページの本文（ブロックツリー）を取得し、GitHub Flavored Markdownに変換します。
+
+        Args:
+            page_id: NotionのページID
+
+        Returns:
+            Markdownに変換した本文
+        """
+        children: Dict[str, List[Dict[str, Any]]] = {}
+        await self._load_block_tree(page_id, children)
+        lines = blocks_to_markdown(children[page_id], lambda block_id: children.get(block_id, []))
+        return "\n".join(lines).strip()
+
+    async def fetch_page_bodies(self, tasks: List[Dict[str, Any]], max_workers: Optional[int] = None) -> int:
+        """
+        各タスクのページ本文を並行して取得し、Markdownに変換して task['body'] に設定します。
+
+        全ページのコルーチンを一度に作らず、max_workers 個のワーカーが待ち行列からページを取り出して取得します。
+        取得の遅いページがあっても、他のワーカーは次のページの取得を続けます
+        （各ページの子ブロックの取得は、同時実行数の範囲で並行して行います）。
+
+        Args:
+            tasks: タスクのリスト
+            max_workers: 同時に取得するページ数。指定しない場合は max_concurrency
+
+        Returns:
+            APIから取得したページ数（キャッシュから読み込んだページは含まない）
+        """
+        cache = BlockCache(config.BLOCK_CACHE_DIR) if config.BLOCK_CACHE_DIR else None
+        pending = []
+
+        for task in tasks:
+            page_id = task.get('notion_id')
+            if not page_id:
+                continue
+            cached = cache.get(page_id, task.get('last_edited_time')) if cache else None
+            if cached is not None:
+                task['body'] = cached
+            else:
+                pending.append(task)
+
+        self.logger.info(
+            f"ページ本文: キャッシュ {len(tasks) - len(pending)} 件、取得 {len(pending)} 件"
+        )
+
+        async def fetch(task: Dict[str, Any]) -> bool:
+            try:
+                markdown = await self.get_page_markdown(task['notion_id'])
+            except Exception as e:
+                self.logger.warning(f"ページ本文の取得に失敗しました: {task.get('title', 'No Title')}, エラー: {e}")
+                return False
+            task['body'] = markdown
+            if cache:
+                cache.put(task['notion_id'], task.get('last_edited_time'), markdown)
+            return True
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for task in pending:
+            queue.put_nowait(task)
+
+        async def worker() -> int:
+            count = 0
+            while not queue.empty():
+                count += await fetch(queue.get_nowait())
+            return count
+
+        worker_count = min(max(1, max_workers or self.max_concurrency), len(pending))
+        results = await asyncio.gather(*(worker() for _ in range(worker_count)))
+        return sum(results)
+
+    async def load_tasks(self, criteria: Optional[Dict[str, Any]] = None,
+                         include_body: bool = False) -> List[Dict[str, Any]]:
+        """
+        取得条件の適用、タスクの取得、ページ本文の取得をまとめて行います。
+
+        Args:
+            criteria: 取得条件。指定しない場合は全件を取得
+            include_body: ページ本文も取得するかどうか
+
+        Returns:
+            タスク情報を含む辞書のリスト
+        """
+        if criteria:
+            await self.apply_criteria(criteria)
+        tasks = await self.get_all_tasks()
+        if include_body:
+            await self.fetch_page_bodies(tasks)
+        return tasks
+
+    async def aclose(self) -> None:
+        """
+        コネクションプールを閉じます。
+        """
+        await self.client.aclose()
+
+
+def fetch_tasks(client: AsyncNotionClient, criteria: Optional[Dict[str, Any]] = None,
+                include_body: bool = False) -> List[Dict[str, Any]]:
+    """
+    イベントループを起動してタスクを取得し、終了後にコネクションプールを閉じます。
+    同期的な移行処理から非同期クライアントを使うための入口です。
+
+    Args:
+        client: 非同期クライアント
+        criteria: 取得条件
+        include_body: ページ本文も取得するかどうか
+
+    Returns:
+        タスク情報を含む辞書のリスト
+    """
+    async def run() -> List[Dict[str, Any]]:
+        try:
+            return await client.load_tasks(criteria, include_body)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
@@ -0,0 +1,82 @@
+"""
+ページ本文のキャッシュ
+
+Notionページの本文（Markdownに変換済み）をページの last_edited_time と一緒に
+ページごとのファイルに保存します。再実行時に、編集されていないページの本文を
+再ダウンロードしないために使用します。
+"""
+
+import json
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BlockCache:
+    """
+    ページIDとlast_edited_timeをキーにした本文のキャッシュ
+    """
+
+    def __init__(self, directory: str):
+        """
+        BlockCacheの初期化
+
+        Args:
+            directory: キャッシュファイルを保存するディレクトリ
+        """
+        self.directory = directory
+
+    def _path(self, page_id: str) -> str:
+        """
+        ページのキャッシュファイルのパスを返します。
+        """
+        return os.path.join(self.directory, f"{page_id.replace('-', '')}.json")
+
+    def get(self, page_id: str, last_edited_time: Optional[str]) -> Optional[str]:
+        """
+        キャッシュされた本文を取得します。
+
+        Args:
+            page_id: NotionのページID
+            last_edited_time: ページの最終編集日時
+
+        Returns:
+            ページが編集されていなければキャッシュされた本文、それ以外はNone
+        """
+        if not last_edited_time:
+            return None
+
+        try:
+            with open(self._path(page_id), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if entry.get("last_edited_time") != last_edited_time:
+            return None
+
+        return entry.get("markdown")
+
+    def put(self, page_id: str, last_edited_time: Optional[str], markdown: str) -> None:
+        """
+        本文をキャッシュに保存します。
+
+        Args:
+            page_id: NotionのページID
+            last_edited_time: ページの最終編集日時
+            markdown: Markdownに変換した本文
+        """
+        if not last_edited_time:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(page_id)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"last_edited_time": last_edited_time, "markdown": markdown}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"ページ本文のキャッシュを保存できませんでした: {page_id}, エラー: {e}")
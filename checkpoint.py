@@ -0,0 +1,129 @@
+"""
+Notionページネーションのチェックポイント
+
+databases.queryのページング中に、次のカーソルと取得済みのタスク（パース後のプロパティ）を定期的に
+チェックポイントファイルへ追記します。プロセスが途中で終了しても、
+`--resume` で最後に保存したカーソルから取得を再開できます（取得済みのページは取得し直しません）。
+ページ本文は取得後に別途読み込むため、ファイルには含まれません。
+
+ファイルは1行目がヘッダー（データベースIDとクエリ条件）、以降が
+{"cursor": 次のカーソル, "done": 完了したか, "tasks": [取得済みタスク]} のJSONLです。
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PaginationCheckpoint:
+    """
+    ページネーションの進捗を保存するチェックポイントファイル
+    """
+
+    def __init__(self, path: str, database_id: str, interval: int = 10, query: str = ""):
+        """
+        PaginationCheckpointの初期化
+
+        Args:
+            path: チェックポイントファイルのパス
+            database_id: NotionデータベースのID（別のデータベースのチェックポイントを誤って使わないため）
+            interval: 何ページごとにファイルへ書き出すか
+            query: クエリ条件を表す文字列（条件の異なるチェックポイントを誤って使わないため）
+        """
+        self.path = path
+        self.database_id = database_id
+        self.query = query
+        self.interval = max(1, interval)
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_pages = 0
+
+    def load(self) -> Tuple[List[Dict[str, Any]], Optional[str], bool]:
+        """
+        チェックポイントから取得済みのタスクと再開用のカーソルを読み込みます。
+
+        Returns:
+            (取得済みタスクのリスト, 次のカーソル, 取得が完了していたか)
+        """
+        tasks: List[Dict[str, Any]] = []
+        cursor = None
+        done = False
+
+        if not os.path.exists(self.path):
+            return (tasks, cursor, done)
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            header_line = f.readline()
+            try:
+                header = json.loads(header_line)
+            except json.JSONDecodeError:
+                header = {}
+
+            if header.get("database_id") != self.database_id:
+                logger.warning(f"チェックポイント '{self.path}' は別のデータベースのものなので使用しません")
+                return ([], None, False)
+
+            if header.get("query", "") != self.query:
+                logger.warning(f"チェックポイント '{self.path}' は別のクエリ条件のものなので使用しません")
+                return ([], None, False)
+
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 書き込み途中で中断された最終行は無視する
+                    break
+                tasks.extend(entry.get("tasks", []))
+                cursor = entry.get("cursor")
+                done = entry.get("done", False)
+
+        return (tasks, cursor, done)
+
+    def reset(self) -> None:
+        """
+        チェックポイントを新規に作成し、ヘッダーを書き込みます。
+        """
+        self._pending = []
+        self._pending_pages = 0
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"database_id": self.database_id, "query": self.query}, ensure_ascii=False) + "\n")
+
+    def add(self, tasks: List[Dict[str, Any]], next_cursor: Optional[str]) -> None:
+        """
+        1ページ分の取得結果を記録します。interval ページごと、または最終ページでファイルに書き出します。
+
+        Args:
+            tasks: このページで取得したタスク
+            next_cursor: 次のページのカーソル。最終ページならNone
+        """
+        self._pending.extend(tasks)
+        self._pending_pages += 1
+
+        if next_cursor is None or self._pending_pages >= self.interval:
+            self._flush(next_cursor)
+
+    def _flush(self, next_cursor: Optional[str]) -> None:
+        """
+        溜まっている取得結果とカーソルを追記します。
+        """
+        entry = {
+            "cursor": next_cursor,
+            "done": next_cursor is None,
+            "tasks": self._pending
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._pending = []
+        self._pending_pages = 0
+
+    def clear(self) -> None:
+        """
+        チェックポイントファイルを削除します。
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
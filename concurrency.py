@@ -0,0 +1,218 @@
+"""
+同時実行数の適応制御
+
+同時に実行中のリクエスト数（ウィンドウ）をAIMD（加算増加・乗算減少）で調整します。
+応答時間とエラーが正常な間はウィンドウを少しずつ広げ、レート制限（403 / 429）、
+サーバーエラー（5xx）、タイムアウト、応答時間の急増を検出すると半分に狭めます。
+NotionとGitHubでそれぞれ別のコントローラーを使い、現在のウィンドウは移行結果に表示します。
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+# 応答時間の指数移動平均の重み
+LATENCY_EWMA_ALPHA = 0.2
+# 応答時間の急増とみなす、平均に対する倍率と、判定を始めるまでのサンプル数
+LATENCY_SPIKE_FACTOR = 3.0
+LATENCY_MIN_SAMPLES = 10
+
+# 混雑とみなすHTTPステータス
+CONGESTION_STATUSES = {403, 429, 500, 502, 503, 504}
+
+
+def is_congestion_error(error: BaseException) -> bool:
+    """
+    例外が混雑（レート制限・サーバーエラー・タイムアウト・接続エラー）によるものかを判定します。
+
+    Args:
+        error: リクエストで発生した例外
+
+    Returns:
+        混雑によるものならTrue
+    """
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status", None)
+    if status in CONGESTION_STATUSES:
+        return True
+    name = type(error).__name__
+    return "Timeout" in name or "ConnectionError" in name or isinstance(error, TimeoutError)
+
+
+class RequestOutcome:
+    """
+    リクエストの結果。応答は成功でも本文がレート制限を示す場合は congested を設定します。
+    """
+
+    def __init__(self):
+        self.congested = False
+
+
+class AdaptiveConcurrency:
+    """
+    AIMDで同時実行数を調整するスレッドセーフなコントローラー
+    """
+
+    def __init__(self, name: str, max_window: int, min_window: int = 1,
+                 initial_window: Optional[float] = None, decrease_factor: float = 0.5,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        AdaptiveConcurrencyの初期化
+
+        Args:
+            name: 表示名（"github" / "notion"）
+            max_window: 同時実行数の上限
+            min_window: 同時実行数の下限
+            initial_window: 最初の同時実行数。指定しない場合は下限
+            decrease_factor: 混雑を検出したときにウィンドウに掛ける値
+            clock: 現在時刻を返す関数（テスト用に差し替え可能）
+        """
+        self.name = name
+        self.max_window = max(1, max_window)
+        self.min_window = max(1, min(min_window, self.max_window))
+        self.window = float(initial_window or self.min_window)
+        self.decrease_factor = decrease_factor
+        self._clock = clock
+
+        self.in_flight = 0
+        self.decreases = 0
+        self.peak_window = self.window
+        self._latency: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """
+        現在許可している同時実行数
+        """
+        return max(self.min_window, min(self.max_window, int(self.window)))
+
+    def _record(self, latency: float, congested: bool) -> None:
+        """
+        リクエストの結果からウィンドウを更新します。ロックを取得した状態で呼び出してください。
+        """
+        spike = (
+            self._latency is not None
+            and self._samples >= LATENCY_MIN_SAMPLES
+            and latency > self._latency * LATENCY_SPIKE_FACTOR
+        )
+        self._samples += 1
+        self._latency = latency if self._latency is None else (
+            LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * self._latency
+        )
+
+        now = self._clock()
+        if congested or spike:
+            # 同じ混雑で何度も狭めないよう、前回の減少から平均応答時間が経過するまでは1回とみなす
+            if now - self._last_decrease >= (self._latency or 0.0):
+                self.window = max(float(self.min_window), self.window * self.decrease_factor)
+                self.decreases += 1
+                self._last_decrease = now
+        elif self.window < self.max_window:
+            # ウィンドウ分のリクエストが成功するごとに1ずつ広げる
+            self.window = min(float(self.max_window), self.window + 1.0 / self.window)
+            self.peak_window = max(self.peak_window, self.window)
+
+    def acquire(self) -> None:
+        """
+        同時実行数に空きができるまで待ちます。
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    def release(self, latency: float, congested: bool = False) -> None:
+        """
+        リクエストの完了を記録します。
+
+        Args:
+            latency: 応答時間（秒）
+            congested: 混雑を示す結果だったかどうか
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._record(latency, congested)
+            self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def request(self) -> Iterator[RequestOutcome]:
+        """
+        同時実行数の範囲でリクエストを実行し、応答時間と結果を記録します。
+
+        Yields:
+            リクエストの結果（本文がレート制限を示す場合は congested をTrueにする）
+        """
+        self.acquire()
+        outcome = RequestOutcome()
+        started = self._clock()
+        try:
+            yield outcome
+        except BaseException as e:
+            self.release(self._clock() - started, congested=is_congestion_error(e))
+            raise
+        self.release(self._clock() - started, congested=outcome.congested)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        現在の状態を返します（移行結果の表示用）。
+
+        Returns:
+            {"window", "peak_window", "max_window", "decreases", "latency_ms"}
+        """
+        with self._condition:
+            return {
+                "window": self.limit,
+                "peak_window": int(self.peak_window),
+                "max_window": self.max_window,
+                "decreases": self.decreases,
+                "latency_ms": round((self._latency or 0.0) * 1000)
+            }
+
+
+class AsyncAdaptiveConcurrency(AdaptiveConcurrency):
+    """
+    asyncioのタスク間で使うAdaptiveConcurrency
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._async_condition: Optional[asyncio.Condition] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # 条件変数は実行中のイベントループで作成する
+        if self._async_condition is None:
+            self._async_condition = asyncio.Condition()
+        return self._async_condition
+
+    @contextlib.asynccontextmanager
+    async def request(self) -> AsyncIterator[RequestOutcome]:  # type: ignore[override]
+        """
+        同時実行数の範囲でリクエストを実行し、応答時間と結果を記録します。
+
+        Yields:
+            リクエストの結果
+        """
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+        outcome = RequestOutcome()
+        started = self._clock()
+        congested = False
+        try:
+            yield outcome
+            congested = outcome.congested
+        except BaseException as e:
+            congested = is_congestion_error(e)
+            raise
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                with self._condition:
+                    self._record(self._clock() - started, congested)
+                condition.notify_all()
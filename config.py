@@ -58,5 +58,124 @@ GITHUB_PROJECT_FIELDS = {
     "title": "Title",
     "labels": "Labels",
     "assignees": "Assignees",
-    "due_date": "Due Date"
-} 
\ No newline at end of file
+    "due_date": "Due Date",
+    "parent": "Parent task"
+}
+
+# GitHubへのリクエストが一時的なエラー（429 / 5xx、タイムアウト、接続エラー）で失敗した場合の再試行設定
+# （失敗したリクエストだけを再試行し、タスク全体はやり直さない）
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+RETRY_BACKOFF_SECONDS = float(os.getenv("RETRY_BACKOFF_SECONDS", "1.0"))
+RETRY_BACKOFF_MAX_SECONDS = float(os.getenv("RETRY_BACKOFF_MAX_SECONDS", "30.0"))
+
+# 最終的に失敗したタスクを書き出すデッドレターファイル（空にすると無効）。
+# インポートを始めるたびに、前回のファイルは「<ファイル名>.prev」に退避する
+DEAD_LETTER_FILE = os.getenv("DEAD_LETTER_FILE", "failed_tasks.jsonl")
+
+# タスクごとのインポート状態を記録する状態ファイル（空にすると無効）
+IMPORT_STATE_FILE = os.getenv("IMPORT_STATE_FILE", "import_state.jsonl")
+
+# 途中で失敗したアイテムの扱い（"resume": 残りのフィールド更新を再開, "rollback": Draftを削除して作り直す）
+PARTIAL_IMPORT_POLICY = os.getenv("PARTIAL_IMPORT_POLICY", "resume")
+
+# Notionからの取得の進捗を保存するチェックポイントファイル（空にすると無効）と、保存するページ間隔
+NOTION_CHECKPOINT_FILE = os.getenv("NOTION_CHECKPOINT_FILE", "notion_checkpoint.jsonl")
+CHECKPOINT_INTERVAL = int(os.getenv("CHECKPOINT_INTERVAL", "10"))
+
+# 共有のレート制限（1秒あたりのリクエスト数）とHTTPコネクションプールのサイズ
+# Notion APIの制限は平均3リクエスト/秒。GitHubはコンテンツを作成するミューテーションの二次レート制限に合わせる
+NOTION_REQUESTS_PER_SECOND = float(os.getenv("NOTION_REQUESTS_PER_SECOND", "3"))
+GITHUB_REQUESTS_PER_SECOND = float(os.getenv("GITHUB_REQUESTS_PER_SECOND", "1"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+# GitHubへの同時リクエスト数の上限（1なら1件ずつ順にインポート）
+# NotionとGitHubの同時実行数は、この上限とNOTION_MAX_WORKERS / NOTION_MAX_CONCURRENCYの範囲で応答時間とエラーに応じて自動調整される
+GITHUB_MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", "1"))
+
+# GitHubへの1リクエストのタイムアウト（秒）と、実行全体の期限（秒、0なら期限なし）
+# 期限を過ぎると新しいタスクのインポートを始めず、未処理のタスクは次回の実行で続きからインポートする
+GITHUB_REQUEST_TIMEOUT = float(os.getenv("GITHUB_REQUEST_TIMEOUT", "30"))
+RUN_DEADLINE_SECONDS = float(os.getenv("RUN_DEADLINE_SECONDS", "0"))
+
+# 冪等な読み取りクエリ（プロジェクトID・フィールド・アイテムの取得）が応答時間の95パーセンタイルを過ぎても
+# 返らない場合に、同じクエリをもう1つ送るかどうかと、2つ目を送るまでの最小の待ち時間（秒）
+GITHUB_HEDGE_READS = os.getenv("GITHUB_HEDGE_READS", "false").lower() == "true"
+GITHUB_HEDGE_MIN_DELAY = float(os.getenv("GITHUB_HEDGE_MIN_DELAY", "0.2"))
+
+# 一括ミューテーションで1リクエストにまとめる件数
+GRAPHQL_BATCH_SIZE = int(os.getenv("GRAPHQL_BATCH_SIZE", "20"))
+
+# Notionページの本文（ブロック）を取得してDraftアイテムの説明に含めるかどうか
+FETCH_PAGE_BODY = os.getenv("FETCH_PAGE_BODY", "false").lower() == "true"
+# ページ本文を並行して取得する数と、本文のキャッシュディレクトリ（空にすると無効）
+NOTION_MAX_WORKERS = int(os.getenv("NOTION_MAX_WORKERS", "3"))
+BLOCK_CACHE_DIR = os.getenv("BLOCK_CACHE_DIR", ".cache/notion_blocks")
+
+# Notionから取得するタスクの条件（notion_filters.compile_queryの形式のJSON）
+# 例: {"status": ["In progress"], "tags": ["SDK/計測"], "edited_after": "2024-01-01", "sort": ["Due Date:ascending"]}
+try:
+    NOTION_QUERY = json.loads(os.getenv("NOTION_QUERY", "{}"))
+except json.JSONDecodeError:
+    NOTION_QUERY = {}
+
+# Notionのクエリで、使用するプロパティ（タスクの解析で読み取る型のプロパティとFIELD_MAPPING）だけを取得するかどうか
+NOTION_FILTER_PROPERTIES = os.getenv("NOTION_FILTER_PROPERTIES", "true").lower() == "true"
+
+# Notionからの取得に非同期クライアントを使うかどうかと、同時に実行するリクエストの最大数
+NOTION_ASYNC = os.getenv("NOTION_ASYNC", "false").lower() == "true"
+NOTION_MAX_CONCURRENCY = int(os.getenv("NOTION_MAX_CONCURRENCY", "10"))
+
+# GitHub Projectに既にあるタスク（説明のNotionのURLかタイトルで照合）の扱い
+# "skip": スキップ, "update": 既存のアイテムを更新, "off": 既存アイテムを読み込まない
+EXISTING_ITEM_POLICY = os.getenv("EXISTING_ITEM_POLICY", "skip")
+
+# --verify の検証レポートの出力先
+VERIFY_REPORT_FILE = os.getenv("VERIFY_REPORT_FILE", "verify_report.jsonl")
+
+# Notionで削除・アーカイブされたタスクのアイテムの扱い（"archive" / "delete"、空にすると何もしない）
+PRUNE_ACTION = os.getenv("PRUNE_ACTION", "")
+
+# Notionのステータスに対応するオプションがGitHub Projectにない場合に、インポート前にまとめて作成するかどうか
+# （Statusフィールドの設定を変更するため、明示的に有効にした場合のみ作成する）
+AUTO_CREATE_OPTIONS = os.getenv("AUTO_CREATE_OPTIONS", "false").lower() == "true"
+
+# Notionの担当者（ユーザーID・メールアドレス・名前）をGitHubのログイン名にマッピング
+# 例: {"alice@example.com": "alice", "Takayuki Cho": "TakayukiCho"}
+try:
+    PEOPLE_MAPPING = json.loads(os.getenv("PEOPLE_MAPPING", "{}"))
+except json.JSONDecodeError:
+    PEOPLE_MAPPING = {}
+# GitHubのログイン名からユーザーIDへのキャッシュファイル（空にすると無効）
+PEOPLE_CACHE_FILE = os.getenv("PEOPLE_CACHE_FILE", ".cache/github_users.json")
+
+# 期日を含むイテレーション（スプリント）を設定するGitHub Projectのイテレーションフィールド名（空にすると設定しない）
+ITERATION_FIELD = os.getenv("ITERATION_FIELD", "")
+
+# 移行後にDraftアイテムをイシューに変換するかどうかと、変換先のリポジトリ（"owner/name" または "name"）
+CONVERT_TO_ISSUES = os.getenv("CONVERT_TO_ISSUES", "false").lower() == "true"
+ISSUE_REPOSITORY = os.getenv("ISSUE_REPOSITORY", "")
+
+# 複数のワーカーに分散して移行するワークキュー（--enqueue / --worker）のファイルと、
+# リースの期限（秒）、リースの期限切れで取り出し直す最大回数、他のワーカーの完了を待つ間隔（秒）
+QUEUE_DB_FILE = os.getenv("QUEUE_DB_FILE", "work_queue.sqlite3")
+QUEUE_LEASE_SECONDS = float(os.getenv("QUEUE_LEASE_SECONDS", "600"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_POLL_SECONDS = float(os.getenv("QUEUE_POLL_SECONDS", "5"))
+
+# --daemon で常駐して同期する際の取得の間隔（秒）。変更があれば最短に戻し、変更がない間はDAEMON_BACKOFF倍ずつ延ばす
+DAEMON_MIN_INTERVAL = float(os.getenv("DAEMON_MIN_INTERVAL", "10"))
+DAEMON_MAX_INTERVAL = float(os.getenv("DAEMON_MAX_INTERVAL", "300"))
+DAEMON_BACKOFF = float(os.getenv("DAEMON_BACKOFF", "2.0"))
+# 同期済みの編集日時（ウォーターマーク）を保存する状態ファイル
+DAEMON_STATE_FILE = os.getenv("DAEMON_STATE_FILE", ".cache/daemon_state.json")
+
+# --reverse-sync と --daemon が共有する同期台帳（両方向で最後に一致した値を記録し、同期のエコーを防ぐ）
+SYNC_LEDGER_FILE = os.getenv("SYNC_LEDGER_FILE", ".cache/sync_ledger.json")
+
+# --webhook-server でGitHubのWebhookを受け取る設定（シークレットはWebhookの設定と同じ値）
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8765"))
+# 同じアイテムへのイベントをまとめる時間（秒）と、1回に読み込むアイテムの最大数
+WEBHOOK_COALESCE_SECONDS = float(os.getenv("WEBHOOK_COALESCE_SECONDS", "2"))
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "100"))
@@ -0,0 +1,274 @@
+"""
+常駐して同期するデーモン
+
+NotionClient・GitHubClient（コネクションプール、スキーマ、フィールドIDのキャッシュ）と
+プロジェクトの既存アイテムの索引を保持したまま、Notionで最近編集されたページを定期的に取得し、
+変更されたタスクだけをGitHub Projectに反映します。cronで毎回全件を取得するのに比べて、
+起動とスキーマの取得、データベース全体の取得のコストがかかりません。
+
+取得は last_edited_time の条件（ウォーターマーク以降）で絞り込み、ウォーターマークは
+状態ファイルに保存するため、再起動しても続きから同期します。取得の間隔は、変更があれば
+最短の間隔に戻し、変更がない間は少しずつ延ばします。
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from task_importer import TaskImporter, new_stats
+from project_index import EXISTING_UPDATE, load_project_index
+from hierarchy import topological_order
+from people_resolver import PeopleResolver
+from snapshot import task_digest
+from reverse_sync import SyncLedger, task_values
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptivePoller:
+    """
+    変更の有無に応じて取得の間隔を調整するクラス
+    """
+
+    def __init__(self, min_interval: Optional[float] = None, max_interval: Optional[float] = None,
+                 backoff: Optional[float] = None):
+        """
+        AdaptivePollerの初期化
+
+        Args:
+            min_interval: 最短の間隔（秒）。指定しない場合は設定ファイルの値
+            max_interval: 最長の間隔（秒）。指定しない場合は設定ファイルの値
+            backoff: 変更がなかったときに間隔に掛ける値。指定しない場合は設定ファイルの値
+        """
+        self.min_interval = min_interval or config.DAEMON_MIN_INTERVAL
+        self.max_interval = max(self.min_interval, max_interval or config.DAEMON_MAX_INTERVAL)
+        self.backoff = backoff or config.DAEMON_BACKOFF
+        self.interval = self.min_interval
+
+    def next_interval(self, changes: int) -> float:
+        """
+        取得した変更の数から、次の取得までの間隔を返します。
+
+        Args:
+            changes: 変更されたタスク数
+
+        Returns:
+            次の取得までの秒数
+        """
+        if changes:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return self.interval
+
+
+class SyncDaemon:
+    """
+    Notionの変更を差分でGitHub Projectに反映し続けるクラス
+    """
+
+    def __init__(self, notion_client: Any, github_client: Any, criteria: Optional[Dict[str, Any]] = None,
+                 state_path: Optional[str] = None, poller: Optional[AdaptivePoller] = None,
+                 sleep: Callable[[float], None] = time.sleep, ledger: Optional[SyncLedger] = None):
+        """
+        SyncDaemonの初期化
+
+        Args:
+            notion_client: NotionのAPIクライアント
+            github_client: GitHubのAPIクライアント
+            criteria: 取得条件（編集日時の条件は同期のたびに上書きする）
+            state_path: ウォーターマークを保存する状態ファイル。指定しない場合は設定ファイルの値
+            poller: 取得の間隔の調整。指定しない場合は設定ファイルの値で作成
+            sleep: 待機に使用する関数（テスト用に差し替え可能）
+            ledger: 逆方向の同期と共有する同期台帳。指定した場合は、逆方向の同期がNotionに書き込んだ変更を
+                反映せず、反映した値を台帳に記録する
+        """
+        self.notion_client = notion_client
+        self.github_client = github_client
+        self.criteria = dict(criteria or {})
+        self.state_path = state_path if state_path is not None else config.DAEMON_STATE_FILE
+        self.poller = poller or AdaptivePoller()
+        self.sleep = sleep
+        self.ledger = ledger
+
+        self.stats = new_stats()
+        self.polls = 0
+        self.watermark: Optional[str] = None
+        # ウォーターマークと同じ編集日時で反映済みのタスクと内容のハッシュ
+        # （編集日時は分単位のため、同じ分の中の変更は内容で区別する）
+        self._seen: Set[Tuple[str, str]] = set()
+        # 取得した変更の反映が終わったら進める、次のウォーターマークと反映済みのタスク
+        self._next: Optional[Tuple[str, Set[Tuple[str, str]]]] = None
+        self._item_index = None
+        self._importer: Optional[TaskImporter] = None
+        self._resolver: Optional[PeopleResolver] = None
+        self._load_state()
+
+    def _load_state(self) -> None:
+        """
+        状態ファイルからウォーターマークを読み込みます。ない場合は現在時刻から監視します。
+        """
+        if self.state_path and os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.watermark = state.get("watermark")
+            self._seen = {tuple(entry) for entry in state.get("seen", [])}
+            logger.info(f"{self.watermark} 以降に編集されたタスクから同期を再開します")
+            return
+
+        # Notionの編集日時は分単位のため、現在の分の始まりから監視する
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        self.watermark = now.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        logger.info(f"{self.watermark} 以降に編集されたタスクを同期します（既存のタスクは通常の移行で移行してください）")
+
+    def _save_state(self) -> None:
+        """
+        ウォーターマークを状態ファイルに保存します。
+        """
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"watermark": self.watermark, "seen": sorted(self._seen)}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def _prepare(self) -> None:
+        """
+        最初の同期の前に、既存アイテムの索引とインポーターを用意します（以降は使い回す）。
+        """
+        if self._importer is not None:
+            return
+        self._item_index = load_project_index(self.github_client)
+        self._importer = TaskImporter(
+            self.github_client, self.stats,
+            dead_letter_file=config.DEAD_LETTER_FILE,
+            item_index=self._item_index,
+            existing_policy=EXISTING_UPDATE
+        )
+        if config.PEOPLE_MAPPING:
+            self._resolver = PeopleResolver(self.github_client)
+
+    def fetch_changes(self) -> List[Dict[str, Any]]:
+        """
+        ウォーターマーク以降に編集され、まだ反映していないタスクを取得します。
+
+        次のウォーターマークは計算だけ行い、commit()で反映が終わってから進めます。
+
+        Returns:
+            変更されたタスクのリスト
+        """
+        self.notion_client.apply_criteria(dict(self.criteria, edited_after=self.watermark))
+        tasks = self.notion_client.get_all_tasks()
+
+        changed = [task for task in tasks if (task.get('notion_id'), task_digest(task)) not in self._seen]
+        if self.ledger is not None:
+            # 逆方向の同期による書き込みは、GitHubの値がそのままNotionに反映されたものなので戻さない
+            changed = [task for task in changed if not self.ledger.is_echo(task)]
+
+        self._next = None
+        edited_times = [task['last_edited_time'] for task in tasks if task.get('last_edited_time')]
+        if edited_times:
+            latest = max(edited_times)
+            seen = set(self._seen) if latest == self.watermark else set()
+            seen.update(
+                (task['notion_id'], task_digest(task)) for task in tasks
+                if task.get('notion_id') and task.get('last_edited_time') == latest
+            )
+            self._next = (latest, seen)
+        return changed
+
+    def commit(self) -> None:
+        """
+        fetch_changesで取得した変更の反映が終わった後に、ウォーターマークを進めて保存します。
+        """
+        if self._next is not None:
+            self.watermark, self._seen = self._next
+            self._next = None
+        self._save_state()
+
+    def poll_once(self) -> int:
+        """
+        変更を1回取得してGitHub Projectに反映します。
+
+        Returns:
+            反映を試みたタスク数
+        """
+        self.polls += 1
+        self._prepare()
+        changed = self.fetch_changes()
+        if not changed:
+            logger.debug("変更されたタスクはありません")
+            self.commit()
+            return 0
+
+        logger.info(f"変更されたタスク: {len(changed)} 件")
+        if config.FETCH_PAGE_BODY:
+            self.notion_client.fetch_page_bodies(changed)
+        if any(task.get('parent_id') for task in changed):
+            changed = topological_order(changed)
+        try:
+            self.github_client.prepare_field_options(changed)
+        except Exception as e:
+            logger.error(f"フィールドのオプションの作成に失敗しました: {e}")
+        if self._resolver:
+            try:
+                self._resolver.resolve_tasks(changed)
+            except Exception as e:
+                logger.error(f"担当者の対応づけに失敗しました: {e}")
+
+        self.stats["total"] += len(changed)
+        deadline_skipped = self.stats.get("deadline_skipped", 0)
+        for task in changed:
+            existing = self._item_index.find(task, by_title=False)
+            if not self._importer.import_task(task):
+                continue
+            # 新しく作成したアイテムは、TaskImporterが索引に追加する
+            item_id = existing["id"] if existing else self.github_client.imported_items.get(task.get('notion_id'))
+            if item_id and self.ledger is not None:
+                # 反映した値を記録し、逆方向の同期がこの更新をNotionに書き戻さないようにする
+                self.ledger.record_github(item_id, task_values(task))
+
+        if self.ledger is not None:
+            self.ledger.save()
+
+        # 失敗したタスクも含めてウォーターマークを進める（失敗したタスクはデッドレターファイルから再実行する）。
+        # 途中で例外が発生した場合や、期限で反映しなかったタスクがある場合は進めず、次回に同じ変更を取得し直す
+        if self.stats.get("deadline_skipped", 0) == deadline_skipped:
+            self.commit()
+        return len(changed)
+
+    def run(self, max_polls: Optional[int] = None, should_stop: Callable[[], bool] = lambda: False) -> Dict[str, Any]:
+        """
+        変更の取得と反映を繰り返します。
+
+        取得に失敗した場合はログに記録し、変更がなかったものとして間隔を延ばして続行します。
+
+        Args:
+            max_polls: 取得の最大回数。Noneなら停止するまで続ける
+            should_stop: Trueを返したら終了する関数（実行の期限など）
+
+        Returns:
+            反映の統計情報
+        """
+        logger.info(
+            f"デーモンを開始します（取得の間隔: {self.poller.min_interval:g}〜{self.poller.max_interval:g} 秒）"
+        )
+        while not should_stop() and (max_polls is None or self.polls < max_polls):
+            try:
+                changes = self.poll_once()
+            except Exception as e:
+                logger.error(f"変更の同期に失敗しました: {e}")
+                changes = 0
+            if max_polls is not None and self.polls >= max_polls:
+                break
+            interval = self.poller.next_interval(changes)
+            logger.debug(f"{interval:g} 秒後に変更を確認します")
+            self.sleep(interval)
+        return self.stats
@@ -5,13 +5,107 @@ GitHub APIを使ってGitHub Projectsにタスクをインポートします。
 """
 
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple
 import requests
 import json
 import config
+from rate_limiter import RateLimiter
+from concurrency import AdaptiveConcurrency
+from timeouts import DeadlineExceeded, HedgedReader, run_deadline
+from retry_queue import PERMANENT, RateLimitedError, RetryPolicy, call_with_retry, classify_exception
+from project_index import ProjectItemIndex
+from iteration_index import IterationIndex
+from import_state import (
+    ImportStateStore, POLICY_RESUME, POLICY_ROLLBACK,
+    STEP_CREATE, STEP_BODY, STEP_STATUS, STEP_DUE_DATE, STEP_ITERATION, STEP_ASSIGNEES, STEP_LABELS
+)
 from github import Github
 from github.GithubException import GithubException
 
+def graphql_literal(value: Any) -> str:
+    """
+    値をGraphQLのリテラルに変換します（一括ミューテーションで引数を埋め込むため）。
+    
+    GraphQLの文字列リテラルのエスケープはJSONと互換なので、json.dumpsを使用します。
+    
+    Args:
+        value: 文字列、数値、真偽値、None、またはそれらのリスト
+        
+    Returns:
+        GraphQLのリテラル表現
+    """
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(graphql_literal(v) for v in value) + "]"
+    return json.dumps(value, ensure_ascii=False)
+
+
+# プロジェクトのアイテムをフィールドの値と一緒に取得するフラグメント（iter_items / get_items）
+ITEM_VALUES_FRAGMENT = """
+fragment ItemValues on ProjectV2Item {
+    id
+    type
+    isArchived
+    updatedAt
+    content {
+        ... on DraftIssue { id title body }
+        ... on Issue { id title body }
+        ... on PullRequest { id title body }
+    }
+    fieldValues(first: 20) {
+        nodes {
+            ... on ProjectV2ItemFieldTextValue {
+                text
+                field { ... on ProjectV2FieldCommon { name } }
+            }
+            ... on ProjectV2ItemFieldSingleSelectValue {
+                name
+                field { ... on ProjectV2FieldCommon { name } }
+            }
+            ... on ProjectV2ItemFieldDateValue {
+                date
+                field { ... on ProjectV2FieldCommon { name } }
+            }
+            ... on ProjectV2ItemFieldNumberValue {
+                number
+                field { ... on ProjectV2FieldCommon { name } }
+            }
+            ... on ProjectV2ItemFieldIterationValue {
+                title
+                field { ... on ProjectV2FieldCommon { name } }
+            }
+        }
+    }
+}
+"""
+
+
+def _parse_item_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    ItemValuesで取得したアイテムを、iter_itemsの形式にします。
+    """
+    content = node.get("content") or {}
+    fields = {}
+    for value in (node.get("fieldValues") or {}).get("nodes", []):
+        field_name = (value.get("field") or {}).get("name")
+        if not field_name:
+            continue
+        for key in ("text", "name", "date", "number", "title"):
+            if key in value:
+                fields[field_name] = value[key]
+                break
+    
+    return {
+        "id": node["id"],
+        "type": node.get("type"),
+        "content_id": content.get("id"),
+        "title": content.get("title", ""),
+        "body": content.get("body") or "",
+        "archived": node.get("isArchived", False),
+        "updated_at": node.get("updatedAt"),
+        "fields": fields
+    }
+
+
 class GitHubClient:
     """
     GitHub APIと通信するためのクライアントクラス
@@ -21,7 +115,12 @@ class GitHubClient:
     """
     
     def __init__(self, token: Optional[str] = None, owner: Optional[str] = None, 
-                 project_number: Optional[str] = None):
+                 project_number: Optional[str] = None, session: Optional[requests.Session] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 metadata_cache: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None,
+                 concurrency: Optional[AdaptiveConcurrency] = None,
+                 hedged_reader: Optional[HedgedReader] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
         """
         GitHubClientの初期化
         
@@ -29,6 +128,12 @@ class GitHubClient:
             token: GitHub APIトークン。指定しない場合は環境変数から取得
             owner: GitHubの所有者名（ユーザー名または組織名）。指定しない場合は環境変数から取得
             project_number: GitHub Projectの番号。指定しない場合は環境変数から取得
+            session: 共有するHTTPセッション（コネクションプール）。指定しない場合はrequestsを直接使用
+            rate_limiter: 共有するレートリミッター。指定しない場合は制限しない
+            metadata_cache: (所有者, プロジェクト番号) をキーにした、プロジェクトIDとフィールドIDの共有キャッシュ
+            concurrency: 共有する同時実行数のコントローラー。指定しない場合はGITHUB_MAX_CONCURRENCYを上限に作成
+            hedged_reader: 読み取りクエリのヘッジ。指定しない場合はGITHUB_HEDGE_READSが有効なときに作成
+            retry_policy: 一時的なエラーで失敗したリクエストの再試行ポリシー。指定しない場合は設定ファイルの値
         """
         self.token = token or config.GITHUB_TOKEN
         self.owner = owner or config.GITHUB_OWNER
@@ -50,11 +155,115 @@ class GitHubClient:
             "Content-Type": "application/json"
         }
         
+        # 共有のHTTPセッションとレートリミッター
+        self.http = session if session is not None else requests
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency or AdaptiveConcurrency("github", config.GITHUB_MAX_CONCURRENCY)
+        if hedged_reader is None and config.GITHUB_HEDGE_READS:
+            hedged_reader = HedgedReader(min_delay=config.GITHUB_HEDGE_MIN_DELAY)
+        self.hedged_reader = hedged_reader
+        self.retry_policy = retry_policy or RetryPolicy.from_config()
+        
+        # このクライアントでインポートしたタスクのNotionページIDからアイテムIDへの対応
+        self.imported_items: Dict[str, str] = {}
+        
         # プロジェクトIDとプロジェクトフィールドのキャッシュ
         self._project_id = None
         self._field_ids = {}
+        self._metadata = (metadata_cache if metadata_cache is not None else {}).setdefault(
+            (self.owner, str(self.project_number)), {}
+        )
         
         self.logger = logging.getLogger(__name__)
+
+    def _post_graphql(self, query: str, variables: Dict[str, Any], idempotent: bool = True) -> Dict[str, Any]:
+        """
+        GraphQL APIにリクエストを送信します。
+
+        HTTPステータスがエラーの場合は、ステータスコードと本文を含む
+        requests.HTTPErrorを送出します（リトライ時のエラー分類に使用されます）。
+        一時的なエラー（429 / 5xx、レート制限、タイムアウト、接続エラー）は、このリクエストだけを
+        バックオフ付きで再試行します。作成などの冪等でないミューテーションは idempotent=False で送信し、
+        サーバーに届く前に失敗した場合だけ再試行します。
+        応答時間とレート制限のエラーは、同時実行数のコントローラーに記録します。
+
+        Args:
+            query: GraphQLクエリ
+            variables: クエリ変数
+            idempotent: 同じリクエストを繰り返しても結果が変わらないかどうか
+
+        Returns:
+            レスポンスのJSON
+        """
+        return call_with_retry(
+            lambda: self._post_graphql_once(query, variables), self.retry_policy,
+            run_deadline(), "GraphQLのリクエスト", idempotent=idempotent
+        )
+
+    def _post_graphql_once(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        レート制限と同時実行数の範囲で、GraphQL APIにリクエストを1回送信します。
+
+        GraphQLのレート制限（200の応答のRATE_LIMITEDエラー）はRateLimitedErrorとして送出します。
+        """
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        with self.concurrency.request() as outcome:
+            data = self._send_graphql(query, variables)
+            # GraphQLのレート制限は200の応答のエラーとして返される
+            rate_limited = [error for error in data.get("errors") or [] if error.get("type") == "RATE_LIMITED"]
+            if rate_limited:
+                outcome.congested = True
+        if rate_limited:
+            raise RateLimitedError(rate_limited[0].get("message", "RATE_LIMITED"))
+        return data
+
+    def _send_graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        GraphQL APIにリクエストを1回送信します。
+
+        タイムアウトはGITHUB_REQUEST_TIMEOUTと実行の期限までの残り時間の短い方です。
+        期限を過ぎている場合は送信せずにtimeouts.DeadlineExceededを送出します。
+        """
+        response = self.http.post(
+            self.graphql_url,
+            headers=self.headers,
+            json={"query": query, "variables": variables},
+            timeout=run_deadline().timeout(config.GITHUB_REQUEST_TIMEOUT)
+        )
+
+        if not response.ok:
+            raise requests.HTTPError(
+                f"{response.status_code} {response.reason}: {response.text[:200]}",
+                response=response
+            )
+        return response.json()
+
+    def _read_graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        冪等な読み取りクエリを送信します。
+        
+        GITHUB_HEDGE_READSが有効な場合、応答が遅いと同じクエリをもう1つ送り、先に返った応答を使います。
+        2つ目のクエリはレート制限の対象ですが、同時実行数のコントローラーは通しません
+        （ウィンドウが1のときも最初のクエリの完了を待たずに送るため）。
+        
+        Args:
+            query: GraphQLクエリ
+            variables: クエリ変数
+        
+        Returns:
+            レスポンスのJSON
+        """
+        if self.hedged_reader is None:
+            return self._post_graphql(query, variables)
+        
+        def hedge() -> Dict[str, Any]:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            return self._send_graphql(query, variables)
+        
+        return self.hedged_reader.call(lambda: self._post_graphql(query, variables), hedge)
     
     def get_project_id(self) -> str:
         """
@@ -68,6 +277,10 @@ class GitHubClient:
         """
         if self._project_id:
             return self._project_id
+        
+        if "project_id" in self._metadata:
+            self._project_id = self._metadata["project_id"]
+            return self._project_id
             
         # ユーザープロジェクトかOrganizationプロジェクトかを判定
         # ユーザープロジェクトの場合
@@ -86,18 +299,13 @@ class GitHubClient:
             "project_number": int(self.project_number)
         }
         
-        response = requests.post(
-            self.graphql_url, 
-            headers=self.headers, 
-            json={"query": query, "variables": variables}
-        )
-        
-        data = response.json()
+        data = self._read_graphql(query, variables)
         
         # ユーザープロジェクトの場合
         if "data" in data and data["data"]["user"] and data["data"]["user"]["projectV2"]:
             project_id = data["data"]["user"]["projectV2"]["id"]
             self._project_id = project_id
+            self._metadata["project_id"] = project_id
             return project_id
         
         # Organizationプロジェクトの場合
@@ -111,13 +319,7 @@ class GitHubClient:
         }
         """
         
-        response = requests.post(
-            self.graphql_url, 
-            headers=self.headers, 
-            json={"query": query, "variables": variables}
-        )
-        
-        data = response.json()
+        data = self._read_graphql(query, variables)
         if "errors" in data or not data["data"]["organization"] or not data["data"]["organization"]["projectV2"]:
             error_message = data.get("errors", [{"message": "プロジェクトが見つかりません"}])[0]["message"]
             self.logger.error(f"プロジェクトIDの取得に失敗しました: {error_message}")
@@ -125,6 +327,7 @@ class GitHubClient:
             
         project_id = data["data"]["organization"]["projectV2"]["id"]
         self._project_id = project_id
+        self._metadata["project_id"] = project_id
         return project_id
     
     def get_field_ids(self) -> Dict[str, str]:
@@ -139,6 +342,10 @@ class GitHubClient:
         """
         if self._field_ids:
             return self._field_ids
+        
+        if "field_ids" in self._metadata:
+            self._field_ids = self._metadata["field_ids"]
+            return self._field_ids
             
         project_id = self.get_project_id()
         
@@ -155,6 +362,10 @@ class GitHubClient:
                             ... on ProjectV2IterationField {
                                 id
                                 name
+                                configuration {
+                                    iterations { id title startDate duration }
+                                    completedIterations { id title startDate duration }
+                                }
                             }
                             ... on ProjectV2SingleSelectField {
                                 id
@@ -162,6 +373,8 @@ class GitHubClient:
                                 options {
                                     id
                                     name
+                                    color
+                                    description
                                 }
                             }
                         }
@@ -175,19 +388,15 @@ class GitHubClient:
             "project_id": project_id
         }
         
-        response = requests.post(
-            self.graphql_url, 
-            headers=self.headers, 
-            json={"query": query, "variables": variables}
-        )
-        
-        data = response.json()
+        data = self._read_graphql(query, variables)
         if "errors" in data:
             error_message = data["errors"][0]["message"]
             self.logger.error(f"フィールドIDの取得に失敗しました: {error_message}")
             raise ValueError(f"フィールドIDの取得に失敗しました: {error_message}")
             
         field_mappings = {}
+        select_options = {}
+        iterations = {}
         fields = data["data"]["node"]["fields"]["nodes"]
         
         for field in fields:
@@ -195,16 +404,234 @@ class GitHubClient:
             field_id = field["id"]
             field_mappings[field_name] = field_id
             
+            # イテレーションフィールドの場合は、完了済みを含む全イテレーションを保存
+            if "configuration" in field:
+                configuration = field["configuration"] or {}
+                iterations[field_name] = (configuration.get("iterations") or []) + \
+                    (configuration.get("completedIterations") or [])
+            
             # ステータスフィールドの場合は、各オプションのIDも保存
             if "options" in field:
+                select_options[field_name] = field["options"]
                 for option in field["options"]:
                     option_name = option["name"]
                     option_id = option["id"]
                     field_mappings[f"{field_name}:{option_name}"] = option_id
         
         self._field_ids = field_mappings
+        self._metadata["field_ids"] = field_mappings
+        self._metadata["select_options"] = select_options
+        self._metadata["iterations"] = iterations
         return field_mappings
     
+    def get_iteration_index(self, field_name: str) -> Optional[IterationIndex]:
+        """
+        イテレーションフィールドの期間の索引を返します。索引はプロジェクトごとに1回だけ作成します。
+        
+        Args:
+            field_name: イテレーションフィールドの名前
+            
+        Returns:
+            期間の索引。イテレーションフィールドでなければNone
+        """
+        self.get_field_ids()
+        indexes = self._metadata.setdefault("iteration_indexes", {})
+        if field_name not in indexes:
+            iterations = self._metadata.get("iterations", {}).get(field_name)
+            indexes[field_name] = IterationIndex(iterations) if iterations is not None else None
+        return indexes[field_name]
+    
+    def ensure_single_select_options(self, field_name: str, values: Iterable[str]) -> List[str]:
+        """
+        単一選択フィールドに不足しているオプションを1回のミューテーションでまとめて作成します。
+        
+        updateProjectV2Fieldはオプションの一覧を置き換えるため、既存のオプションもIDと名前・色・説明を
+        そのまま含めて送信します。IDを送らないとオプションが作り直され、アイテムのステータスが消えます。
+        作成後にオプションIDのキャッシュを応答の内容で1回だけ更新します。
+        
+        Args:
+            field_name: 単一選択フィールドの名前
+            values: フィールドに設定する値
+            
+        Returns:
+            作成したオプション名のリスト
+        """
+        field_ids = self.get_field_ids()
+        options = self._metadata.get("select_options", {}).get(field_name)
+        
+        if field_name not in field_ids or options is None:
+            self.logger.warning(f"単一選択フィールド '{field_name}' が見つかりません")
+            return []
+        
+        missing = sorted({value for value in values if value and f"{field_name}:{value}" not in field_ids})
+        if not missing:
+            return []
+        
+        if not config.AUTO_CREATE_OPTIONS:
+            self.logger.warning(f"フィールド '{field_name}' にオプションがありません: {', '.join(missing)}")
+            return []
+        
+        query = """
+        mutation($field_id: ID!, $options: [ProjectV2SingleSelectFieldOptionInput!]) {
+            updateProjectV2Field(input: {
+                fieldId: $field_id,
+                singleSelectOptions: $options
+            }) {
+                projectV2Field {
+                    ... on ProjectV2SingleSelectField {
+                        options {
+                            id
+                            name
+                            color
+                            description
+                        }
+                    }
+                }
+            }
+        }
+        """
+        
+        # 既存のオプションはIDを含めて送信し、IDを変えずに残す
+        new_options = [
+            {
+                "id": option["id"],
+                "name": option["name"],
+                "color": option.get("color") or "GRAY",
+                "description": option.get("description") or ""
+            }
+            for option in options
+        ] + [
+            {"name": value, "color": "GRAY", "description": "Created from Notion"} for value in missing
+        ]
+        
+        variables = {
+            "field_id": field_ids[field_name],
+            "options": new_options
+        }
+        
+        data = self._post_graphql(query, variables, idempotent=False)
+        if "errors" in data:
+            error_message = data["errors"][0]["message"]
+            self.logger.error(f"オプションの作成に失敗しました: {error_message}")
+            raise ValueError(f"オプションの作成に失敗しました: {error_message}")
+        
+        # オプションIDのキャッシュを応答の内容で更新
+        updated = data["data"]["updateProjectV2Field"]["projectV2Field"]["options"]
+        prefix = f"{field_name}:"
+        for key in [key for key in field_ids if key.startswith(prefix)]:
+            del field_ids[key]
+        for option in updated:
+            field_ids[f"{prefix}{option['name']}"] = option["id"]
+        self._metadata["select_options"][field_name] = updated
+        
+        self.logger.info(f"フィールド '{field_name}' にオプションを作成しました: {', '.join(missing)}")
+        return missing
+    
+    def prepare_field_options(self, tasks: Iterable[Dict[str, Any]]) -> int:
+        """
+        インポートの前に、全タスクのステータスの値を集めて不足しているオプションを作成します。
+        
+        Args:
+            tasks: インポートするタスク
+            
+        Returns:
+            作成したオプション数
+        """
+        statuses = {task['status'] for task in tasks if task.get('status')}
+        return len(self.ensure_single_select_options("Status", statuses))
+    
+    def iter_items(self) -> Iterator[Dict[str, Any]]:
+        """
+        プロジェクトの全アイテムを、フィールドの値と一緒にページングしながら取得します。
+        
+        1リクエストで100件ずつ取得するため、アイテムごとに存在を確認するより少ないリクエストで済みます。
+        
+        Yields:
+            {"id", "type", "content_id", "title", "body", "archived", "updated_at", "fields": {フィールド名: 値}}
+        """
+        project_id = self.get_project_id()
+        
+        query = """
+        query($project_id: ID!, $cursor: String) {
+            node(id: $project_id) {
+                ... on ProjectV2 {
+                    items(first: 100, after: $cursor) {
+                        pageInfo {
+                            hasNextPage
+                            endCursor
+                        }
+                        nodes { ...ItemValues }
+                    }
+                }
+            }
+        }
+        """ + ITEM_VALUES_FRAGMENT
+        
+        cursor = None
+        while True:
+            data = self._read_graphql(query, {"project_id": project_id, "cursor": cursor})
+            if "errors" in data:
+                error_message = data["errors"][0]["message"]
+                self.logger.error(f"アイテムの取得に失敗しました: {error_message}")
+                raise ValueError(f"アイテムの取得に失敗しました: {error_message}")
+            
+            items = data["data"]["node"]["items"]
+            for node in items["nodes"]:
+                yield _parse_item_node(node)
+            
+            if not items["pageInfo"]["hasNextPage"]:
+                return
+            cursor = items["pageInfo"]["endCursor"]
+    
+    def get_items(self, item_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        指定したアイテムを、フィールドの値と一緒に100件ずつまとめて取得します。
+        
+        このプロジェクトのアイテムでないもの、削除されたものは含まれません。
+        
+        Args:
+            item_ids: アイテムIDのリスト
+            
+        Returns:
+            アイテムのリスト（iter_itemsの形式）
+        """
+        project_id = self.get_project_id()
+        
+        query = """
+        query($ids: [ID!]!) {
+            nodes(ids: $ids) {
+                ... on ProjectV2Item {
+                    project { id }
+                    ...ItemValues
+                }
+            }
+        }
+        """ + ITEM_VALUES_FRAGMENT
+        
+        item_ids = list(dict.fromkeys(item_ids))
+        result = []
+        for start in range(0, len(item_ids), 100):
+            data = self._read_graphql(query, {"ids": item_ids[start:start + 100]})
+            if "errors" in data and not data.get("data"):
+                error_message = data["errors"][0]["message"]
+                self.logger.error(f"アイテムの取得に失敗しました: {error_message}")
+                raise ValueError(f"アイテムの取得に失敗しました: {error_message}")
+            
+            # 削除されたアイテムはnullとエラーで返るため、取得できたものだけを使う
+            for node in data["data"]["nodes"]:
+                if node and (node.get("project") or {}).get("id") == project_id:
+                    result.append(_parse_item_node(node))
+        return result
+    
+    def get_all_items(self) -> List[Dict[str, Any]]:
+        """
+        プロジェクトの全アイテムを取得します。
+        
+        Returns:
+            アイテムのリスト（iter_itemsの形式）
+        """
+        return list(self.iter_items())
+    
     def create_draft_item(self, task_data: Dict[str, Any]) -> str:
         """
         GitHub ProjectsにDraftアイテムを直接作成します。
@@ -220,10 +647,12 @@ class GitHubClient:
         
         # Draftアイテムを作成するGraphQLミューテーション
         query = """
-        mutation($project_id: ID!, $title: String!) {
+        mutation($project_id: ID!, $title: String!, $body: String, $assignee_ids: [ID!]) {
             addProjectV2DraftItem(input: {
                 projectId: $project_id,
-                title: $title
+                title: $title,
+                body: $body,
+                assigneeIds: $assignee_ids
             }) {
                 projectItem {
                     id
@@ -237,25 +666,52 @@ class GitHubClient:
             "title": title
         }
         
-        try:
-            response = requests.post(
-                self.graphql_url, 
-                headers=self.headers, 
-                json={"query": query, "variables": variables}
-            )
-            
-            data = response.json()
-            if "errors" in data:
-                error_message = data["errors"][0]["message"]
-                self.logger.error(f"Draftアイテム作成に失敗しました: {title}, エラー: {error_message}")
-                raise ValueError(f"Draftアイテム作成に失敗しました: {error_message}")
-            
-            item_id = data["data"]["addProjectV2DraftItem"]["projectItem"]["id"]
-            return item_id
+        # 作成されたか分からない場合にページIDで探せるように、作成時からNotionのURLを説明に含める
+        if task_data.get('url'):
+            variables["body"] = f"*From Notion: {task_data['url']}*"
+        
+        # GitHubのユーザーに対応づけられた担当者をDraftにアサイン
+        if task_data.get('assignee_ids'):
+            variables["assignee_ids"] = task_data['assignee_ids']
+        
+        # 冪等でないため、タイムアウトや5xxでは作成が反映された可能性がある。
+        # その場合はNotionのページIDでアイテムを探し、見つからないときだけ作成し直す
+        attempt = 0
+        while True:
+            try:
+                data = self._post_graphql(query, variables, idempotent=False)
+                break
+            except Exception as e:
+                if (classify_exception(e) == PERMANENT or attempt >= self.retry_policy.max_retries
+                        or not task_data.get('url')):
+                    self.logger.error(f"Draftアイテム作成に失敗しました: {title}, エラー: {str(e)}")
+                    raise
+                attempt += 1
+                self.retry_policy.sleep(self.retry_policy.delay(attempt))
+                existing = self.find_item_by_page(task_data)
+                if existing:
+                    self.logger.info(f"作成済みのDraftアイテムが見つかったため再利用します: {existing['id']}")
+                    return existing["id"]
+                self.logger.warning(f"Draftアイテムは作成されていなかったため、作成し直します: {title}")
+        
+        if "errors" in data:
+            error_message = data["errors"][0]["message"]
+            self.logger.error(f"Draftアイテム作成に失敗しました: {title}, エラー: {error_message}")
+            raise ValueError(f"Draftアイテム作成に失敗しました: {error_message}")
+        
+        return data["data"]["addProjectV2DraftItem"]["projectItem"]["id"]
+    
+    def find_item_by_page(self, task_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        説明に埋め込まれたNotionのページIDで、タスクに対応するプロジェクトのアイテムを探します。
+        
+        Args:
+            task_data: タスクデータ
             
-        except Exception as e:
-            self.logger.error(f"Draftアイテム作成に失敗しました: {title}, エラー: {str(e)}")
-            raise
+        Returns:
+            対応するアイテム。見つからなければNone
+        """
+        return ProjectItemIndex(self.iter_items()).find(task_data, by_title=False)
     
     def update_item_field(self, item_id: str, field_name: str, field_value: Any) -> bool:
         """
@@ -278,8 +734,39 @@ class GitHubClient:
         field_id = field_ids[field_name]
         project_id = self.get_project_id()
         
+        iteration_index = self.get_iteration_index(field_name)
+        
         # フィールドタイプに応じたミューテーションを選択
-        if field_name == "Status":
+        if iteration_index is not None:
+            # イテレーションフィールドの場合は、日付を含むイテレーションを設定
+            iteration_id = iteration_index.find(field_value)
+            if not iteration_id:
+                self.logger.warning(f"日付 '{field_value}' を含むイテレーションが '{field_name}' にありません")
+                return False
+            
+            query = """
+            mutation($project_id: ID!, $item_id: ID!, $field_id: ID!, $iteration_id: String!) {
+                updateProjectV2ItemFieldValue(input: {
+                    projectId: $project_id,
+                    itemId: $item_id,
+                    fieldId: $field_id,
+                    value: {
+                        iterationId: $iteration_id
+                    }
+                }) {
+                    clientMutationId
+                }
+            }
+            """
+            
+            variables = {
+                "project_id": project_id,
+                "item_id": item_id,
+                "field_id": field_id,
+                "iteration_id": iteration_id
+            }
+        
+        elif field_name == "Status":
             # ステータスフィールドの場合
             status_option_key = f"Status:{field_value}"
             if status_option_key not in field_ids:
@@ -358,13 +845,7 @@ class GitHubClient:
                 "text_value": str(field_value)
             }
         
-        response = requests.post(
-            self.graphql_url, 
-            headers=self.headers, 
-            json={"query": query, "variables": variables}
-        )
-        
-        data = response.json()
+        data = self._post_graphql(query, variables)
         if "errors" in data:
             error_message = data["errors"][0]["message"]
             self.logger.error(f"フィールド更新に失敗しました: {error_message}")
@@ -406,13 +887,7 @@ class GitHubClient:
             "body": body
         }
         
-        response = requests.post(
-            self.graphql_url, 
-            headers=self.headers, 
-            json={"query": query, "variables": variables}
-        )
-        
-        data = response.json()
+        data = self._post_graphql(query, variables)
         if "errors" in data:
             error_message = data["errors"][0]["message"]
             self.logger.error(f"説明更新に失敗しました: {error_message}")
@@ -420,51 +895,341 @@ class GitHubClient:
             
         return True
     
-    def import_task(self, task_data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    def run_batched_mutations(self, operations: List[str],
+                              batch_size: Optional[int] = None) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        複数のミューテーションをエイリアスでまとめ、batch_size件ずつ1リクエストで実行します。
+        
+        各操作は `addSubIssue(input: {...}) { clientMutationId }` のようなミューテーションの
+        フィールド部分で、引数はgraphql_literalでリテラルとして埋め込みます。
+        
+        Args:
+            operations: ミューテーションのフィールド部分のリスト
+            batch_size: 1リクエストにまとめる件数。指定しない場合は設定ファイルの値
+            
+        Returns:
+            操作ごとの (レスポンスデータ, エラーメッセージ) のリスト（入力と同じ順序）
+        """
+        return self._run_batched("mutation", operations, batch_size)
+    
+    def run_query(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        読み取りのGraphQLクエリを送信します（一時的なエラーは再試行し、有効ならヘッジします）。
+        
+        Args:
+            query: GraphQLクエリ
+            variables: クエリ変数
+            
+        Returns:
+            レスポンスのJSON
+        """
+        return self._read_graphql(query, variables)
+    
+    def run_batched_queries(self, operations: List[str],
+                            batch_size: Optional[int] = None) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        複数のクエリ（例: `user(login: "octocat") { id }`）をエイリアスでまとめて実行します。
+        
+        Args:
+            operations: クエリのフィールド部分のリスト
+            batch_size: 1リクエストにまとめる件数。指定しない場合は設定ファイルの値
+            
+        Returns:
+            操作ごとの (レスポンスデータ, エラーメッセージ) のリスト（入力と同じ順序）
+        """
+        return self._run_batched("query", operations, batch_size)
+    
+    def _run_batched(self, operation_type: str, operations: List[str],
+                     batch_size: Optional[int] = None) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        操作をエイリアス（m0, m1, ...）でまとめ、batch_size件ずつ1リクエストで実行します。
+        """
+        batch_size = batch_size or config.GRAPHQL_BATCH_SIZE
+        results: List[Tuple[Optional[Dict[str, Any]], Optional[str]]] = []
+        
+        for start in range(0, len(operations), batch_size):
+            batch = operations[start:start + batch_size]
+            query = f"{operation_type} {{\n" + "\n".join(
+                f"    m{i}: {operation}" for i, operation in enumerate(batch)
+            ) + "\n}"
+            
+            try:
+                # クエリ以外（作成・変換・削除など）は、書き込みが反映された可能性があれば再送しない
+                data = self._post_graphql(query, {}, idempotent=operation_type == "query")
+            except Exception as e:
+                self.logger.error(f"一括{'ミューテーション' if operation_type == 'mutation' else 'クエリ'}に失敗しました: {str(e)}")
+                results.extend((None, str(e)) for _ in batch)
+                continue
+            
+            # エラーはpathの先頭のエイリアスで操作に対応づける
+            errors: Dict[str, str] = {}
+            for error in data.get("errors", []):
+                path = error.get("path") or []
+                alias = path[0] if path else None
+                if alias:
+                    errors[alias] = error.get("message", "")
+                else:
+                    # 対応づけられないエラーはバッチ全体の失敗とみなす
+                    errors.update({f"m{i}": error.get("message", "") for i in range(len(batch))})
+            
+            response_data = data.get("data") or {}
+            for i in range(len(batch)):
+                alias = f"m{i}"
+                results.append((response_data.get(alias), errors.get(alias)))
+        
+        return results
+    
+    def set_parent_items(self, links: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        アイテムに親タスクを一括で設定します。
+        
+        Draftアイテムはサブイシューを持てないため、親タスクのタイトルとNotionのURLを
+        「親タスク」のテキストフィールドに設定します。
+        
+        Args:
+            links: (子アイテムのID, 親タスクのデータ) のリスト
+            
+        Returns:
+            設定に成功した件数
+        """
+        field_name = config.GITHUB_PROJECT_FIELDS.get("parent")
+        field_ids = self.get_field_ids()
+        
+        if not field_name or field_name not in field_ids:
+            self.logger.warning(f"フィールド '{field_name}' が見つからないため、親タスクを設定できません")
+            return 0
+        
+        project_id = self.get_project_id()
+        field_id = field_ids[field_name]
+        
+        operations = []
+        for item_id, parent_task in links:
+            parent_text = parent_task.get('title', 'No Title')
+            if parent_task.get('url'):
+                parent_text += f" ({parent_task['url']})"
+            operations.append(
+                "updateProjectV2ItemFieldValue(input: {"
+                f"projectId: {graphql_literal(project_id)}, "
+                f"itemId: {graphql_literal(item_id)}, "
+                f"fieldId: {graphql_literal(field_id)}, "
+                f"value: {{text: {graphql_literal(parent_text)}}}"
+                "}) { clientMutationId }"
+            )
+        
+        succeeded = 0
+        for (item_id, _), (_, error) in zip(links, self.run_batched_mutations(operations)):
+            if error:
+                self.logger.error(f"親タスクの設定に失敗しました: {item_id}, エラー: {error}")
+            else:
+                succeeded += 1
+        
+        return succeeded
+    
+    def delete_item(self, item_id: str) -> bool:
+        """
+        プロジェクトからアイテムを削除します。
+        
+        Args:
+            item_id: アイテムのID
+            
+        Returns:
+            削除に成功したかどうか
+        """
+        project_id = self.get_project_id()
+        
+        query = """
+        mutation($project_id: ID!, $item_id: ID!) {
+            deleteProjectV2Item(input: {
+                projectId: $project_id,
+                itemId: $item_id
+            }) {
+                deletedItemId
+            }
+        }
+        """
+        
+        variables = {
+            "project_id": project_id,
+            "item_id": item_id
+        }
+        
+        data = self._post_graphql(query, variables, idempotent=False)
+        if "errors" in data:
+            error_message = data["errors"][0]["message"]
+            self.logger.error(f"アイテム削除に失敗しました: {error_message}")
+            return False
+            
+        return True
+    
+    def remove_items(self, item_ids: List[str], archive: bool = True) -> List[str]:
+        """
+        複数のアイテムをアーカイブ（または削除）します。GRAPHQL_BATCH_SIZE件ずつ1リクエストにまとめます。
+        
+        Args:
+            item_ids: アイテムIDのリスト
+            archive: Trueならアーカイブ、Falseなら削除
+            
+        Returns:
+            アーカイブ（削除）に成功したアイテムIDのリスト
+        """
+        project_id = self.get_project_id()
+        mutation = "archiveProjectV2Item" if archive else "deleteProjectV2Item"
+        result_field = "item { id }" if archive else "deletedItemId"
+        
+        operations = [
+            f"{mutation}(input: {{projectId: {graphql_literal(project_id)}, itemId: {graphql_literal(item_id)}}}) "
+            f"{{ {result_field} }}"
+            for item_id in item_ids
+        ]
+        
+        removed = []
+        for item_id, (_, error) in zip(item_ids, self.run_batched_mutations(operations)):
+            if error:
+                self.logger.error(f"アイテム {item_id} の{'アーカイブ' if archive else '削除'}に失敗しました: {error}")
+            else:
+                removed.append(item_id)
+        
+        return removed
+    
+    def _import_steps(self, task_data: Dict[str, Any]) -> List[Tuple[str, Callable[[str], Any]]]:
+        """
+        Draftアイテム作成後に実行するフィールド更新のステップを組み立てます。
+        
+        Args:
+            task_data: タスクデータ
+            
+        Returns:
+            (ステップ名, アイテムIDを受け取る関数) のリスト
+        """
+        steps = []
+        
+        # 説明を設定（プロパティの説明とページ本文）
+        body = "\n\n".join(part for part in (task_data.get('description', ''), task_data.get('body', '')) if part)
+        
+        # タスクのソースとしてNotionのURLを追加
+        if 'url' in task_data:
+            body += f"\n\n*From Notion: {task_data['url']}*"
+            
+        if body:
+            steps.append((STEP_BODY, lambda item_id: self.update_item_body(item_id, body)))
+        
+        # ステータスを設定（あれば）
+        if 'status' in task_data and task_data['status']:
+            steps.append((STEP_STATUS, lambda item_id: self.update_item_field(item_id, "Status", task_data['status'])))
+        
+        # 期日を設定（あれば）
+        if 'due_date' in task_data and task_data['due_date']:
+            steps.append((STEP_DUE_DATE, lambda item_id: self.update_item_field(item_id, "Due Date", task_data['due_date'])))
+        
+        # 期日を含むイテレーションを設定（イテレーションフィールドが設定されていれば）
+        if config.ITERATION_FIELD and task_data.get('due_date'):
+            steps.append((STEP_ITERATION, lambda item_id: self.update_item_field(item_id, config.ITERATION_FIELD, task_data['due_date'])))
+        
+        # アサインの追加（あれば）- カスタムフィールドとして設定する必要があります
+        if 'assignees' in task_data and task_data['assignees'] and len(task_data['assignees']) > 0:
+            assignee_text = ", ".join(task_data['assignees'])
+            steps.append((STEP_ASSIGNEES, lambda item_id: self.update_item_field(item_id, "Assignees", assignee_text)))
+        
+        # ラベルの追加（あれば）- カスタムフィールドとして設定する必要があります
+        if 'tags' in task_data and task_data['tags'] and len(task_data['tags']) > 0:
+            labels_text = ", ".join(task_data['tags'])
+            steps.append((STEP_LABELS, lambda item_id: self.update_item_field(item_id, "Labels", labels_text)))
+        
+        return steps
+    
+    def import_task(self, task_data: Dict[str, Any], state_store: Optional[ImportStateStore] = None,
+                    partial_policy: str = POLICY_RESUME,
+                    existing_item_id: Optional[str] = None) -> Tuple[bool, Optional[str]]:
         """
         タスクをGitHub Projectsにインポートします。
         
+        state_storeを指定すると、作成したアイテムIDと完了したステップを記録します。
+        前回途中で失敗したタスクは、partial_policyに従って残りのステップを再開するか、
+        作りかけのDraftアイテムを削除して作り直します。
+        existing_item_idを指定すると、Draftアイテムを作成せずに既存のアイテムのフィールドを更新します。
+        
         Args:
             task_data: タスクデータ
+            state_store: インポート状態の記録先
+            partial_policy: 途中で失敗したアイテムの扱い（"resume" または "rollback"）
+            existing_item_id: プロジェクトに既にある同じタスクのアイテムID
             
         Returns:
             (成功したかどうか, エラーメッセージ)
         """
+        notion_id = task_data.get('notion_id') if state_store is not None else None
+        record = state_store.get(notion_id) if notion_id else None
+        item_id = None
+        
         try:
-            # 1. Draftアイテムを作成
-            item_id = self.create_draft_item(task_data)
-            
-            # 2. 説明を設定
-            body = task_data.get('description', '')
+            if record and record["item_id"] and partial_policy == POLICY_ROLLBACK:
+                # 作りかけのアイテムを削除してから作り直す
+                self.logger.info(f"途中までインポートされたアイテムを削除します: {record['item_id']}")
+                self.delete_item(record["item_id"])
+                state_store.forget(notion_id)
+                record = None
             
-            # タスクのソースとしてNotionのURLを追加
-            if 'url' in task_data:
-                body += f"\n\n*From Notion: {task_data['url']}*"
-                
-            if body:
-                self.update_item_body(item_id, body)
-            
-            # 3. ステータスを設定（あれば）
-            if 'status' in task_data and task_data['status']:
-                self.update_item_field(item_id, "Status", task_data['status'])
+            if record and record["item_id"]:
+                # 前回作成したアイテムを再利用して残りのステップを再開
+                item_id = record["item_id"]
+                completed = set(record["steps"])
+                self.logger.info(f"途中までインポートされたアイテムを再開します: {item_id}")
+            elif existing_item_id:
+                # プロジェクトに既にあるアイテムのフィールドを更新
+                item_id = existing_item_id
+                completed = {STEP_CREATE}
+                self.logger.info(f"既存のアイテムを更新します: {item_id}")
+                if notion_id:
+                    state_store.record_created(notion_id, item_id)
+            else:
+                # 1. Draftアイテムを作成
+                item_id = self.create_draft_item(task_data)
+                completed = {STEP_CREATE}
+                if notion_id:
+                    state_store.record_created(notion_id, item_id)
             
-            # 4. 期日を設定（あれば）
-            if 'due_date' in task_data and task_data['due_date']:
-                self.update_item_field(item_id, "Due Date", task_data['due_date'])
+            # 2. 以降のフィールド更新
+            for step_name, apply_step in self._import_steps(task_data):
+                if step_name in completed:
+                    continue
+                # フィールドやオプションがなく更新できなかったステップは、完了として記録しない
+                if apply_step(item_id) and notion_id:
+                    state_store.record_step(notion_id, step_name)
             
-            # 5. アサインの追加（あれば）- カスタムフィールドとして設定する必要があります
-            if 'assignees' in task_data and task_data['assignees'] and len(task_data['assignees']) > 0:
-                assignee_text = ", ".join(task_data['assignees'])
-                self.update_item_field(item_id, "Assignees", assignee_text)
+            if notion_id:
+                state_store.mark_done(notion_id)
             
-            # 6. ラベルの追加（あれば）- カスタムフィールドとして設定する必要があります
-            if 'tags' in task_data and task_data['tags'] and len(task_data['tags']) > 0:
-                labels_text = ", ".join(task_data['tags'])
-                self.update_item_field(item_id, "Labels", labels_text)
+            if task_data.get('notion_id'):
+                self.imported_items[task_data['notion_id']] = item_id
             
             return (True, None)
             
+        except DeadlineExceeded:
+            # 期限切れは失敗ではないため、状態を残したまま呼び出し元に伝え、次回の実行で再開する
+            raise
         except Exception as e:
             error_message = f"タスクのインポートに失敗しました: {str(e)}"
             self.logger.error(error_message)
-            return (False, error_message) 
\ No newline at end of file
+            
+            # 既存のアイテムは今回作成したものではないので削除しない
+            if notion_id and item_id and item_id != existing_item_id and partial_policy == POLICY_ROLLBACK:
+                self._rollback_item(notion_id, item_id, state_store)
+            
+            return (False, error_message)
+    
+    def _rollback_item(self, notion_id: str, item_id: str, state_store: ImportStateStore) -> None:
+        """
+        作りかけのDraftアイテムを削除し、状態ファイルから記録を消します。
+        
+        削除自体に失敗した場合は記録を残し、次回の実行で再度削除を試みます。
+        
+        Args:
+            notion_id: NotionのページID
+            item_id: アイテムのID
+            state_store: インポート状態の記録先
+        """
+        try:
+            if self.delete_item(item_id):
+                state_store.forget(notion_id)
+        except Exception as e:
+            self.logger.error(f"アイテム {item_id} のロールバックに失敗しました: {str(e)}")
@@ -0,0 +1,119 @@
+"""
+タスクの親子関係
+
+Notionの「親タスク」リレーションをもとに、インポート後のアイテムへ親子関係を設定します。
+タスクを親が先になるようにトポロジカルソートし、NotionページIDからアイテムIDへの索引を
+一度だけ作成してから、親の設定を一括ミューテーションでまとめて適用します。
+"""
+
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def topological_order(tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    親タスクが子タスクより先になるようにタスクを並べ替えます。
+
+    親がデータベース内にないタスクは根として扱います。循環している場合は、
+    循環に含まれるタスクを元の順序のまま末尾に追加します。
+
+    Args:
+        tasks: タスクのリスト
+
+    Returns:
+        並べ替えたタスクのリスト
+    """
+    by_id = {task.get('notion_id'): task for task in tasks if task.get('notion_id')}
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    roots = []
+
+    for task in tasks:
+        parent_id = task.get('parent_id')
+        if parent_id and parent_id in by_id and parent_id != task.get('notion_id'):
+            children.setdefault(parent_id, []).append(task)
+        else:
+            roots.append(task)
+
+    ordered = []
+    queue = deque(roots)
+    while queue:
+        task = queue.popleft()
+        ordered.append(task)
+        queue.extend(children.get(task.get('notion_id'), []))
+
+    if len(ordered) < len(tasks):
+        visited = {id(task) for task in ordered}
+        cyclic = [task for task in tasks if id(task) not in visited]
+        logger.warning(f"親タスクのリレーションが循環しているタスクが {len(cyclic)} 件あります")
+        ordered.extend(cyclic)
+
+    return ordered
+
+
+def build_item_index(github_client: Any, state_store: Optional[Any] = None) -> Dict[str, str]:
+    """
+    NotionページIDからGitHubのアイテムIDへの索引を作成します。
+
+    今回の実行でインポートしたアイテムに加えて、状態ファイルに記録されている
+    以前の実行でインポート済みのアイテムも含めます。
+
+    Args:
+        github_client: GitHubのAPIクライアント
+        state_store: インポート状態の記録
+
+    Returns:
+        NotionページIDからアイテムIDへの辞書
+    """
+    index: Dict[str, str] = {}
+    if state_store is not None:
+        for notion_id, record in state_store:
+            if record.get("done") and record.get("item_id"):
+                index[notion_id] = record["item_id"]
+    index.update(github_client.imported_items)
+    return index
+
+
+def link_parents(github_client: Any, tasks: List[Dict[str, Any]],
+                 item_index: Dict[str, str]) -> Dict[str, int]:
+    """
+    親タスクを持つタスクのアイテムに、親を一括で設定します。
+
+    Args:
+        github_client: GitHubのAPIクライアント
+        tasks: タスクのリスト
+        item_index: NotionページIDからアイテムIDへの索引
+
+    Returns:
+        {"linked": 設定した件数, "unresolved": 親または子のアイテムが見つからなかった件数}
+    """
+    tasks_by_id = {task.get('notion_id'): task for task in tasks if task.get('notion_id')}
+    links: List[Tuple[str, Dict[str, Any]]] = []
+    unresolved = 0
+
+    for task in topological_order(tasks):
+        parent_id = task.get('parent_id')
+        if not parent_id:
+            continue
+
+        child_item_id = item_index.get(task.get('notion_id'))
+        parent_task = tasks_by_id.get(parent_id)
+        if not child_item_id or not parent_task or parent_id not in item_index:
+            unresolved += 1
+            continue
+
+        links.append((child_item_id, parent_task))
+
+    result = {"linked": 0, "unresolved": unresolved}
+    if not links:
+        return result
+
+    logger.info(f"{len(links)} 件のアイテムに親タスクを設定しています...")
+    result["linked"] = github_client.set_parent_items(links)
+
+    if unresolved:
+        logger.warning(f"親タスクまたはアイテムが見つからず、{unresolved} 件の親子関係を設定できませんでした")
+
+    return result
@@ -0,0 +1,195 @@
+"""
+インポート状態の管理
+
+タスクごとに作成済みのDraftアイテムIDと完了済みのステップをローカルの状態ファイルに記録します。
+途中で失敗したタスクを再実行する際に、Draftアイテムを重複して作成せず
+残りのステップだけを再開（または作りかけのアイテムを削除）するために使用します。
+
+状態ファイルは1行1イベントのJSONL形式の追記型ジャーナルで、読み込み時に再生されます。
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# インポートの各ステップ（実行順）
+STEP_CREATE = "create"
+STEP_BODY = "body"
+STEP_STATUS = "status"
+STEP_DUE_DATE = "due_date"
+STEP_ITERATION = "iteration"
+STEP_ASSIGNEES = "assignees"
+STEP_LABELS = "labels"
+
+# 途中で失敗したアイテムの扱い
+POLICY_RESUME = "resume"
+POLICY_ROLLBACK = "rollback"
+
+logger = logging.getLogger(__name__)
+
+
+class ImportStateStore:
+    """
+    タスクごとのインポート状態を保持する状態ファイル
+    """
+
+    def __init__(self, path: str):
+        """
+        ImportStateStoreの初期化
+
+        Args:
+            path: 状態ファイルのパス
+        """
+        self.path = path
+        self._records: Dict[str, Dict[str, Any]] = {}
+        # 複数のスレッドからインポートする場合に、状態の読み書きと追記を1件ずつ行うためのロック
+        self._lock = threading.Lock()
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        """
+        ジャーナルを再生して状態を復元し、必要ならコンパクションします（ロックを保持して呼び出す）。
+        """
+        if not os.path.exists(self.path):
+            return
+
+        event_count = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # 書き込み途中で中断された最終行は無視する
+                    logger.warning(f"状態ファイル '{self.path}' の壊れた行を無視しました")
+                    continue
+                self._apply(event)
+                event_count += 1
+
+        if event_count > 2 * max(len(self._records), 1):
+            self._compact()
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        """
+        1件のイベントを状態に反映します。
+        """
+        notion_id = event.get("notion_id")
+        kind = event.get("event")
+
+        if kind == "forget":
+            self._records.pop(notion_id, None)
+            return
+
+        if kind == "snapshot":
+            self._records[notion_id] = {
+                "item_id": event.get("item_id"),
+                "steps": list(event.get("steps", [])),
+                "done": event.get("done", False)
+            }
+            return
+
+        record = self._records.setdefault(notion_id, {"item_id": None, "steps": [], "done": False})
+        if kind == "created":
+            record["item_id"] = event.get("item_id")
+            record["steps"] = [STEP_CREATE]
+            record["done"] = False
+        elif kind == "step":
+            if event.get("step") not in record["steps"]:
+                record["steps"].append(event.get("step"))
+        elif kind == "done":
+            record["done"] = True
+
+    def _compact(self) -> None:
+        """
+        現在の状態だけを含むジャーナルに書き直します（ロックを保持して呼び出す）。
+        """
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for notion_id, record in self._records.items():
+                event = {"event": "snapshot", "notion_id": notion_id, **record}
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        """
+        イベントをジャーナルに追記し、状態に反映します。
+        """
+        with self._lock:
+            self._apply(event)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                f.flush()
+
+    def get(self, notion_id: str) -> Optional[Dict[str, Any]]:
+        """
+        タスクのインポート状態を取得します。
+
+        Args:
+            notion_id: NotionのページID
+
+        Returns:
+            {"item_id", "steps", "done"} の辞書（コピー）。記録がなければNone
+        """
+        with self._lock:
+            record = self._records.get(notion_id)
+            return dict(record, steps=list(record["steps"])) if record else None
+
+    def is_done(self, notion_id: str) -> bool:
+        """
+        タスクのインポートが完了しているかを返します。
+        """
+        with self._lock:
+            record = self._records.get(notion_id)
+            return bool(record and record["done"])
+
+    def record_created(self, notion_id: str, item_id: str) -> None:
+        """
+        Draftアイテムの作成を記録します。
+        """
+        self._append({"event": "created", "notion_id": notion_id, "item_id": item_id})
+
+    def record_step(self, notion_id: str, step: str) -> None:
+        """
+        ステップの完了を記録します。
+        """
+        self._append({"event": "step", "notion_id": notion_id, "step": step})
+
+    def mark_done(self, notion_id: str) -> None:
+        """
+        タスクのインポート完了を記録します。
+        """
+        self._append({"event": "done", "notion_id": notion_id})
+
+    def forget(self, notion_id: str) -> None:
+        """
+        タスクの記録を削除します（ロールバック後など）。
+        """
+        self._append({"event": "forget", "notion_id": notion_id})
+
+    def incomplete(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        作成済みだが完了していないタスクの一覧を返します。
+
+        Returns:
+            (NotionのページID, 状態) のリスト
+        """
+        with self._lock:
+            return [
+                (notion_id, dict(record, steps=list(record["steps"])))
+                for notion_id, record in self._records.items()
+                if record["item_id"] and not record["done"]
+            ]
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            records = [(notion_id, dict(record, steps=list(record["steps"]))) for notion_id, record in self._records.items()]
+        return iter(records)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
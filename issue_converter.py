@@ -0,0 +1,251 @@
+"""
+Draftアイテムのイシューへの変換
+
+移行したDraftアイテムを、指定したリポジトリのイシューに一括で変換します。
+Draftアイテムには付けられないラベル・アサイン・サブイシューの関係を、変換後のイシューに設定します。
+
+1. タグから作成したラベルのうち、リポジトリにないものを一括で作成
+2. Draftアイテムを convertProjectV2DraftIssueItemToIssue で一括変換
+3. ラベルとアサインを1つの一括ミューテーションで設定
+4. Notionの親タスクの関係を addSubIssue で一括設定
+
+いずれもGRAPHQL_BATCH_SIZE件ずつ1リクエストにまとめるため、タスクごとに呼び出すより
+リクエスト数が大幅に少なくなります。既にイシューになっているアイテムは変換しません。
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from github_client import graphql_literal
+from project_index import notion_url_of, page_key, task_page_keys
+import config
+
+logger = logging.getLogger(__name__)
+
+# 新しく作成するラベルの色
+DEFAULT_LABEL_COLOR = "ededed"
+
+
+def parse_repository(repository: str, default_owner: str) -> Tuple[str, str]:
+    """
+    リポジトリ名を所有者と名前に分けます。
+
+    Args:
+        repository: "owner/name" または "name"
+        default_owner: 所有者が省略された場合の所有者
+
+    Returns:
+        (所有者, リポジトリ名)
+    """
+    if "/" in repository:
+        owner, name = repository.split("/", 1)
+        return owner, name
+    return default_owner, repository
+
+
+class IssueConverter:
+    """
+    Draftアイテムをリポジトリのイシューにまとめて変換するクラス
+    """
+
+    def __init__(self, github_client: Any, repository: Optional[str] = None):
+        """
+        IssueConverterの初期化
+
+        Args:
+            github_client: GitHubのAPIクライアント
+            repository: 変換先のリポジトリ（"owner/name" または "name"）。指定しない場合は設定ファイルの値
+        """
+        self.github_client = github_client
+        repository = repository or config.ISSUE_REPOSITORY
+        if not repository:
+            raise ValueError("イシューの作成先のリポジトリ（ISSUE_REPOSITORY）が設定されていません。")
+        self.owner, self.name = parse_repository(repository, github_client.owner)
+        self._repository_id: Optional[str] = None
+        # ラベル名（大文字小文字を区別しない）からラベルIDへの対応
+        self._labels: Dict[str, str] = {}
+
+    def _load_repository(self) -> str:
+        """
+        リポジトリのIDと既存のラベルを読み込みます。
+
+        Returns:
+            リポジトリのノードID
+        """
+        if self._repository_id:
+            return self._repository_id
+
+        query = """
+        query($owner: String!, $name: String!, $cursor: String) {
+            repository(owner: $owner, name: $name) {
+                id
+                labels(first: 100, after: $cursor) {
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                    nodes { id name }
+                }
+            }
+        }
+        """
+
+        cursor = None
+        while True:
+            data = self.github_client.run_query(query, {"owner": self.owner, "name": self.name, "cursor": cursor})
+            repository = (data.get("data") or {}).get("repository")
+            if "errors" in data or not repository:
+                error_message = data["errors"][0]["message"] if data.get("errors") else "リポジトリが見つかりません"
+                raise ValueError(f"リポジトリ '{self.owner}/{self.name}' の取得に失敗しました: {error_message}")
+
+            self._repository_id = repository["id"]
+            labels = repository["labels"]
+            for label in labels["nodes"]:
+                self._labels[label["name"].casefold()] = label["id"]
+
+            if not labels["pageInfo"]["hasNextPage"]:
+                return self._repository_id
+            cursor = labels["pageInfo"]["endCursor"]
+
+    def ensure_labels(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        リポジトリにないラベルを一括で作成します。
+
+        Args:
+            names: ラベル名
+
+        Returns:
+            ラベル名からラベルIDへの辞書（作成に失敗したラベルは含まない）
+        """
+        repository_id = self._load_repository()
+        names = sorted({name for name in names if name})
+        missing = [name for name in names if name.casefold() not in self._labels]
+
+        if missing:
+            operations = [
+                "createLabel(input: {"
+                f"repositoryId: {graphql_literal(repository_id)}, "
+                f"name: {graphql_literal(name)}, "
+                f"color: {graphql_literal(DEFAULT_LABEL_COLOR)}"
+                "}) { label { id name } }"
+                for name in missing
+            ]
+            for name, (data, error) in zip(missing, self.github_client.run_batched_mutations(operations)):
+                label = (data or {}).get("label")
+                if label:
+                    self._labels[name.casefold()] = label["id"]
+                else:
+                    logger.error(f"ラベル '{name}' の作成に失敗しました: {error}")
+            logger.info(f"リポジトリにラベルを作成しました: {len(missing)} 件")
+
+        return {name: self._labels[name.casefold()] for name in names if name.casefold() in self._labels}
+
+    def convert_items(self, item_ids: List[str]) -> Dict[str, str]:
+        """
+        Draftアイテムを一括でイシューに変換します。
+
+        Args:
+            item_ids: DraftアイテムのIDのリスト
+
+        Returns:
+            アイテムIDから作成されたイシューのノードIDへの辞書（変換に失敗したアイテムは含まない）
+        """
+        repository_id = self._load_repository()
+        operations = [
+            "convertProjectV2DraftIssueItemToIssue(input: {"
+            f"itemId: {graphql_literal(item_id)}, "
+            f"repositoryId: {graphql_literal(repository_id)}"
+            "}) { item { id content { ... on Issue { id number } } } }"
+            for item_id in item_ids
+        ]
+
+        issue_ids: Dict[str, str] = {}
+        for item_id, (data, error) in zip(item_ids, self.github_client.run_batched_mutations(operations)):
+            content = ((data or {}).get("item") or {}).get("content") or {}
+            if content.get("id"):
+                issue_ids[item_id] = content["id"]
+            else:
+                logger.error(f"アイテム {item_id} のイシューへの変換に失敗しました: {error}")
+        return issue_ids
+
+    def convert_tasks(self, tasks: List[Dict[str, Any]]) -> int:
+        """
+        移行したタスクのDraftアイテムをイシューに変換し、ラベル・アサイン・サブイシューを設定します。
+
+        アイテムはプロジェクトから一括で読み込み、説明に埋め込まれたNotionのページIDでタスクと対応づけます
+        （URLにはタイトルが含まれるため、移行後に名前を変えたページも対応づけられるように）。
+
+        Args:
+            tasks: 移行したタスクのリスト
+
+        Returns:
+            イシューに変換したアイテム数
+        """
+        by_page_id = {}
+        for item in self.github_client.iter_items():
+            key = page_key(notion_url_of(item.get("body", "")))
+            if key and not item.get("archived"):
+                by_page_id[key] = item
+
+        # NotionページIDからイシューのノードIDへの対応（既にイシューになっているものを含む）
+        issue_ids: Dict[str, str] = {}
+        drafts: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        for task in tasks:
+            item = next((by_page_id[key] for key in task_page_keys(task) if key in by_page_id), None)
+            if not item or not task.get('notion_id'):
+                continue
+            if item.get("type") == "DRAFT_ISSUE":
+                drafts.append((task, item))
+            elif item.get("type") == "ISSUE" and item.get("content_id"):
+                issue_ids[task['notion_id']] = item["content_id"]
+
+        if not drafts:
+            logger.info("イシューに変換するDraftアイテムはありません")
+            return 0
+
+        label_ids = self.ensure_labels(tag for task, _ in drafts for tag in task.get('tags', []))
+        converted = self.convert_items([item["id"] for _, item in drafts])
+
+        # ラベルとアサインは1つの一括ミューテーションにまとめる
+        operations = []
+        converted_tasks = []
+        for task, item in drafts:
+            issue_id = converted.get(item["id"])
+            if not issue_id:
+                continue
+            issue_ids[task['notion_id']] = issue_id
+            converted_tasks.append(task)
+
+            labels = [label_ids[tag] for tag in task.get('tags', []) if tag in label_ids]
+            if labels:
+                operations.append(
+                    f"addLabelsToLabelable(input: {{labelableId: {graphql_literal(issue_id)}, "
+                    f"labelIds: {graphql_literal(labels)}}}) {{ clientMutationId }}"
+                )
+            if task.get('assignee_ids'):
+                operations.append(
+                    f"addAssigneesToAssignable(input: {{assignableId: {graphql_literal(issue_id)}, "
+                    f"assigneeIds: {graphql_literal(task['assignee_ids'])}}}) {{ clientMutationId }}"
+                )
+
+        # 今回変換したタスクの親子関係をサブイシューとして設定
+        links = [
+            (issue_ids[task['parent_id']], issue_ids[task['notion_id']])
+            for task in converted_tasks
+            if task.get('parent_id') in issue_ids and task['parent_id'] != task['notion_id']
+        ]
+        operations.extend(
+            f"addSubIssue(input: {{issueId: {graphql_literal(parent_id)}, "
+            f"subIssueId: {graphql_literal(child_id)}}}) {{ clientMutationId }}"
+            for parent_id, child_id in links
+        )
+
+        failed = sum(1 for _, error in self.github_client.run_batched_mutations(operations) if error)
+        if failed:
+            logger.error(f"ラベル・アサイン・サブイシューの設定に {failed} 件失敗しました")
+
+        logger.info(
+            f"Draftアイテムをイシューに変換しました: {len(converted)}/{len(drafts)} 件"
+            f"（サブイシュー {len(links)} 件）"
+        )
+        return len(converted)
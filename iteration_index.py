@@ -0,0 +1,59 @@
+"""
+イテレーションの期間の索引
+
+GitHub Projectのイテレーションフィールドのイテレーション（開始日と日数）を開始日順に並べ、
+日付を含むイテレーションを二分探索で求めます。イテレーションはフィールドIDの取得時に
+まとめて読み込むため、タスクごとの追加のAPI呼び出しはありません。
+"""
+
+from bisect import bisect_right
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class IterationIndex:
+    """
+    日付からイテレーションIDを引く索引
+    """
+
+    def __init__(self, iterations: Iterable[Dict[str, Any]]):
+        """
+        IterationIndexの初期化
+
+        Args:
+            iterations: {"id", "startDate", "duration"} のイテレーション
+        """
+        entries = sorted(
+            (date.fromisoformat(iteration["startDate"]), int(iteration["duration"]), iteration["id"])
+            for iteration in iterations
+        )
+        self._starts: List[date] = [start for start, _, _ in entries]
+        self._entries = entries
+
+    def find(self, value: str) -> Optional[str]:
+        """
+        日付を含むイテレーションのIDを返します。
+
+        Args:
+            value: 日付（YYYY-MM-DD、時刻付きでも可）
+
+        Returns:
+            イテレーションID。含むイテレーションがなければNone
+        """
+        try:
+            day = date.fromisoformat(str(value)[:10])
+        except ValueError:
+            return None
+
+        # 開始日が日付以前のイテレーションのうち最後のもの
+        position = bisect_right(self._starts, day) - 1
+        if position < 0:
+            return None
+
+        start, duration, iteration_id = self._entries[position]
+        if day < start + timedelta(days=duration):
+            return iteration_id
+        return None
+
+    def __len__(self) -> int:
+        return len(self._entries)
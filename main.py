@@ -12,7 +12,28 @@ import json
 import sys
 import os
 from notion_api_client import NotionClient
+from async_notion_client import AsyncNotionClient, fetch_tasks
 from github_client import GitHubClient
+from retry_queue import DeadLetterQueue
+from import_state import ImportStateStore, POLICY_RESUME, POLICY_ROLLBACK
+from rate_limiter import RateLimiter
+from task_importer import (
+    TaskImporter, finish_import, new_stats, prepare_field_options, resolve_people, run_importer
+)
+from hierarchy import topological_order
+from project_index import EXISTING_OFF, EXISTING_SKIP, EXISTING_UPDATE, ProjectItemIndex, load_project_index
+from verify import run_verification
+from reconcile import PRUNE_ARCHIVE, PRUNE_DELETE
+from people_resolver import PeopleResolver
+from planner import plan_migration
+from snapshot import export_snapshot, iter_snapshot, read_header
+from timeouts import run_deadline, start_run_deadline
+from work_queue import QueueWorker, WorkQueue
+from daemon import SyncDaemon
+from reverse_sync import ReverseSync, SyncLedger
+from webhook_server import WebhookReceiver, replay_events, serve
+from profiling import StageProfiler
+from orchestrator import SyncOrchestrator, aggregate_stats, apply_settings, load_manifest
 import config
 
 # ロガーの設定
@@ -47,7 +68,7 @@ def setup_argument_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--config",
         type=str,
-        help="カスタム設定ファイルへのパス（.env以外の設定を使用する場合）"
+        help="カスタム設定ファイル（JSONマニフェスト）へのパス。jobsを指定すると複数のデータベースとプロジェクトを1つのプロセスで同期します"
     )
     
     parser.add_argument(
@@ -69,8 +90,184 @@ def setup_argument_parser() -> argparse.ArgumentParser:
         help="ログレベル（デフォルト: INFO）"
     )
     
+    parser.add_argument(
+        "--retry-failed",
+        type=str,
+        metavar="FILE",
+        help="デッドレターファイルに保存された失敗タスクだけを再インポートします（Notionからは取得しません）"
+    )
+    
+    parser.add_argument(
+        "--dead-letter-file",
+        type=str,
+        help="失敗したタスクを書き出すファイルのパス（デフォルト: failed_tasks.jsonl）"
+    )
+    
+    parser.add_argument(
+        "--include-page-body",
+        action="store_true",
+        help="Notionページの本文を取得し、Markdownに変換してDraftアイテムの説明に含めます"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回中断したNotionからの取得をチェックポイントから再開します"
+    )
+    
+    parser.add_argument(
+        "--partial-policy",
+        choices=[POLICY_RESUME, POLICY_ROLLBACK],
+        help="途中で失敗したアイテムの扱い（resume: 残りの更新を再開, rollback: Draftを削除して作り直す）"
+    )
+    
+    parser.add_argument(
+        "--async-notion",
+        action="store_true",
+        help="Notionからの取得を非同期クライアントで行います（チェックポイントからの再開には対応していません）"
+    )
+    
+    parser.add_argument(
+        "--existing",
+        choices=[EXISTING_SKIP, EXISTING_UPDATE, EXISTING_OFF],
+        help="GitHub Projectに既にあるタスクの扱い（skip: スキップ, update: 既存のアイテムを更新, off: 照合しない）"
+    )
+    
+    parser.add_argument(
+        "--verify",
+        nargs="?",
+        const=config.VERIFY_REPORT_FILE,
+        metavar="REPORT",
+        help="移行は行わず、NotionとGitHub Projectを突き合わせて不足・余分・不一致をJSONLのレポートに書き出します"
+             f"（デフォルト: {config.VERIFY_REPORT_FILE}）"
+    )
+    
+    parser.add_argument(
+        "--prune",
+        nargs="?",
+        const=PRUNE_ARCHIVE,
+        choices=[PRUNE_ARCHIVE, PRUNE_DELETE],
+        help="Notionで削除・アーカイブされたタスクのアイテムを、移行後にアーカイブ（archive）または削除（delete）します"
+    )
+    
+    parser.add_argument(
+        "--convert-to-issues",
+        nargs="?",
+        const="",
+        metavar="OWNER/REPO",
+        help="移行後にDraftアイテムを指定したリポジトリのイシューに変換し、ラベル・アサイン・サブイシューを設定します"
+             "（省略時はISSUE_REPOSITORY）"
+    )
+    
+    queue_group = parser.add_argument_group("ワークキュー（複数のワーカーに分散して移行します）")
+    queue_group.add_argument("--queue-db", metavar="FILE",
+                             help="ワークキューのファイル（共有ストレージ上のSQLite、省略時はQUEUE_DB_FILE）")
+    queue_group.add_argument("--enqueue", action="store_true",
+                             help="Notionのタスクを取得してワークキューに登録します（GitHubにはインポートしません）")
+    queue_group.add_argument("--worker", nargs="?", const="", metavar="ID",
+                             help="ワークキューのタスクを取り出してインポートします（IDの省略時はホスト名とプロセスID）")
+    queue_group.add_argument("--finish-queue", action="store_true",
+                             help="全ワーカーの完了後に、親子関係の設定などインポートの後処理を行います")
+    
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="常駐し、Notionで編集されたタスクを定期的に取得してGitHub Projectに反映します"
+             "（取得の間隔は変更の頻度に応じて調整）"
+    )
+    
+    parser.add_argument(
+        "--reverse-sync",
+        action="store_true",
+        help="GitHub Projectで変更されたStatus・Due Date・LabelsをNotionに書き戻します"
+             "（前回の同期以降に更新されたアイテムのみ）"
+    )
+    
+    parser.add_argument(
+        "--webhook-server",
+        action="store_true",
+        help="GitHubのWebhook（projects_v2_item）を受け取り、変更されたアイテムをすぐにNotionに書き戻します"
+             f"（http://{config.WEBHOOK_HOST}:{config.WEBHOOK_PORT}/）"
+    )
+    
+    parser.add_argument(
+        "--replay-events",
+        metavar="FILE",
+        help="記録したWebhookのイベント（JSONL）を署名付きで --webhook-server に送り直します（動作確認用）"
+    )
+    
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="実行全体の期限（秒）。過ぎると新しいタスクのインポートを始めずに終了します（RUN_DEADLINE_SECONDS）"
+    )
+    
+    parser.add_argument(
+        "--hedge-reads",
+        action="store_true",
+        help="応答の遅い読み取りクエリを同じ内容でもう1つ送り、先に返った応答を使います（GITHUB_HEDGE_READS）"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="処理ごとの経過時間とCPU時間を計測して移行結果と一緒に表示します。"
+             "FILEを指定すると実行全体のcProfileのプロファイルも書き出します"
+    )
+    
+    parser.add_argument(
+        "--export-snapshot",
+        metavar="FILE",
+        help="GitHubには書き込まず、Notionのタスクをgzip圧縮したJSONLのスナップショットに書き出します"
+    )
+    
+    parser.add_argument(
+        "--import-snapshot",
+        metavar="FILE",
+        help="Notionには接続せず、スナップショットのタスクをGitHub Projectsにインポートします"
+    )
+    
+    filter_group = parser.add_argument_group("Notionの取得条件（Notion側で絞り込み、該当するページだけを取得します）")
+    filter_group.add_argument("--status", action="append", metavar="STATUS",
+                              help="ステータスで絞り込みます（複数指定するといずれかに一致）")
+    filter_group.add_argument("--tag", action="append", metavar="TAG",
+                              help="タグで絞り込みます（複数指定するといずれかを含む）")
+    filter_group.add_argument("--due-after", metavar="DATE", help="期日がこの日付以降のタスクだけを取得します")
+    filter_group.add_argument("--due-before", metavar="DATE", help="期日がこの日付以前のタスクだけを取得します")
+    filter_group.add_argument("--created-after", metavar="DATE", help="この日時以降に作成されたページだけを取得します")
+    filter_group.add_argument("--created-before", metavar="DATE", help="この日時以前に作成されたページだけを取得します")
+    filter_group.add_argument("--edited-after", metavar="DATE", help="この日時以降に編集されたページだけを取得します")
+    filter_group.add_argument("--edited-before", metavar="DATE", help="この日時以前に編集されたページだけを取得します")
+    filter_group.add_argument("--where", action="append", metavar="PROP:OP[:VALUE]",
+                              help="任意のプロパティの条件（例: Priority:equals:High, Owner:is_empty）")
+    filter_group.add_argument("--sort", action="append", metavar="PROP[:DIRECTION]",
+                              help="取得順（例: \"Due Date:ascending\", last_edited_time:descending）")
+    
     return parser
 
+def query_criteria_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    コマンドライン引数の取得条件を、設定ファイルの条件（NOTION_QUERY）に重ねて返します。
+    
+    Args:
+        args: コマンドライン引数
+        
+    Returns:
+        notion_filters.compile_queryの形式の取得条件
+    """
+    criteria = dict(config.NOTION_QUERY)
+    for key, arg_name in (("status", "status"), ("tags", "tag"), ("where", "where"), ("sort", "sort"),
+                          ("due_after", "due_after"), ("due_before", "due_before"),
+                          ("created_after", "created_after"), ("created_before", "created_before"),
+                          ("edited_after", "edited_after"), ("edited_before", "edited_before")):
+        value = getattr(args, arg_name, None)
+        if value:
+            criteria[key] = value
+    return criteria
+
 def migrate_tasks(notion_client: NotionClient, github_client: GitHubClient, dry_run: bool = False) -> Dict[str, Any]:
     """
     NotionのタスクをGitHub Projectsに移行します。
@@ -94,39 +291,285 @@ def migrate_tasks(notion_client: NotionClient, github_client: GitHubClient, dry_
     
     # Notionからタスクを取得
     logger.info("Notionからタスクを取得しています...")
-    tasks = notion_client.get_all_tasks()
+    include_body = config.FETCH_PAGE_BODY and not dry_run
+    if isinstance(notion_client, AsyncNotionClient):
+        # 非同期クライアントはタスクとページ本文を1つのイベントループで取得する
+        tasks = fetch_tasks(notion_client, config.NOTION_QUERY, include_body)
+    else:
+        tasks = notion_client.get_all_tasks()
     stats["total"] = len(tasks)
     
     logger.info(f"取得したタスク数: {len(tasks)}")
     
+    if include_body and not isinstance(notion_client, AsyncNotionClient):
+        logger.info("Notionからページ本文を取得しています...")
+        notion_client.fetch_page_bodies(tasks)
+    
     if dry_run:
         logger.info("ドライランモードが有効です。実際のデータ移行は行いません。")
         for i, task in enumerate(tasks, 1):
             logger.info(f"タスク {i}/{len(tasks)}: {task.get('title', 'No Title')}")
             logger.debug(f"タスクデータ: {json.dumps(task, ensure_ascii=False, indent=2)}")
         
+        stats["plan"] = plan_migration(github_client, tasks, open_state_store())
         return stats
     
+    # 親タスクが子タスクより先にインポートされるように並べ替え
+    has_hierarchy = any(task.get('parent_id') for task in tasks)
+    if has_hierarchy:
+        tasks = topological_order(tasks)
+    
     # GitHub Projectsにタスクをインポート
     logger.info("GitHub Projectsにタスクをインポートしています...")
+    state_store = open_state_store()
+    item_index = load_project_index(github_client) if config.EXISTING_ITEM_POLICY != EXISTING_OFF else None
+    prepare_field_options(github_client, tasks)
+    resolve_people(github_client, tasks)
+    import_tasks(github_client, tasks, stats, state_store, item_index)
+    
+    finish_import(github_client, tasks, stats, state_store, item_index, config.NOTION_QUERY)
+    
+    record_client_metrics(stats, github_client, notion_client)
+    return stats
+
+def record_client_metrics(stats: Dict[str, Any], github_client: GitHubClient,
+                          notion_client: Optional[NotionClient] = None) -> None:
+    """
+    同時実行数と読み取りクエリのヘッジの状況を統計情報に記録します（移行結果の表示用）。
+    
+    Args:
+        stats: 更新する統計情報
+        github_client: GitHubのAPIクライアント
+        notion_client: NotionのAPIクライアント
+    """
+    concurrency = {}
+    if notion_client is not None:
+        concurrency["notion"] = notion_client.concurrency.snapshot()
+    concurrency["github"] = github_client.concurrency.snapshot()
+    stats["concurrency"] = concurrency
+    if github_client.hedged_reader is not None:
+        stats["hedging"] = github_client.hedged_reader.snapshot()
+
+def open_state_store() -> Optional[ImportStateStore]:
+    """
+    設定ファイルで指定された状態ファイルを開きます。
+    
+    Returns:
+        インポート状態の記録。状態ファイルが無効な場合はNone
+    """
+    return ImportStateStore(config.IMPORT_STATE_FILE) if config.IMPORT_STATE_FILE else None
+
+def import_tasks(github_client: GitHubClient, tasks: List[Dict[str, Any]], stats: Dict[str, Any],
+                 state_store: Optional[ImportStateStore] = None,
+                 item_index: Optional[ProjectItemIndex] = None) -> None:
+    """
+    タスクのリストをGitHub Projectsにインポートし、統計情報を更新します。
+    
+    一時的なエラーは再試行し、最終的に失敗したタスクはデッドレターファイルに書き出します。
+    状態ファイルでインポート済みと記録されているタスクはスキップし、
+    途中で失敗したタスクは作成済みのDraftアイテムを再利用（またはロールバック）します。
+    
+    Args:
+        github_client: GitHubのAPIクライアント
+        tasks: インポートするタスクのリスト
+        stats: 更新する統計情報
+        state_store: インポート状態の記録。Noneなら記録しない
+        item_index: プロジェクトの既存アイテムの索引。Noneなら既存アイテムと照合しない
+    """
+    importer = TaskImporter(
+        github_client, stats,
+        dead_letter_file=config.DEAD_LETTER_FILE,
+        state_store=state_store,
+        item_index=item_index
+    )
+    
+    run_importer(importer, ((f"{i}/{len(tasks)}", task) for i, task in enumerate(tasks, 1)))
+    
+    importer.finish()
+
+def rotate_dead_letter_file() -> None:
+    """
+    前回の実行のデッドレターファイルを退避し、今回の実行で失敗したタスクだけを書き出すようにします。
+    """
+    if config.DEAD_LETTER_FILE:
+        DeadLetterQueue(config.DEAD_LETTER_FILE).rotate()
+
+def retry_failed_tasks(github_client: GitHubClient, path: str) -> Dict[str, Any]:
+    """
+    デッドレターファイルに保存されたタスクを再インポートします。
+    
+    Notionからの再取得は行いません。再度失敗したタスクは改めてデッドレターファイルに書き出されます。
+    
+    Args:
+        github_client: GitHubのAPIクライアント
+        path: デッドレターファイルのパス
+        
+    Returns:
+        移行結果の統計情報
+    """
+    stats = new_stats()
+    
+    source = DeadLetterQueue(path)
+    tasks = source.load_tasks()
+    stats["total"] = len(tasks)
+    logger.info(f"'{path}' から {len(tasks)} 件の失敗タスクを再実行します。")
+    
+    # 読み込み後にクリアし、再度失敗したものだけを書き出す
+    if config.DEAD_LETTER_FILE and os.path.abspath(config.DEAD_LETTER_FILE) == os.path.abspath(path):
+        source.clear()
+    
+    import_tasks(github_client, tasks, stats, open_state_store())
+    record_client_metrics(stats, github_client)
+    return stats
+
+# スナップショットからのインポート後の処理に必要なタスクの項目（本文などは保持しない）
+SNAPSHOT_SUMMARY_KEYS = ("notion_id", "parent_id", "title", "url", "tags", "assignee_ids")
+
+def import_snapshot_file(github_client: GitHubClient, path: str) -> Dict[str, Any]:
+    """
+    スナップショットのタスクをGitHub Projectsにインポートします。Notionには接続しません。
     
-    for i, task in enumerate(tasks, 1):
-        task_title = task.get('title', 'No Title')
-        logger.info(f"タスク {i}/{len(tasks)} をインポート中: {task_title}")
+    タスクはファイルから1件ずつ読み込んでインポートします。ステータスのオプションと担当者の
+    対応づけは、インポートの前にファイルを1回走査してまとめて準備します。
+    
+    Args:
+        github_client: GitHubのAPIクライアント
+        path: スナップショットファイルのパス
         
-        success, error_message = github_client.import_task(task)
+    Returns:
+        移行結果の統計情報
+    """
+    header = read_header(path)
+    logger.info(f"スナップショット '{path}'（{header.get('created_at')} に作成）からインポートします。")
+    stats = new_stats()
+    
+    state_store = open_state_store()
+    item_index = load_project_index(github_client) if config.EXISTING_ITEM_POLICY != EXISTING_OFF else None
+    prepare_field_options(github_client, iter_snapshot(path))
+    
+    resolver = None
+    user_ids: Dict[str, Optional[str]] = {}
+    if config.PEOPLE_MAPPING:
+        try:
+            resolver = PeopleResolver(github_client)
+            user_ids = resolver.lookup(
+                login for task in iter_snapshot(path) for login in resolver.task_logins(task)
+            )
+        except Exception as e:
+            logger.error(f"担当者の対応づけに失敗しました: {e}")
+            resolver = None
+    
+    importer = TaskImporter(
+        github_client, stats,
+        dead_letter_file=config.DEAD_LETTER_FILE,
+        state_store=state_store,
+        item_index=item_index
+    )
+    
+    summaries = []
+    
+    def entries():
+        for i, task in enumerate(iter_snapshot(path), 1):
+            if resolver:
+                resolver.assign(task, user_ids)
+            stats["total"] += 1
+            summaries.append({key: task[key] for key in SNAPSHOT_SUMMARY_KEYS if key in task})
+            yield f"#{i}", task
+    
+    run_importer(importer, entries())
+    
+    importer.finish()
+    finish_import(github_client, summaries, stats, state_store, item_index, header.get("criteria"))
+    record_client_metrics(stats, github_client)
+    return stats
+
+def enqueue_tasks(notion_client: NotionClient, github_client: GitHubClient, queue: WorkQueue) -> int:
+    """
+    Notionのタスクを取得してワークキューに登録します（コーディネーター）。
+    
+    ステータスのオプションの作成と担当者の対応づけは登録前に1回だけ行い、
+    ワーカーは登録されたタスクをそのままインポートします。
+    
+    Args:
+        notion_client: NotionのAPIクライアント（取得条件は適用済み）
+        github_client: GitHubのAPIクライアント
+        queue: ワークキュー
         
-        if success:
-            logger.info(f"タスク '{task_title}' のインポートに成功しました。")
-            stats["success"] += 1
-        else:
-            logger.error(f"タスク '{task_title}' のインポートに失敗しました: {error_message}")
-            stats["failed"] += 1
-            stats["failures"].append({
-                "title": task_title,
-                "error": error_message
-            })
+    Returns:
+        新たに待機中になったタスク数
+    """
+    logger.info("Notionからタスクを取得しています...")
+    tasks = notion_client.get_all_tasks()
+    if config.FETCH_PAGE_BODY:
+        notion_client.fetch_page_bodies(tasks)
+    if any(task.get('parent_id') for task in tasks):
+        tasks = topological_order(tasks)
+    
+    prepare_field_options(github_client, tasks)
+    resolve_people(github_client, tasks)
+    queued = queue.enqueue(tasks)
+    logger.info(f"{len(tasks)} 件のタスクのうち {queued} 件をキュー '{queue.path}' に登録しました。")
+    return queued
+
+def run_queue_worker(github_client: GitHubClient, queue: WorkQueue,
+                     worker_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    ワークキューのタスクがなくなるまで、取り出してインポートします（ワーカー）。
+    
+    インポート状態はキューに記録するため、停止したワーカーのタスクを取り出し直した場合も
+    Draftアイテムは重複して作成されません。
+    
+    Args:
+        github_client: GitHubのAPIクライアント
+        queue: ワークキュー
+        worker_id: ワーカーID。指定しない場合はホスト名とプロセスID
+        
+    Returns:
+        このワーカーの移行結果の統計情報
+    """
+    stats = new_stats()
+    item_index = load_project_index(github_client) if config.EXISTING_ITEM_POLICY != EXISTING_OFF else None
+    importer = TaskImporter(
+        github_client, stats,
+        dead_letter_file=config.DEAD_LETTER_FILE,
+        state_store=queue,
+        item_index=item_index
+    )
+    worker = QueueWorker(queue, importer, worker_id)
+    logger.info(f"ワーカー {worker.worker_id} がキュー '{queue.path}' のタスクを処理します。")
+    
+    run_importer(worker, worker.entries(should_stop=run_deadline().expired))
     
+    importer.finish()
+    stats["total"] = worker.claimed
+    stats["queue"] = queue.counts()
+    record_client_metrics(stats, github_client)
+    return stats
+
+def finish_queue(github_client: GitHubClient, queue: WorkQueue) -> Dict[str, Any]:
+    """
+    全ワーカーの完了後に、キューのタスクに対してインポートの後処理を行います。
+    
+    Args:
+        github_client: GitHubのAPIクライアント
+        queue: ワークキュー
+        
+    Returns:
+        移行結果の統計情報
+    """
+    stats = new_stats()
+    counts = queue.counts()
+    if counts["pending"] or counts["leased"]:
+        logger.warning(f"キューに未完了のタスクがあります（待機中 {counts['pending']}, 処理中 {counts['leased']}）")
+    
+    summaries = [
+        {key: task[key] for key in SNAPSHOT_SUMMARY_KEYS if key in task} for task in queue.iter_tasks()
+    ]
+    stats["total"] = len(summaries)
+    stats["success"] = counts["done"]
+    stats["failed"] = counts["failed"]
+    finish_import(github_client, summaries, stats, queue, None, config.NOTION_QUERY)
+    stats["queue"] = counts
     return stats
 
 def main():
@@ -139,7 +582,10 @@ def main():
     # ログレベルの設定
     logging.getLogger().setLevel(getattr(logging, args.log_level))
     
+    profiler = None
     try:
+        jobs = []
+        
         # カスタム設定ファイルの読み込み
         if args.config:
             if not os.path.exists(args.config):
@@ -147,7 +593,9 @@ def main():
                 sys.exit(1)
             
             logger.info(f"カスタム設定ファイル '{args.config}' を読み込みます。")
-            # TODO: カスタム設定ファイルの読み込み処理
+            manifest = load_manifest(args.config)
+            apply_settings(manifest.get("settings", {}))
+            jobs = manifest.get("jobs", [])
         
         # コマンドライン引数による設定の上書き
         if args.notion_database_id:
@@ -158,12 +606,170 @@ def main():
             config.GITHUB_PROJECT_NUMBER = args.github_project_number
             logger.info(f"GitHub Project Numberを上書きしました: {args.github_project_number}")
         
-        # クライアントの初期化
-        notion_client = NotionClient()
-        github_client = GitHubClient()
+        if args.dead_letter_file:
+            config.DEAD_LETTER_FILE = args.dead_letter_file
+        
+        if args.partial_policy:
+            config.PARTIAL_IMPORT_POLICY = args.partial_policy
+        
+        if args.include_page_body:
+            config.FETCH_PAGE_BODY = True
+        
+        config.NOTION_QUERY = query_criteria_from_args(args)
+        
+        if args.async_notion:
+            config.NOTION_ASYNC = True
+        
+        if args.existing:
+            config.EXISTING_ITEM_POLICY = args.existing
+        
+        if args.prune:
+            config.PRUNE_ACTION = args.prune
         
-        # タスクの移行
-        stats = migrate_tasks(notion_client, github_client, args.dry_run)
+        if args.deadline is not None:
+            config.RUN_DEADLINE_SECONDS = args.deadline
+        
+        if args.hedge_reads:
+            config.GITHUB_HEDGE_READS = True
+        
+        start_run_deadline(config.RUN_DEADLINE_SECONDS)
+        
+        if args.profile is not None:
+            profiler = StageProfiler(args.profile or None)
+            profiler.start()
+        
+        if args.convert_to_issues is not None:
+            config.CONVERT_TO_ISSUES = True
+            if args.convert_to_issues:
+                config.ISSUE_REPOSITORY = args.convert_to_issues
+        
+        if jobs:
+            # マニフェストの全ジョブを共有リソースで実行
+            orchestrator = SyncOrchestrator(jobs, resume=args.resume)
+            results = orchestrator.run(args.dry_run)
+            stats = aggregate_stats(results)
+            stats["concurrency"] = orchestrator.concurrency_metrics()
+            if orchestrator.hedged_reader is not None:
+                stats["hedging"] = orchestrator.hedged_reader.snapshot()
+        elif args.retry_failed:
+            # 失敗タスクの再実行（Notionには接続しない）
+            if not os.path.exists(args.retry_failed):
+                logger.error(f"デッドレターファイル '{args.retry_failed}' が見つかりません。")
+                sys.exit(1)
+            
+            github_client = GitHubClient()
+            stats = retry_failed_tasks(github_client, args.retry_failed)
+        elif args.export_snapshot:
+            # スナップショットへの書き出し（GitHubには書き込まない）
+            notion_client = NotionClient(rate_limiter=RateLimiter(config.NOTION_REQUESTS_PER_SECOND))
+            if config.NOTION_QUERY:
+                notion_client.apply_criteria(config.NOTION_QUERY)
+            count = export_snapshot(notion_client, args.export_snapshot, config.NOTION_QUERY, config.FETCH_PAGE_BODY)
+            logger.info(f"書き出したタスク数: {count}")
+            return
+        elif args.daemon:
+            # 常駐して変更を差分で同期（Ctrl+Cまたは実行の期限で終了）
+            notion_client = NotionClient(rate_limiter=RateLimiter(config.NOTION_REQUESTS_PER_SECOND))
+            github_client = GitHubClient()
+            daemon = SyncDaemon(notion_client, github_client, config.NOTION_QUERY, ledger=SyncLedger())
+            rotate_dead_letter_file()
+            try:
+                daemon.run(should_stop=run_deadline().expired)
+            except KeyboardInterrupt:
+                logger.info("デーモンを停止します。")
+            stats = daemon.stats
+            record_client_metrics(stats, github_client, notion_client)
+        elif args.enqueue or args.worker is not None or args.finish_queue:
+            queue = WorkQueue(args.queue_db or config.QUEUE_DB_FILE)
+            github_client = GitHubClient()
+            if args.enqueue:
+                # ワークキューへの登録（コーディネーター）。デッドレターファイルは移行の開始時にだけ退避する
+                rotate_dead_letter_file()
+                notion_client = NotionClient(rate_limiter=RateLimiter(config.NOTION_REQUESTS_PER_SECOND))
+                if config.NOTION_QUERY:
+                    notion_client.apply_criteria(config.NOTION_QUERY)
+                enqueue_tasks(notion_client, github_client, queue)
+                counts = queue.counts()
+                logger.info(
+                    f"キュー: 待機中 {counts['pending']}, 処理中 {counts['leased']}, "
+                    f"完了 {counts['done']}, 失敗 {counts['failed']}"
+                )
+                return
+            if args.worker is not None:
+                stats = run_queue_worker(github_client, queue, args.worker or None)
+            else:
+                stats = finish_queue(github_client, queue)
+        elif args.import_snapshot:
+            # スナップショットからのインポート（Notionには接続しない）
+            if not os.path.exists(args.import_snapshot):
+                logger.error(f"スナップショット '{args.import_snapshot}' が見つかりません。")
+                sys.exit(1)
+            
+            github_client = GitHubClient()
+            rotate_dead_letter_file()
+            stats = import_snapshot_file(github_client, args.import_snapshot)
+        elif args.replay_events:
+            # 記録したイベントをWebhookのサーバーに送り直す
+            url = f"http://{config.WEBHOOK_HOST}:{config.WEBHOOK_PORT}/"
+            accepted = replay_events(args.replay_events, url)
+            logger.info(f"受け付けられたイベント数: {accepted}")
+            return
+        elif args.reverse_sync or args.webhook_server:
+            # GitHub Projectの変更をNotionに書き戻す（Webhookの場合は通知されたアイテムのみ）
+            notion_client = NotionClient(rate_limiter=RateLimiter(config.NOTION_REQUESTS_PER_SECOND))
+            reverse_sync = ReverseSync(notion_client, GitHubClient())
+            if args.webhook_server:
+                if not config.WEBHOOK_SECRET:
+                    logger.error("WEBHOOK_SECRETを設定してください（署名を検証できないため起動しません）。")
+                    sys.exit(1)
+                counts = serve(WebhookReceiver(reverse_sync), should_stop=run_deadline().expired)
+            else:
+                counts = reverse_sync.run()
+            
+            logger.info("====== 逆方向の同期結果 ======")
+            logger.info(f"確認したアイテム数: {counts['checked']}")
+            logger.info(f"Notionを更新: {counts['updated']}")
+            logger.info(f"変更なし: {counts['unchanged']}")
+            logger.info(f"失敗: {counts['failed']}")
+            
+            if counts['failed']:
+                sys.exit(1)
+            return
+        elif args.verify:
+            # 移行結果の検証（GitHubには書き込まない）
+            notion_client = NotionClient(rate_limiter=RateLimiter(config.NOTION_REQUESTS_PER_SECOND))
+            if config.NOTION_QUERY:
+                notion_client.apply_criteria(config.NOTION_QUERY)
+            counts = run_verification(notion_client, GitHubClient(), args.verify)
+            
+            logger.info("====== 検証結果 ======")
+            logger.info(f"一致: {counts['matched']}")
+            logger.info(f"不足（GitHubにない）: {counts['missing']}")
+            logger.info(f"余分（Notionにない）: {counts['extra']}")
+            logger.info(f"不一致: {counts['mismatch']}")
+            
+            if counts['missing'] or counts['extra'] or counts['mismatch']:
+                sys.exit(1)
+            return
+        else:
+            # クライアントの初期化
+            if config.NOTION_ASYNC:
+                # 取得条件は取得時に適用する
+                notion_client = AsyncNotionClient()
+            else:
+                notion_client = NotionClient(
+                    checkpoint_path=config.NOTION_CHECKPOINT_FILE or None,
+                    resume=args.resume,
+                    rate_limiter=RateLimiter(config.NOTION_REQUESTS_PER_SECOND)
+                )
+                if config.NOTION_QUERY:
+                    notion_client.apply_criteria(config.NOTION_QUERY)
+            github_client = GitHubClient()
+            if not args.dry_run:
+                rotate_dead_letter_file()
+            
+            # タスクの移行
+            stats = migrate_tasks(notion_client, github_client, args.dry_run)
         
         # 結果の表示
         logger.info("====== 移行結果 ======")
@@ -171,6 +777,36 @@ def main():
         logger.info(f"成功: {stats['success']}")
         logger.info(f"失敗: {stats['failed']}")
         logger.info(f"スキップ: {stats['skipped']}")
+        if "pruned" in stats:
+            logger.info(f"整理（Notionで削除済み）: {stats['pruned']}")
+        if "converted" in stats:
+            logger.info(f"イシューに変換: {stats['converted']}")
+        for side, metrics in stats.get("concurrency", {}).items():
+            logger.info(
+                f"同時実行数（{side}）: 現在 {metrics['window']}, 最大 {metrics['peak_window']}/{metrics['max_window']}, "
+                f"縮小 {metrics['decreases']} 回, 平均応答 {metrics['latency_ms']}ms"
+            )
+        if "queue" in stats:
+            counts = stats["queue"]
+            logger.info(
+                f"キュー全体: 待機中 {counts['pending']}, 処理中 {counts['leased']}, "
+                f"完了 {counts['done']}, 失敗 {counts['failed']}"
+            )
+        if "hedging" in stats:
+            hedging = stats["hedging"]
+            logger.info(f"読み取りのヘッジ: 再送 {hedging['hedged']} 回（うち先に応答 {hedging['hedge_wins']} 回）")
+        if stats.get("deadline_skipped"):
+            logger.warning(
+                f"期限切れで未処理: {stats['deadline_skipped']}（次回の実行で続きからインポートします）"
+            )
+        if profiler is not None:
+            profiler.stop()
+            profile = profiler.snapshot()
+            logger.info(f"------ 処理時間の内訳（全体: 経過 {profile['wall']:.2f}秒, CPU {profile['cpu']:.2f}秒） ------")
+            for stage in profile["stages"]:
+                logger.info(
+                    f"{stage['name']}: 経過 {stage['wall']:.2f}秒, CPU {stage['cpu']:.2f}秒, {stage['calls']} 回"
+                )
         
         if stats["failures"]:
             logger.info("------ 失敗したタスク ------")
@@ -179,7 +815,7 @@ def main():
                 logger.info(f"エラー: {failure['error']}")
                 logger.info("-------------------------")
         
-        if stats["failed"] > 0:
+        if stats["failed"] > 0 or stats.get("deadline_skipped"):
             sys.exit(1)
     
     except KeyboardInterrupt:
@@ -189,6 +825,11 @@ def main():
     except Exception as e:
         logger.exception(f"予期しないエラーが発生しました: {str(e)}")
         sys.exit(1)
+    
+    finally:
+        # 移行結果を表示しないモードでも、差し替えたメソッドを戻してプロファイルを書き出す
+        if profiler is not None:
+            profiler.stop()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+Notionブロック → GitHub Flavored Markdown 変換
+
+Notionのブロック（blocks.children.list の結果）をGitHub Flavored Markdownに変換します。
+子ブロックは必要になった時点で fetch_children から取得し、変換結果は1行ずつ返すため、
+ページ全体のブロックツリーをメモリに保持せずに変換できます。
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+# 連続する場合に空行を挟まないリスト系のブロック
+LIST_BLOCK_TYPES = {"bulleted_list_item", "numbered_list_item", "to_do"}
+
+# ファイル系のブロック
+FILE_BLOCK_TYPES = {"image", "video", "file", "pdf", "audio"}
+
+# 子ページ・子データベースのブロック（中身は別のページなので子ブロックを取得せず、リンクだけを出力する）
+CHILD_PAGE_BLOCK_TYPES = {"child_page", "child_database"}
+
+INDENT = "    "
+
+FetchChildren = Callable[[str], Iterable[Dict[str, Any]]]
+
+
+def _wrap(text: str, marker_open: str, marker_close: str) -> str:
+    """
+    前後の空白を外に出してから装飾記号で囲みます（`** text **` は強調にならないため）。
+    """
+    stripped = text.strip()
+    if not stripped:
+        return text
+    leading = text[:len(text) - len(text.lstrip())]
+    trailing = text[len(text.rstrip()):]
+    return f"{leading}{marker_open}{stripped}{marker_close}{trailing}"
+
+
+def rich_text_to_markdown(rich_text: List[Dict[str, Any]]) -> str:
+    """
+    Notionのリッチテキストを装飾付きのMarkdownに変換します。
+
+    Args:
+        rich_text: リッチテキストオブジェクトのリスト
+
+    Returns:
+        Markdown文字列
+    """
+    parts = []
+    for obj in rich_text:
+        if obj.get("type") == "equation":
+            parts.append(f"${obj.get('equation', {}).get('expression', '')}$")
+            continue
+
+        text = obj.get("plain_text", "")
+        annotations = obj.get("annotations", {})
+
+        if annotations.get("code"):
+            text = _wrap(text, "`", "`")
+        if annotations.get("bold"):
+            text = _wrap(text, "**", "**")
+        if annotations.get("italic"):
+            text = _wrap(text, "*", "*")
+        if annotations.get("strikethrough"):
+            text = _wrap(text, "~~", "~~")
+        if obj.get("href"):
+            text = f"[{text}]({obj['href']})"
+
+        parts.append(text)
+
+    return "".join(parts)
+
+
+def _file_url(data: Dict[str, Any]) -> str:
+    """
+    ファイル系ブロックのURLを取得します（Notionにアップロードされたファイルと外部ファイルの両方）。
+    """
+    file_type = data.get("type", "")
+    return data.get(file_type, {}).get("url", "")
+
+
+def _table_lines(rows: Iterable[Dict[str, Any]], indent: str) -> Iterator[str]:
+    """
+    table_rowブロックをMarkdownの表に変換します。1行目をヘッダーとして扱います。
+    """
+    for i, row in enumerate(rows):
+        cells = row.get("table_row", {}).get("cells", [])
+        rendered = [rich_text_to_markdown(cell).replace("|", "\\|") for cell in cells]
+        yield f"{indent}| " + " | ".join(rendered) + " |"
+        if i == 0:
+            yield f"{indent}| " + " | ".join("---" for _ in rendered) + " |"
+
+
+def blocks_to_markdown(blocks: Iterable[Dict[str, Any]], fetch_children: FetchChildren,
+                       depth: int = 0) -> Iterator[str]:
+    """
+    ブロックを順にMarkdownの行に変換します。
+
+    Args:
+        blocks: ブロックのイテラブル
+        fetch_children: ブロックIDから子ブロックを返す関数
+        depth: リストのネストの深さ
+
+    Yields:
+        Markdownの行
+    """
+    indent = INDENT * depth
+    previous_type = None
+    number = 0
+
+    for block in blocks:
+        block_type = block.get("type", "")
+        data = block.get(block_type) or {}
+        is_list = block_type in LIST_BLOCK_TYPES
+
+        # リスト項目が続く場合以外はブロックの間に空行を入れる
+        if previous_type is not None and not (is_list and previous_type in LIST_BLOCK_TYPES):
+            yield ""
+
+        number = number + 1 if block_type == "numbered_list_item" and previous_type == block_type else 1
+        previous_type = block_type
+
+        text = rich_text_to_markdown(data.get("rich_text", []))
+        has_children = block.get("has_children") and block_type not in CHILD_PAGE_BLOCK_TYPES
+        children = fetch_children(block["id"]) if has_children else None
+
+        if block_type == "paragraph":
+            yield f"{indent}{text}"
+        elif block_type in ("heading_1", "heading_2", "heading_3"):
+            yield f"{indent}{'#' * int(block_type[-1])} {text}"
+        elif block_type == "bulleted_list_item":
+            yield f"{indent}- {text}"
+        elif block_type == "numbered_list_item":
+            yield f"{indent}{number}. {text}"
+        elif block_type == "to_do":
+            yield f"{indent}- [{'x' if data.get('checked') else ' '}] {text}"
+        elif block_type in ("quote", "callout"):
+            icon = data.get("icon") or {}
+            prefix = f"{icon['emoji']} " if block_type == "callout" and icon.get("emoji") else ""
+            for line in f"{prefix}{text}".split("\n"):
+                yield f"{indent}> {line}"
+        elif block_type == "code":
+            code = "".join(obj.get("plain_text", "") for obj in data.get("rich_text", []))
+            language = data.get("language", "")
+            yield f"{indent}```{'' if language == 'plain text' else language}"
+            for line in code.split("\n"):
+                yield f"{indent}{line}"
+            yield f"{indent}```"
+        elif block_type == "equation":
+            yield f"{indent}$$"
+            yield f"{indent}{data.get('expression', '')}"
+            yield f"{indent}$$"
+        elif block_type == "divider":
+            yield f"{indent}---"
+        elif block_type in FILE_BLOCK_TYPES:
+            url = _file_url(data)
+            caption = rich_text_to_markdown(data.get("caption", [])) or data.get("name", "") or url
+            yield f"{indent}{'!' if block_type == 'image' else ''}[{caption}]({url})"
+        elif block_type in ("bookmark", "embed", "link_preview"):
+            url = data.get("url", "")
+            caption = rich_text_to_markdown(data.get("caption", [])) or url
+            yield f"{indent}[{caption}]({url})"
+        elif block_type in CHILD_PAGE_BLOCK_TYPES:
+            icon = "📄" if block_type == "child_page" else "🗂"
+            url = f"https://www.notion.so/{block['id'].replace('-', '')}"
+            yield f"{indent}{icon} [{data.get('title', '')}]({url})"
+        elif block_type == "table":
+            if children is not None:
+                yield from _table_lines(children, indent)
+                children = None
+        elif block_type == "toggle":
+            yield f"{indent}<details><summary>{text}</summary>"
+            yield ""
+            if children is not None:
+                yield from blocks_to_markdown(children, fetch_children, depth)
+                children = None
+            yield ""
+            yield f"{indent}</details>"
+        elif text:
+            # 未対応のブロックでもテキストがあれば残す
+            yield f"{indent}{text}"
+
+        if children is not None:
+            if is_list:
+                yield from blocks_to_markdown(children, fetch_children, depth + 1)
+            else:
+                yield ""
+                yield from blocks_to_markdown(children, fetch_children, depth)
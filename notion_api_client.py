@@ -5,11 +5,38 @@ NotionのAPIを使ってデータベースからタスク情報を取得しま
 """
 
 import logging
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Any, Optional
 from notion_client import Client as NotionSDKClient
 from datetime import datetime
+from checkpoint import PaginationCheckpoint
+from rate_limiter import RateLimiter
+from concurrency import AdaptiveConcurrency
+from block_cache import BlockCache
+from markdown_converter import blocks_to_markdown
+from notion_filters import compile_query, query_signature
 import config
 
+# _parse_pageが型で読み取るプロパティ（名前に関係なく値を使うため、FIELD_MAPPINGになくても取得する）
+PARSED_PROPERTY_TYPES = ('title', 'status', 'multi_select', 'people', 'date', 'rich_text')
+
+def select_filter_property_ids(schema: Dict[str, Any]) -> List[str]:
+    """
+    スキーマから、クエリで取得するプロパティのIDを選びます。
+    
+    _parse_pageが読み取る型のプロパティと、FIELD_MAPPINGに含まれるプロパティ（親タスクのリレーションなど）が対象です。
+    
+    Args:
+        schema: データベースのプロパティ（databases.retrieveのproperties）
+        
+    Returns:
+        プロパティIDのリスト
+    """
+    return [
+        prop.get('id') for prop_name, prop in schema.items()
+        if prop.get('id') and (prop_name in config.FIELD_MAPPING or prop.get('type') in PARSED_PROPERTY_TYPES)
+    ]
+
 class NotionClient:
     """
     Notion APIと通信するためのクライアントクラス
@@ -18,16 +45,30 @@ class NotionClient:
     GitHub Projectに適したフォーマットに変換する機能を提供します。
     """
     
-    def __init__(self, api_key: Optional[str] = None, database_id: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, database_id: Optional[str] = None,
+                 checkpoint_path: Optional[str] = None, resume: bool = False,
+                 client: Optional[NotionSDKClient] = None, rate_limiter: Optional[RateLimiter] = None,
+                 schema_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+                 query: Optional[Dict[str, Any]] = None,
+                 concurrency: Optional[AdaptiveConcurrency] = None):
         """
         NotionClientの初期化
         
         Args:
             api_key: Notion APIキー。指定しない場合は環境変数から取得
             database_id: Notionデータベースのコピー。指定しない場合は環境変数から取得
+            checkpoint_path: ページネーションの進捗を保存するチェックポイントファイル。指定しない場合は保存しない
+            resume: チェックポイントから取得を再開するかどうか
+            client: 共有するNotion SDKクライアント。指定しない場合は新規に作成
+            rate_limiter: 共有するレートリミッター。指定しない場合は制限しない
+            schema_cache: データベースIDをキーにした共有のスキーマキャッシュ
+            query: databases.queryに追加で渡すパラメータ（filter / sorts）。指定しない場合は全件を取得
+            concurrency: 共有する同時実行数のコントローラー。指定しない場合はNOTION_MAX_WORKERSを上限に作成
         """
         self.api_key = api_key or config.NOTION_API_KEY
         self.database_id = database_id or config.NOTION_DATABASE_ID
+        self.checkpoint_path = checkpoint_path
+        self.resume = resume
         
         if not self.api_key:
             raise ValueError("Notion API Keyが設定されていません。.envファイルを確認してください。")
@@ -35,9 +76,34 @@ class NotionClient:
         if not self.database_id:
             raise ValueError("Notion Database IDが設定されていません。.envファイルを確認してください。")
         
-        self.client = NotionSDKClient(auth=self.api_key)
+        self.client = client or NotionSDKClient(auth=self.api_key)
+        self.rate_limiter = rate_limiter
+        self.schema_cache = schema_cache if schema_cache is not None else {}
+        self.query = query or {}
+        self._filter_property_ids: Optional[List[str]] = None
+        self.concurrency = concurrency or AdaptiveConcurrency("notion", config.NOTION_MAX_WORKERS)
         self.logger = logging.getLogger(__name__)
     
+    def _throttle(self) -> None:
+        """
+        レートリミッターが設定されていれば、リクエスト前にトークンを取得します。
+        """
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+    
+    def _call(self, call: Callable[[], Any]) -> Any:
+        """
+        同時実行数のコントローラーの範囲でAPIを呼び出します。
+        
+        Args:
+            call: APIを呼び出す関数
+            
+        Returns:
+            APIのレスポンス
+        """
+        with self.concurrency.request():
+            return call()
+    
     def get_database_schema(self) -> Dict[str, Any]:
         """
         データベースのスキーマ情報を取得します。
@@ -45,50 +111,301 @@ class NotionClient:
         Returns:
             データベースのプロパティ情報を含む辞書
         """
+        if self.database_id in self.schema_cache:
+            return self.schema_cache[self.database_id]
+        
         try:
-            database = self.client.databases.retrieve(self.database_id)
-            return database.get('properties', {})
+            self._throttle()
+            database = self._call(lambda: self.client.databases.retrieve(self.database_id))
+            properties = database.get('properties', {})
+            self.schema_cache[self.database_id] = properties
+            return properties
         except Exception as e:
             self.logger.error(f"データベーススキーマの取得に失敗しました: {e}")
             raise
     
+    def get_filter_property_ids(self) -> List[str]:
+        """
+        クエリで取得するプロパティのIDを返します（filter_propertiesに指定するため）。
+        
+        _parse_pageが読み取る型のプロパティと、FIELD_MAPPINGに含まれるプロパティが対象です。
+        スキーマはデータベースごとに1回だけ取得します。
+        
+        Returns:
+            プロパティIDのリスト。対象のプロパティが見つからなければ空のリスト
+        """
+        if self._filter_property_ids is None:
+            self._filter_property_ids = select_filter_property_ids(self.get_database_schema())
+        return self._filter_property_ids
+    
+    def _query_database(self, query_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        databases.queryを実行します。NOTION_FILTER_PROPERTIESが有効なら、使用するプロパティだけを取得します。
+        
+        SDKのdatabases.queryはfilter_propertiesを渡せないため、その場合はエンドポイントを直接呼び出します。
+        
+        Args:
+            query_params: クエリのパラメータ（database_idを含む）
+            
+        Returns:
+            APIのレスポンス
+        """
+        property_ids = self.get_filter_property_ids() if config.NOTION_FILTER_PROPERTIES else []
+        if not property_ids:
+            return self._call(lambda: self.client.databases.query(**query_params))
+        
+        body = {key: value for key, value in query_params.items() if key != "database_id"}
+        return self._call(lambda: self.client.request(
+            path=f"databases/{query_params['database_id']}/query",
+            method="POST",
+            query={"filter_properties": property_ids},
+            body=body
+        ))
+    
+    def apply_criteria(self, criteria: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        取得条件をスキーマに合わせてNotionのfilter / sortsに変換し、以降のクエリに使用します。
+        
+        Args:
+            criteria: 取得条件（notion_filters.compile_queryの形式）
+            
+        Returns:
+            databases.queryに追加で渡すパラメータ
+        """
+        self.query = compile_query(criteria, self.get_database_schema())
+        if self.query:
+            self.logger.info(f"Notionのクエリ条件: {self.query}")
+        return self.query
+    
     def get_all_tasks(self) -> List[Dict[str, Any]]:
         """
         データベースから全てのタスクを取得します。
         
+        checkpoint_pathが設定されている場合は、取得の進捗をチェックポイントファイルに保存し、
+        resumeが有効なら前回中断したカーソルから取得を再開します。
+        チェックポイントには取得済みのタスクを保存し、再開時はページを取得し直さずにカーソルの続きだけを取得します。
+        
         Returns:
             タスク情報を含む辞書のリスト
         """
         try:
-            # 全ページを取得するための再帰関数
-            def fetch_pages(cursor=None, results=None):
-                if results is None:
-                    results = []
+            tasks = []
+            seen_ids = set()
+            cursor = None
+            checkpoint = None
+            
+            if self.checkpoint_path:
+                checkpoint = PaginationCheckpoint(
+                    self.checkpoint_path, self.database_id, config.CHECKPOINT_INTERVAL,
+                    query=query_signature(self.query) if self.query else ""
+                )
+                if self.resume:
+                    tasks, cursor, done = checkpoint.load()
+                    seen_ids = {task.get('notion_id') for task in tasks}
+                    if done:
+                        checkpoint.clear()
+                        return tasks
+                    if cursor:
+                        self.logger.info(f"チェックポイントから再開します（取得済み: {len(tasks)} 件）")
                 
+                if not cursor:
+                    # 再開できるカーソルがなければ最初から取得し直す
+                    tasks, seen_ids = [], set()
+                    checkpoint.reset()
+            
+            # 全ページを順に取得（ページ数が多くても再帰の深さに依存しないようにループで処理）
+            while True:
                 query_params = {
                     "database_id": self.database_id,
-                    "page_size": 100  # 最大ページサイズ
+                    "page_size": 100,  # 最大ページサイズ
+                    **self.query
                 }
                 
                 if cursor:
                     query_params["start_cursor"] = cursor
                 
-                response = self.client.databases.query(**query_params)
-                results.extend(response.get("results", []))
+                self._throttle()
+                response = self._query_database(query_params)
+                
+                page_tasks = []
+                for page in response.get("results", []):
+                    if page.get('id') in seen_ids:
+                        continue
+                    seen_ids.add(page.get('id'))
+                    page_tasks.append(self._parse_page(page))
+                tasks.extend(page_tasks)
                 
                 # 次のページがあれば続けて取得
-                if response.get("has_more", False):
-                    return fetch_pages(response.get("next_cursor"), results)
+                has_more = response.get("has_more", False)
+                cursor = response.get("next_cursor") if has_more else None
                 
-                return results
+                if checkpoint:
+                    checkpoint.add(page_tasks, cursor)
+                
+                if not has_more:
+                    break
+            
+            if checkpoint:
+                checkpoint.clear()
             
-            all_pages = fetch_pages()
-            return [self._parse_page(page) for page in all_pages]
+            return tasks
         
         except Exception as e:
             self.logger.error(f"タスクの取得に失敗しました: {e}")
             raise
     
+    def iter_tasks(self) -> Iterator[Dict[str, Any]]:
+        """
+        データベースのタスクをページングしながら順に返します。
+        
+        全件をリストに保持しないため、件数の多いデータベースを一度だけ走査する場合に使用します
+        （チェックポイントには対応していません）。
+        
+        Yields:
+            パースされたタスク情報
+        """
+        seen_ids = set()
+        cursor = None
+        while True:
+            query_params = {
+                "database_id": self.database_id,
+                "page_size": 100,
+                **self.query
+            }
+            if cursor:
+                query_params["start_cursor"] = cursor
+            
+            self._throttle()
+            response = self._query_database(query_params)
+            for page in response.get("results", []):
+                if page.get('id') in seen_ids:
+                    continue
+                seen_ids.add(page.get('id'))
+                yield self._parse_page(page)
+            
+            if not response.get("has_more", False):
+                return
+            cursor = response.get("next_cursor")
+    
+    def iter_block_children(self, block_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        ブロック（またはページ）の子ブロックをページングしながら順に返します。
+        
+        Args:
+            block_id: ブロックまたはページのID
+            
+        Yields:
+            子ブロック
+        """
+        cursor = None
+        while True:
+            query_params = {
+                "block_id": block_id,
+                "page_size": 100
+            }
+            if cursor:
+                query_params["start_cursor"] = cursor
+            
+            self._throttle()
+            response = self._call(lambda: self.client.blocks.children.list(**query_params))
+            yield from response.get("results", [])
+            
+            if not response.get("has_more", False):
+                return
+            cursor = response.get("next_cursor")
+    
+    def get_page_markdown(self, page_id: str) -> str:
+        """
+        ページの本文（ブロックツリー）を取得し、GitHub Flavored Markdownに変換します。
+        
+        子ブロックは変換しながら再帰的に取得します。
+        
+        Args:
+            page_id: NotionのページID
+            
+        Returns:
+            Markdownに変換した本文
+        """
+        lines = blocks_to_markdown(self.iter_block_children(page_id), self.iter_block_children)
+        return "\n".join(lines).strip()
+    
+    def fetch_page_bodies(self, tasks: List[Dict[str, Any]], max_workers: Optional[int] = None) -> int:
+        """
+        各タスクのページ本文を並行して取得し、Markdownに変換して task['body'] に設定します。
+        
+        リクエストはレートリミッターの範囲で並行に行い、本文は last_edited_time をキーに
+        キャッシュするため、編集されていないページは再ダウンロードしません。
+        
+        Args:
+            tasks: タスクのリスト
+            max_workers: 並行して取得するページ数。指定しない場合は設定ファイルの値
+            
+        Returns:
+            APIから取得したページ数（キャッシュから読み込んだページは含まない）
+        """
+        cache = BlockCache(config.BLOCK_CACHE_DIR) if config.BLOCK_CACHE_DIR else None
+        pending = []
+        
+        for task in tasks:
+            page_id = task.get('notion_id')
+            if not page_id:
+                continue
+            cached = cache.get(page_id, task.get('last_edited_time')) if cache else None
+            if cached is not None:
+                task['body'] = cached
+            else:
+                pending.append(task)
+        
+        self.logger.info(
+            f"ページ本文: キャッシュ {len(tasks) - len(pending)} 件、取得 {len(pending)} 件"
+        )
+        
+        def fetch(task: Dict[str, Any]) -> None:
+            markdown = self.get_page_markdown(task['notion_id'])
+            task['body'] = markdown
+            if cache:
+                cache.put(task['notion_id'], task.get('last_edited_time'), markdown)
+        
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=max_workers or config.NOTION_MAX_WORKERS) as executor:
+            futures = {executor.submit(fetch, task): task for task in pending}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    future.result()
+                    fetched += 1
+                except Exception as e:
+                    self.logger.warning(f"ページ本文の取得に失敗しました: {task.get('title', 'No Title')}, エラー: {e}")
+        
+        return fetched
+    
+    def get_task(self, page_id: str) -> Dict[str, Any]:
+        """
+        1件のページを取得してパースします。
+        
+        Args:
+            page_id: NotionのページID
+            
+        Returns:
+            パースされたタスク情報
+        """
+        self._throttle()
+        return self._parse_page(self._call(lambda: self.client.pages.retrieve(page_id)))
+    
+    def update_page(self, page_id: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        ページのプロパティを更新します。指定したプロパティだけが変更されます。
+        
+        Args:
+            page_id: NotionのページID
+            properties: pages.updateに渡すプロパティ
+            
+        Returns:
+            更新後のページ
+        """
+        self._throttle()
+        return self._call(lambda: self.client.pages.update(page_id=page_id, properties=properties))
+    
     def _parse_page(self, page: Dict[str, Any]) -> Dict[str, Any]:
         """
         Notionのページデータをパースして必要な情報を抽出します。
@@ -102,7 +419,8 @@ class NotionClient:
         properties = page.get('properties', {})
         task_data = {
             'notion_id': page.get('id'),
-            'url': page.get('url')
+            'url': page.get('url'),
+            'last_edited_time': page.get('last_edited_time')
         }
         
         # 各プロパティをパース
@@ -134,11 +452,19 @@ class NotionClient:
             elif prop_type == 'people':
                 # 担当者
                 assignees = []
+                people = []
                 for person in prop_data.get('people', []):
                     name = person.get('name', '')
                     if name:
                         assignees.append(name)
+                    # GitHubのユーザーへの対応づけに使うIDとメールアドレス
+                    people.append({
+                        'id': person.get('id'),
+                        'name': name,
+                        'email': (person.get('person') or {}).get('email')
+                    })
                 task_data['assignees'] = assignees
+                task_data['people'] = people
             
             elif prop_type == 'date':
                 # 期日
@@ -152,6 +478,12 @@ class NotionClient:
                     except ValueError:
                         self.logger.warning(f"日付の解析に失敗しました: {start_date}")
             
+            elif prop_type == 'relation':
+                # リレーション（親タスク）
+                relation_ids = [relation.get('id') for relation in prop_data.get('relation', []) if relation.get('id')]
+                if config.FIELD_MAPPING.get(prop_name) == 'parent' and relation_ids:
+                    task_data['parent_id'] = relation_ids[0]
+            
             elif prop_type == 'rich_text':
                 # リッチテキスト（説明など）
                 rich_text_objects = prop_data.get('rich_text', [])
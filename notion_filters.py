@@ -0,0 +1,212 @@
+"""
+Notionクエリのフィルターとソート
+
+コマンドライン引数やマニフェストで指定された条件を、databases.queryの
+`filter` / `sorts` オブジェクトに変換します。条件をNotion側で評価させることで、
+必要なページだけを転送できます。
+
+条件（criteria）の形式:
+
+    {
+        "status": ["In progress", "Backlog"],      # いずれかに一致
+        "tags": ["SDK/計測"],                       # いずれかを含む
+        "due_after": "2024-01-01", "due_before": "2024-12-31",
+        "created_after": "2024-01-01", "created_before": "...",
+        "edited_after": "2024-06-01T00:00:00Z", "edited_before": "...",
+        "where": ["Priority:equals:High", "Estimate:greater_than:3"]
+    }
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+import config
+
+# 値を取らない演算子
+_UNARY_OPERATORS = {"is_empty", "is_not_empty", "past_week", "past_month", "past_year",
+                    "next_week", "next_month", "next_year", "this_week"}
+
+
+def _property_for(field: str, schema: Dict[str, Any]) -> Optional[str]:
+    """
+    FIELD_MAPPINGでfieldに対応づけられているNotionのプロパティ名を返します。
+    """
+    for prop_name, mapped in config.FIELD_MAPPING.items():
+        if mapped == field and prop_name in schema:
+            return prop_name
+    return None
+
+
+def _property_type(prop_name: str, schema: Dict[str, Any]) -> str:
+    """
+    スキーマからプロパティの型を返します。
+    """
+    if prop_name not in schema:
+        raise ValueError(f"プロパティ '{prop_name}' がデータベースに存在しません。")
+    return schema[prop_name].get("type", "")
+
+
+def _parse_value(value: str, prop_type: str) -> Any:
+    """
+    文字列で指定された値を、プロパティの型に合わせて変換します。
+    """
+    if prop_type == "checkbox":
+        return value.lower() in ("true", "1", "yes")
+    if prop_type == "number":
+        return float(value) if "." in value else int(value)
+    return value
+
+
+def _any_of(conditions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    条件が複数ならORでまとめます。
+    """
+    return conditions[0] if len(conditions) == 1 else {"or": conditions}
+
+
+def parse_where(expression: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    "プロパティ:演算子:値" 形式の条件をNotionのフィルターに変換します。
+
+    Args:
+        expression: 条件（例: "Priority:equals:High", "Owner:is_empty"）
+        schema: データベースのスキーマ
+
+    Returns:
+        Notionのプロパティフィルター
+    """
+    parts = expression.split(":", 2)
+    if len(parts) < 2:
+        raise ValueError(f"条件 '{expression}' は 'プロパティ:演算子:値' の形式で指定してください。")
+
+    prop_name, operator = parts[0], parts[1]
+    prop_type = _property_type(prop_name, schema)
+
+    if operator in _UNARY_OPERATORS:
+        value: Any = {} if operator.startswith(("past_", "next_", "this_")) else True
+    elif len(parts) == 3:
+        value = _parse_value(parts[2], prop_type)
+    else:
+        raise ValueError(f"条件 '{expression}' に値がありません。")
+
+    return {"property": prop_name, prop_type: {operator: value}}
+
+
+def build_filter(criteria: Dict[str, Any], schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    条件からdatabases.queryのfilterオブジェクトを作成します。
+
+    Args:
+        criteria: 条件の辞書
+        schema: データベースのスキーマ（get_database_schemaの結果）
+
+    Returns:
+        Notionのfilterオブジェクト。条件がなければNone
+    """
+    conditions: List[Dict[str, Any]] = []
+
+    if criteria.get("status"):
+        prop_name = _property_for("status", schema)
+        if not prop_name:
+            raise ValueError("ステータスのプロパティがデータベースに見つかりません。")
+        prop_type = _property_type(prop_name, schema)
+        conditions.append(_any_of([
+            {"property": prop_name, prop_type: {"equals": value}} for value in criteria["status"]
+        ]))
+
+    if criteria.get("tags"):
+        prop_name = _property_for("labels", schema)
+        if not prop_name:
+            raise ValueError("タグのプロパティがデータベースに見つかりません。")
+        prop_type = _property_type(prop_name, schema)
+        operator = "contains" if prop_type == "multi_select" else "equals"
+        conditions.append(_any_of([
+            {"property": prop_name, prop_type: {operator: value}} for value in criteria["tags"]
+        ]))
+
+    if criteria.get("due_after") or criteria.get("due_before"):
+        prop_name = _property_for("due_date", schema)
+        if not prop_name:
+            raise ValueError("期日のプロパティがデータベースに見つかりません。")
+        if criteria.get("due_after"):
+            conditions.append({"property": prop_name, "date": {"on_or_after": criteria["due_after"]}})
+        if criteria.get("due_before"):
+            conditions.append({"property": prop_name, "date": {"on_or_before": criteria["due_before"]}})
+
+    for timestamp, prefix in (("created_time", "created"), ("last_edited_time", "edited")):
+        if criteria.get(f"{prefix}_after"):
+            conditions.append({"timestamp": timestamp, timestamp: {"on_or_after": criteria[f"{prefix}_after"]}})
+        if criteria.get(f"{prefix}_before"):
+            conditions.append({"timestamp": timestamp, timestamp: {"on_or_before": criteria[f"{prefix}_before"]}})
+
+    for expression in criteria.get("where") or []:
+        conditions.append(parse_where(expression, schema))
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"and": conditions}
+
+
+def build_sorts(sort_specs: List[str]) -> List[Dict[str, Any]]:
+    """
+    "プロパティ[:ascending|descending]" 形式の指定からsortsを作成します。
+
+    created_time / last_edited_time はページのタイムスタンプとして扱います。
+
+    Args:
+        sort_specs: ソートの指定のリスト
+
+    Returns:
+        Notionのsortsオブジェクト
+    """
+    sorts = []
+    for spec in sort_specs:
+        name, _, direction = spec.partition(":")
+        direction = direction or "ascending"
+        if direction not in ("ascending", "descending"):
+            raise ValueError(f"ソート順 '{direction}' は ascending か descending を指定してください。")
+        key = "timestamp" if name in ("created_time", "last_edited_time") else "property"
+        sorts.append({key: name, "direction": direction})
+    return sorts
+
+
+def compile_query(criteria: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    条件とソート指定から、databases.queryに渡す追加のパラメータを作成します。
+
+    criteriaの "filter" / "sorts" にNotionのオブジェクトをそのまま指定することもできます。
+
+    Args:
+        criteria: 条件の辞書（"sort" にソートの指定のリスト）
+        schema: データベースのスキーマ
+
+    Returns:
+        {"filter": ..., "sorts": ...}（指定がないものは含まない）
+    """
+    query: Dict[str, Any] = {}
+
+    query_filter = criteria.get("filter") or build_filter(criteria, schema)
+    if query_filter:
+        query["filter"] = query_filter
+
+    sorts = criteria.get("sorts") or build_sorts(criteria.get("sort") or [])
+    if sorts:
+        query["sorts"] = sorts
+
+    return query
+
+
+def has_filter(criteria: Dict[str, Any]) -> bool:
+    """
+    条件にタスクを絞り込むもの（ソート以外）が含まれているかを返します。
+    """
+    return any(value for key, value in criteria.items() if key not in ("sort", "sorts"))
+
+
+def query_signature(query: Dict[str, Any]) -> str:
+    """
+    クエリの内容を表す文字列を返します（チェックポイントが同じクエリのものか判定するため）。
+    """
+    return json.dumps(query, sort_keys=True, ensure_ascii=False)
@@ -0,0 +1,431 @@
+"""
+複数データベース・複数プロジェクトの同期オーケストレーター
+
+マニフェストファイル（`--config`）に列挙された複数の
+「Notionデータベース → GitHub Project」の組み合わせを1つのプロセスで実行します。
+HTTPコネクションプール、レートリミッター、スキーマ・フィールドIDのキャッシュを全ジョブで共有します。
+Notionからの取得はジョブごとに並行して行い、インポートは取得が終わったジョブの間でラウンドロビンに
+行うことで、1つの大きなジョブが他のジョブを待たせないようにします。
+孤立したアイテムの整理（PRUNE_ACTION）を行う場合、同じGitHub Projectを対象にするジョブは指定できません。
+
+マニフェストの形式:
+
+    {
+        "settings": {"MAX_RETRIES": 5},
+        "defaults": {"github_owner": "my-org"},
+        "jobs": [
+            {"name": "team-a", "notion_database_id": "...", "github_project_number": 1},
+            {"name": "team-b", "notion_database_id": "...", "github_project_number": 2,
+             "query": {"status": ["In progress"], "edited_after": "2024-01-01"},
+             "issue_repository": "my-org/team-b"}
+        ]
+    }
+"""
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from notion_client import Client as NotionSDKClient
+
+from notion_api_client import NotionClient
+from github_client import GitHubClient
+from import_state import ImportStateStore
+from rate_limiter import RateLimiter
+from concurrency import AdaptiveConcurrency
+from timeouts import HedgedReader
+from task_importer import (
+    TaskImporter, finish_import, new_stats, prepare_field_options, resolve_people, run_importer
+)
+from retry_queue import DeadLetterQueue
+from hierarchy import topological_order
+from project_index import EXISTING_OFF, load_project_index
+from planner import plan_migration
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    """
+    マニフェストファイルを読み込みます。
+
+    Args:
+        path: マニフェストファイルのパス
+
+    Returns:
+        マニフェストの内容
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if not isinstance(manifest, dict):
+        raise ValueError(f"設定ファイル '{path}' の形式が正しくありません。")
+
+    jobs = manifest.get("jobs", [])
+    defaults = manifest.get("defaults", {})
+    for i, job in enumerate(jobs, 1):
+        job.setdefault("name", f"job{i}")
+        for key, value in defaults.items():
+            job.setdefault(key, value)
+        if not job.get("notion_database_id") or not job.get("github_project_number"):
+            raise ValueError(
+                f"ジョブ '{job['name']}' に notion_database_id と github_project_number が必要です。"
+            )
+
+    return manifest
+
+
+def apply_settings(settings: Dict[str, Any]) -> None:
+    """
+    マニフェストの settings をconfigモジュールの値に反映します。
+
+    Args:
+        settings: 設定名（config.pyの変数名）と値の辞書
+    """
+    for key, value in settings.items():
+        if not hasattr(config, key):
+            logger.warning(f"不明な設定 '{key}' を無視しました")
+            continue
+        setattr(config, key, value)
+        logger.info(f"設定 '{key}' を上書きしました")
+
+
+def job_path(path: Optional[str], job_name: str) -> Optional[str]:
+    """
+    ジョブごとのファイル名を作成します（例: failed_tasks.jsonl → failed_tasks.team-a.jsonl）。
+
+    Args:
+        path: 元のファイルパス
+        job_name: ジョブ名
+
+    Returns:
+        ジョブごとのファイルパス。元のパスがなければNone
+    """
+    if not path:
+        return None
+    root, ext = os.path.splitext(path)
+    return f"{root}.{job_name}{ext}"
+
+
+def aggregate_stats(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    ジョブごとの統計情報を合計します。
+
+    Args:
+        results: ジョブ名から統計情報への辞書
+
+    Returns:
+        合計した統計情報
+    """
+    total = new_stats()
+    for job_name, stats in results.items():
+        for key in ("total", "success", "failed", "skipped"):
+            total[key] += stats[key]
+        for key in ("pruned", "converted", "deadline_skipped"):
+            if key in stats:
+                total[key] = total.get(key, 0) + stats[key]
+        for failure in stats["failures"]:
+            total["failures"].append(dict(failure, title=f"[{job_name}] {failure['title']}"))
+    return total
+
+
+class JobDispatcher:
+    """
+    タスクをジョブごとのTaskImporterに振り分けるクラス
+
+    run_importerにTaskImporterの代わりに渡すと、進捗の表示（ジョブ間で一意）ごとに
+    登録したTaskImporterでインポートします。
+    """
+
+    def __init__(self):
+        self._importers: Dict[str, TaskImporter] = {}
+        self._lock = threading.Lock()
+
+    def assign(self, position: str, importer: TaskImporter) -> None:
+        """
+        進捗の表示に対応するTaskImporterを登録します。
+        """
+        with self._lock:
+            self._importers[position] = importer
+
+    def import_task(self, task: Dict[str, Any], position: str) -> bool:
+        """
+        登録したTaskImporterでタスクを1件インポートします。
+        """
+        with self._lock:
+            importer = self._importers[position]
+        result = importer.import_task(task, position)
+        with self._lock:
+            del self._importers[position]
+        return result
+
+    def record_failure(self, task: Dict[str, Any], error_message: Optional[str], position: str) -> None:
+        """
+        インポート中に例外が発生したタスクの失敗を、登録したTaskImporterに記録します。
+        """
+        with self._lock:
+            importer = self._importers.pop(position)
+        importer.record_failure(task, error_message, position)
+
+
+def record_job_failure(stats: Dict[str, Any], title: str, error: Exception) -> None:
+    """
+    ジョブ全体の処理の失敗を統計情報に記録します。
+    """
+    stats["failed"] += 1
+    stats["failures"].append({"title": title, "error": str(error)})
+
+
+class SyncOrchestrator:
+    """
+    複数の同期ジョブを共有リソースで実行するクラス
+    """
+
+    def __init__(self, jobs: List[Dict[str, Any]], resume: bool = False):
+        """
+        SyncOrchestratorの初期化
+
+        Args:
+            jobs: ジョブ定義のリスト
+            resume: Notionからの取得をチェックポイントから再開するかどうか
+        """
+        if config.PRUNE_ACTION:
+            # 同じプロジェクトを対象にするジョブがあると、他のジョブのアイテムを孤立したアイテムとして整理してしまう
+            targets: Dict[Tuple[str, str], str] = {}
+            for job in jobs:
+                target = (job.get("github_owner") or config.GITHUB_OWNER, str(job["github_project_number"]))
+                if target in targets:
+                    raise ValueError(
+                        f"ジョブ '{targets[target]}' と '{job['name']}' が同じGitHub Project（{target[0]}/{target[1]}）を"
+                        "対象にしているため、孤立したアイテムの整理（PRUNE_ACTION）は使用できません。"
+                    )
+                targets[target] = job["name"]
+
+        self.jobs = jobs
+        self.resume = resume
+
+        # 全ジョブで共有するHTTPコネクションプール
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+
+        # 全ジョブで共有するレート制限とキャッシュ
+        self.notion_rate_limiter = RateLimiter(config.NOTION_REQUESTS_PER_SECOND)
+        self.github_rate_limiter = RateLimiter(config.GITHUB_REQUESTS_PER_SECOND)
+        self.notion_concurrency = AdaptiveConcurrency("notion", config.NOTION_MAX_WORKERS)
+        self.github_concurrency = AdaptiveConcurrency("github", config.GITHUB_MAX_CONCURRENCY)
+        self.hedged_reader = HedgedReader(min_delay=config.GITHUB_HEDGE_MIN_DELAY) if config.GITHUB_HEDGE_READS else None
+        self.schema_cache: Dict[str, Dict[str, Any]] = {}
+        self.metadata_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._notion_sdk_clients: Dict[str, NotionSDKClient] = {}
+        self._sdk_lock = threading.Lock()
+        self._job_tasks: Dict[str, List[Dict[str, Any]]] = {}
+
+        # 状態ファイルはNotionのページIDで記録するため、ジョブごとに分ける
+        # （同じデータベースを別のプロジェクトに同期するジョブが、互いのアイテムIDを使わないように）
+        self.state_stores: Dict[str, ImportStateStore] = {
+            job["name"]: ImportStateStore(job_path(config.IMPORT_STATE_FILE, job["name"]))
+            for job in jobs
+        } if config.IMPORT_STATE_FILE else {}
+
+    def _notion_client_for(self, job: Dict[str, Any]) -> NotionClient:
+        """
+        ジョブ用のNotionClientを作成します。同じAPIキーのジョブはSDKクライアントを共有します。
+        """
+        api_key = job.get("notion_api_key") or config.NOTION_API_KEY
+        # ジョブの取得は並行して行うため、SDKクライアントの作成を保護する
+        with self._sdk_lock:
+            if api_key and api_key not in self._notion_sdk_clients:
+                self._notion_sdk_clients[api_key] = NotionSDKClient(auth=api_key)
+
+        notion_client = NotionClient(
+            api_key=api_key,
+            database_id=job["notion_database_id"],
+            checkpoint_path=job_path(config.NOTION_CHECKPOINT_FILE, job["name"]),
+            resume=self.resume,
+            client=self._notion_sdk_clients.get(api_key),
+            rate_limiter=self.notion_rate_limiter,
+            schema_cache=self.schema_cache,
+            concurrency=self.notion_concurrency
+        )
+        criteria = job.get("query", config.NOTION_QUERY)
+        if criteria:
+            notion_client.apply_criteria(criteria)
+        return notion_client
+
+    def _github_client_for(self, job: Dict[str, Any]) -> GitHubClient:
+        """
+        ジョブ用のGitHubClientを作成します。HTTPセッションとキャッシュは全ジョブで共有します。
+        """
+        return GitHubClient(
+            token=job.get("github_token"),
+            owner=job.get("github_owner"),
+            project_number=str(job["github_project_number"]),
+            session=self.session,
+            rate_limiter=self.github_rate_limiter,
+            metadata_cache=self.metadata_cache,
+            concurrency=self.github_concurrency,
+            hedged_reader=self.hedged_reader
+        )
+
+    def _importer_for(self, job: Dict[str, Any], stats: Dict[str, Any]) -> TaskImporter:
+        """
+        ジョブ用のTaskImporterを作成します。既存アイテムの索引を読み込み、前回のデッドレターファイルを退避します。
+        """
+        github_client = self._github_client_for(job)
+        item_index = None
+        if config.EXISTING_ITEM_POLICY != EXISTING_OFF:
+            item_index = load_project_index(github_client)
+        dead_letter_file = job_path(config.DEAD_LETTER_FILE, job["name"])
+        if dead_letter_file:
+            DeadLetterQueue(dead_letter_file).rotate()
+        return TaskImporter(
+            github_client, stats,
+            dead_letter_file=dead_letter_file,
+            state_store=self.state_stores.get(job["name"]),
+            item_index=item_index
+        )
+
+    def _fetch_job(self, job: Dict[str, Any], stats: Dict[str, Any], dry_run: bool = False,
+                   importer: Optional[TaskImporter] = None) -> List[Dict[str, Any]]:
+        """
+        ジョブのタスクをNotionから取得し、インポートの準備をします。
+        ドライランの場合は、ジョブの移行計画とコストの見積もりを統計情報に記録します。
+        """
+        logger.info(f"[{job['name']}] Notionからタスクを取得しています...")
+        notion_client = self._notion_client_for(job)
+        tasks = notion_client.get_all_tasks()
+        if config.FETCH_PAGE_BODY and not dry_run:
+            notion_client.fetch_page_bodies(tasks)
+        if any(task.get('parent_id') for task in tasks):
+            tasks = topological_order(tasks)
+        stats["total"] = len(tasks)
+        logger.info(f"[{job['name']}] 取得したタスク数: {len(tasks)}")
+        if dry_run:
+            logger.info(f"[{job['name']}] 移行計画を作成しています...")
+            stats["plan"] = plan_migration(self._github_client_for(job), tasks, self.state_stores.get(job["name"]))
+        if importer is not None:
+            prepare_field_options(importer.github_client, tasks)
+            resolve_people(importer.github_client, tasks)
+        return tasks
+
+    def _interleave(self, fetches: Dict[Future, Tuple[Dict[str, Any], Optional[TaskImporter]]],
+                    results: Dict[str, Dict[str, Any]],
+                    dispatcher: JobDispatcher) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        取得が終わったジョブから順に加え、ジョブ間でラウンドロビンにタスクを返します。
+
+        取得の遅いジョブを待たずに、取得の終わったジョブのインポートを始めます。
+        """
+        pending = set(fetches)
+        active: List[Tuple[Dict[str, Any], Optional[TaskImporter], Iterator[Dict[str, Any]]]] = []
+        position = 0
+        while pending or active:
+            done = {future for future in pending if future.done()}
+            if not done and not active:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                job, importer = fetches[future]
+                try:
+                    tasks = future.result()
+                except Exception as e:
+                    # 1つのジョブの取得失敗で他のジョブを止めない
+                    logger.error(f"[{job['name']}] タスクの取得に失敗しました: {e}")
+                    record_job_failure(results[job["name"]], "(Notionからの取得)", e)
+                    continue
+                self._job_tasks[job["name"]] = tasks
+                active.append((job, importer, iter(tasks)))
+
+            remaining = []
+            for job, importer, stream in active:
+                task = next(stream, None)
+                if task is None:
+                    continue
+                position += 1
+                label = f"[{job['name']}] #{position}"
+                if importer:
+                    dispatcher.assign(label, importer)
+                yield label, task
+                remaining.append((job, importer, stream))
+            active = remaining
+
+    def concurrency_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        全ジョブで共有している同時実行数のコントローラーの状態を返します。
+        """
+        return {
+            "notion": self.notion_concurrency.snapshot(),
+            "github": self.github_concurrency.snapshot()
+        }
+
+    def run(self, dry_run: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        全ジョブを実行します。
+
+        Notionからの取得はジョブごとに並行して行い、インポートは取得が終わったジョブの間で
+        ラウンドロビンに行います（GITHUB_MAX_CONCURRENCYが2以上なら並行してインポートします）。
+        1つのジョブの準備や取得に失敗しても、他のジョブは続行します。
+
+        Args:
+            dry_run: 実際にGitHubにインポートしない場合はTrue
+
+        Returns:
+            ジョブ名から統計情報への辞書
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        jobs: List[Tuple[Dict[str, Any], Optional[TaskImporter]]] = []
+
+        for job in self.jobs:
+            stats = new_stats()
+            results[job["name"]] = stats
+            importer = None
+            if not dry_run:
+                try:
+                    importer = self._importer_for(job, stats)
+                except Exception as e:
+                    logger.error(f"[{job['name']}] GitHub Projectの準備に失敗しました: {e}")
+                    record_job_failure(stats, "(GitHub Projectの準備)", e)
+                    continue
+            jobs.append((job, importer))
+
+        dispatcher = JobDispatcher()
+        with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), config.NOTION_MAX_WORKERS))) as executor:
+            fetches = {
+                executor.submit(self._fetch_job, job, results[job["name"]], dry_run, importer): (job, importer)
+                for job, importer in jobs
+            }
+            entries = self._interleave(fetches, results, dispatcher)
+            if dry_run:
+                for position, task in entries:
+                    logger.info(f"{position} タスク: {task.get('title', 'No Title')}")
+            else:
+                run_importer(dispatcher, entries)
+
+        # 後処理は、ジョブの全タスクのインポートが終わってから行う
+        for job, importer in jobs:
+            tasks = self._job_tasks.pop(job["name"], None)
+            if importer and tasks is not None:
+                importer.finish()
+                try:
+                    finish_import(
+                        importer.github_client, tasks, results[job["name"]], importer.state_store,
+                        importer.item_index, job.get("query", config.NOTION_QUERY), job.get("issue_repository")
+                    )
+                except Exception as e:
+                    logger.error(f"[{job['name']}] インポートの後処理に失敗しました: {e}")
+            logger.info(f"[{job['name']}] 完了しました")
+
+        for job_name, stats in results.items():
+            logger.info(
+                f"[{job_name}] 合計: {stats['total']}, 成功: {stats['success']}, "
+                f"失敗: {stats['failed']}, スキップ: {stats['skipped']}"
+            )
+
+        return results
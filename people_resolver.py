@@ -0,0 +1,164 @@
+"""
+Notionのユーザー → GitHubのユーザーの対応づけ
+
+Notionの担当者（ユーザーID・メールアドレス・名前）を、設定ファイルの対応表（PEOPLE_MAPPING）で
+GitHubのログイン名に変換し、`user(login:)` のエイリアス付き一括クエリでユーザーのノードIDを取得します。
+結果はファイルにキャッシュし、同じ人はタスクの数によらず1回だけ問い合わせます。
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from github_client import graphql_literal
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class PeopleResolver:
+    """
+    Notionのユーザーを、GitHubのログイン名とユーザーのノードIDに対応づけるクラス
+    """
+
+    def __init__(self, github_client: Any, mapping: Optional[Dict[str, str]] = None,
+                 cache_path: Optional[str] = None):
+        """
+        PeopleResolverの初期化
+
+        Args:
+            github_client: GitHubのAPIクライアント
+            mapping: NotionのユーザーID・メールアドレス・名前からGitHubのログイン名への対応表。
+                     指定しない場合は設定ファイルの値
+            cache_path: ログイン名からノードIDへのキャッシュファイル。指定しない場合は設定ファイルの値
+        """
+        self.github_client = github_client
+        self.mapping = mapping if mapping is not None else config.PEOPLE_MAPPING
+        self.cache_path = cache_path if cache_path is not None else config.PEOPLE_CACHE_FILE
+        # ログイン名 → ノードID（存在しないユーザーはNone）
+        self._user_ids: Dict[str, Optional[str]] = self._load_cache()
+
+    def _load_cache(self) -> Dict[str, Optional[str]]:
+        """
+        キャッシュファイルを読み込みます。
+        """
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"ユーザーのキャッシュ '{self.cache_path}' を読み込めませんでした: {e}")
+            return {}
+
+    def _save_cache(self) -> None:
+        """
+        キャッシュファイルを書き出します。
+        """
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._user_ids, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"ユーザーのキャッシュを保存できませんでした: {e}")
+
+    def login_for(self, person: Dict[str, Any]) -> Optional[str]:
+        """
+        Notionのユーザーに対応するGitHubのログイン名を返します。
+
+        ユーザーID、メールアドレス、名前の順に対応表を参照します。
+
+        Args:
+            person: {"id", "name", "email"}
+
+        Returns:
+            GitHubのログイン名。対応表になければNone
+        """
+        for key in (person.get("id"), person.get("email"), person.get("name")):
+            if key and key in self.mapping:
+                return self.mapping[key]
+        return None
+
+    def task_logins(self, task: Dict[str, Any]) -> List[str]:
+        """
+        タスクの担当者に対応するGitHubのログイン名を返します。
+
+        Args:
+            task: タスクデータ
+
+        Returns:
+            ログイン名のリスト（重複なし、対応表にない担当者は含まない）
+        """
+        logins: List[str] = []
+        for person in task.get('people', []):
+            login = self.login_for(person)
+            if login and login not in logins:
+                logins.append(login)
+        return logins
+
+    def assign(self, task: Dict[str, Any], user_ids: Dict[str, Optional[str]]) -> None:
+        """
+        lookupの結果をもとに、task['assignee_logins'] と task['assignee_ids'] を設定します。
+
+        Args:
+            task: タスクデータ
+            user_ids: ログイン名からノードIDへの辞書
+        """
+        resolved = [login for login in self.task_logins(task) if user_ids.get(login)]
+        if resolved:
+            task['assignee_logins'] = resolved
+            task['assignee_ids'] = [user_ids[login] for login in resolved]
+
+    def lookup(self, logins: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        ログイン名からユーザーのノードIDを取得します。キャッシュにないものだけを一括で問い合わせます。
+
+        Args:
+            logins: GitHubのログイン名
+
+        Returns:
+            ログイン名からノードID（存在しないユーザーはNone）への辞書
+        """
+        logins = sorted(set(logins))
+        unknown = [login for login in logins if login not in self._user_ids]
+
+        if unknown:
+            operations = [f"user(login: {graphql_literal(login)}) {{ id login }}" for login in unknown]
+            for login, (data, error) in zip(unknown, self.github_client.run_batched_queries(operations)):
+                if data and data.get("id"):
+                    self._user_ids[login] = data["id"]
+                elif error and "Could not resolve" not in error:
+                    # 一時的なエラーはキャッシュせず、次回に再度問い合わせる
+                    logger.warning(f"GitHubユーザー '{login}' を取得できませんでした: {error}")
+                else:
+                    logger.warning(f"GitHubユーザー '{login}' が見つかりません")
+                    self._user_ids[login] = None
+            self._save_cache()
+
+        return {login: self._user_ids.get(login) for login in logins}
+
+    def resolve_tasks(self, tasks: List[Dict[str, Any]]) -> int:
+        """
+        全タスクの担当者をGitHubのユーザーに対応づけ、task['assignee_logins'] と task['assignee_ids'] に設定します。
+
+        Args:
+            tasks: タスクのリスト
+
+        Returns:
+            対応づけられたユーザー数
+        """
+        user_ids = self.lookup(login for task in tasks for login in self.task_logins(task))
+
+        for task in tasks:
+            self.assign(task, user_ids)
+
+        resolved_count = sum(1 for user_id in user_ids.values() if user_id)
+        logger.info(f"担当者をGitHubのユーザーに対応づけました: {resolved_count}/{len(user_ids)} 人")
+        return resolved_count
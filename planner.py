@@ -0,0 +1,322 @@
+"""
+移行計画の作成とコストの見積もり
+
+ドライランで、タスクごとにインポート時に実行されるリクエスト（Draftアイテムの作成、説明、
+Status、Due Date、イテレーション、Assignees、Labels）と、フィールドやオプションがないために
+スキップされる更新を求めます。全体のリクエスト数、GitHub GraphQL APIのポイント、
+レート制限の設定から見込まれる所要時間を集計し、大きな移行をレート制限の範囲に収める計画に使います。
+
+見積もりはGitHubの公開されているレート制限に基づく概算です:
+
+- プライマリレート制限: 1リクエストあたり1ポイント（1時間あたり5,000ポイント）
+- 二次レート制限: ミューテーション1回あたり5ポイント（1分あたり2,000ポイント）、
+  コンテンツの作成は1分あたり80件まで
+"""
+
+import logging
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from import_state import (
+    STEP_CREATE, STEP_STATUS, STEP_DUE_DATE, STEP_ITERATION, STEP_ASSIGNEES, STEP_LABELS
+)
+from project_index import EXISTING_OFF, EXISTING_SKIP, load_project_index
+from people_resolver import PeopleResolver
+import config
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_POINTS_PER_HOUR = 5000
+SECONDARY_POINTS_PER_MUTATION = 5
+SECONDARY_POINTS_PER_MINUTE = 2000
+CONTENT_CREATIONS_PER_MINUTE = 80
+# 1リクエストの平均的な応答時間（秒）
+ESTIMATED_REQUEST_SECONDS = 0.5
+
+# ステップで更新するフィールド名
+STEP_FIELDS = {
+    STEP_STATUS: "Status",
+    STEP_DUE_DATE: "Due Date",
+    STEP_ASSIGNEES: "Assignees",
+    STEP_LABELS: "Labels"
+}
+
+# スキップの理由
+REASON_NO_FIELD = "フィールドなし"
+REASON_NO_OPTION = "オプションなし"
+REASON_NO_ITERATION = "該当するイテレーションなし"
+
+
+class MigrationPlan:
+    """
+    移行で実行されるリクエストの計画
+    """
+
+    def __init__(self):
+        """
+        MigrationPlanの初期化
+        """
+        self.tasks: Counter = Counter()
+        self.requests: Counter = Counter()
+        self.skipped_steps: Counter = Counter()
+        self.batched_requests: Counter = Counter()
+        self.read_requests = 0
+
+    @property
+    def mutation_count(self) -> int:
+        return sum(self.requests.values()) + sum(self.batched_requests.values())
+
+    @property
+    def request_count(self) -> int:
+        return self.mutation_count + self.read_requests
+
+    def estimate(self, requests_per_second: Optional[float] = None, concurrency: int = 1) -> Dict[str, float]:
+        """
+        GraphQL APIのポイントと所要時間を見積もります。
+
+        Args:
+            requests_per_second: GitHubへのリクエストのレート。指定しない場合は設定ファイルの値
+            concurrency: 同時に実行するリクエスト数
+
+        Returns:
+            {"primary_points", "secondary_points", "seconds"}
+        """
+        requests_per_second = requests_per_second or config.GITHUB_REQUESTS_PER_SECOND
+        secondary_points = self.mutation_count * SECONDARY_POINTS_PER_MUTATION
+
+        # レートリミッター、応答時間と同時実行数、各レート制限のうち最も遅いものが所要時間になる
+        seconds = max(
+            self.request_count / requests_per_second if requests_per_second > 0 else 0.0,
+            self.request_count * ESTIMATED_REQUEST_SECONDS / max(concurrency, 1),
+            secondary_points / SECONDARY_POINTS_PER_MINUTE * 60,
+            self.requests[STEP_CREATE] / CONTENT_CREATIONS_PER_MINUTE * 60,
+            self.request_count / PRIMARY_POINTS_PER_HOUR * 3600 if self.request_count > PRIMARY_POINTS_PER_HOUR else 0.0
+        )
+        return {
+            "primary_points": self.request_count,
+            "secondary_points": secondary_points,
+            "seconds": seconds
+        }
+
+    def log_summary(self, concurrency: int = 1) -> None:
+        """
+        計画と見積もりをログに出力します。
+
+        Args:
+            concurrency: 同時に実行するリクエスト数
+        """
+        estimate = self.estimate(concurrency=concurrency)
+        logger.info("====== 移行計画 ======")
+        logger.info(
+            f"タスク: 作成 {self.tasks['create']}, 既存を更新 {self.tasks['update']}, "
+            f"スキップ {self.tasks['skip']}"
+        )
+        for step, count in sorted(self.requests.items()):
+            logger.info(f"  {step}: {count} リクエスト")
+        for step, count in sorted(self.batched_requests.items()):
+            logger.info(f"  {step}（一括）: {count} リクエスト")
+        for (step, reason), count in sorted(self.skipped_steps.items()):
+            logger.warning(f"  {step}: {count} 件を更新できません（{reason}）")
+        logger.info(f"リクエスト数: {self.request_count}（うちミューテーション {self.mutation_count}）")
+        logger.info(
+            f"GraphQLのポイント: プライマリ {estimate['primary_points']}, "
+            f"二次レート制限 {estimate['secondary_points']}"
+        )
+        logger.info(f"見込みの所要時間: {format_duration(estimate['seconds'])}")
+
+    def to_dict(self, concurrency: int = 1) -> Dict[str, Any]:
+        """
+        計画と見積もりを辞書で返します。
+        """
+        return {
+            "tasks": dict(self.tasks),
+            "requests": dict(self.requests),
+            "batched_requests": dict(self.batched_requests),
+            "skipped_steps": {f"{step}:{reason}": count for (step, reason), count in self.skipped_steps.items()},
+            "request_count": self.request_count,
+            **self.estimate(concurrency=concurrency)
+        }
+
+
+def format_duration(seconds: float) -> str:
+    """
+    秒数を「1時間2分3秒」の形式にします。
+    """
+    seconds = int(math.ceil(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}時間{minutes}分{seconds}秒"
+    if minutes:
+        return f"{minutes}分{seconds}秒"
+    return f"{seconds}秒"
+
+
+class MigrationPlanner:
+    """
+    タスクのリストから移行計画を作成するクラス
+
+    GitHubClientの実際のインポートステップ（_import_steps）を使うため、計画とインポートの内容は一致します。
+    フィールドIDが取得できない場合は、全てのフィールドがあるものとして計画します。
+    """
+
+    def __init__(self, github_client: Any, field_ids: Optional[Dict[str, str]] = None,
+                 state_store: Optional[Any] = None, item_index: Optional[Any] = None,
+                 existing_policy: Optional[str] = None):
+        """
+        MigrationPlannerの初期化
+
+        Args:
+            github_client: GitHubのAPIクライアント（ステップの作成とイテレーションの索引に使用）
+            field_ids: プロジェクトのフィールドID（get_field_idsの形式）。Noneなら確認しない
+            state_store: インポート状態の記録。インポート済みのタスクと完了済みのステップを除く
+            item_index: プロジェクトの既存アイテムの索引
+            existing_policy: 既存アイテムの扱い。指定しない場合は設定ファイルの値
+        """
+        self.github_client = github_client
+        self.field_ids = field_ids
+        self.state_store = state_store
+        self.item_index = item_index
+        self.existing_policy = existing_policy or config.EXISTING_ITEM_POLICY
+
+    def _skip_reason(self, step: str, task: Dict[str, Any]) -> Optional[str]:
+        """
+        ステップの更新がスキップされる理由を返します。実行される場合はNone。
+        """
+        if self.field_ids is None:
+            return None
+
+        if step == STEP_ITERATION:
+            if config.ITERATION_FIELD not in self.field_ids:
+                return REASON_NO_FIELD
+            index = self.github_client.get_iteration_index(config.ITERATION_FIELD)
+            if index is not None and not index.find(task['due_date']):
+                return REASON_NO_ITERATION
+            return None
+
+        field_name = STEP_FIELDS.get(step)
+        if field_name and field_name not in self.field_ids:
+            return REASON_NO_FIELD
+        if step == STEP_STATUS and f"Status:{task['status']}" not in self.field_ids and not config.AUTO_CREATE_OPTIONS:
+            return REASON_NO_OPTION
+        return None
+
+    def plan_task(self, task: Dict[str, Any], plan: MigrationPlan) -> List[Tuple[str, Optional[str]]]:
+        """
+        1件のタスクの計画を作成し、plan に加算します。
+
+        Args:
+            task: タスクデータ
+            plan: 加算する計画
+
+        Returns:
+            (ステップ名, スキップの理由) のリスト。実行されないタスクは空
+        """
+        notion_id = task.get('notion_id')
+        record = self.state_store.get(notion_id) if self.state_store is not None and notion_id else None
+        if record and record.get("done"):
+            plan.tasks["skip"] += 1
+            return []
+
+        existing = (
+            self.item_index.find(task, by_title=self.existing_policy == EXISTING_SKIP)
+            if self.item_index is not None else None
+        )
+        if existing and self.existing_policy == EXISTING_SKIP:
+            plan.tasks["skip"] += 1
+            return []
+
+        completed = set(record["steps"]) if record and record.get("item_id") else set()
+        steps: List[Tuple[str, Optional[str]]] = []
+        if existing or completed:
+            plan.tasks["update"] += 1
+        else:
+            plan.tasks["create"] += 1
+            plan.requests[STEP_CREATE] += 1
+            steps.append((STEP_CREATE, None))
+
+        for step, _ in self.github_client._import_steps(task):
+            if step in completed:
+                continue
+            reason = self._skip_reason(step, task)
+            if reason:
+                plan.skipped_steps[(step, reason)] += 1
+            else:
+                plan.requests[step] += 1
+            steps.append((step, reason))
+
+        return steps
+
+    def plan(self, tasks: Iterable[Dict[str, Any]]) -> MigrationPlan:
+        """
+        全タスクの移行計画を作成します。インポートの前後に一括で行う処理も含めます。
+
+        Args:
+            tasks: タスク
+
+        Returns:
+            移行計画
+        """
+        plan = MigrationPlan()
+        batch_size = config.GRAPHQL_BATCH_SIZE
+        statuses = set()
+        logins = set()
+        links = 0
+        resolver = PeopleResolver(self.github_client, cache_path="") if config.PEOPLE_MAPPING else None
+
+        for task in tasks:
+            steps = self.plan_task(task, plan)
+            logger.debug(f"計画: {task.get('title', 'No Title')}: {steps}")
+            if task.get('status'):
+                statuses.add(task['status'])
+            if resolver:
+                logins.update(resolver.task_logins(task))
+            if task.get('parent_id'):
+                links += 1
+
+        # 不足しているステータスのオプションは1回のミューテーションで作成する
+        if self.field_ids is not None and config.AUTO_CREATE_OPTIONS and "Status" in self.field_ids:
+            if any(f"Status:{status}" not in self.field_ids for status in statuses):
+                plan.batched_requests["status_options"] += 1
+
+        # キャッシュ済みのユーザーは問い合わせないため、最大のリクエスト数
+        if logins:
+            plan.read_requests += math.ceil(len(logins) / batch_size)
+        if links:
+            plan.batched_requests["parent"] += math.ceil(links / batch_size)
+        if self.item_index is not None:
+            plan.read_requests += max(1, math.ceil(len(self.item_index) / 100))
+
+        return plan
+
+
+def plan_migration(github_client: Any, tasks: List[Dict[str, Any]],
+                   state_store: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    ドライランで、実際の移行で実行されるリクエストの計画とコストの見積もりを作成します。
+
+    GitHub Projectのフィールドと既存アイテムは読み込みますが、書き込みは行いません。
+    読み込めない場合は、全てのフィールドがあるものとして計画します。
+    所要時間はGITHUB_MAX_CONCURRENCYの同時実行数で見積もります。
+
+    Args:
+        github_client: GitHubのAPIクライアント
+        tasks: 移行するタスクのリスト
+        state_store: インポートの進捗を記録するストア（完了済みのタスクは計画から除きます）
+
+    Returns:
+        計画と見積もり（MigrationPlan.to_dictの形式）
+    """
+    field_ids = None
+    item_index = None
+    try:
+        field_ids = github_client.get_field_ids()
+        if config.EXISTING_ITEM_POLICY != EXISTING_OFF:
+            item_index = load_project_index(github_client)
+    except Exception as e:
+        logger.warning(f"GitHub Projectの情報を取得できないため、全てのフィールドがあるものとして計画します: {e}")
+
+    plan = MigrationPlanner(github_client, field_ids, state_store, item_index).plan(tasks)
+    plan.log_summary(concurrency=config.GITHUB_MAX_CONCURRENCY)
+    return plan.to_dict(concurrency=config.GITHUB_MAX_CONCURRENCY)
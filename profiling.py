@@ -0,0 +1,160 @@
+"""
+移行の処理時間の計測
+
+--profile を指定すると、主な処理（Notionからの取得とパース、GitHubへのインポートとHTTPの待ち時間、
+JSONの変換、ログ出力）の経過時間とCPU時間を計測し、移行結果と一緒に表示します。
+経過時間に比べてCPU時間が短い処理は、APIの応答などを待っている時間が長いことを示します。
+
+計測は対象のメソッドを実行中だけ差し替えて行うため、計測しない場合のコストはありません。
+処理は入れ子になるため（import_taskの時間にはHTTPの時間も含まれる）、合計は全体の時間と一致しません。
+ファイルを指定した場合は、実行全体のcProfileのプロファイルも書き出します。
+"""
+
+import cProfile
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from notion_api_client import NotionClient
+from github_client import GitHubClient
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# 計測する処理（差し替えるオブジェクト, 属性名, 表示名）
+DEFAULT_STAGES: List[Tuple[Any, str, str]] = [
+    (NotionClient, "get_all_tasks", "Notion: get_all_tasks"),
+    (NotionClient, "_parse_page", "Notion: _parse_page"),
+    (NotionClient, "fetch_page_bodies", "Notion: ページ本文の取得"),
+    (GitHubClient, "import_task", "GitHub: import_task"),
+    (GitHubClient, "_send_graphql", "GitHub: HTTPリクエスト"),
+    (json, "dumps", "JSONの変換"),
+    (json, "dump", "JSONの変換"),
+    # json.loadはjson.loadsを呼び出すため、loadsだけを計測する
+    (json, "loads", "JSONの変換"),
+    (logging.Handler, "handle", "ログ出力"),
+]
+
+
+class StageProfiler:
+    """
+    処理ごとの経過時間とCPU時間を計測するクラス
+    """
+
+    def __init__(self, dump_path: Optional[str] = None, clock: Callable[[], float] = time.perf_counter,
+                 cpu_clock: Callable[[], float] = time.thread_time):
+        """
+        StageProfilerの初期化
+
+        Args:
+            dump_path: cProfileのプロファイルを書き出すファイル。指定しない場合は書き出さない
+            clock: 経過時間の計測に使用する関数（テスト用に差し替え可能）
+            cpu_clock: CPU時間の計測に使用する関数（スレッドごとのCPU時間）
+        """
+        self.dump_path = dump_path
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.wall = 0.0
+        self.cpu = 0.0
+        self._lock = threading.Lock()
+        self._patches: List[Tuple[Any, str, Any]] = []
+        self._profile: Optional[cProfile.Profile] = None
+        self._started: Optional[Tuple[float, float]] = None
+
+    def _record(self, name: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            stage = self.stages.setdefault(name, {"calls": 0, "wall": 0.0, "cpu": 0.0})
+            stage["calls"] += 1
+            stage["wall"] += wall
+            stage["cpu"] += cpu
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        withブロックの処理時間を計測します。
+
+        Args:
+            name: 処理の表示名
+        """
+        wall, cpu = self.clock(), self.cpu_clock()
+        try:
+            yield
+        finally:
+            self._record(name, self.clock() - wall, self.cpu_clock() - cpu)
+
+    def patch(self, owner: Any, attr: str, name: str) -> None:
+        """
+        メソッド（関数）を、処理時間を計測するものに差し替えます。stop()で元に戻します。
+
+        Args:
+            owner: メソッドを持つクラスまたはモジュール
+            attr: メソッド名
+            name: 処理の表示名
+        """
+        original = getattr(owner, attr)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            with self.stage(name):
+                return original(*args, **kwargs)
+
+        # 継承したメソッドは、元に戻すときに削除する
+        self._patches.append((owner, attr, vars(owner).get(attr, _MISSING)))
+        setattr(owner, attr, timed)
+
+    def start(self, stages: Optional[List[Tuple[Any, str, str]]] = None) -> None:
+        """
+        計測を開始します。
+
+        Args:
+            stages: 計測する処理。指定しない場合はDEFAULT_STAGES
+        """
+        for owner, attr, name in DEFAULT_STAGES if stages is None else stages:
+            self.patch(owner, attr, name)
+        if self.dump_path:
+            # cProfileはメインスレッドの処理だけを記録する
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._started = (self.clock(), time.process_time())
+
+    def stop(self) -> None:
+        """
+        計測を終了し、差し替えたメソッドを元に戻します（2回目以降は何もしない）。
+        """
+        if self._started is None:
+            return
+        wall, cpu = self._started
+        self._started = None
+        self.wall = self.clock() - wall
+        self.cpu = time.process_time() - cpu
+
+        for owner, attr, original in reversed(self._patches):
+            if original is _MISSING:
+                delattr(owner, attr)
+            else:
+                setattr(owner, attr, original)
+        self._patches = []
+
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.dump_path)
+            self._profile = None
+            logger.info(f"プロファイルを {self.dump_path} に書き出しました（python -m pstats で確認できます）")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        計測結果を返します。
+
+        Returns:
+            {"wall", "cpu", "stages": [{"name", "calls", "wall", "cpu"}]}（処理は経過時間の長い順）
+        """
+        with self._lock:
+            stages = [dict(stage, name=name) for name, stage in self.stages.items()]
+        stages.sort(key=lambda stage: stage["wall"], reverse=True)
+        return {"wall": self.wall, "cpu": self.cpu, "stages": stages}
@@ -0,0 +1,179 @@
+"""
+GitHub Projectの既存アイテムの索引
+
+プロジェクトの全アイテムを一括で読み込み、説明に埋め込まれた `*From Notion: <url>*` のページIDと
+タイトルをキーにした索引を作成します。状態ファイルがなくても、既にプロジェクトにある
+タスクを重複して作成しないために使用します。
+NotionのURLにはタイトルが含まれるため、URLそのものではなくURLから取り出したページIDで照合します。
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 既存アイテムの扱い
+EXISTING_SKIP = "skip"
+EXISTING_UPDATE = "update"
+EXISTING_OFF = "off"
+
+NOTION_URL_PATTERN = re.compile(r"\*From Notion: (\S+)\*")
+_PAGE_ID_PATTERN = re.compile(r"([0-9a-f]{32})(?:[?#].*)?$")
+
+
+def notion_url_of(body: str) -> Optional[str]:
+    """
+    アイテムの説明からNotionのURLを取り出します。
+
+    Args:
+        body: アイテムの説明
+
+    Returns:
+        NotionのURL。埋め込まれていなければNone
+    """
+    matches = NOTION_URL_PATTERN.findall(body or "")
+    # 説明の末尾に追加しているため、最後のものを使う
+    return matches[-1] if matches else None
+
+
+def page_id_from_url(url: Optional[str]) -> Optional[str]:
+    """
+    NotionのページのURLからページIDを取り出します。
+
+    Args:
+        url: NotionのページのURL
+
+    Returns:
+        ハイフン付きのページID。取り出せなければNone
+    """
+    match = _PAGE_ID_PATTERN.search((url or "").replace("-", ""))
+    if not match:
+        return None
+    raw = match.group(1)
+    return f"{raw[:8]}-{raw[8:12]}-{raw[12:16]}-{raw[16:20]}-{raw[20:]}"
+
+
+def page_key(url_or_id: Optional[str]) -> Optional[str]:
+    """
+    NotionのURLまたはページIDから照合用のキー（ハイフン付きのページID）を作ります。
+
+    ページIDを含まない値はそのまま使います。
+
+    Args:
+        url_or_id: NotionのページのURLまたはページID
+
+    Returns:
+        照合用のキー。値がなければNone
+    """
+    return page_id_from_url(url_or_id) or url_or_id or None
+
+
+def task_page_keys(task: Dict[str, Any]) -> Set[str]:
+    """
+    タスクの照合用のキー（ページIDとURLから作ったもの）を返します。
+    """
+    return {key for key in (page_key(task.get("notion_id")), page_key(task.get("url"))) if key}
+
+
+def _normalize_title(title: str) -> str:
+    """
+    比較用にタイトルを正規化します。
+    """
+    return " ".join((title or "").split()).casefold()
+
+
+class ProjectItemIndex:
+    """
+    NotionのページIDとタイトルからプロジェクトの既存アイテムを引く索引
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]] = ()):
+        """
+        ProjectItemIndexの初期化
+
+        Args:
+            items: プロジェクトのアイテム（GitHubClient.iter_itemsの形式）
+        """
+        self.by_page_id: Dict[str, Dict[str, Any]] = {}
+        self.by_title: Dict[str, List[Dict[str, Any]]] = {}
+        self.item_ids: Set[str] = set()
+        self.count = 0
+        for item in items:
+            self.add(item)
+
+    def add(self, item: Dict[str, Any], keys: Iterable[str] = ()) -> None:
+        """
+        アイテムを索引に追加します。
+
+        Args:
+            item: プロジェクトのアイテム
+            keys: 照合用のキー。指定しない場合は説明に埋め込まれたURLから作る
+        """
+        self.count += 1
+        self.item_ids.add(item["id"])
+        keys = set(keys) or {key for key in (page_key(notion_url_of(item.get("body", ""))),) if key}
+        if keys:
+            for key in keys:
+                self.by_page_id[key] = item
+        else:
+            # NotionのURLがないアイテムだけをタイトルで照合する
+            self.by_title.setdefault(_normalize_title(item.get("title", "")), []).append(item)
+
+    def add_task(self, task: Dict[str, Any], item_id: str) -> None:
+        """
+        インポートしたタスクのアイテムを索引に追加します。
+
+        Args:
+            task: タスクデータ
+            item_id: 作成したアイテムのID
+        """
+        body = f"*From Notion: {task['url']}*" if task.get("url") else ""
+        self.add({"id": item_id, "title": task.get("title", ""), "body": body}, task_page_keys(task))
+
+    def find(self, task: Dict[str, Any], by_title: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        タスクに対応する既存のアイテムを探します。
+
+        NotionのページIDで照合し、見つからなければNotionのURLがないアイテムのうち
+        タイトルが一意に一致するものを返します。タイトルだけの一致は手動で作成した別のアイテムの
+        可能性があるため、既存のアイテムを上書きする場合は by_title=False で照合してください。
+
+        Args:
+            task: タスクデータ
+            by_title: ページIDで見つからない場合にタイトルで照合するかどうか
+
+        Returns:
+            対応するアイテム。見つからなければNone
+        """
+        for key in task_page_keys(task):
+            if key in self.by_page_id:
+                return self.by_page_id[key]
+
+        if not by_title:
+            return None
+        candidates = self.by_title.get(_normalize_title(task.get("title", "")), [])
+        if len(candidates) == 1:
+            return candidates[0]
+        if len(candidates) > 1:
+            logger.warning(f"同じタイトルのアイテムが {len(candidates)} 件あるため照合しません: {task.get('title')}")
+        return None
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def load_project_index(github_client: Any) -> ProjectItemIndex:
+    """
+    プロジェクトの全アイテムを読み込んで索引を作成します。
+
+    Args:
+        github_client: GitHubのAPIクライアント
+
+    Returns:
+        既存アイテムの索引
+    """
+    logger.info("GitHub Projectの既存アイテムを読み込んでいます...")
+    index = ProjectItemIndex(github_client.iter_items())
+    logger.info(f"既存アイテム数: {len(index)}")
+    return index
@@ -0,0 +1,110 @@
+"""
+レートリミッター
+
+NotionやGitHubへのリクエスト数を、複数のクライアント・スレッド間で共有する
+トークンバケットで制限します。asyncioのタスク間で共有する場合は AsyncRateLimiter を使用します。
+"""
+
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable
+
+
+class RateLimiter:
+    """
+    スレッドセーフなトークンバケット方式のレートリミッター
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        RateLimiterの初期化
+
+        Args:
+            rate_per_second: 1秒あたりに許可するリクエスト数
+            burst: 連続して許可するリクエストの最大数
+            clock: 現在時刻を返す関数（テスト用に差し替え可能）
+            sleep: 待機に使用する関数（テスト用に差し替え可能）
+        """
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second は正の値である必要があります。")
+
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """
+        経過時間に応じてトークンを補充します。ロックを取得した状態で呼び出してください。
+        """
+        now = self._clock()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate_per_second)
+
+    def acquire(self) -> float:
+        """
+        リクエスト1回分のトークンを取得します。トークンがなければ補充されるまで待機します。
+
+        Returns:
+            待機した秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate_per_second
+
+            self._sleep(wait)
+            waited += wait
+
+
+class AsyncRateLimiter(RateLimiter):
+    """
+    asyncioのタスク間で共有するトークンバケット方式のレートリミッター
+
+    待機中もイベントループを止めないよう、asyncio.sleepで待機します。
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        """
+        AsyncRateLimiterの初期化
+
+        Args:
+            rate_per_second: 1秒あたりに許可するリクエスト数
+            burst: 連続して許可するリクエストの最大数
+            clock: 現在時刻を返す関数（テスト用に差し替え可能）
+            sleep: 待機に使用するコルーチン関数（テスト用に差し替え可能）
+        """
+        super().__init__(rate_per_second, burst, clock)
+        self._async_sleep = sleep
+
+    async def acquire(self) -> float:  # type: ignore[override]
+        """
+        リクエスト1回分のトークンを取得します。トークンがなければ補充されるまで待機します。
+
+        Returns:
+            待機した秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate_per_second
+
+            await self._async_sleep(wait)
+            waited += wait
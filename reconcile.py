@@ -0,0 +1,94 @@
+"""
+Notionで削除・アーカイブされたタスクの反映
+
+現在のNotionのページと、GitHub Project上のNotion由来のアイテム（説明に埋め込まれたURL）および
+状態ファイルに記録されたアイテムとの差集合を求め、Notionに存在しなくなったアイテムを
+一括ミューテーションでアーカイブ（または削除）します。
+NotionのURLにはタイトルが含まれるため、ページの照合はURLから取り出したページIDで行います
+（ページの名前を変えても孤立したアイテムにはなりません）。
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from project_index import ProjectItemIndex, task_page_keys
+
+logger = logging.getLogger(__name__)
+
+# 孤立したアイテムの扱い
+PRUNE_ARCHIVE = "archive"
+PRUNE_DELETE = "delete"
+
+
+def find_orphans(tasks: List[Dict[str, Any]], item_index: ProjectItemIndex,
+                 state_store: Optional[Any] = None) -> Dict[str, Optional[str]]:
+    """
+    Notionに存在しなくなったタスクのアイテムを求めます。
+
+    Args:
+        tasks: 現在のNotionの全タスク
+        item_index: プロジェクトの既存アイテムの索引
+        state_store: インポート状態の記録
+
+    Returns:
+        孤立したアイテムIDからNotionページID（状態ファイルにない場合はNone）への辞書
+    """
+    current_ids = {task.get('notion_id') for task in tasks if task.get('notion_id')}
+    current_pages = {key for task in tasks for key in task_page_keys(task)}
+
+    archived_ids = {item["id"] for item in item_index.by_page_id.values() if item.get("archived")}
+
+    orphans: Dict[str, Optional[str]] = {}
+    # 1つのアイテムが複数のキー（ページIDとURL）で登録されている場合は、いずれかが一致すれば孤立していない
+    current_items = {item["id"] for key, item in item_index.by_page_id.items() if key in current_pages}
+    for item in item_index.by_page_id.values():
+        if item["id"] not in current_items and item["id"] not in archived_ids:
+            orphans[item["id"]] = None
+
+    # 状態ファイルは複数のプロジェクトで共有されることがあるため、このプロジェクトのアイテムだけを対象にする
+    if state_store is not None:
+        for notion_id, record in state_store:
+            item_id = record.get("item_id")
+            if (notion_id not in current_ids and item_id in item_index.item_ids
+                    and item_id not in archived_ids):
+                orphans[item_id] = notion_id
+
+    return orphans
+
+
+def prune_orphans(github_client: Any, tasks: List[Dict[str, Any]], item_index: ProjectItemIndex,
+                  state_store: Optional[Any] = None, action: str = PRUNE_ARCHIVE) -> int:
+    """
+    Notionに存在しなくなったタスクのアイテムをアーカイブ（または削除）します。
+
+    Notionから1件も取得できなかった場合は、設定の誤りとみなして何もしません。
+
+    Args:
+        github_client: GitHubのAPIクライアント
+        tasks: 現在のNotionの全タスク（取得条件で絞り込んでいないもの）
+        item_index: プロジェクトの既存アイテムの索引
+        state_store: インポート状態の記録
+        action: "archive" または "delete"
+
+    Returns:
+        アーカイブ（削除）したアイテム数
+    """
+    if not tasks:
+        logger.warning("Notionからタスクを取得できなかったため、孤立したアイテムの整理を行いません")
+        return 0
+
+    orphans = find_orphans(tasks, item_index, state_store)
+    if not orphans:
+        logger.info("Notionで削除されたタスクのアイテムはありません")
+        return 0
+
+    logger.info(f"Notionで削除されたタスクのアイテム {len(orphans)} 件を{'アーカイブ' if action == PRUNE_ARCHIVE else '削除'}します")
+    removed = github_client.remove_items(list(orphans), archive=(action == PRUNE_ARCHIVE))
+
+    # アーカイブ・削除したアイテムは状態ファイルからも消す（Notionで復元されたら作り直す）
+    if state_store is not None:
+        for item_id in removed:
+            if orphans[item_id]:
+                state_store.forget(orphans[item_id])
+
+    return len(removed)
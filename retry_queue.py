@@ -0,0 +1,261 @@
+"""
+リトライキュー
+
+GitHubへのリクエストの失敗を一時的なエラー（HTTP 429 / 5xx、レート制限、タイムアウト、接続エラー）と
+恒久的なエラー（バリデーションエラーなど）にHTTPステータスと例外の型で分類し、一時的なエラーは
+失敗したリクエストだけをバックオフ付きで再試行します（タスク全体はやり直しません）。
+作成や変換などの冪等でないミューテーションは、サーバーに届く前に失敗したことが分かる場合
+（接続の失敗、429、RATE_LIMITED）だけ再送します。タイムアウトや5xxでは書き込みが反映された可能性が
+あるため再送せず、呼び出し元が既存のアイテムを確認します。最終的に失敗したタスクはデッドレターファイルに
+書き出し、`--retry-failed` モードで再投入できるようにします。
+"""
+
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from timeouts import Deadline, DeadlineExceeded
+import config
+
+# エラー種別
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# 一時的なエラーとみなすHTTPステータス
+TRANSIENT_STATUS_CODES = (429, 500, 502, 503, 504)
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitedError(Exception):
+    """
+    GraphQL APIのレート制限（200の応答に含まれるRATE_LIMITEDのエラー）
+    """
+
+
+def classify_exception(error: BaseException) -> str:
+    """
+    リクエストで発生した例外から、再試行すべきエラーかどうかを判定します。
+
+    エラーメッセージの文字列ではなく、HTTPステータスと例外の型で判定します。
+
+    Args:
+        error: 発生した例外
+
+    Returns:
+        一時的なエラーなら TRANSIENT、それ以外は PERMANENT
+    """
+    if isinstance(error, (RateLimitedError, requests.Timeout, requests.ConnectionError)):
+        return TRANSIENT
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        if status in TRANSIENT_STATUS_CODES:
+            return TRANSIENT
+        # GitHubのセカンダリレート制限は、403とRetry-Afterヘッダーで返される
+        if status == 403 and "Retry-After" in (error.response.headers or {}):
+            return TRANSIENT
+
+    return PERMANENT
+
+
+def failed_before_write(error: BaseException) -> bool:
+    """
+    リクエストがサーバーで処理される前に失敗したかどうかを判定します。
+
+    Trueの場合は、冪等でないミューテーションを再送しても書き込みが重複しません。
+    タイムアウトや5xxはサーバーが書き込みを反映した後の可能性があるためFalseです。
+
+    Args:
+        error: 発生した例外
+
+    Returns:
+        書き込みが反映されていないことが分かればTrue
+    """
+    if isinstance(error, (RateLimitedError, requests.ConnectTimeout)):
+        return True
+
+    if isinstance(error, requests.ConnectionError) and not isinstance(error, requests.Timeout):
+        # 接続の確立に失敗した場合だけ（送信後の切断は含めない）
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or (status == 403 and "Retry-After" in (error.response.headers or {}))
+
+    return False
+
+
+class RetryPolicy:
+    """
+    指数バックオフによる再試行ポリシー
+    """
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        RetryPolicyの初期化
+
+        Args:
+            max_retries: 最初の試行に加えて再試行する最大回数
+            backoff_base: バックオフの基準秒数
+            backoff_max: バックオフの上限秒数
+            sleep: 待機に使用する関数（テスト用に差し替え可能）
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        """
+        設定ファイルの値からRetryPolicyを作成します。
+
+        Returns:
+            RetryPolicy
+        """
+        return cls(
+            max_retries=config.MAX_RETRIES,
+            backoff_base=config.RETRY_BACKOFF_SECONDS,
+            backoff_max=config.RETRY_BACKOFF_MAX_SECONDS
+        )
+
+    def delay(self, attempt: int) -> float:
+        """
+        再試行前に待機する秒数を計算します（フルジッター付き指数バックオフ）。
+
+        Args:
+            attempt: 何回目の再試行か（1始まり）
+
+        Returns:
+            待機秒数
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+def call_with_retry(request: Callable[[], T], policy: RetryPolicy, deadline: Optional[Deadline] = None,
+                    description: str = "リクエスト", idempotent: bool = True) -> T:
+    """
+    一時的なエラーの場合に再試行しながらリクエストを実行します。
+
+    恒久的なエラーと、再試行の上限に達した一時的なエラーはそのまま送出します。
+    期限までに再試行できない場合はtimeouts.DeadlineExceededを送出します。
+
+    Args:
+        request: 実行するリクエスト
+        policy: 再試行ポリシー
+        deadline: 実行全体の期限。待機後に期限を過ぎる場合は再試行しない
+        description: ログに表示するリクエストの説明
+        idempotent: Falseなら、サーバーに届く前に失敗した場合（failed_before_write）だけ再試行する
+
+    Returns:
+        リクエストの結果
+    """
+    attempt = 0
+    while True:
+        try:
+            return request()
+        except Exception as e:
+            if classify_exception(e) == PERMANENT or attempt >= policy.max_retries:
+                raise
+            if not idempotent and not failed_before_write(e):
+                # 書き込みが反映された可能性があるため再送しない
+                logger.warning(f"{description}が反映されたか分からないため再送しません: {e}")
+                raise
+
+            attempt += 1
+            wait = policy.delay(attempt)
+            remaining = deadline.remaining() if deadline is not None else None
+            if remaining is not None and wait >= remaining:
+                logger.warning(f"実行の期限までに再試行できないため中止します: {description}")
+                raise DeadlineExceeded(f"実行の期限までに{description}を再試行できません: {e}") from e
+            logger.warning(
+                f"一時的なエラーのため {wait:.1f} 秒後に{description}を再試行します "
+                f"({attempt}/{policy.max_retries}): {e}"
+            )
+            policy.sleep(wait)
+
+
+class DeadLetterQueue:
+    """
+    最終的に失敗したタスクをJSONL形式で保存するデッドレターファイル
+    """
+
+    def __init__(self, path: str):
+        """
+        DeadLetterQueueの初期化
+
+        Args:
+            path: デッドレターファイルのパス
+        """
+        self.path = path
+
+    def append(self, task: Dict[str, Any], error_message: Optional[str]) -> None:
+        """
+        失敗したタスクをタスクデータごと追記します。
+
+        Args:
+            task: タスクデータ
+            error_message: エラーメッセージ
+        """
+        entry = {
+            "task": task,
+            "error": error_message,
+            "failed_at": datetime.now(timezone.utc).isoformat()
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """
+        保存されているエントリを順に返します。壊れた行は読み飛ばします。
+        """
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"デッドレターファイルの {line_number} 行目を読み込めませんでした")
+
+    def load_tasks(self) -> List[Dict[str, Any]]:
+        """
+        保存されているタスクデータを全て読み込みます。
+
+        Returns:
+            タスクデータのリスト
+        """
+        return [entry["task"] for entry in self if "task" in entry]
+
+    def rotate(self) -> None:
+        """
+        前回の実行のデッドレターファイルを「<パス>.prev」に移し、今回の実行で失敗したタスクだけを書き出すようにします。
+        """
+        if os.path.exists(self.path):
+            previous = f"{self.path}.prev"
+            os.replace(self.path, previous)
+            logger.info(f"前回の実行で失敗したタスクを '{previous}' に移しました")
+
+    def clear(self) -> None:
+        """
+        デッドレターファイルを空にします。
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
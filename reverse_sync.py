@@ -0,0 +1,299 @@
+"""
+GitHub ProjectからNotionへの逆方向の同期
+
+GitHub Projectで変更されたStatus・Due Date・Labelsを、Notionのページに書き戻します。
+
+1. プロジェクトの全アイテムを100件ずつまとめて読み込み、ウォーターマーク以降に更新されたものを選ぶ
+2. 値をSTATUS_MAPPING / TAG_MAPPINGの逆引きでNotionの値に戻す
+3. 変更されたプロパティだけを pages.update で書き込む（Notionのレート制限の範囲で）
+
+同期台帳（SYNC_LEDGER_FILE）に、両方向で最後に一致した値を記録してエコーを防ぎます。
+
+- GitHubのアイテムごとに、最後に同期した値を記録する。順方向の同期（--daemon）が書き込んだ値も
+  記録するため、順方向の更新で変わったアイテムをNotionに書き戻さない
+- Notionに書き込んだページの編集日時と値を記録する。--daemon はこの書き込みを変更として扱わないため、
+  GitHubの変更がNotionを経由してGitHubに戻ることはない
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+import config
+from project_index import notion_url_of, page_id_from_url
+
+logger = logging.getLogger(__name__)
+
+# 逆方向に同期するフィールド（タスクのキー）
+SYNCED_FIELDS = ("status", "due_date", "labels")
+
+
+def task_values(task: Dict[str, Any]) -> Dict[str, str]:
+    """
+    タスクの値を、逆方向の同期で比較する形式（GitHub Projectのフィールドの値）にします。
+
+    Args:
+        task: タスクデータ（NotionClientでパースしたもの）
+
+    Returns:
+        タスクのキーから値への辞書（値がない場合は空文字列）
+    """
+    return {
+        "status": task.get('status') or "",
+        "due_date": task.get('due_date') or "",
+        "labels": ", ".join(task.get('tags') or [])
+    }
+
+
+def item_values(item: Dict[str, Any]) -> Dict[str, str]:
+    """
+    アイテムのフィールドの値を、逆方向の同期で比較する形式にします。
+
+    Args:
+        item: プロジェクトのアイテム（GitHubClient.iter_itemsの形式）
+
+    Returns:
+        タスクのキーから値への辞書（値がない場合は空文字列）
+    """
+    fields = item.get("fields") or {}
+    return {key: str(fields.get(config.GITHUB_PROJECT_FIELDS[key]) or "") for key in SYNCED_FIELDS}
+
+
+def _inverse(mapping: Dict[str, str]) -> Dict[str, str]:
+    """
+    マッピングを逆引きにします（同じ値に複数のキーがある場合は最初のキー）。
+    """
+    inverse: Dict[str, str] = {}
+    for key, value in mapping.items():
+        inverse.setdefault(value, key)
+    return inverse
+
+
+def notion_properties(changes: Dict[str, str], schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    変更された値から、pages.updateに渡すプロパティを作成します。
+
+    Args:
+        changes: タスクのキーから新しい値への辞書
+        schema: データベースのスキーマ
+
+    Returns:
+        Notionのプロパティ名から値への辞書（データベースにないプロパティは含まない）
+    """
+    property_names = {field: name for name, field in config.FIELD_MAPPING.items()}
+    properties: Dict[str, Any] = {}
+
+    for key, value in changes.items():
+        prop_name = property_names.get(key)
+        prop_type = (schema.get(prop_name) or {}).get("type")
+        if not prop_type:
+            logger.warning(f"Notionのデータベースに '{key}' に対応するプロパティがないため書き戻しません")
+            continue
+
+        if key == "status":
+            if not value:
+                # Notionのステータスは空にできないため書き戻さない
+                continue
+            name = _inverse(config.STATUS_MAPPING).get(value, value)
+            properties[prop_name] = {prop_type: {"name": name}}
+        elif key == "due_date":
+            properties[prop_name] = {"date": {"start": value} if value else None}
+        elif key == "labels":
+            tags = _inverse(config.TAG_MAPPING)
+            names = [label.strip() for label in value.split(",") if label.strip()]
+            properties[prop_name] = {"multi_select": [{"name": tags.get(name, name)} for name in names]}
+
+    return properties
+
+
+class SyncLedger:
+    """
+    両方向の同期で最後に一致した値を記録する台帳
+
+    保存時にファイルを読み直してマージするため、--daemon と逆方向の同期を別のプロセスで実行できます。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        SyncLedgerの初期化
+
+        Args:
+            path: 台帳のファイル。指定しない場合は設定ファイルの値。空文字列ならファイルに保存しない
+        """
+        self.path = path if path is not None else config.SYNC_LEDGER_FILE
+        self.watermark: Optional[str] = None
+        # アイテムIDから最後に同期した値
+        self.items: Dict[str, Dict[str, str]] = {}
+        # NotionページIDから、逆方向の同期で書き込んだ編集日時と値
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._merge(self._read())
+
+    def _read(self) -> Dict[str, Any]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _merge(self, state: Dict[str, Any]) -> None:
+        watermarks = [value for value in (self.watermark, state.get("watermark")) if value]
+        self.watermark = max(watermarks) if watermarks else None
+        self.items = dict(state.get("items", {}), **self.items)
+        self.pages = dict(state.get("pages", {}), **self.pages)
+
+    def save(self) -> None:
+        """
+        台帳をファイルに保存します。
+        """
+        if not self.path:
+            return
+        with self._lock:
+            self._merge(self._read())
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"watermark": self.watermark, "items": self.items, "pages": self.pages}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def record_github(self, item_id: str, values: Dict[str, str]) -> None:
+        """
+        アイテムの値を、両方向で一致した値として記録します。
+        """
+        with self._lock:
+            self.items[item_id] = dict(values)
+
+    def record_notion_write(self, notion_id: str, last_edited_time: Optional[str], values: Dict[str, str]) -> None:
+        """
+        逆方向の同期でNotionに書き込んだページを記録します。
+        """
+        with self._lock:
+            self.pages[notion_id] = {"last_edited_time": last_edited_time, "values": dict(values)}
+
+    def is_echo(self, task: Dict[str, Any]) -> bool:
+        """
+        タスクの変更が、逆方向の同期による書き込みそのものかを返します（順方向の同期で反映しない）。
+
+        Args:
+            task: Notionから取得したタスク
+        """
+        entry = self.pages.get(task.get('notion_id'))
+        return bool(
+            entry
+            and entry["last_edited_time"] == task.get('last_edited_time')
+            and entry["values"] == task_values(task)
+        )
+
+
+class ReverseSync:
+    """
+    GitHub Projectの変更をNotionに書き戻すクラス
+    """
+
+    def __init__(self, notion_client: Any, github_client: Any, ledger: Optional[SyncLedger] = None):
+        """
+        ReverseSyncの初期化
+
+        Args:
+            notion_client: NotionのAPIクライアント（書き込みはレートリミッターの範囲で行う）
+            github_client: GitHubのAPIクライアント
+            ledger: 同期台帳。指定しない場合は設定ファイルの台帳を開く
+        """
+        self.notion_client = notion_client
+        self.github_client = github_client
+        self.ledger = ledger if ledger is not None else SyncLedger()
+        self.counts = {"checked": 0, "updated": 0, "unchanged": 0, "failed": 0}
+
+    def apply_item(self, item: Dict[str, Any]) -> bool:
+        """
+        1件のアイテムの値をNotionのページに書き戻します。
+
+        台帳に記録がないアイテムは、Notionのページを読み込んで現在の値と比較します。
+
+        Args:
+            item: プロジェクトのアイテム
+
+        Returns:
+            Notionを更新した場合はTrue
+        """
+        page_id = page_id_from_url(notion_url_of(item.get("body", "")))
+        if not page_id:
+            return False
+        self.counts["checked"] += 1
+
+        current = item_values(item)
+        known = self.ledger.items.get(item["id"])
+        if known is None:
+            known = task_values(self.notion_client.get_task(page_id))
+        changes = {key: value for key, value in current.items() if known.get(key) != value}
+        if not changes:
+            self.ledger.record_github(item["id"], current)
+            self.counts["unchanged"] += 1
+            return False
+
+        properties = notion_properties(changes, self.notion_client.get_database_schema())
+        if not properties:
+            self.ledger.record_github(item["id"], current)
+            self.counts["unchanged"] += 1
+            return False
+
+        page = self.notion_client.update_page(page_id, properties)
+        task = self.notion_client._parse_page(page)
+        self.ledger.record_notion_write(page_id, page.get('last_edited_time'), task_values(task))
+        self.ledger.record_github(item["id"], current)
+        self.counts["updated"] += 1
+        logger.info(f"Notionに書き戻しました: {item.get('title')}（{', '.join(sorted(changes))}）")
+        return True
+
+    def apply_items(self, items: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        アイテムの値をNotionに書き戻し、台帳を保存します。失敗したアイテムは記録して続行します。
+
+        Args:
+            items: プロジェクトのアイテム
+
+        Returns:
+            {"checked", "updated", "unchanged", "failed"}
+        """
+        try:
+            for item in items:
+                if item.get("archived"):
+                    continue
+                try:
+                    self.apply_item(item)
+                except Exception as e:
+                    self.counts["failed"] += 1
+                    logger.error(f"Notionへの書き戻しに失敗しました: {item.get('title')}, エラー: {e}")
+        finally:
+            self.ledger.save()
+        return self.counts
+
+    def run(self) -> Dict[str, int]:
+        """
+        ウォーターマーク以降に更新されたアイテムを読み込み、Notionに書き戻します。
+
+        Returns:
+            {"checked", "updated", "unchanged", "failed"}
+        """
+        watermark = self.ledger.watermark
+        logger.info(f"GitHub Projectのアイテムを読み込んでいます（{watermark or '全件'} 以降の更新）...")
+
+        latest = watermark
+        changed = []
+        for item in self.github_client.iter_items():
+            updated_at = item.get("updated_at")
+            if watermark and updated_at and updated_at < watermark:
+                continue
+            changed.append(item)
+            if updated_at and (latest is None or updated_at > latest):
+                latest = updated_at
+
+        counts = self.apply_items(changed)
+        # 失敗したアイテムがある場合は、次回も同じ範囲から読み込む
+        if not counts["failed"]:
+            self.ledger.watermark = latest
+            self.ledger.save()
+        return counts
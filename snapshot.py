@@ -0,0 +1,229 @@
+"""
+タスクのスナップショット
+
+Notionから取得・パースしたタスクを、gzip圧縮したJSONL形式のファイルに書き出し、
+GitHubへのインポート時に読み込みます。Notionからの取得（3リクエスト/秒の制限）を1回で済ませ、
+同じスナップショットを複数のプロジェクトへのインポートや再実行に使えるようにします。
+
+ファイルの形式（1行に1つのJSON）:
+
+    {"type": "header", "format": "notiondb-snapshot", "version": 1, "database_id": "...",
+     "criteria": {...}, "schema": {"プロパティ名": "型"}, "include_body": false, "created_at": "..."}
+    {"type": "task", "sha256": "<タスクのハッシュ>", "task": {...}}
+    ...
+    {"type": "end", "count": <タスク数>}
+
+読み書きはどちらも1行ずつ行うため、タスク数によらず一定のメモリで処理できます。
+各タスクのハッシュと末尾の件数で、破損や書き込みの中断を検出します。
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "notiondb-snapshot"
+SNAPSHOT_VERSION = 1
+
+# ページ本文をまとめて取得するタスク数
+BODY_CHUNK_SIZE = 100
+
+
+def task_digest(task: Dict[str, Any]) -> str:
+    """
+    タスクの内容のハッシュを計算します（キーの順序によらない）。
+
+    Args:
+        task: タスクデータ
+
+    Returns:
+        SHA-256の16進文字列
+    """
+    canonical = json.dumps(task, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SnapshotWriter:
+    """
+    タスクをスナップショットファイルに1件ずつ書き出すクラス
+
+    一時ファイルに書き出し、closeで末尾の件数を書き込んでから置き換えるため、
+    途中で中断しても既存のスナップショットは壊れません。
+    """
+
+    def __init__(self, path: str, header: Dict[str, Any]):
+        """
+        SnapshotWriterの初期化
+
+        Args:
+            path: スナップショットファイルのパス
+            header: ヘッダーに追加で記録する内容（database_id、criteria、schemaなど）
+        """
+        self.path = path
+        self.count = 0
+        self._tmp_path = f"{path}.tmp"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = gzip.open(self._tmp_path, "wt", encoding="utf-8")
+        self._write_line(dict(
+            header,
+            type="header",
+            format=SNAPSHOT_FORMAT,
+            version=SNAPSHOT_VERSION,
+            created_at=datetime.now(timezone.utc).isoformat()
+        ))
+
+    def _write_line(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def write(self, task: Dict[str, Any]) -> None:
+        """
+        タスクを1件書き出します。
+
+        Args:
+            task: タスクデータ
+        """
+        self._write_line({"type": "task", "sha256": task_digest(task), "task": task})
+        self.count += 1
+
+    def close(self) -> None:
+        """
+        末尾に件数を書き込み、スナップショットファイルを置き換えます。
+        """
+        self._write_line({"type": "end", "count": self.count})
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """
+        書き出しを中止し、一時ファイルを削除します。
+        """
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    """
+    スナップショットのヘッダーを読み込みます。
+
+    Args:
+        path: スナップショットファイルのパス
+
+    Returns:
+        ヘッダーの内容
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return _parse_header(f.readline(), path)
+
+
+def _parse_header(line: str, path: str) -> Dict[str, Any]:
+    """
+    ヘッダー行を検証して返します。
+    """
+    try:
+        header = json.loads(line)
+    except json.JSONDecodeError:
+        header = None
+    if not isinstance(header, dict) or header.get("type") != "header" or header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"'{path}' はスナップショットファイルではありません。")
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"スナップショットのバージョン {header.get('version')} には対応していません。")
+    return header
+
+
+def iter_snapshot(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    スナップショットのタスクを1件ずつ読み込みます。
+
+    各タスクのハッシュと末尾の件数を検証し、破損や途中で切れたファイルはエラーにします。
+
+    Args:
+        path: スナップショットファイルのパス
+
+    Yields:
+        タスクデータ
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        _parse_header(f.readline(), path)
+
+        count = 0
+        for line_number, line in enumerate(f, 2):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                raise ValueError(f"スナップショットの {line_number} 行目が破損しています。")
+            if record.get("type") == "end":
+                if record.get("count") != count:
+                    raise ValueError(
+                        f"スナップショットの件数が一致しません（記録: {record.get('count')}, 読み込み: {count}）"
+                    )
+                return
+
+            task = record.get("task")
+            if task is None or task_digest(task) != record.get("sha256"):
+                raise ValueError(f"スナップショットの {line_number} 行目が破損しています。")
+            count += 1
+            yield task
+
+    raise ValueError(f"スナップショット '{path}' が途中で切れています。")
+
+
+def export_snapshot(notion_client: Any, path: str, criteria: Optional[Dict[str, Any]] = None,
+                    include_body: bool = False) -> int:
+    """
+    Notionのタスクを取得しながらスナップショットに書き出します。
+
+    ページ本文を含める場合は、BODY_CHUNK_SIZE件ずつまとめて取得してから書き出します。
+
+    Args:
+        notion_client: NotionのAPIクライアント（取得条件は適用済み）
+        path: スナップショットファイルのパス
+        criteria: 記録する取得条件
+        include_body: ページ本文も含めるかどうか
+
+    Returns:
+        書き出したタスク数
+    """
+    schema = notion_client.get_database_schema()
+    header = {
+        "database_id": notion_client.database_id,
+        "criteria": criteria or {},
+        "schema": {name: prop.get("type") for name, prop in schema.items()},
+        "include_body": include_body
+    }
+
+    with SnapshotWriter(path, header) as writer:
+        chunk: List[Dict[str, Any]] = []
+        for task in notion_client.iter_tasks():
+            if not include_body:
+                writer.write(task)
+                continue
+            chunk.append(task)
+            if len(chunk) >= BODY_CHUNK_SIZE:
+                notion_client.fetch_page_bodies(chunk)
+                for pending in chunk:
+                    writer.write(pending)
+                chunk = []
+        if chunk:
+            notion_client.fetch_page_bodies(chunk)
+            for pending in chunk:
+                writer.write(pending)
+
+    logger.info(f"{writer.count} 件のタスクをスナップショット '{path}' に書き出しました。")
+    return writer.count
@@ -0,0 +1,318 @@
+"""
+タスクインポーター
+
+1件ずつのタスクをGitHub Projectsにインポートし、統計情報を更新します。
+デッドレターファイルへの書き出しとインポート状態の記録をまとめて扱うため、
+単一の移行とオーケストレーターによる複数の移行の両方から使用されます。
+インポートの前処理（オプションの作成、担当者の対応づけ）と後処理（親子関係の設定、
+イシューへの変換、孤立したアイテムの整理）も、両方から同じ関数を使用します。
+"""
+
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from github_client import GitHubClient
+from retry_queue import DeadLetterQueue
+from import_state import ImportStateStore
+from project_index import EXISTING_SKIP, ProjectItemIndex, load_project_index
+from hierarchy import build_item_index, link_parents
+from reconcile import prune_orphans
+from notion_filters import has_filter
+from people_resolver import PeopleResolver
+from issue_converter import IssueConverter
+from timeouts import Deadline, DeadlineExceeded, run_deadline
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def new_stats() -> Dict[str, Any]:
+    """
+    空の統計情報を作成します。
+
+    Returns:
+        移行結果の統計情報
+    """
+    return {
+        "total": 0,
+        "success": 0,
+        "failed": 0,
+        "skipped": 0,
+        "failures": []
+    }
+
+
+class TaskImporter:
+    """
+    タスクを1件ずつインポートするクラス
+    """
+
+    def __init__(self, github_client: Any, stats: Dict[str, Any],
+                 dead_letter_file: Optional[str] = None,
+                 state_store: Optional[ImportStateStore] = None,
+                 partial_policy: Optional[str] = None,
+                 item_index: Optional[ProjectItemIndex] = None,
+                 existing_policy: Optional[str] = None,
+                 deadline: Optional[Deadline] = None):
+        """
+        TaskImporterの初期化
+
+        Args:
+            github_client: GitHubのAPIクライアント
+            stats: 更新する統計情報
+            dead_letter_file: 失敗したタスクを書き出すファイル。Noneなら書き出さない
+            state_store: インポート状態の記録先。Noneなら記録しない
+            partial_policy: 途中で失敗したアイテムの扱い。指定しない場合は設定ファイルの値
+            item_index: プロジェクトの既存アイテムの索引。Noneなら照合しない
+            existing_policy: 既存アイテムの扱い（"skip" / "update"）。指定しない場合は設定ファイルの値
+            deadline: 実行全体の期限。指定しない場合はtimeouts.run_deadline()
+        """
+        self.github_client = github_client
+        self.stats = stats
+        self.dead_letter = DeadLetterQueue(dead_letter_file) if dead_letter_file else None
+        self.state_store = state_store
+        self.partial_policy = partial_policy or config.PARTIAL_IMPORT_POLICY
+        self.item_index = item_index
+        self.existing_policy = existing_policy or config.EXISTING_ITEM_POLICY
+        self.deadline = deadline or run_deadline()
+        # 複数のスレッドからimport_taskを呼び出す場合に、統計情報とデッドレターファイルを保護するロック
+        self._lock = threading.Lock()
+
+    def _skip_for_deadline(self, label: str, task_title: str) -> bool:
+        """
+        期限を過ぎたため未処理のタスクを数えます。
+        """
+        with self._lock:
+            if not self.stats.get("deadline_skipped"):
+                logger.warning("実行の期限を過ぎたため、残りのタスクのインポートを中断します")
+            self.stats["deadline_skipped"] = self.stats.get("deadline_skipped", 0) + 1
+        logger.debug(f"{label} は期限を過ぎたため未処理: {task_title}")
+        return False
+
+    def import_task(self, task: Dict[str, Any], position: str = "") -> bool:
+        """
+        タスクを1件インポートし、統計情報を更新します。
+
+        Args:
+            task: タスクデータ
+            position: ログに表示する進捗（例: "3/10"）
+
+        Returns:
+            インポートに成功した（またはインポート済みだった）かどうか
+        """
+        task_title = task.get('title', 'No Title')
+        label = f"タスク {position}" if position else "タスク"
+
+        # 実行の期限を過ぎたら新しいタスクは始めない（次回の実行で続きからインポートする）
+        if self.deadline.expired():
+            return self._skip_for_deadline(label, task_title)
+
+        # 以前の実行でインポート済みのタスクはスキップ
+        if self.state_store is not None and task.get('notion_id') and self.state_store.is_done(task['notion_id']):
+            logger.info(f"{label} はインポート済みのためスキップします: {task_title}")
+            with self._lock:
+                self.stats["skipped"] += 1
+            return True
+
+        # プロジェクトに既にあるタスクはスキップするか、既存のアイテムを更新する
+        # タイトルだけが一致したアイテムは別のアイテムの可能性があるため、更新はしない（スキップだけに使う）
+        existing = (
+            self.item_index.find(task, by_title=self.existing_policy == EXISTING_SKIP)
+            if self.item_index is not None else None
+        )
+        if existing and self.existing_policy == EXISTING_SKIP:
+            logger.info(f"{label} はプロジェクトに既にあるためスキップします: {task_title}")
+            if task.get('notion_id'):
+                self.github_client.imported_items[task['notion_id']] = existing["id"]
+            with self._lock:
+                self.stats["skipped"] += 1
+            return True
+
+        logger.info(f"{label} をインポート中: {task_title}")
+
+        # 一時的なエラーは、失敗したリクエストだけをGitHubClientが再試行する
+        try:
+            success, error_message = self.github_client.import_task(
+                task,
+                state_store=self.state_store,
+                partial_policy=self.partial_policy,
+                existing_item_id=existing["id"] if existing else None
+            )
+        except DeadlineExceeded:
+            # インポート中に期限を過ぎたタスクは失敗として記録せず、次回の実行で続きから再開する
+            return self._skip_for_deadline(label, task_title)
+
+        if success:
+            logger.info(f"タスク '{task_title}' のインポートに成功しました。")
+            item_id = self.github_client.imported_items.get(task['notion_id']) if task.get('notion_id') else None
+            with self._lock:
+                self.stats["success"] += 1
+                # 同じ実行の中で同じタスクを重複して作成しないように、作成したアイテムを索引に追加する
+                if self.item_index is not None and not existing and item_id:
+                    self.item_index.add_task(task, item_id)
+            return True
+
+        self.record_failure(task, error_message, position)
+        return False
+
+    def record_failure(self, task: Dict[str, Any], error_message: Optional[str], position: str = "") -> None:
+        """
+        タスクのインポートの失敗を統計情報とデッドレターファイルに記録します。
+
+        Args:
+            task: タスクデータ
+            error_message: エラーメッセージ
+            position: ログに表示する進捗（例: "3/10"）
+        """
+        task_title = task.get('title', 'No Title')
+        logger.error(f"タスク '{task_title}' のインポートに失敗しました: {error_message}")
+        with self._lock:
+            self.stats["failed"] += 1
+            self.stats["failures"].append({
+                "title": task_title,
+                "notion_id": task.get('notion_id'),
+                "error": error_message
+            })
+            if self.dead_letter:
+                self.dead_letter.append(task, error_message)
+
+    def finish(self) -> None:
+        """
+        インポートの終了時に、失敗したタスクの書き出し先を案内します。
+        """
+        if self.dead_letter and self.stats["failed"] > 0:
+            logger.info(f"失敗したタスクを '{self.dead_letter.path}' に書き出しました。--retry-failed で再実行できます。")
+
+
+def run_importer(importer: TaskImporter, entries: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+    """
+    タスクを順にインポートします。GITHUB_MAX_CONCURRENCYが2以上なら並行してインポートします。
+
+    並行する場合も、実際に同時に送るリクエスト数はGitHubClientのコントローラーが
+    応答時間とエラーに応じて調整します。タスクは実行中の数に応じて少しずつ読み込みます。
+    ワーカースレッドで発生した予期しない例外は、そのタスクの失敗としてimporterに記録します。
+
+    Args:
+        importer: タスクインポーター
+        entries: (進捗の表示, タスク) の列
+    """
+    max_workers = config.GITHUB_MAX_CONCURRENCY
+    if max_workers <= 1:
+        for position, task in entries:
+            importer.import_task(task, position)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Dict[Future, Tuple[str, Dict[str, Any]]] = {}
+        for position, task in entries:
+            if len(pending) >= max_workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                _collect_results(importer, pending, done)
+            pending[executor.submit(importer.import_task, task, position)] = (position, task)
+        done, _ = wait(pending)
+        _collect_results(importer, pending, done)
+
+
+def _collect_results(importer: TaskImporter, pending: Dict[Future, Tuple[str, Dict[str, Any]]],
+                     done: Iterable[Future]) -> None:
+    """
+    完了したインポートの結果を確認し、例外で終わったタスクを失敗として記録します。
+    """
+    for future in done:
+        position, task = pending.pop(future)
+        try:
+            future.result()
+        except Exception as e:
+            importer.record_failure(task, f"予期しないエラー: {e}", position)
+
+
+def prepare_field_options(github_client: GitHubClient, tasks: Iterable[Dict[str, Any]]) -> None:
+    """
+    インポートの前に、不足している単一選択フィールドのオプションをまとめて作成します。
+
+    作成に失敗した場合もインポートは続行します（該当する値の更新はスキップされます）。
+
+    Args:
+        github_client: GitHubのAPIクライアント
+        tasks: インポートするタスクのリスト
+    """
+    try:
+        github_client.prepare_field_options(tasks)
+    except Exception as e:
+        logger.error(f"フィールドのオプションの作成に失敗しました: {e}")
+
+
+def resolve_people(github_client: GitHubClient, tasks: List[Dict[str, Any]]) -> None:
+    """
+    PEOPLE_MAPPINGが設定されていれば、担当者をGitHubのユーザーに対応づけます。
+
+    対応づけに失敗した場合もインポートは続行します（Draftはアサインなしで作成されます）。
+
+    Args:
+        github_client: GitHubのAPIクライアント
+        tasks: インポートするタスクのリスト
+    """
+    if not config.PEOPLE_MAPPING:
+        return
+    try:
+        PeopleResolver(github_client).resolve_tasks(tasks)
+    except Exception as e:
+        logger.error(f"担当者の対応づけに失敗しました: {e}")
+
+
+def convert_to_issues(github_client: GitHubClient, tasks: List[Dict[str, Any]],
+                      repository: Optional[str] = None) -> int:
+    """
+    移行したDraftアイテムをリポジトリのイシューに一括で変換します。
+
+    変換に失敗した場合も移行の結果には影響しません（Draftアイテムのまま残ります）。
+
+    Args:
+        github_client: GitHubのAPIクライアント
+        tasks: 移行したタスクのリスト
+        repository: 変換先のリポジトリ。指定しない場合は設定ファイルの値
+
+    Returns:
+        イシューに変換したアイテム数
+    """
+    try:
+        return IssueConverter(github_client, repository).convert_tasks(tasks)
+    except Exception as e:
+        logger.error(f"イシューへの変換に失敗しました: {e}")
+        return 0
+
+
+def finish_import(github_client: GitHubClient, tasks: List[Dict[str, Any]], stats: Dict[str, Any],
+                  state_store: Optional[ImportStateStore], item_index: Optional[ProjectItemIndex],
+                  criteria: Optional[Dict[str, Any]], repository: Optional[str] = None) -> None:
+    """
+    インポートの後処理（親子関係の設定、イシューへの変換、孤立したアイテムの整理）を行います。
+
+    Args:
+        github_client: GitHubのAPIクライアント
+        tasks: インポートしたタスクのリスト
+        stats: 更新する統計情報
+        state_store: インポート状態の記録
+        item_index: プロジェクトの既存アイテムの索引
+        criteria: タスクの取得条件（絞り込んでいる場合は整理を行わない）
+        repository: イシューの変換先のリポジトリ。指定しない場合は設定ファイルの値
+    """
+    # 親子関係を一括で設定
+    if any(task.get('parent_id') for task in tasks):
+        link_parents(github_client, tasks, build_item_index(github_client, state_store))
+
+    # Draftアイテムをイシューに変換
+    if config.CONVERT_TO_ISSUES:
+        stats["converted"] = convert_to_issues(github_client, tasks, repository)
+
+    # Notionで削除・アーカイブされたタスクのアイテムを整理
+    if config.PRUNE_ACTION:
+        if has_filter(criteria or {}):
+            logger.warning("取得条件で絞り込んでいるため、孤立したアイテムの整理を行いません")
+        else:
+            stats["pruned"] = prune_orphans(
+                github_client, tasks, item_index or load_project_index(github_client),
+                state_store, config.PRUNE_ACTION
+            )
@@ -0,0 +1,151 @@
+"""
+AsyncNotionClientのテスト
+
+非同期Notionクライアントの機能をモックデータを使用してテストします。
+"""
+
+import unittest
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import AsyncMock, MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from async_notion_client import AsyncNotionClient
+from notion_api_client import NotionClient
+from rate_limiter import AsyncRateLimiter
+import config
+
+class TestAsyncNotionClient(unittest.IsolatedAsyncioTestCase):
+    """AsyncNotionClientクラスのテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.original_notion_api_key = config.NOTION_API_KEY
+        self.original_notion_database_id = config.NOTION_DATABASE_ID
+        self.original_filter_properties = config.NOTION_FILTER_PROPERTIES
+        
+        config.NOTION_API_KEY = "test_api_key"
+        config.NOTION_DATABASE_ID = "test_database_id"
+        config.NOTION_FILTER_PROPERTIES = False
+        
+        with open(os.path.join(os.path.dirname(__file__), 'mock_data/notion_database.json'), 'r') as f:
+            self.mock_data = json.load(f)
+        
+        self.sdk_client = MagicMock()
+        self.sdk_client.databases.query = AsyncMock()
+        self.sdk_client.blocks.children.list = AsyncMock()
+        self.client = AsyncNotionClient(client=self.sdk_client, rate_limiter=AsyncRateLimiter(1000, burst=100))
+    
+    def tearDown(self):
+        """テストの後処理"""
+        config.NOTION_API_KEY = self.original_notion_api_key
+        config.NOTION_DATABASE_ID = self.original_notion_database_id
+        config.NOTION_FILTER_PROPERTIES = self.original_filter_properties
+    
+    async def test_get_all_tasks(self):
+        """ページングしながら全タスクを取得するかのテスト"""
+        results = self.mock_data["results"]
+        self.sdk_client.databases.query.side_effect = [
+            {"results": results[:2], "has_more": True, "next_cursor": "cursor_2"},
+            {"results": results[1:], "has_more": False, "next_cursor": None}
+        ]
+        
+        tasks = await self.client.get_all_tasks()
+        
+        # ページをまたいだ重複は除かれる
+        self.assertEqual([task["notion_id"] for task in tasks],
+                         ["notion_page_id_1", "notion_page_id_2", "notion_page_id_3"])
+        self.sdk_client.databases.query.assert_called_with(
+            database_id="test_database_id", page_size=100, start_cursor="cursor_2"
+        )
+    
+    async def test_fetch_page_bodies(self):
+        """子ブロックを含むページ本文を取得してMarkdownに変換するかのテスト"""
+        def list_children(block_id, page_size, start_cursor=None):
+            if block_id == "page1":
+                return {
+                    "results": [
+                        {"id": "b1", "type": "paragraph", "has_children": False,
+                         "paragraph": {"rich_text": [{"plain_text": "本文"}]}},
+                        {"id": "b2", "type": "bulleted_list_item", "has_children": True,
+                         "bulleted_list_item": {"rich_text": [{"plain_text": "親"}]}}
+                    ],
+                    "has_more": False
+                }
+            if block_id == "page2":
+                return {"results": [], "has_more": False}
+            return {
+                "results": [{"id": "b3", "type": "bulleted_list_item", "has_children": False,
+                             "bulleted_list_item": {"rich_text": [{"plain_text": "子"}]}}],
+                "has_more": False
+            }
+        
+        self.sdk_client.blocks.children.list.side_effect = list_children
+        
+        original_cache_dir = config.BLOCK_CACHE_DIR
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                config.BLOCK_CACHE_DIR = temp_dir
+                tasks = [{"notion_id": "page1", "last_edited_time": "2024-12-01T00:00:00.000Z"},
+                         {"notion_id": "page2", "last_edited_time": "2024-12-01T00:00:00.000Z"}]
+                
+                fetched = await self.client.fetch_page_bodies(tasks)
+                
+                self.assertEqual(fetched, 2)
+                self.assertEqual(tasks[0]["body"], "本文\n\n- 親\n    - 子")
+                self.assertEqual(tasks[1]["body"], "")
+                
+                # 2回目はキャッシュから読み込む
+                self.assertEqual(await self.client.fetch_page_bodies(tasks), 0)
+        finally:
+            config.BLOCK_CACHE_DIR = original_cache_dir
+
+    async def test_fetch_page_bodies_worker_pool(self):
+        """同時に取得するページ数を制限し、遅いページを待たずに次のページを取得するかのテスト"""
+        in_flight = set()
+        peak = []
+        last_page_fetched = asyncio.Event()
+        async def get_page_markdown(page_id):
+            in_flight.add(page_id)
+            peak.append(len(in_flight))
+            if page_id == "page0":
+                # 最初のページは、他の全ページの取得が終わるまで終わらない
+                await last_page_fetched.wait()
+            else:
+                await asyncio.sleep(0)
+            if page_id == "page4":
+                last_page_fetched.set()
+            in_flight.discard(page_id)
+            return ""
+        
+        self.client.get_page_markdown = get_page_markdown
+        
+        original_cache_dir = config.BLOCK_CACHE_DIR
+        try:
+            config.BLOCK_CACHE_DIR = ""
+            tasks = [{"notion_id": f"page{i}"} for i in range(5)]
+            
+            fetched = await asyncio.wait_for(self.client.fetch_page_bodies(tasks, max_workers=2), timeout=5)
+            self.assertEqual(fetched, 5)
+            self.assertEqual(max(peak), 2)
+        finally:
+            config.BLOCK_CACHE_DIR = original_cache_dir
+    
+    def test_wrapped_client_stays_sync(self):
+        """包んでいるNotionClientの同期メソッドがそのまま使えるかのテスト"""
+        notion_client = self.client.notion_client
+        notion_client.client = MagicMock()
+        notion_client.client.databases.retrieve.return_value = {"properties": {"Name": {"id": "title", "type": "title"}}}
+        
+        self.assertNotIsInstance(self.client, NotionClient)
+        self.assertEqual(notion_client.get_database_schema(), {"Name": {"id": "title", "type": "title"}})
+        # スキーマキャッシュは共有される
+        self.assertIs(self.client.schema_cache, notion_client.schema_cache)
+
+if __name__ == '__main__':
+    unittest.main()
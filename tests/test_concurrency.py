@@ -0,0 +1,124 @@
+"""
+concurrencyのテスト
+
+AIMDによる同時実行数の調整をテストします。
+"""
+
+import asyncio
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock
+
+import requests
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from concurrency import AdaptiveConcurrency, AsyncAdaptiveConcurrency, is_congestion_error
+
+class FakeClock:
+    """テスト用の時計"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+def http_error(status):
+    """テスト用のHTTPエラー"""
+    return requests.HTTPError(f"{status}", response=MagicMock(status_code=status))
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    """AdaptiveConcurrencyクラスのテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.clock = FakeClock()
+        self.controller = AdaptiveConcurrency("github", max_window=8, clock=self.clock)
+    
+    def complete(self, latency=0.1, congested=False):
+        """1件のリクエストを完了させる"""
+        self.controller.acquire()
+        self.clock.now += latency
+        self.controller.release(latency, congested)
+    
+    def test_additive_increase(self):
+        """正常な応答が続くとウィンドウが広がり、上限で止まるかのテスト"""
+        self.assertEqual(self.controller.limit, 1)
+        self.complete()
+        self.assertEqual(self.controller.limit, 2)
+        for _ in range(200):
+            self.complete()
+        self.assertEqual(self.controller.limit, 8)
+        self.assertEqual(self.controller.snapshot()["peak_window"], 8)
+    
+    def test_multiplicative_decrease(self):
+        """混雑を検出するとウィンドウを半分にするかのテスト"""
+        self.controller.window = 8.0
+        self.complete(congested=True)
+        self.assertEqual(self.controller.limit, 4)
+        
+        # 同時に失敗したリクエストでは続けて狭めない
+        self.controller.acquire()
+        self.controller.release(0.1, congested=True)
+        self.assertEqual(self.controller.limit, 4)
+        
+        # 平均応答時間が経過した後の混雑では再度狭める
+        self.clock.now += 1.0
+        self.complete(congested=True)
+        self.assertEqual(self.controller.limit, 2)
+        self.assertEqual(self.controller.snapshot()["decreases"], 2)
+    
+    def test_latency_spike(self):
+        """応答時間の急増を混雑として扱うかのテスト"""
+        for _ in range(20):
+            self.complete(latency=0.1)
+        before = self.controller.window
+        self.complete(latency=1.0)
+        self.assertLess(self.controller.window, before)
+    
+    def test_request_context(self):
+        """レート制限のエラーを記録して例外を送出し直すかのテスト"""
+        self.controller.window = 4.0
+        with self.assertRaises(requests.HTTPError):
+            with self.controller.request():
+                raise http_error(429)
+        self.assertEqual(self.controller.limit, 2)
+        self.assertEqual(self.controller.in_flight, 0)
+        
+        # 本文がレート制限を示す場合
+        self.clock.now += 1.0
+        with self.controller.request() as outcome:
+            outcome.congested = True
+        self.assertEqual(self.controller.limit, 1)
+    
+    def test_is_congestion_error(self):
+        """混雑によるエラーの判定のテスト"""
+        self.assertTrue(is_congestion_error(http_error(403)))
+        self.assertTrue(is_congestion_error(http_error(503)))
+        self.assertTrue(is_congestion_error(requests.Timeout()))
+        self.assertFalse(is_congestion_error(http_error(404)))
+        self.assertFalse(is_congestion_error(ValueError("invalid")))
+    
+    def test_async_limits_in_flight(self):
+        """非同期版が同時実行数をウィンドウ以下に制限するかのテスト"""
+        controller = AsyncAdaptiveConcurrency("notion", max_window=2)
+        peak = 0
+        
+        async def task():
+            nonlocal peak
+            async with controller.request():
+                peak = max(peak, controller.in_flight)
+                await asyncio.sleep(0)
+        
+        async def run():
+            await asyncio.gather(*(task() for _ in range(10)))
+        
+        asyncio.run(run())
+        self.assertLessEqual(peak, 2)
+        self.assertEqual(controller.in_flight, 0)
+
+if __name__ == '__main__':
+    unittest.main()
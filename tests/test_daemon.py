@@ -0,0 +1,136 @@
+"""
+daemonのテスト
+
+取得の間隔の調整と、変更されたタスクだけを反映する同期をテストします。
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daemon import AdaptivePoller, SyncDaemon
+from reverse_sync import SyncLedger, task_values
+
+def make_task(notion_id, edited, title=None):
+    """テスト用のタスク"""
+    return {
+        "notion_id": notion_id,
+        "title": title or notion_id,
+        "url": f"https://www.notion.so/{notion_id}",
+        "last_edited_time": edited
+    }
+
+class TestAdaptivePoller(unittest.TestCase):
+    """AdaptivePollerクラスのテスト"""
+
+    def test_interval(self):
+        """変更がない間は間隔を延ばし、変更があれば最短に戻すかのテスト"""
+        poller = AdaptivePoller(min_interval=10, max_interval=60, backoff=2)
+        self.assertEqual(poller.next_interval(0), 20)
+        self.assertEqual(poller.next_interval(0), 40)
+        self.assertEqual(poller.next_interval(0), 60)
+        self.assertEqual(poller.next_interval(0), 60)
+        self.assertEqual(poller.next_interval(3), 10)
+
+class TestSyncDaemon(unittest.TestCase):
+    """SyncDaemonクラスのテスト"""
+
+    def setUp(self):
+        """テストの前処理"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.temp_dir.name, "daemon_state.json")
+        self.notion_client = MagicMock()
+        self.github_client = MagicMock()
+        self.github_client.iter_items.return_value = [
+            {"id": "PVTI_a", "title": "a", "body": "*From Notion: https://www.notion.so/a*"}
+        ]
+        self.github_client.import_task.return_value = (True, None)
+        self.github_client.imported_items = {}
+        self.sleep = MagicMock()
+
+    def tearDown(self):
+        """テストの後処理"""
+        self.temp_dir.cleanup()
+
+    def make_daemon(self):
+        """テスト用のデーモン"""
+        return SyncDaemon(
+            self.notion_client, self.github_client, {"status": ["Doing"]},
+            state_path=self.state_path,
+            poller=AdaptivePoller(min_interval=1, max_interval=8, backoff=2),
+            sleep=self.sleep
+        )
+
+    def test_applies_only_changes(self):
+        """ウォーターマーク以降の変更だけを反映し、反映済みの変更を繰り返さないかのテスト"""
+        daemon = self.make_daemon()
+        first = [make_task("a", "2024-06-01T10:00:00.000Z"), make_task("b", "2024-06-01T10:05:00.000Z")]
+        self.notion_client.get_all_tasks.side_effect = [first, first[1:], []]
+
+        daemon.run(max_polls=3)
+
+        criteria = self.notion_client.apply_criteria.call_args[0][0]
+        self.assertEqual(criteria, {"status": ["Doing"], "edited_after": "2024-06-01T10:05:00.000Z"})
+        self.assertEqual(self.github_client.import_task.call_count, 2)
+        # 既存のアイテムは更新し、新しいタスクは作成する
+        existing_ids = [call[1]["existing_item_id"] for call in self.github_client.import_task.call_args_list]
+        self.assertEqual(existing_ids, ["PVTI_a", None])
+        self.assertEqual(daemon.stats["success"], 2)
+        self.assertEqual([call[0][0] for call in self.sleep.call_args_list], [1, 2])
+
+        # 再起動してもウォーターマークから再開する
+        restarted = self.make_daemon()
+        self.assertEqual(restarted.watermark, "2024-06-01T10:05:00.000Z")
+
+    def test_failed_poll_does_not_advance_watermark(self):
+        """反映の途中で失敗した場合、ウォーターマークを進めずに次回に同じ変更を取得し直すかのテスト"""
+        daemon = self.make_daemon()
+        watermark = daemon.watermark
+        changes = [make_task("b", "2024-06-01T10:05:00.000Z")]
+        self.notion_client.get_all_tasks.return_value = changes
+        daemon._prepare()
+        daemon._importer.import_task = MagicMock(side_effect=[KeyError("status"), True])
+
+        with self.assertRaises(KeyError):
+            daemon.poll_once()
+        self.assertEqual(daemon.watermark, watermark)
+        self.assertFalse(os.path.exists(self.state_path))
+
+        self.assertEqual(daemon.poll_once(), 1)
+        self.assertEqual(daemon.watermark, "2024-06-01T10:05:00.000Z")
+
+    def test_same_minute_edit_is_detected(self):
+        """同じ分の中で再度編集されたタスクを検出するかのテスト"""
+        daemon = self.make_daemon()
+        self.notion_client.get_all_tasks.side_effect = [
+            [make_task("b", "2024-06-01T10:05:00.000Z")],
+            [make_task("b", "2024-06-01T10:05:00.000Z", title="b（修正）")]
+        ]
+
+        self.assertEqual(daemon.poll_once(), 1)
+        self.assertEqual(daemon.poll_once(), 1)
+
+    def test_reverse_sync_echo_is_skipped(self):
+        """逆方向の同期による書き込みを反映せず、反映した値を台帳に記録するかのテスト"""
+        ledger = SyncLedger(os.path.join(self.temp_dir.name, "sync_ledger.json"))
+        echo = make_task("a", "2024-06-01T10:00:00.000Z")
+        ledger.record_notion_write("a", echo["last_edited_time"], task_values(echo))
+        daemon = SyncDaemon(
+            self.notion_client, self.github_client, state_path=self.state_path,
+            sleep=self.sleep, ledger=ledger
+        )
+        self.notion_client.get_all_tasks.return_value = [echo, make_task("b", "2024-06-01T10:00:00.000Z")]
+
+        self.github_client.imported_items = {"b": "PVTI_b"}
+
+        self.assertEqual(daemon.poll_once(), 1)
+        self.assertEqual(self.github_client.import_task.call_count, 1)
+        self.assertEqual(list(ledger.items), ["PVTI_b"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,12 +9,14 @@ import json
 import os
 from unittest.mock import patch, MagicMock, Mock
 import sys
+import tempfile
 import requests
 
 # テスト対象のモジュールをインポートするためにパスを追加
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from github_client import GitHubClient
+from github_client import GitHubClient, graphql_literal
+from import_state import ImportStateStore
 import config
 
 class TestGitHubClient(unittest.TestCase):
@@ -26,6 +28,7 @@ class TestGitHubClient(unittest.TestCase):
         self.original_github_token = config.GITHUB_TOKEN
         self.original_github_owner = config.GITHUB_OWNER
         self.original_github_project_number = config.GITHUB_PROJECT_NUMBER
+        self.original_auto_create_options = config.AUTO_CREATE_OPTIONS
         
         config.GITHUB_TOKEN = "test_github_token"
         config.GITHUB_OWNER = "test_owner"
@@ -52,6 +55,7 @@ class TestGitHubClient(unittest.TestCase):
         config.GITHUB_TOKEN = self.original_github_token
         config.GITHUB_OWNER = self.original_github_owner
         config.GITHUB_PROJECT_NUMBER = self.original_github_project_number
+        config.AUTO_CREATE_OPTIONS = self.original_auto_create_options
     
     @patch('github_client.requests.post')
     def test_init(self, mock_post):
@@ -242,5 +246,252 @@ class TestGitHubClient(unittest.TestCase):
         # 更新対象のフィールドが正しいことを確認
         self.assertEqual(mock_update_field.call_count, 4)  # ステータス、期日、担当者、ラベル
 
+    @patch('github_client.GitHubClient.update_item_field')
+    @patch('github_client.GitHubClient.update_item_body')
+    @patch('github_client.GitHubClient.create_draft_item')
+    def test_import_task_resume(self, mock_create_draft, mock_update_body, mock_update_field):
+        """途中で失敗したタスクの再開のテスト"""
+        mock_create_draft.return_value = "PVTI_lADOBDCxpc4AXYZzM4AXAA"
+        mock_update_body.return_value = True
+        # 2つ目のフィールド更新（期日）で失敗する
+        mock_update_field.side_effect = [True, requests.ConnectionError("Connection reset"), True, True, True]
+        
+        task = dict(self.test_task, notion_id="notion_page_id_1")
+        client = GitHubClient()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_store = ImportStateStore(os.path.join(temp_dir, "import_state.jsonl"))
+            
+            success, error = client.import_task(task, state_store=state_store)
+            self.assertFalse(success)
+            self.assertIn("Connection reset", error)
+            
+            # 再実行ではDraftを作り直さず、残りのステップだけを実行する
+            success, error = client.import_task(task, state_store=state_store)
+            self.assertTrue(success)
+            self.assertTrue(state_store.is_done("notion_page_id_1"))
+        
+        mock_create_draft.assert_called_once_with(task)
+        mock_update_body.assert_called_once()
+        self.assertEqual(mock_update_field.call_count, 5)
+        self.assertEqual(mock_update_field.call_args_list[2][0][1], "Due Date")
+    
+    @patch('github_client.GitHubClient.update_item_field')
+    @patch('github_client.GitHubClient.update_item_body')
+    @patch('github_client.GitHubClient.create_draft_item')
+    def test_import_task_skipped_step_not_recorded(self, mock_create_draft, mock_update_body, mock_update_field):
+        """フィールドがなく更新できなかったステップを完了として記録しないかのテスト"""
+        mock_create_draft.return_value = "PVTI_lADOBDCxpc4AXYZzM4AXAA"
+        mock_update_body.return_value = True
+        # Statusのオプションがない
+        mock_update_field.side_effect = lambda item_id, name, value: name != "Status"
+        
+        task = dict(self.test_task, notion_id="notion_page_id_1")
+        client = GitHubClient()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_store = ImportStateStore(os.path.join(temp_dir, "import_state.jsonl"))
+            success, error = client.import_task(task, state_store=state_store)
+            
+            self.assertTrue(success)
+            self.assertEqual(
+                state_store.get("notion_page_id_1")["steps"],
+                ["create", "body", "due_date", "assignees", "labels"]
+            )
+    
+    @patch('github_client.GitHubClient.delete_item')
+    @patch('github_client.GitHubClient.update_item_field')
+    @patch('github_client.GitHubClient.update_item_body')
+    @patch('github_client.GitHubClient.create_draft_item')
+    def test_import_task_rollback(self, mock_create_draft, mock_update_body, mock_update_field, mock_delete):
+        """途中で失敗したDraftアイテムのロールバックのテスト"""
+        mock_create_draft.return_value = "PVTI_lADOBDCxpc4AXYZzM4AXAA"
+        mock_update_body.side_effect = ValueError("Validation failed")
+        mock_delete.return_value = True
+        
+        task = dict(self.test_task, notion_id="notion_page_id_1")
+        client = GitHubClient()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_store = ImportStateStore(os.path.join(temp_dir, "import_state.jsonl"))
+            
+            success, error = client.import_task(task, state_store=state_store, partial_policy="rollback")
+            
+            self.assertFalse(success)
+            mock_delete.assert_called_once_with("PVTI_lADOBDCxpc4AXYZzM4AXAA")
+            self.assertIsNone(state_store.get("notion_page_id_1"))
+
+    @patch('github_client.requests.post')
+    def test_run_batched_mutations(self, mock_post):
+        """一括ミューテーションのテスト"""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "data": {
+                "m0": {"clientMutationId": None},
+                "m1": None,
+                "m2": {"clientMutationId": None}
+            },
+            "errors": [{"path": ["m1"], "message": "Could not resolve to a node"}]
+        }
+        mock_post.return_value = mock_response
+        
+        client = GitHubClient()
+        operations = [f"deleteProjectV2Item(input: {{itemId: {graphql_literal(f'PVTI_{i}')}}}) {{ deletedItemId }}"
+                      for i in range(5)]
+        results = client.run_batched_mutations(operations, batch_size=3)
+        
+        # 5件が3件ずつ2リクエストにまとめられる
+        self.assertEqual(mock_post.call_count, 2)
+        query = mock_post.call_args_list[0][1]["json"]["query"]
+        self.assertIn('m0: deleteProjectV2Item(input: {itemId: "PVTI_0"})', query)
+        self.assertIn('m2: deleteProjectV2Item(input: {itemId: "PVTI_2"})', query)
+        
+        self.assertEqual(len(results), 5)
+        self.assertIsNone(results[0][1])
+        self.assertEqual(results[1][1], "Could not resolve to a node")
+        self.assertEqual(graphql_literal('タイトル "引用"'), '"タイトル \\"引用\\""')
+    
+    @patch('github_client.GitHubClient.get_project_id')
+    @patch('github_client.requests.post')
+    def test_iter_items(self, mock_post, mock_get_project_id):
+        """プロジェクトの全アイテムをページングしながら取得するかのテスト"""
+        mock_get_project_id.return_value = "PVT_kwDOBDCxpc4AXYZz"
+        
+        def page(nodes, has_next, end_cursor):
+            response = Mock()
+            response.json.return_value = {"data": {"node": {"items": {
+                "pageInfo": {"hasNextPage": has_next, "endCursor": end_cursor},
+                "nodes": nodes
+            }}}}
+            return response
+        
+        mock_post.side_effect = [
+            page([{
+                "id": "PVTI_1", "type": "DRAFT_ISSUE", "isArchived": False,
+                "content": {"id": "DI_1", "title": "タスク1", "body": "説明\n\n*From Notion: https://www.notion.so/page1*"},
+                "fieldValues": {"nodes": [
+                    {"name": "Done", "field": {"name": "Status"}},
+                    {"date": "2024-12-31", "field": {"name": "Due Date"}},
+                    {}
+                ]}
+            }], True, "cursor_1"),
+            page([{
+                "id": "PVTI_2", "type": "DRAFT_ISSUE", "isArchived": True,
+                "content": {"id": "DI_2", "title": "タスク2", "body": None},
+                "fieldValues": {"nodes": []}
+            }], False, None)
+        ]
+        
+        client = GitHubClient()
+        items = client.get_all_items()
+        
+        self.assertEqual([item["id"] for item in items], ["PVTI_1", "PVTI_2"])
+        self.assertEqual(items[0]["fields"], {"Status": "Done", "Due Date": "2024-12-31"})
+        self.assertEqual(items[1]["body"], "")
+        self.assertTrue(items[1]["archived"])
+        self.assertEqual(mock_post.call_args_list[1][1]["json"]["variables"]["cursor"], "cursor_1")
+    
+    @patch('github_client.GitHubClient.update_item_field')
+    @patch('github_client.GitHubClient.update_item_body')
+    @patch('github_client.GitHubClient.create_draft_item')
+    def test_import_task_existing_item(self, mock_create_draft, mock_update_body, mock_update_field):
+        """既存のアイテムを指定するとDraftを作成せずに更新するかのテスト"""
+        mock_update_body.return_value = True
+        mock_update_field.return_value = True
+        
+        client = GitHubClient()
+        success, error = client.import_task(dict(self.test_task, notion_id="notion_page_id_1"),
+                                            existing_item_id="PVTI_existing")
+        
+        self.assertTrue(success)
+        mock_create_draft.assert_not_called()
+        self.assertEqual(mock_update_body.call_args[0][0], "PVTI_existing")
+        self.assertEqual(client.imported_items["notion_page_id_1"], "PVTI_existing")
+    
+    @patch('github_client.GitHubClient.get_project_id')
+    @patch('github_client.requests.post')
+    def test_remove_items(self, mock_post, mock_get_project_id):
+        """複数のアイテムを1リクエストでアーカイブするかのテスト"""
+        mock_get_project_id.return_value = "PVT_kwDOBDCxpc4AXYZz"
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "data": {"m0": {"item": {"id": "PVTI_1"}}, "m1": None},
+            "errors": [{"path": ["m1"], "message": "Could not resolve to a node"}]
+        }
+        mock_post.return_value = mock_response
+        
+        client = GitHubClient()
+        removed = client.remove_items(["PVTI_1", "PVTI_2"])
+        
+        self.assertEqual(removed, ["PVTI_1"])
+        self.assertEqual(mock_post.call_count, 1)
+        query = mock_post.call_args[1]["json"]["query"]
+        self.assertIn('m0: archiveProjectV2Item(input: {projectId: "PVT_kwDOBDCxpc4AXYZz", itemId: "PVTI_1"})', query)
+    
+    @patch('github_client.GitHubClient.get_project_id')
+    @patch('github_client.GitHubClient._post_graphql')
+    def test_prepare_field_options(self, mock_post_graphql, mock_get_project_id):
+        """不足しているステータスのオプションを、既存のオプションのIDを変えずに作成するかのテスト"""
+        config.AUTO_CREATE_OPTIONS = True
+        mock_get_project_id.return_value = "PVT_kwDOBDCxpc4AXYZz"
+        existing = [{"id": "OPT_1", "name": "Done", "color": "GREEN", "description": "完了"}]
+        mock_post_graphql.side_effect = [
+            {"data": {"node": {"fields": {"nodes": [
+                {"id": "PVTSSF_status", "name": "Status", "options": existing}
+            ]}}}},
+            {"data": {"updateProjectV2Field": {"projectV2Field": {"options": [
+                {"id": "OPT_1", "name": "Done", "color": "GREEN", "description": "完了"},
+                {"id": "OPT_2", "name": "In Review", "color": "GRAY", "description": "Created from Notion"}
+            ]}}}}
+        ]
+        
+        client = GitHubClient()
+        tasks = [{"status": "Done"}, {"status": "In Review"}, {"status": "In Review"}, {}]
+        self.assertEqual(client.prepare_field_options(tasks), 1)
+        
+        variables = mock_post_graphql.call_args_list[1][0][1]
+        self.assertEqual(variables["field_id"], "PVTSSF_status")
+        self.assertEqual(variables["options"], [
+            {"id": "OPT_1", "name": "Done", "color": "GREEN", "description": "完了"},
+            {"name": "In Review", "color": "GRAY", "description": "Created from Notion"}
+        ])
+        
+        # 既存のオプションのIDは変わらず、作成したオプションのIDが追加される
+        field_ids = client.get_field_ids()
+        self.assertEqual(field_ids["Status:Done"], "OPT_1")
+        self.assertEqual(field_ids["Status:In Review"], "OPT_2")
+        
+        # すべてのオプションがあれば何もしない
+        self.assertEqual(client.prepare_field_options(tasks), 0)
+        self.assertEqual(mock_post_graphql.call_count, 2)
+        
+        # 自動作成が無効ならフィールドを変更しない
+        config.AUTO_CREATE_OPTIONS = False
+        self.assertEqual(client.prepare_field_options([{"status": "Blocked"}]), 0)
+        self.assertEqual(mock_post_graphql.call_count, 2)
+    
+    @patch('github_client.GitHubClient.get_project_id')
+    @patch('github_client.GitHubClient._post_graphql')
+    def test_update_item_field_iteration(self, mock_post_graphql, mock_get_project_id):
+        """日付を含むイテレーションのIDを設定するかのテスト"""
+        mock_get_project_id.return_value = "PVT_kwDOBDCxpc4AXYZz"
+        mock_post_graphql.side_effect = [
+            {"data": {"node": {"fields": {"nodes": [
+                {"id": "PVTIF_sprint", "name": "Sprint", "configuration": {
+                    "iterations": [{"id": "IT_2", "title": "Sprint 2", "startDate": "2024-01-15", "duration": 14}],
+                    "completedIterations": [{"id": "IT_1", "title": "Sprint 1", "startDate": "2024-01-01", "duration": 14}]
+                }}
+            ]}}}},
+            {"data": {"updateProjectV2ItemFieldValue": {"clientMutationId": None}}}
+        ]
+        
+        client = GitHubClient()
+        self.assertTrue(client.update_item_field("PVTI_1", "Sprint", "2024-01-14"))
+        self.assertEqual(mock_post_graphql.call_args_list[1][0][1]["iteration_id"], "IT_1")
+        
+        # どのイテレーションにも含まれない日付は更新しない
+        self.assertFalse(client.update_item_field("PVTI_1", "Sprint", "2024-01-29"))
+        self.assertEqual(mock_post_graphql.call_count, 2)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
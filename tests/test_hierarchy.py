@@ -0,0 +1,67 @@
+"""
+タスクの親子関係のテスト
+
+トポロジカルソートと親タスクの一括設定をテストします。
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from hierarchy import build_item_index, link_parents, topological_order
+
+class TestHierarchy(unittest.TestCase):
+    """hierarchyモジュールのテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.tasks = [
+            {"notion_id": "grandchild", "title": "孫", "parent_id": "child"},
+            {"notion_id": "child", "title": "子", "parent_id": "root"},
+            {"notion_id": "root", "title": "親", "url": "https://www.notion.so/root"},
+            {"notion_id": "orphan", "title": "外部の親", "parent_id": "other_database_page"}
+        ]
+    
+    def test_topological_order(self):
+        """親が子より先に並ぶかのテスト"""
+        ordered = [task["notion_id"] for task in topological_order(self.tasks)]
+        
+        self.assertEqual(len(ordered), 4)
+        self.assertLess(ordered.index("root"), ordered.index("child"))
+        self.assertLess(ordered.index("child"), ordered.index("grandchild"))
+    
+    def test_topological_order_cycle(self):
+        """循環したリレーションのテスト"""
+        tasks = [
+            {"notion_id": "a", "parent_id": "b"},
+            {"notion_id": "b", "parent_id": "a"},
+            {"notion_id": "c"}
+        ]
+        ordered = [task["notion_id"] for task in topological_order(tasks)]
+        
+        self.assertEqual(ordered, ["c", "a", "b"])
+    
+    def test_link_parents(self):
+        """索引を使った親タスクの一括設定のテスト"""
+        github_client = MagicMock()
+        github_client.imported_items = {"child": "PVTI_child", "root": "PVTI_root"}
+        github_client.set_parent_items.side_effect = lambda links: len(links)
+        
+        state_store = [("grandchild", {"item_id": "PVTI_grandchild", "steps": [], "done": True})]
+        item_index = build_item_index(github_client, state_store)
+        
+        result = link_parents(github_client, self.tasks, item_index)
+        
+        # 1回の呼び出しでまとめて設定される
+        github_client.set_parent_items.assert_called_once()
+        links = github_client.set_parent_items.call_args[0][0]
+        self.assertEqual([(item_id, parent["notion_id"]) for item_id, parent in links],
+                         [("PVTI_child", "root"), ("PVTI_grandchild", "child")])
+        self.assertEqual(result, {"linked": 2, "unresolved": 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+ImportStateStoreのテスト
+
+インポート状態のジャーナルの記録・再生をテストします。
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import threading
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from import_state import ImportStateStore, STEP_CREATE, STEP_BODY
+
+class TestImportStateStore(unittest.TestCase):
+    """ImportStateStoreクラスのテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "import_state.jsonl")
+    
+    def tearDown(self):
+        """テストの後処理"""
+        self.temp_dir.cleanup()
+    
+    def test_record_and_reload(self):
+        """記録した状態が再読み込みで復元されるかのテスト"""
+        store = ImportStateStore(self.path)
+        store.record_created("page1", "PVTI_1")
+        store.record_step("page1", STEP_BODY)
+        store.record_created("page2", "PVTI_2")
+        store.mark_done("page2")
+        
+        # 書き込み途中で中断された行があっても読み込める
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"event": "step", "notion_id"')
+        
+        reloaded = ImportStateStore(self.path)
+        self.assertEqual(reloaded.get("page1")["item_id"], "PVTI_1")
+        self.assertEqual(reloaded.get("page1")["steps"], [STEP_CREATE, STEP_BODY])
+        self.assertFalse(reloaded.is_done("page1"))
+        self.assertTrue(reloaded.is_done("page2"))
+        self.assertEqual([notion_id for notion_id, _ in reloaded.incomplete()], ["page1"])
+    
+    def test_forget_and_compaction(self):
+        """記録の削除とジャーナルのコンパクションのテスト"""
+        store = ImportStateStore(self.path)
+        for i in range(5):
+            store.record_created("page1", f"PVTI_{i}")
+            store.forget("page1")
+        store.record_created("page2", "PVTI_2")
+        
+        reloaded = ImportStateStore(self.path)
+        self.assertIsNone(reloaded.get("page1"))
+        self.assertEqual(len(reloaded), 1)
+        
+        # コンパクション後は現在の状態だけが残る
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(ImportStateStore(self.path).get("page2")["item_id"], "PVTI_2")
+    
+    def test_concurrent_record_and_read(self):
+        """複数のスレッドから記録と読み込みを同時に行っても、状態が壊れないかのテスト"""
+        store = ImportStateStore(self.path)
+        
+        def import_pages(worker):
+            for i in range(50):
+                notion_id = f"page{worker}_{i}"
+                store.record_created(notion_id, f"PVTI_{worker}_{i}")
+                store.record_step(notion_id, STEP_BODY)
+                store.mark_done(notion_id)
+                # 読み込み中に他のスレッドが記録しても例外にならない
+                store.incomplete()
+                list(store)
+        
+        threads = [threading.Thread(target=import_pages, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        reloaded = ImportStateStore(self.path)
+        self.assertEqual(len(reloaded), 200)
+        self.assertEqual(reloaded.incomplete(), [])
+        
+        # 返された状態を変更しても記録には影響しない
+        reloaded.get("page0_0")["steps"].append("status")
+        self.assertEqual(reloaded.get("page0_0")["steps"], [STEP_CREATE, STEP_BODY])
+
+if __name__ == '__main__':
+    unittest.main()
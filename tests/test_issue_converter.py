@@ -0,0 +1,89 @@
+"""
+issue_converterのテスト
+
+Draftアイテムのイシューへの一括変換をテストします。
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from issue_converter import IssueConverter, parse_repository
+
+def item(item_id, url, item_type="DRAFT_ISSUE", content_id=None):
+    """テスト用のアイテム"""
+    return {"id": item_id, "type": item_type, "content_id": content_id,
+            "title": item_id, "body": f"*From Notion: {url}*", "archived": False}
+
+REPOSITORY = {"data": {"repository": {"id": "R_1", "labels": {
+    "pageInfo": {"hasNextPage": False, "endCursor": None},
+    "nodes": [{"id": "LA_bug", "name": "Bug"}]
+}}}}
+
+class TestIssueConverter(unittest.TestCase):
+    """イシューへの変換のテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.github_client = MagicMock()
+        self.github_client.owner = "my-org"
+        self.github_client.run_query.return_value = REPOSITORY
+    
+    def test_parse_repository(self):
+        """リポジトリ名の解釈のテスト"""
+        self.assertEqual(parse_repository("octo/repo", "my-org"), ("octo", "repo"))
+        self.assertEqual(parse_repository("repo", "my-org"), ("my-org", "repo"))
+    
+    def test_convert_tasks(self):
+        """変換・ラベル・アサイン・サブイシューを一括で設定するかのテスト"""
+        self.github_client.iter_items.return_value = iter([
+            item("PVTI_parent", "https://www.notion.so/parent", "ISSUE", "I_parent"),
+            # 移行後にページの名前を変えても、ページIDで対応づける
+            item("PVTI_child", "https://www.notion.so/Old-83c75a51b3fe4a1aad9f0cbe6d75c89e")
+        ])
+        self.github_client.run_batched_mutations.side_effect = [
+            # ラベルの作成
+            [({"label": {"id": "LA_docs", "name": "docs"}}, None)],
+            # イシューへの変換
+            [({"item": {"id": "PVTI_child", "content": {"id": "I_child", "number": 7}}}, None)],
+            # ラベル・アサイン・サブイシュー
+            [({}, None), ({}, None), ({}, None)]
+        ]
+        tasks = [
+            {"notion_id": "parent", "url": "https://www.notion.so/parent", "tags": ["bug"]},
+            {"notion_id": "83c75a51-b3fe-4a1a-ad9f-0cbe6d75c89e",
+             "url": "https://www.notion.so/New-83c75a51b3fe4a1aad9f0cbe6d75c89e", "tags": ["bug", "docs"],
+             "assignee_ids": ["U_1"], "parent_id": "parent"},
+            {"notion_id": "missing", "url": "https://www.notion.so/missing"}
+        ]
+        
+        converter = IssueConverter(self.github_client, "my-repo")
+        self.assertEqual(converter.convert_tasks(tasks), 1)
+        
+        calls = self.github_client.run_batched_mutations.call_args_list
+        # 既存のラベルは大文字小文字を区別せずに再利用し、ないものだけを作成する
+        self.assertEqual(len(calls[0][0][0]), 1)
+        self.assertIn('name: "docs"', calls[0][0][0][0])
+        # 既にイシューになっているアイテムは変換しない
+        self.assertEqual(len(calls[1][0][0]), 1)
+        self.assertIn('itemId: "PVTI_child", repositoryId: "R_1"', calls[1][0][0][0])
+        operations = calls[2][0][0]
+        self.assertIn('labelIds: ["LA_bug", "LA_docs"]', operations[0])
+        self.assertIn('assigneeIds: ["U_1"]', operations[1])
+        self.assertIn('addSubIssue(input: {issueId: "I_parent", subIssueId: "I_child"})', operations[2])
+    
+    def test_convert_tasks_without_drafts(self):
+        """変換するDraftアイテムがなければ何もしないかのテスト"""
+        self.github_client.iter_items.return_value = iter([
+            item("PVTI_1", "https://www.notion.so/page1", "ISSUE", "I_1")
+        ])
+        converter = IssueConverter(self.github_client, "my-repo")
+        self.assertEqual(converter.convert_tasks([{"notion_id": "page1", "url": "https://www.notion.so/page1"}]), 0)
+        self.github_client.run_batched_mutations.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+iteration_indexのテスト
+
+日付からイテレーションを引く索引をテストします。
+"""
+
+import unittest
+import os
+import sys
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from iteration_index import IterationIndex
+
+ITERATIONS = [
+    {"id": "IT_3", "title": "Sprint 3", "startDate": "2024-02-05", "duration": 7},
+    {"id": "IT_1", "title": "Sprint 1", "startDate": "2024-01-01", "duration": 14},
+    {"id": "IT_2", "title": "Sprint 2", "startDate": "2024-01-15", "duration": 14}
+]
+
+class TestIterationIndex(unittest.TestCase):
+    """イテレーションの索引のテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.index = IterationIndex(ITERATIONS)
+    
+    def test_find(self):
+        """日付を含むイテレーションを返すかのテスト"""
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.find("2024-01-01"), "IT_1")
+        self.assertEqual(self.index.find("2024-01-14"), "IT_1")
+        self.assertEqual(self.index.find("2024-01-15"), "IT_2")
+        self.assertEqual(self.index.find("2024-02-11T10:00:00.000+09:00"), "IT_3")
+    
+    def test_find_outside(self):
+        """どのイテレーションにも含まれない日付のテスト"""
+        # 最初のイテレーションより前
+        self.assertIsNone(self.index.find("2023-12-31"))
+        # イテレーションの間の空白期間
+        self.assertIsNone(self.index.find("2024-01-30"))
+        # 最後のイテレーションより後
+        self.assertIsNone(self.index.find("2024-02-12"))
+        self.assertIsNone(self.index.find("not a date"))
+        self.assertIsNone(IterationIndex([]).find("2024-01-01"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ import unittest
 import os
 import sys
 import json
+import tempfile
 from unittest.mock import patch, MagicMock, Mock
 
 # テスト対象のモジュールをインポートするためにパスを追加
@@ -18,6 +19,9 @@ import config
 from notion_api_client import NotionClient
 from github_client import GitHubClient
 
+# 引数を指定しなかった場合の値（テスト中はsetup_argument_parserをモックするため先に取得しておく）
+DEFAULT_ARGS = vars(main.setup_argument_parser().parse_args([]))
+
 class TestMain(unittest.TestCase):
     """メインモジュールのテスト"""
     
@@ -29,12 +33,18 @@ class TestMain(unittest.TestCase):
         self.original_github_token = config.GITHUB_TOKEN
         self.original_github_owner = config.GITHUB_OWNER
         self.original_github_project_number = config.GITHUB_PROJECT_NUMBER
+        self.original_dead_letter_file = config.DEAD_LETTER_FILE
+        self.original_import_state_file = config.IMPORT_STATE_FILE
+        
+        self.temp_dir = tempfile.TemporaryDirectory()
         
         config.NOTION_API_KEY = "test_api_key"
         config.NOTION_DATABASE_ID = "test_database_id"
         config.GITHUB_TOKEN = "test_github_token"
         config.GITHUB_OWNER = "test_owner"
         config.GITHUB_PROJECT_NUMBER = "42"
+        config.DEAD_LETTER_FILE = os.path.join(self.temp_dir.name, "failed_tasks.jsonl")
+        config.IMPORT_STATE_FILE = os.path.join(self.temp_dir.name, "import_state.jsonl")
         
         # モックデータの読み込み
         with open(os.path.join(os.path.dirname(__file__), 'mock_data/notion_database.json'), 'r') as f:
@@ -48,6 +58,10 @@ class TestMain(unittest.TestCase):
         config.GITHUB_TOKEN = self.original_github_token
         config.GITHUB_OWNER = self.original_github_owner
         config.GITHUB_PROJECT_NUMBER = self.original_github_project_number
+        config.DEAD_LETTER_FILE = self.original_dead_letter_file
+        config.IMPORT_STATE_FILE = self.original_import_state_file
+        
+        self.temp_dir.cleanup()
     
     def test_setup_argument_parser(self):
         """引数パーサーのセットアップテスト"""
@@ -150,6 +164,37 @@ class TestMain(unittest.TestCase):
         self.assertEqual(len(stats['failures']), 1)
         self.assertEqual(stats['failures'][0]['title'], 'Task 2')
         self.assertEqual(stats['failures'][0]['error'], 'エラーが発生しました')
+        
+        # 失敗したタスクはデッドレターファイルに書き出される
+        with open(config.DEAD_LETTER_FILE, 'r') as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['task']['title'], 'Task 2')
+        self.assertEqual(entries[0]['error'], 'エラーが発生しました')
+    
+    @patch('main.GitHubClient')
+    def test_retry_failed_tasks(self, mock_github_client):
+        """デッドレターファイルからの再実行のテスト"""
+        with open(config.DEAD_LETTER_FILE, 'w') as f:
+            f.write(json.dumps({'task': {'title': 'Task 1'}, 'error': 'x', 'error_type': 'permanent'}) + '\n')
+            f.write(json.dumps({'task': {'title': 'Task 2'}, 'error': 'x', 'error_type': 'permanent'}) + '\n')
+        
+        mock_github_instance = mock_github_client.return_value
+        mock_github_instance.import_task.side_effect = [
+            (True, None),
+            (False, "Validation failed")
+        ]
+        
+        stats = main.retry_failed_tasks(mock_github_instance, config.DEAD_LETTER_FILE)
+        
+        self.assertEqual(stats['total'], 2)
+        self.assertEqual(stats['success'], 1)
+        self.assertEqual(stats['failed'], 1)
+        
+        # 再度失敗したタスクだけが残る
+        with open(config.DEAD_LETTER_FILE, 'r') as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([entry['task']['title'] for entry in entries], ['Task 2'])
     
     @patch('main.migrate_tasks')
     @patch('main.GitHubClient')
@@ -158,7 +203,7 @@ class TestMain(unittest.TestCase):
     def test_main_success(self, mock_parser, mock_notion_client, mock_github_client, mock_migrate):
         """main関数成功のテスト"""
         # モックの設定
-        mock_args = MagicMock()
+        mock_args = MagicMock(**DEFAULT_ARGS)
         mock_args.dry_run = False
         mock_args.config = None
         mock_args.notion_database_id = None
@@ -199,7 +244,7 @@ class TestMain(unittest.TestCase):
     def test_main_with_failures(self, mock_parser, mock_notion_client, mock_github_client, mock_migrate):
         """main関数失敗のテスト"""
         # モックの設定
-        mock_args = MagicMock()
+        mock_args = MagicMock(**DEFAULT_ARGS)
         mock_args.dry_run = False
         mock_args.config = None
         mock_args.notion_database_id = None
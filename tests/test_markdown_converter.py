@@ -0,0 +1,101 @@
+"""
+Markdown変換のテスト
+
+NotionのブロックからGitHub Flavored Markdownへの変換をテストします。
+"""
+
+import unittest
+import os
+import sys
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from markdown_converter import blocks_to_markdown, rich_text_to_markdown
+
+def text(content, **annotations):
+    """テスト用のリッチテキストを作成"""
+    return {"type": "text", "plain_text": content, "annotations": annotations}
+
+def block(block_id, block_type, rich_text=None, has_children=False, **data):
+    """テスト用のブロックを作成"""
+    payload = dict(data)
+    if rich_text is not None:
+        payload["rich_text"] = rich_text
+    return {"id": block_id, "type": block_type, "has_children": has_children, block_type: payload}
+
+class TestMarkdownConverter(unittest.TestCase):
+    """markdown_converterモジュールのテスト"""
+    
+    def test_rich_text_to_markdown(self):
+        """装飾付きテキストの変換のテスト"""
+        rich_text = [
+            text("通常 "),
+            text("太字 ", bold=True),
+            text("コード", code=True),
+            dict(text("リンク"), href="https://example.com")
+        ]
+        
+        self.assertEqual(
+            rich_text_to_markdown(rich_text),
+            "通常 **太字** `コード`[リンク](https://example.com)"
+        )
+    
+    def test_blocks_to_markdown(self):
+        """ブロックの変換とネストした子ブロックの取得のテスト"""
+        children = {
+            "list1": [block("nested", "bulleted_list_item", [text("ネスト")])],
+            "table": [
+                {"id": "r1", "type": "table_row", "table_row": {"cells": [[text("名前")], [text("値")]]}},
+                {"id": "r2", "type": "table_row", "table_row": {"cells": [[text("a|b")], [text("1")]]}}
+            ]
+        }
+        fetched = []
+        def fetch_children(block_id):
+            fetched.append(block_id)
+            return iter(children[block_id])
+        
+        blocks = [
+            block("h", "heading_2", [text("仕様")]),
+            block("p", "paragraph", [text("本文")]),
+            block("list1", "bulleted_list_item", [text("項目1")], has_children=True),
+            block("list2", "numbered_list_item", [text("手順1")]),
+            block("list3", "numbered_list_item", [text("手順2")]),
+            block("todo", "to_do", [text("確認")], checked=True),
+            block("code", "code", [text("print('hi')\nprint('bye')")], language="python"),
+            block("table", "table", has_children=True, has_column_header=True),
+            block("div", "divider"),
+            block("sub-page", "child_page", has_children=True, title="議事録")
+        ]
+        
+        markdown = "\n".join(blocks_to_markdown(blocks, fetch_children))
+        
+        self.assertEqual(markdown, "\n".join([
+            "## 仕様",
+            "",
+            "本文",
+            "",
+            "- 項目1",
+            "    - ネスト",
+            "1. 手順1",
+            "2. 手順2",
+            "- [x] 確認",
+            "",
+            "```python",
+            "print('hi')",
+            "print('bye')",
+            "```",
+            "",
+            "| 名前 | 値 |",
+            "| --- | --- |",
+            "| a\\|b | 1 |",
+            "",
+            "---",
+            "",
+            "📄 [議事録](https://www.notion.so/subpage)"
+        ]))
+        # 子ページの中身は取得しない
+        self.assertEqual(fetched, ["list1", "table"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,7 @@ import json
 import os
 from unittest.mock import patch, MagicMock
 import sys
+import tempfile
 
 # テスト対象のモジュールをインポートするためにパスを追加
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -133,5 +134,176 @@ class TestNotionClient(unittest.TestCase):
         self.assertEqual(task["assignees"], ["Takayuki Cho"])
         self.assertEqual(task["due_date"], "2024-12-05")
 
+    @patch('notion_api_client.NotionSDKClient')
+    def test_get_all_tasks_resume(self, mock_notion_client):
+        """チェックポイントからの取得再開のテスト"""
+        results = self.mock_data["results"]
+        first_page = {"results": results[:2], "has_more": True, "next_cursor": "cursor_2"}
+        second_page = {"results": results[2:], "has_more": False, "next_cursor": None}
+        
+        mock_instance = mock_notion_client.return_value
+        # 2ページ目の取得中にエラーで中断する
+        mock_instance.databases.query.side_effect = [first_page, RuntimeError("connection lost")]
+        
+        original_interval = config.CHECKPOINT_INTERVAL
+        config.CHECKPOINT_INTERVAL = 1
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                checkpoint_path = os.path.join(temp_dir, "checkpoint.jsonl")
+                
+                with self.assertRaises(RuntimeError):
+                    NotionClient(checkpoint_path=checkpoint_path).get_all_tasks()
+                self.assertTrue(os.path.exists(checkpoint_path))
+                
+                # チェックポイントには取得済みのタスクを保存する
+                with open(checkpoint_path, "r", encoding="utf-8") as f:
+                    entry = json.loads(f.readlines()[1])
+                self.assertEqual([task["notion_id"] for task in entry["tasks"]], ["notion_page_id_1", "notion_page_id_2"])
+                
+                # 再開時は取得済みのページを取得し直さず、保存したカーソルから続きを取得する
+                mock_instance.databases.query.reset_mock()
+                mock_instance.databases.query.side_effect = [second_page]
+                tasks = NotionClient(checkpoint_path=checkpoint_path, resume=True).get_all_tasks()
+                
+                mock_instance.pages.retrieve.assert_not_called()
+                
+                self.assertEqual([task["notion_id"] for task in tasks],
+                                 ["notion_page_id_1", "notion_page_id_2", "notion_page_id_3"])
+                mock_instance.databases.query.assert_called_once_with(
+                    database_id="test_database_id", page_size=100, start_cursor="cursor_2"
+                )
+                # 取得が完了したらチェックポイントは削除される
+                self.assertFalse(os.path.exists(checkpoint_path))
+        finally:
+            config.CHECKPOINT_INTERVAL = original_interval
+
+    @patch('notion_api_client.NotionSDKClient')
+    def test_parse_page_parent_relation(self, mock_notion_client):
+        """親タスクのリレーションの解析のテスト"""
+        client = NotionClient()
+        
+        page_data = {
+            "id": "notion_page_id_4",
+            "url": "https://www.notion.so/page4",
+            "properties": {
+                "Name": {"type": "title", "title": [{"plain_text": "子タスク"}]},
+                "Parent task": {"type": "relation", "relation": [{"id": "notion_page_id_1"}]}
+            }
+        }
+        
+        task = client._parse_page(page_data)
+        
+        self.assertEqual(task["parent_id"], "notion_page_id_1")
+
+    @patch('notion_api_client.NotionSDKClient')
+    def test_fetch_page_bodies(self, mock_notion_client):
+        """ページ本文の取得とキャッシュのテスト"""
+        def list_children(block_id, page_size, start_cursor=None):
+            if block_id == "page1" and start_cursor is None:
+                return {
+                    "results": [{"id": "b1", "type": "paragraph", "has_children": False,
+                                 "paragraph": {"rich_text": [{"plain_text": "1ページ目"}]}}],
+                    "has_more": True, "next_cursor": "cursor_2"
+                }
+            if block_id == "page1":
+                return {
+                    "results": [{"id": "b2", "type": "bulleted_list_item", "has_children": True,
+                                 "bulleted_list_item": {"rich_text": [{"plain_text": "親"}]}}],
+                    "has_more": False
+                }
+            if block_id == "b2":
+                return {
+                    "results": [{"id": "b3", "type": "bulleted_list_item", "has_children": False,
+                                 "bulleted_list_item": {"rich_text": [{"plain_text": "子"}]}}],
+                    "has_more": False
+                }
+            raise ValueError(f"unexpected block: {block_id}")
+        
+        mock_instance = mock_notion_client.return_value
+        mock_instance.blocks.children.list.side_effect = list_children
+        
+        original_cache_dir = config.BLOCK_CACHE_DIR
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                config.BLOCK_CACHE_DIR = temp_dir
+                client = NotionClient()
+                
+                tasks = [{"notion_id": "page1", "last_edited_time": "2024-12-01T00:00:00.000Z"}]
+                fetched = client.fetch_page_bodies(tasks)
+                
+                self.assertEqual(fetched, 1)
+                self.assertEqual(tasks[0]["body"], "1ページ目\n\n- 親\n    - 子")
+                self.assertEqual(mock_instance.blocks.children.list.call_count, 3)
+                
+                # 編集されていないページはキャッシュから読み込む
+                tasks = [{"notion_id": "page1", "last_edited_time": "2024-12-01T00:00:00.000Z"}]
+                self.assertEqual(client.fetch_page_bodies(tasks), 0)
+                self.assertEqual(tasks[0]["body"], "1ページ目\n\n- 親\n    - 子")
+                self.assertEqual(mock_instance.blocks.children.list.call_count, 3)
+                
+                # 編集されたページは再取得する
+                tasks = [{"notion_id": "page1", "last_edited_time": "2024-12-02T00:00:00.000Z"}]
+                self.assertEqual(client.fetch_page_bodies(tasks), 1)
+                self.assertEqual(mock_instance.blocks.children.list.call_count, 6)
+        finally:
+            config.BLOCK_CACHE_DIR = original_cache_dir
+
+    @patch('notion_api_client.NotionSDKClient')
+    def test_get_all_tasks_with_criteria(self, mock_notion_client):
+        """取得条件がfilter / sortsとしてクエリに渡されるかのテスト"""
+        mock_instance = mock_notion_client.return_value
+        mock_instance.databases.retrieve.return_value = {
+            "properties": {
+                "Name": {"type": "title"},
+                "Status": {"type": "status"},
+                "Tags": {"type": "multi_select"}
+            }
+        }
+        mock_instance.databases.query.return_value = self.mock_data
+        
+        client = NotionClient()
+        client.apply_criteria({"status": ["In progress"], "sort": ["last_edited_time:descending"]})
+        client.get_all_tasks()
+        
+        mock_instance.databases.query.assert_called_once_with(
+            database_id="test_database_id", page_size=100,
+            filter={"property": "Status", "status": {"equals": "In progress"}},
+            sorts=[{"timestamp": "last_edited_time", "direction": "descending"}]
+        )
+
+    @patch('notion_api_client.NotionSDKClient')
+    def test_get_all_tasks_filter_properties(self, mock_notion_client):
+        """使用するプロパティのIDだけをfilter_propertiesで要求するかのテスト"""
+        mock_instance = mock_notion_client.return_value
+        mock_instance.databases.retrieve.return_value = {
+            "properties": {
+                "Name": {"id": "title", "type": "title"},
+                "Status": {"id": "a%3Bc", "type": "status"},
+                "Memo": {"id": "m1", "type": "rich_text"},
+                # FIELD_MAPPINGにない名前でも、_parse_pageが読み取る型のプロパティは取得する
+                "Labels": {"id": "l1", "type": "multi_select"},
+                "Owner": {"id": "o1", "type": "people"},
+                "Deadline": {"id": "d1", "type": "date"},
+                "Formula": {"id": "f1", "type": "formula"},
+                "Related": {"id": "r1", "type": "relation"}
+            }
+        }
+        mock_instance.request.return_value = self.mock_data
+        
+        client = NotionClient()
+        tasks = client.get_all_tasks()
+        client.get_all_tasks()
+        
+        self.assertEqual(len(tasks), 3)
+        mock_instance.databases.query.assert_not_called()
+        # スキーマの取得は1回だけ
+        mock_instance.databases.retrieve.assert_called_once_with("test_database_id")
+        mock_instance.request.assert_called_with(
+            path="databases/test_database_id/query",
+            method="POST",
+            query={"filter_properties": ["title", "a%3Bc", "m1", "l1", "o1", "d1"]},
+            body={"page_size": 100}
+        )
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
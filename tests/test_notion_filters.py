@@ -0,0 +1,79 @@
+"""
+notion_filtersのテスト
+
+取得条件からNotionのfilter / sortsへの変換をテストします。
+"""
+
+import unittest
+import os
+import sys
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from notion_filters import build_filter, build_sorts, compile_query, parse_where
+
+SCHEMA = {
+    "Name": {"type": "title"},
+    "Status": {"type": "status"},
+    "Tags": {"type": "multi_select"},
+    "Due Date": {"type": "date"},
+    "Estimate": {"type": "number"},
+    "Owner": {"type": "people"}
+}
+
+class TestNotionFilters(unittest.TestCase):
+    """取得条件の変換のテスト"""
+    
+    def test_build_filter_empty(self):
+        """条件がなければフィルターを作らないかのテスト"""
+        self.assertIsNone(build_filter({}, SCHEMA))
+    
+    def test_build_filter_combines_conditions(self):
+        """複数の条件がANDで、同じ条件の複数の値がORでまとめられるかのテスト"""
+        query_filter = build_filter({
+            "status": ["In progress", "Backlog"],
+            "tags": ["SDK/計測"],
+            "due_before": "2024-12-31",
+            "edited_after": "2024-06-01T00:00:00Z"
+        }, SCHEMA)
+        
+        self.assertEqual(query_filter, {"and": [
+            {"or": [
+                {"property": "Status", "status": {"equals": "In progress"}},
+                {"property": "Status", "status": {"equals": "Backlog"}}
+            ]},
+            {"property": "Tags", "multi_select": {"contains": "SDK/計測"}},
+            {"property": "Due Date", "date": {"on_or_before": "2024-12-31"}},
+            {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": "2024-06-01T00:00:00Z"}}
+        ]})
+    
+    def test_parse_where(self):
+        """任意のプロパティの条件がスキーマの型で変換されるかのテスト"""
+        self.assertEqual(parse_where("Estimate:greater_than:3", SCHEMA),
+                         {"property": "Estimate", "number": {"greater_than": 3}})
+        self.assertEqual(parse_where("Owner:is_empty", SCHEMA),
+                         {"property": "Owner", "people": {"is_empty": True}})
+        
+        with self.assertRaises(ValueError):
+            parse_where("Unknown:equals:x", SCHEMA)
+        with self.assertRaises(ValueError):
+            parse_where("Estimate:equals", SCHEMA)
+    
+    def test_build_sorts(self):
+        """ソートの指定の変換のテスト"""
+        self.assertEqual(build_sorts(["Due Date", "created_time:descending"]), [
+            {"property": "Due Date", "direction": "ascending"},
+            {"timestamp": "created_time", "direction": "descending"}
+        ])
+        with self.assertRaises(ValueError):
+            build_sorts(["Due Date:up"])
+    
+    def test_compile_query_raw_filter(self):
+        """Notionのfilterオブジェクトをそのまま指定できるかのテスト"""
+        raw_filter = {"property": "Estimate", "number": {"is_not_empty": True}}
+        self.assertEqual(compile_query({"filter": raw_filter}, SCHEMA), {"filter": raw_filter})
+        self.assertEqual(compile_query({}, SCHEMA), {})
+
+if __name__ == '__main__':
+    unittest.main()
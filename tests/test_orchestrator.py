@@ -0,0 +1,211 @@
+"""
+SyncOrchestratorのテスト
+
+マニフェストの読み込みと、複数ジョブのラウンドロビン実行をテストします。
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch, MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import orchestrator
+from orchestrator import SyncOrchestrator, aggregate_stats, job_path, load_manifest
+import config
+
+class TestOrchestrator(unittest.TestCase):
+    """orchestratorモジュールのテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        
+        self.original_values = {
+            name: getattr(config, name) for name in
+            ("NOTION_API_KEY", "GITHUB_TOKEN", "GITHUB_OWNER", "DEAD_LETTER_FILE",
+             "IMPORT_STATE_FILE", "NOTION_CHECKPOINT_FILE", "MAX_RETRIES")
+        }
+        config.NOTION_API_KEY = "test_api_key"
+        config.GITHUB_TOKEN = "test_github_token"
+        config.GITHUB_OWNER = "test_owner"
+        config.DEAD_LETTER_FILE = os.path.join(self.temp_dir.name, "failed_tasks.jsonl")
+        config.IMPORT_STATE_FILE = os.path.join(self.temp_dir.name, "import_state.jsonl")
+        config.NOTION_CHECKPOINT_FILE = None
+    
+    def tearDown(self):
+        """テストの後処理"""
+        for name, value in self.original_values.items():
+            setattr(config, name, value)
+        self.temp_dir.cleanup()
+    
+    def test_load_manifest(self):
+        """マニフェストの読み込みとデフォルト値の適用のテスト"""
+        path = os.path.join(self.temp_dir.name, "manifest.json")
+        with open(path, "w") as f:
+            json.dump({
+                "settings": {"MAX_RETRIES": 7},
+                "defaults": {"github_owner": "my-org"},
+                "jobs": [
+                    {"notion_database_id": "db1", "github_project_number": 1},
+                    {"name": "team-b", "notion_database_id": "db2", "github_project_number": 2,
+                     "github_owner": "other-org"}
+                ]
+            }, f)
+        
+        manifest = load_manifest(path)
+        orchestrator.apply_settings(manifest["settings"])
+        
+        self.assertEqual(config.MAX_RETRIES, 7)
+        self.assertEqual(manifest["jobs"][0]["name"], "job1")
+        self.assertEqual(manifest["jobs"][0]["github_owner"], "my-org")
+        self.assertEqual(manifest["jobs"][1]["github_owner"], "other-org")
+        self.assertEqual(job_path("failed_tasks.jsonl", "team-b"), "failed_tasks.team-b.jsonl")
+    
+    def test_load_manifest_invalid_job(self):
+        """必須項目が欠けたジョブのテスト"""
+        path = os.path.join(self.temp_dir.name, "manifest.json")
+        with open(path, "w") as f:
+            json.dump({"jobs": [{"notion_database_id": "db1"}]}, f)
+        
+        with self.assertRaises(ValueError):
+            load_manifest(path)
+    
+    @patch('orchestrator.GitHubClient')
+    @patch('orchestrator.NotionClient')
+    @patch('orchestrator.NotionSDKClient')
+    def test_run_round_robin(self, mock_sdk_client, mock_notion_client, mock_github_client):
+        """ジョブ間のラウンドロビン実行と共有リソースのテスト"""
+        tasks_by_db = {
+            "db1": [{"title": "A1"}, {"title": "A2"}, {"title": "A3"}],
+            "db2": [{"title": "B1"}]
+        }
+        # db1の取得はB1のインポートが終わるまで終わらない
+        b1_imported = threading.Event()
+        def notion_client(**kwargs):
+            def get_all_tasks():
+                if kwargs["database_id"] == "db1":
+                    b1_imported.wait(5)
+                return tasks_by_db[kwargs["database_id"]]
+            return MagicMock(get_all_tasks=get_all_tasks)
+        mock_notion_client.side_effect = notion_client
+        
+        imported = []
+        def import_task(task, **kwargs):
+            imported.append(task["title"])
+            if task["title"] == "B1":
+                b1_imported.set()
+            return (True, None)
+        mock_github_client.return_value.import_task.side_effect = import_task
+        
+        jobs = [
+            {"name": "a", "notion_database_id": "db1", "github_project_number": 1},
+            {"name": "b", "notion_database_id": "db2", "github_project_number": 2}
+        ]
+        results = SyncOrchestrator(jobs).run()
+        
+        # 取得に時間のかかるジョブが、他のジョブのインポートを待たせない
+        self.assertEqual(imported, ["B1", "A1", "A2", "A3"])
+        self.assertEqual(results["a"]["success"], 3)
+        self.assertEqual(results["b"]["total"], 1)
+        self.assertEqual(aggregate_stats(results)["success"], 4)
+        
+        # 同じAPIキーのSDKクライアント、HTTPセッション、レートリミッターは共有される
+        mock_sdk_client.assert_called_once_with(auth="test_api_key")
+        notion_kwargs = [call.kwargs for call in mock_notion_client.call_args_list]
+        self.assertIs(notion_kwargs[0]["rate_limiter"], notion_kwargs[1]["rate_limiter"])
+        self.assertIs(notion_kwargs[0]["schema_cache"], notion_kwargs[1]["schema_cache"])
+        github_kwargs = [call.kwargs for call in mock_github_client.call_args_list]
+        self.assertIs(github_kwargs[0]["session"], github_kwargs[1]["session"])
+        self.assertEqual(github_kwargs[1]["project_number"], "2")
+        
+        # 状態ファイルはジョブごとに分ける
+        github_client = mock_github_client.return_value
+        state_stores = [call.kwargs["state_store"] for call in github_client.import_task.call_args_list]
+        self.assertEqual({os.path.basename(store.path) for store in state_stores},
+                         {"import_state.a.jsonl", "import_state.b.jsonl"})
+    
+    def test_same_database_in_two_projects(self):
+        """同じデータベースを2つのプロジェクトに同期するジョブが、状態を共有しないかのテスト"""
+        jobs = [
+            {"name": "a", "notion_database_id": "db1", "github_project_number": 1},
+            {"name": "b", "notion_database_id": "db1", "github_project_number": 2}
+        ]
+        orchestrator = SyncOrchestrator(jobs)
+        orchestrator.state_stores["a"].record_created("page1", "PVTI_a")
+        orchestrator.state_stores["a"].mark_done("page1")
+        
+        self.assertTrue(orchestrator.state_stores["a"].is_done("page1"))
+        self.assertIsNone(orchestrator.state_stores["b"].get("page1"))
+    
+    @patch('orchestrator.load_project_index')
+    @patch('orchestrator.GitHubClient')
+    @patch('orchestrator.NotionClient')
+    @patch('orchestrator.NotionSDKClient')
+    def test_run_isolates_job_setup_failure(self, mock_sdk_client, mock_notion_client, mock_github_client,
+                                           mock_load_index):
+        """1つのジョブのGitHub Projectの準備に失敗しても、他のジョブを続行するかのテスト"""
+        mock_notion_client.return_value.get_all_tasks.return_value = [{"title": "B1"}]
+        mock_github_client.return_value.import_task.return_value = (True, None)
+        mock_load_index.side_effect = [
+            RuntimeError("Could not resolve to a ProjectV2"), MagicMock(find=MagicMock(return_value=None))
+        ]
+        
+        jobs = [
+            {"name": "a", "notion_database_id": "db1", "github_project_number": 1},
+            {"name": "b", "notion_database_id": "db2", "github_project_number": 2}
+        ]
+        results = SyncOrchestrator(jobs).run()
+        
+        self.assertEqual(results["a"]["failed"], 1)
+        self.assertIn("Could not resolve", results["a"]["failures"][0]["error"])
+        self.assertEqual(results["b"]["success"], 1)
+        mock_notion_client.assert_called_once()
+    
+    @patch('orchestrator.plan_migration')
+    @patch('orchestrator.GitHubClient')
+    @patch('orchestrator.NotionClient')
+    @patch('orchestrator.NotionSDKClient')
+    def test_run_dry_run_plans_each_job(self, mock_sdk_client, mock_notion_client, mock_github_client,
+                                        mock_plan_migration):
+        """ドライランでジョブごとに移行計画を作成し、インポートはしないかのテスト"""
+        mock_notion_client.return_value.get_all_tasks.return_value = [{"title": "A1"}]
+        mock_plan_migration.side_effect = lambda github_client, tasks, state_store: {"request_count": len(tasks)}
+        
+        jobs = [
+            {"name": "a", "notion_database_id": "db1", "github_project_number": 1},
+            {"name": "b", "notion_database_id": "db2", "github_project_number": 2}
+        ]
+        orchestrator = SyncOrchestrator(jobs)
+        results = orchestrator.run(dry_run=True)
+        
+        self.assertEqual(results["a"]["plan"], {"request_count": 1})
+        self.assertEqual(results["b"]["plan"], {"request_count": 1})
+        state_stores = {call.args[2] for call in mock_plan_migration.call_args_list}
+        self.assertEqual(state_stores, {orchestrator.state_stores["a"], orchestrator.state_stores["b"]})
+        mock_github_client.return_value.import_task.assert_not_called()
+    
+    def test_duplicate_project_with_prune(self):
+        """整理を行う場合に、同じプロジェクトを対象にするジョブを拒否するかのテスト"""
+        jobs = [
+            {"name": "a", "notion_database_id": "db1", "github_project_number": 1},
+            {"name": "b", "notion_database_id": "db2", "github_project_number": "1"}
+        ]
+        original_prune_action = config.PRUNE_ACTION
+        try:
+            config.PRUNE_ACTION = "archive"
+            with self.assertRaises(ValueError):
+                SyncOrchestrator(jobs)
+            
+            config.PRUNE_ACTION = ""
+            SyncOrchestrator(jobs)
+        finally:
+            config.PRUNE_ACTION = original_prune_action
+
+if __name__ == '__main__':
+    unittest.main()
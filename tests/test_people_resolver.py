@@ -0,0 +1,87 @@
+"""
+PeopleResolverのテスト
+
+Notionの担当者からGitHubのユーザーへの対応づけとキャッシュをテストします。
+"""
+
+import json
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from people_resolver import PeopleResolver
+
+MAPPING = {
+    "user-id-1": "alice",
+    "bob@example.com": "bob",
+    "Carol": "carol-gone"
+}
+
+class TestPeopleResolver(unittest.TestCase):
+    """PeopleResolverクラスのテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, "cache", "github_users.json")
+        self.github_client = MagicMock()
+        self.github_client.run_batched_queries.return_value = [
+            ({"id": "U_alice", "login": "alice"}, None),
+            ({"id": "U_bob", "login": "bob"}, None),
+            (None, "Could not resolve to a User with the login of 'carol-gone'.")
+        ]
+    
+    def tearDown(self):
+        """テストの後処理"""
+        self.temp_dir.cleanup()
+    
+    def test_resolve_tasks(self):
+        """同じ人を1回だけ問い合わせ、タスクにユーザーIDを設定するかのテスト"""
+        tasks = [
+            {"people": [{"id": "user-id-1", "name": "Alice"}, {"id": "x", "name": "Bob", "email": "bob@example.com"}]},
+            {"people": [{"id": "user-id-1", "name": "Alice"}, {"id": "y", "name": "Carol"}]},
+            {"people": [{"id": "z", "name": "Unknown"}]}
+        ]
+        
+        resolver = PeopleResolver(self.github_client, MAPPING, self.cache_path)
+        self.assertEqual(resolver.resolve_tasks(tasks), 2)
+        
+        operations = self.github_client.run_batched_queries.call_args[0][0]
+        self.assertEqual(operations, [
+            'user(login: "alice") { id login }',
+            'user(login: "bob") { id login }',
+            'user(login: "carol-gone") { id login }'
+        ])
+        
+        self.assertEqual(tasks[0]["assignee_ids"], ["U_alice", "U_bob"])
+        self.assertEqual(tasks[1]["assignee_logins"], ["alice"])
+        self.assertNotIn("assignee_ids", tasks[2])
+        
+        # 存在しないユーザーも含めてキャッシュされる
+        with open(self.cache_path, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"alice": "U_alice", "bob": "U_bob", "carol-gone": None})
+    
+    def test_lookup_uses_cache(self):
+        """キャッシュにあるユーザーは問い合わせないかのテスト"""
+        PeopleResolver(self.github_client, MAPPING, self.cache_path).lookup(["alice", "bob", "carol-gone"])
+        self.github_client.run_batched_queries.reset_mock()
+        
+        resolver = PeopleResolver(self.github_client, MAPPING, self.cache_path)
+        self.assertEqual(resolver.lookup(["alice", "carol-gone"]), {"alice": "U_alice", "carol-gone": None})
+        self.github_client.run_batched_queries.assert_not_called()
+    
+    def test_transient_error_not_cached(self):
+        """一時的なエラーのユーザーはキャッシュしないかのテスト"""
+        self.github_client.run_batched_queries.return_value = [(None, "502 Bad Gateway")]
+        
+        resolver = PeopleResolver(self.github_client, MAPPING, self.cache_path)
+        self.assertEqual(resolver.lookup(["alice"]), {"alice": None})
+        self.assertNotIn("alice", resolver._user_ids)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+plannerのテスト
+
+ドライランの移行計画とコストの見積もりをテストします。
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from github_client import GitHubClient
+from import_state import ImportStateStore
+from planner import (
+    MigrationPlan, MigrationPlanner, REASON_NO_FIELD, REASON_NO_OPTION, format_duration, plan_migration
+)
+import config
+
+FIELD_IDS = {
+    "Status": "PVTSSF_status",
+    "Status:Done": "OPT_done",
+    "Due Date": "PVTF_due",
+    "Labels": "PVTF_labels"
+}
+
+TASKS = [
+    {"notion_id": "page1", "title": "タスク1", "url": "https://www.notion.so/page1",
+     "status": "Done", "tags": ["bug"], "assignees": ["alice"], "parent_id": "page2"},
+    {"notion_id": "page2", "title": "タスク2", "url": "https://www.notion.so/page2",
+     "status": "Review", "due_date": "2024-01-01"},
+    {"notion_id": "page3", "title": "タスク3", "url": "https://www.notion.so/page3"}
+]
+
+class TestPlanner(unittest.TestCase):
+    """移行計画のテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.original_auto_create_options = config.AUTO_CREATE_OPTIONS
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.github_client = MagicMock()
+        self.github_client._import_steps.side_effect = lambda task: GitHubClient._import_steps(self.github_client, task)
+    
+    def tearDown(self):
+        """テストの後処理"""
+        config.AUTO_CREATE_OPTIONS = self.original_auto_create_options
+        self.temp_dir.cleanup()
+    
+    def test_plan(self):
+        """実行されるリクエストとスキップされる更新を数えるかのテスト"""
+        config.AUTO_CREATE_OPTIONS = False
+        state_store = ImportStateStore(os.path.join(self.temp_dir.name, "import_state.jsonl"))
+        state_store.record_created("page3", "PVTI_3")
+        state_store.mark_done("page3")
+        
+        plan = MigrationPlanner(self.github_client, FIELD_IDS, state_store).plan(TASKS)
+        
+        self.assertEqual(plan.tasks, {"create": 2, "skip": 1})
+        self.assertEqual(plan.requests["create"], 2)
+        self.assertEqual(plan.requests["body"], 2)
+        self.assertEqual(plan.requests["status"], 1)
+        self.assertEqual(plan.requests["due_date"], 1)
+        self.assertEqual(plan.requests["labels"], 1)
+        self.assertEqual(plan.skipped_steps[("status", REASON_NO_OPTION)], 1)
+        self.assertEqual(plan.skipped_steps[("assignees", REASON_NO_FIELD)], 1)
+        self.assertEqual(plan.batched_requests["parent"], 1)
+        self.assertEqual(plan.request_count, 8)
+    
+    def test_plan_auto_create_options(self):
+        """不足しているオプションを1回のミューテーションで作成する計画になるかのテスト"""
+        config.AUTO_CREATE_OPTIONS = True
+        plan = MigrationPlanner(self.github_client, FIELD_IDS).plan(TASKS)
+        
+        self.assertEqual(plan.requests["status"], 2)
+        self.assertEqual(plan.batched_requests["status_options"], 1)
+        self.assertNotIn(("status", REASON_NO_OPTION), plan.skipped_steps)
+    
+    def test_estimate(self):
+        """ポイントと所要時間の見積もりのテスト"""
+        plan = MigrationPlan()
+        plan.requests["create"] = 160
+        plan.requests["body"] = 160
+        
+        estimate = plan.estimate(requests_per_second=1, concurrency=1)
+        self.assertEqual(estimate["primary_points"], 320)
+        self.assertEqual(estimate["secondary_points"], 1600)
+        # 1リクエスト/秒のレートリミッターが最も遅い
+        self.assertEqual(estimate["seconds"], 320)
+        
+        # レートを上げても、コンテンツ作成の二次レート制限（80件/分）より速くはならない
+        estimate = plan.estimate(requests_per_second=100, concurrency=10)
+        self.assertEqual(estimate["seconds"], 120)
+        self.assertEqual(format_duration(estimate["seconds"]), "2分0秒")
+    
+    def test_plan_migration_uses_configured_concurrency(self):
+        """所要時間をGITHUB_MAX_CONCURRENCYの同時実行数で見積もるかのテスト"""
+        original_values = (config.GITHUB_MAX_CONCURRENCY, config.GITHUB_REQUESTS_PER_SECOND,
+                           config.EXISTING_ITEM_POLICY)
+        try:
+            config.GITHUB_REQUESTS_PER_SECOND = 1000
+            config.EXISTING_ITEM_POLICY = "off"
+            self.github_client.get_field_ids.return_value = FIELD_IDS
+            tasks = [{"notion_id": f"page{i}", "title": f"タスク{i}", "status": "Done"} for i in range(10)]
+            
+            config.GITHUB_MAX_CONCURRENCY = 1
+            sequential = plan_migration(self.github_client, tasks)
+            config.GITHUB_MAX_CONCURRENCY = 4
+            concurrent = plan_migration(self.github_client, tasks)
+            
+            self.assertEqual(sequential["seconds"], sequential["request_count"] * 0.5)
+            self.assertLess(concurrent["seconds"], sequential["seconds"])
+        finally:
+            (config.GITHUB_MAX_CONCURRENCY, config.GITHUB_REQUESTS_PER_SECOND,
+             config.EXISTING_ITEM_POLICY) = original_values
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+profilingのテスト
+
+処理ごとの時間の計測と、差し替えたメソッドの復元をテストします。
+"""
+
+import unittest
+import json
+import os
+import pstats
+import sys
+import tempfile
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from profiling import StageProfiler
+from notion_api_client import NotionClient
+
+class FakeClock:
+    """テスト用の時計（呼び出すたびに1秒進む）"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+class Base:
+    """テスト用のクラス"""
+
+    def fetch(self):
+        return "base"
+
+class Client(Base):
+    """テスト用のクラス（fetchは継承）"""
+
+    def send(self, value):
+        return value * 2
+
+class TestStageProfiler(unittest.TestCase):
+    """StageProfilerクラスのテスト"""
+
+    def test_records_stages(self):
+        """差し替えたメソッドの呼び出し回数と時間を記録し、終了時に元に戻すかのテスト"""
+        profiler = StageProfiler(clock=FakeClock(), cpu_clock=lambda: 0.0)
+        profiler.start([(Client, "send", "送信"), (Client, "fetch", "取得")])
+
+        client = Client()
+        self.assertEqual(client.send(2), 4)
+        self.assertEqual(client.send(3), 6)
+        self.assertEqual(client.fetch(), "base")
+        profiler.stop()
+        profiler.stop()
+
+        snapshot = profiler.snapshot()
+        self.assertEqual(
+            [(stage["name"], stage["calls"], stage["wall"]) for stage in snapshot["stages"]],
+            [("送信", 2, 2.0), ("取得", 1, 1.0)]
+        )
+        # 継承したメソッドは削除して親クラスのものに戻す
+        self.assertIs(Client.send, vars(Client)["send"])
+        self.assertNotIn("fetch", vars(Client))
+        self.assertEqual(Client().fetch(), "base")
+
+    def test_default_stages_are_restored(self):
+        """標準の計測対象を元に戻し、cProfileのプロファイルを書き出すかのテスト"""
+        dumps, parse_page = json.dumps, NotionClient._parse_page
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "run.prof")
+            profiler = StageProfiler(path)
+            profiler.start()
+            self.assertIsNot(json.dumps, dumps)
+            json.dumps({"title": "タスク"})
+            profiler.stop()
+
+            self.assertIs(json.dumps, dumps)
+            self.assertIs(NotionClient._parse_page, parse_page)
+            self.assertEqual(profiler.snapshot()["stages"][0]["name"], "JSONの変換")
+            self.assertTrue(pstats.Stats(path).total_calls > 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+ProjectItemIndexのテスト
+
+既存アイテムの索引と、それを使った重複インポートの防止をテストします。
+"""
+
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from project_index import EXISTING_UPDATE, ProjectItemIndex, notion_url_of, page_id_from_url
+from task_importer import TaskImporter, new_stats
+
+PAGE_ID = "83c75a51-b3fe-4a1a-ad9f-0cbe6d75c89e"
+
+ITEMS = [
+    {"id": "PVTI_1", "title": "改名前のタイトル", "body": "説明\n\n*From Notion: https://www.notion.so/page1*"},
+    {"id": "PVTI_5", "title": "古い名前", "body": "*From Notion: https://www.notion.so/ws/Old-83c75a51b3fe4a1aad9f0cbe6d75c89e*"},
+    {"id": "PVTI_2", "title": "手動で作成したタスク", "body": ""},
+    {"id": "PVTI_3", "title": "重複", "body": ""},
+    {"id": "PVTI_4", "title": "重複", "body": ""}
+]
+
+class TestProjectItemIndex(unittest.TestCase):
+    """ProjectItemIndexクラスのテスト"""
+    
+    def test_notion_url_of(self):
+        """説明からNotionのURLを取り出せるかのテスト"""
+        self.assertEqual(notion_url_of(ITEMS[0]["body"]), "https://www.notion.so/page1")
+        self.assertIsNone(notion_url_of(""))
+    
+    def test_page_id_from_url(self):
+        """URLからページIDを取り出すかのテスト"""
+        self.assertEqual(page_id_from_url("https://www.notion.so/Task-83c75a51b3fe4a1aad9f0cbe6d75c89e?pvs=4"), PAGE_ID)
+        self.assertIsNone(page_id_from_url("https://example.com/"))
+    
+    def test_find(self):
+        """NotionのURL、一意なタイトルの順に照合するかのテスト"""
+        index = ProjectItemIndex(ITEMS)
+        
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.find({"url": "https://www.notion.so/page1", "title": "新しいタイトル"})["id"], "PVTI_1")
+        self.assertEqual(index.find({"url": "https://www.notion.so/page2", "title": " 手動で作成したタスク "})["id"],
+                         "PVTI_2")
+        # 同じタイトルが複数あるときは照合しない
+        self.assertIsNone(index.find({"url": "https://www.notion.so/page3", "title": "重複"}))
+        self.assertIsNone(index.find({"url": "https://www.notion.so/page4", "title": "新規"}))
+        # ページの名前を変えてURLが変わっても、ページIDで照合する
+        renamed = {"notion_id": PAGE_ID, "url": "https://www.notion.so/ws/New-83c75a51b3fe4a1aad9f0cbe6d75c89e"}
+        self.assertEqual(index.find(renamed)["id"], "PVTI_5")
+        self.assertEqual(index.find({"notion_id": PAGE_ID})["id"], "PVTI_5")
+        # タイトルで照合しない場合は、NotionのURLがないアイテムには一致しない
+        self.assertIsNone(index.find({"url": "https://www.notion.so/page2", "title": "手動で作成したタスク"}, by_title=False))
+    
+    def test_importer_skips_existing(self):
+        """既存のタスクをスキップし、新しいタスクだけを作成するかのテスト"""
+        github_client = MagicMock()
+        github_client.imported_items = {}
+        github_client.import_task.return_value = (True, None)
+        stats = new_stats()
+        importer = TaskImporter(github_client, stats,
+                                item_index=ProjectItemIndex(ITEMS), existing_policy="skip")
+        
+        importer.import_task({"notion_id": "page1", "url": "https://www.notion.so/page1", "title": "タスク1"})
+        importer.import_task({"notion_id": "page5", "url": "https://www.notion.so/page5", "title": "新規"})
+        
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(stats["success"], 1)
+        self.assertEqual(github_client.imported_items, {"page1": "PVTI_1"})
+        self.assertEqual(github_client.import_task.call_count, 1)
+        self.assertIsNone(github_client.import_task.call_args[1]["existing_item_id"])
+    
+    def test_importer_skips_duplicates_in_run(self):
+        """同じ実行の中で作成したタスクを重複して作成しないかのテスト"""
+        github_client = MagicMock()
+        github_client.imported_items = {}
+        def import_task(task, **kwargs):
+            github_client.imported_items[task["notion_id"]] = "PVTI_new"
+            return (True, None)
+        github_client.import_task.side_effect = import_task
+        stats = new_stats()
+        importer = TaskImporter(github_client, stats, item_index=ProjectItemIndex(), existing_policy="skip")
+        
+        task = {"notion_id": PAGE_ID, "url": "https://www.notion.so/ws/New-83c75a51b3fe4a1aad9f0cbe6d75c89e",
+                "title": "新規"}
+        importer.import_task(task)
+        importer.import_task(dict(task))
+        
+        self.assertEqual(stats["success"], 1)
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(github_client.import_task.call_count, 1)
+    
+    def test_importer_updates_existing(self):
+        """updateの場合は既存のアイテムIDを渡して更新するかのテスト"""
+        github_client = MagicMock()
+        github_client.import_task.return_value = (True, None)
+        stats = new_stats()
+        importer = TaskImporter(github_client, stats,
+                                item_index=ProjectItemIndex(ITEMS), existing_policy=EXISTING_UPDATE)
+        
+        importer.import_task({"notion_id": "page1", "url": "https://www.notion.so/page1", "title": "タスク1"})
+        
+        self.assertEqual(stats["success"], 1)
+        self.assertEqual(github_client.import_task.call_args[1]["existing_item_id"], "PVTI_1")
+        
+        # タイトルだけが一致する手動のアイテムは上書きせず、新しく作成する
+        importer.import_task({"notion_id": "page2", "url": "https://www.notion.so/page2", "title": "手動で作成したタスク"})
+        self.assertIsNone(github_client.import_task.call_args[1]["existing_item_id"])
+
+if __name__ == '__main__':
+    unittest.main()
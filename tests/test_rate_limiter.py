@@ -0,0 +1,70 @@
+"""
+RateLimiterのテスト
+
+トークンバケットによる待機時間の計算をテストします。
+"""
+
+import asyncio
+import unittest
+import os
+import sys
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rate_limiter import AsyncRateLimiter, RateLimiter
+
+class FakeClock:
+    """テスト用の時計"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.now += seconds
+    
+    async def async_sleep(self, seconds):
+        self.now += seconds
+
+class TestRateLimiter(unittest.TestCase):
+    """RateLimiterクラスのテスト"""
+    
+    def test_acquire_waits_for_tokens(self):
+        """トークンがなくなると補充まで待機するかのテスト"""
+        clock = FakeClock()
+        limiter = RateLimiter(2, burst=2, clock=clock, sleep=clock.sleep)
+        
+        # バースト分は待たずに取得できる
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertEqual(limiter.acquire(), 0)
+        
+        # 以降は 1 / rate 秒ごとに1回
+        self.assertAlmostEqual(limiter.acquire(), 0.5)
+        self.assertAlmostEqual(clock.now, 0.5)
+        
+        clock.now += 10
+        self.assertEqual(limiter.acquire(), 0)
+    
+    def test_invalid_rate(self):
+        """不正なレートのテスト"""
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+    def test_async_acquire_waits_for_tokens(self):
+        """非同期版でもトークンがなくなると補充まで待機するかのテスト"""
+        clock = FakeClock()
+        limiter = AsyncRateLimiter(4, clock=clock, sleep=clock.async_sleep)
+        
+        async def acquire_three():
+            return [await limiter.acquire() for _ in range(3)]
+        
+        waits = asyncio.run(acquire_three())
+        self.assertEqual(waits[0], 0)
+        self.assertAlmostEqual(waits[1], 0.25)
+        self.assertAlmostEqual(clock.now, 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
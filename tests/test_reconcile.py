@@ -0,0 +1,91 @@
+"""
+reconcileのテスト
+
+Notionで削除されたタスクのアイテムの検出と整理をテストします。
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from import_state import ImportStateStore
+from project_index import ProjectItemIndex
+from reconcile import PRUNE_DELETE, find_orphans, prune_orphans
+
+def item(item_id, url=None, archived=False):
+    """テスト用のアイテム"""
+    body = f"*From Notion: {url}*" if url else ""
+    return {"id": item_id, "title": item_id, "body": body, "archived": archived}
+
+TASKS = [{"notion_id": "page1", "url": "https://www.notion.so/page1"}]
+
+class TestReconcile(unittest.TestCase):
+    """孤立したアイテムの整理のテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_store = ImportStateStore(os.path.join(self.temp_dir.name, "import_state.jsonl"))
+        self.index = ProjectItemIndex([
+            item("PVTI_1", "https://www.notion.so/page1"),
+            item("PVTI_2", "https://www.notion.so/page2"),
+            item("PVTI_3", "https://www.notion.so/page3", archived=True),
+            item("PVTI_4"),
+            item("PVTI_5")
+        ])
+    
+    def tearDown(self):
+        """テストの後処理"""
+        self.temp_dir.cleanup()
+    
+    def test_find_orphans(self):
+        """Notionにないタスクのアイテムだけを検出するかのテスト"""
+        # 説明にURLがないが状態ファイルに記録されているアイテム
+        self.state_store.record_created("page5", "PVTI_5")
+        # 別のプロジェクトのアイテム（共有の状態ファイル）
+        self.state_store.record_created("page6", "PVTI_other_project")
+        
+        orphans = find_orphans(TASKS, self.index, self.state_store)
+        
+        # アーカイブ済み、URLのない手動のアイテム、別のプロジェクトのアイテムは対象外
+        self.assertEqual(orphans, {"PVTI_2": None, "PVTI_5": "page5"})
+    
+    def test_renamed_page_is_not_orphan(self):
+        """ページの名前を変えてURLが変わっても、ページIDで照合するかのテスト"""
+        page_id = "83c75a51-b3fe-4a1a-ad9f-0cbe6d75c89e"
+        index = ProjectItemIndex([
+            item("PVTI_1", "https://www.notion.so/workspace/Old-title-83c75a51b3fe4a1aad9f0cbe6d75c89e")
+        ])
+        tasks = [{"notion_id": page_id, "url": "https://www.notion.so/workspace/New-title-83c75a51b3fe4a1aad9f0cbe6d75c89e"}]
+        
+        self.assertEqual(find_orphans(tasks, index), {})
+        # URLがなくてもページIDで照合する
+        self.assertEqual(find_orphans([{"notion_id": page_id}], index), {})
+    
+    def test_prune_orphans(self):
+        """孤立したアイテムを一括で削除し、状態ファイルから消すかのテスト"""
+        self.state_store.record_created("page2", "PVTI_2")
+        self.state_store.mark_done("page2")
+        github_client = MagicMock()
+        github_client.remove_items.return_value = ["PVTI_2"]
+        
+        pruned = prune_orphans(github_client, TASKS, self.index, self.state_store, PRUNE_DELETE)
+        
+        self.assertEqual(pruned, 1)
+        github_client.remove_items.assert_called_once_with(["PVTI_2"], archive=False)
+        self.assertIsNone(self.state_store.get("page2"))
+    
+    def test_prune_orphans_without_tasks(self):
+        """Notionから1件も取得できなかった場合は何もしないかのテスト"""
+        github_client = MagicMock()
+        
+        self.assertEqual(prune_orphans(github_client, [], self.index, self.state_store), 0)
+        github_client.remove_items.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
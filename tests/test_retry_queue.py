@@ -0,0 +1,180 @@
+"""
+リトライキューのテスト
+
+エラー分類、リクエストの再試行、デッドレターファイルの読み書きをテストします。
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, Mock
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from retry_queue import (
+    DeadLetterQueue, RateLimitedError, RetryPolicy, call_with_retry, classify_exception, failed_before_write,
+    PERMANENT, TRANSIENT
+)
+from github_client import GitHubClient
+from timeouts import Deadline, DeadlineExceeded
+import config
+
+def http_error(status, headers=None):
+    """テスト用のHTTPエラー"""
+    return requests.HTTPError(f"{status}", response=MagicMock(status_code=status, headers=headers or {}))
+
+class TestRetryQueue(unittest.TestCase):
+    """retry_queueモジュールのテスト"""
+
+    def setUp(self):
+        """テストの前処理"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.sleep = Mock()
+        self.policy = RetryPolicy(max_retries=2, backoff_base=0.1, sleep=self.sleep)
+
+    def tearDown(self):
+        """テストの後処理"""
+        self.temp_dir.cleanup()
+
+    def test_classify_exception(self):
+        """HTTPステータスと例外の型によるエラー分類のテスト"""
+        self.assertEqual(classify_exception(http_error(502)), TRANSIENT)
+        self.assertEqual(classify_exception(http_error(429)), TRANSIENT)
+        self.assertEqual(classify_exception(http_error(403, {"Retry-After": "60"})), TRANSIENT)
+        self.assertEqual(classify_exception(requests.ReadTimeout("Read timed out.")), TRANSIENT)
+        self.assertEqual(classify_exception(requests.ConnectionError("reset")), TRANSIENT)
+        self.assertEqual(classify_exception(RateLimitedError("API rate limit exceeded")), TRANSIENT)
+        self.assertEqual(classify_exception(http_error(403)), PERMANENT)
+        self.assertEqual(classify_exception(http_error(422)), PERMANENT)
+        # メッセージに含まれる数字や単語では判定しない
+        self.assertEqual(classify_exception(ValueError("Body exceeds 500 characters")), PERMANENT)
+        self.assertEqual(classify_exception(ValueError("connection field is invalid")), PERMANENT)
+
+    def test_call_with_retry(self):
+        """一時的なエラーだけを上限まで再試行するかのテスト"""
+        request = Mock(side_effect=[http_error(503), "ok"])
+        self.assertEqual(call_with_retry(request, self.policy), "ok")
+        self.assertEqual(request.call_count, 2)
+        self.sleep.assert_called_once()
+
+        request = Mock(side_effect=http_error(503))
+        with self.assertRaises(requests.HTTPError):
+            call_with_retry(request, self.policy)
+        self.assertEqual(request.call_count, 3)
+
+        # 恒久的なエラーは再試行しない
+        request = Mock(side_effect=ValueError("Validation failed"))
+        with self.assertRaises(ValueError):
+            call_with_retry(request, self.policy)
+        self.assertEqual(request.call_count, 1)
+
+        # 期限までに再試行できない場合は、失敗ではなく期限切れとして送出する
+        request = Mock(side_effect=http_error(503))
+        with self.assertRaises(DeadlineExceeded):
+            call_with_retry(request, RetryPolicy(backoff_base=60, sleep=self.sleep), Deadline(0.001))
+        self.assertEqual(request.call_count, 1)
+
+    def test_non_idempotent_request(self):
+        """冪等でないリクエストは、サーバーに届く前の失敗だけを再試行するかのテスト"""
+        connect_error = requests.ConnectionError(MagicMock(reason=NewConnectionError(None, "refused")))
+        self.assertTrue(failed_before_write(connect_error))
+        self.assertTrue(failed_before_write(requests.ConnectTimeout("connect timed out")))
+        self.assertTrue(failed_before_write(http_error(429)))
+        self.assertTrue(failed_before_write(RateLimitedError("API rate limit exceeded")))
+        self.assertFalse(failed_before_write(requests.ReadTimeout("Read timed out.")))
+        self.assertFalse(failed_before_write(requests.ConnectionError("reset")))
+        self.assertFalse(failed_before_write(http_error(502)))
+
+        request = Mock(side_effect=[RateLimitedError("API rate limit exceeded"), "ok"])
+        self.assertEqual(call_with_retry(request, self.policy, idempotent=False), "ok")
+
+        request = Mock(side_effect=http_error(502))
+        with self.assertRaises(requests.HTTPError):
+            call_with_retry(request, self.policy, idempotent=False)
+        self.assertEqual(request.call_count, 1)
+
+    def test_ambiguous_create_looks_up_item(self):
+        """作成が反映されたか分からない場合、既存のアイテムを確認してから作り直すかのテスト"""
+        original = (config.GITHUB_TOKEN, config.GITHUB_OWNER, config.GITHUB_PROJECT_NUMBER)
+        config.GITHUB_TOKEN, config.GITHUB_OWNER, config.GITHUB_PROJECT_NUMBER = "token", "owner", "1"
+        self.addCleanup(lambda: setattr_all(original))
+        task = {"title": "Task", "url": "https://www.notion.so/Task-83c75a51b3fe4a1aad9f0cbe6d75c89e"}
+        created = {"data": {"addProjectV2DraftItem": {"projectItem": {"id": "PVTI_2"}}}}
+
+        # 作成されていたアイテムを再利用する
+        client = GitHubClient(session=MagicMock(), retry_policy=self.policy)
+        client._project_id = "PVT_1"
+        client._post_graphql_once = Mock(side_effect=requests.ReadTimeout("Read timed out."))
+        client.iter_items = Mock(return_value=[{"id": "PVTI_1", "title": "Task", "body": f"*From Notion: {task['url']}*"}])
+        self.assertEqual(client.create_draft_item(task), "PVTI_1")
+        self.assertEqual(client._post_graphql_once.call_count, 1)
+        self.assertIn(task["url"], client._post_graphql_once.call_args[0][1]["body"])
+
+        # 作成されていなければ作り直す
+        client._post_graphql_once = Mock(side_effect=[http_error(502), created])
+        client.iter_items = Mock(return_value=[{"id": "PVTI_3", "title": "Task", "body": ""}])
+        self.assertEqual(client.create_draft_item(task), "PVTI_2")
+        self.assertEqual(client._post_graphql_once.call_count, 2)
+
+    def test_failed_request_is_retried_alone(self):
+        """失敗したリクエストだけを再試行し、Draftアイテムを重複して作成しないかのテスト"""
+        original = (config.GITHUB_TOKEN, config.GITHUB_OWNER, config.GITHUB_PROJECT_NUMBER)
+        config.GITHUB_TOKEN, config.GITHUB_OWNER, config.GITHUB_PROJECT_NUMBER = "token", "owner", "1"
+        self.addCleanup(lambda: setattr_all(original))
+
+        def response(status, data=None):
+            return MagicMock(ok=status == 200, status_code=status, reason="", text="",
+                             json=Mock(return_value=data or {}))
+
+        session = MagicMock()
+        session.post.side_effect = [
+            response(200, {"data": {"addProjectV2DraftItem": {"projectItem": {"id": "PVTI_1"}}}}),
+            response(502),
+            response(200, {"errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]}),
+            response(200, {"data": {"updateProjectV2ItemFieldValue": {"clientMutationId": None}}})
+        ]
+        client = GitHubClient(session=session, retry_policy=self.policy)
+        client._project_id = "PVT_1"
+
+        success, error = client.import_task({"title": "Task", "description": "本文"})
+
+        self.assertTrue(success, error)
+        self.assertEqual(session.post.call_count, 4)
+        created = [call for call in session.post.call_args_list if "addProjectV2DraftItem" in call[1]["json"]["query"]]
+        self.assertEqual(len(created), 1)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_dead_letter_queue(self):
+        """デッドレターファイルの読み書きのテスト"""
+        path = os.path.join(self.temp_dir.name, "failed.jsonl")
+        queue = DeadLetterQueue(path)
+
+        task = {"title": "テストタスク", "tags": ["sdk"], "url": "https://www.notion.so/page1"}
+        queue.append(task, "Validation failed")
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("{broken\n")
+
+        self.assertEqual(queue.load_tasks(), [task])
+
+        # 前回の実行のファイルは退避し、今回の実行で失敗したタスクだけを書き出す
+        queue.rotate()
+        self.assertEqual(queue.load_tasks(), [])
+        self.assertEqual(DeadLetterQueue(f"{path}.prev").load_tasks(), [task])
+        queue.append(task, "Validation failed")
+
+        queue.clear()
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(queue.load_tasks(), [])
+
+def setattr_all(values):
+    """GitHubの設定を元に戻す"""
+    config.GITHUB_TOKEN, config.GITHUB_OWNER, config.GITHUB_PROJECT_NUMBER = values
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+reverse_syncのテスト
+
+GitHub Projectの変更をNotionに書き戻す同期と、同期のエコーを防ぐ台帳をテストします。
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from reverse_sync import ReverseSync, SyncLedger, notion_properties
+
+PAGE_ID = "0123456789abcdef0123456789abcdef"
+PAGE_UUID = "01234567-89ab-cdef-0123-456789abcdef"
+
+SCHEMA = {
+    "Status": {"type": "status"},
+    "Tags": {"type": "multi_select"},
+    "Due Date": {"type": "date"}
+}
+
+def make_item(status="In Progress", due_date="2024-06-30", labels="admin", updated_at="2024-06-01T10:00:00Z"):
+    """テスト用のアイテム"""
+    return {
+        "id": "PVTI_1",
+        "title": "タスク",
+        "body": f"説明\n\n---\n*From Notion: https://www.notion.so/Task-{PAGE_ID}*",
+        "archived": False,
+        "updated_at": updated_at,
+        "fields": {"Status": status, "Due Date": due_date, "Labels": labels}
+    }
+
+@patch.object(config, "STATUS_MAPPING", {"In progress": "In Progress", "Done": "Done"})
+@patch.object(config, "TAG_MAPPING", {"管理画面/edge": "admin"})
+class TestNotionProperties(unittest.TestCase):
+    """Notionのプロパティへの変換のテスト"""
+
+    def test_inverse_mapping(self):
+        """マッピングを逆引きしてNotionの値に戻すかのテスト"""
+        properties = notion_properties(
+            {"status": "In Progress", "labels": "admin, bug", "due_date": ""}, SCHEMA
+        )
+        self.assertEqual(properties, {
+            "Status": {"status": {"name": "In progress"}},
+            "Tags": {"multi_select": [{"name": "管理画面/edge"}, {"name": "bug"}]},
+            "Due Date": {"date": None}
+        })
+
+@patch.object(config, "STATUS_MAPPING", {"In progress": "In Progress", "Done": "Done"})
+@patch.object(config, "TAG_MAPPING", {"管理画面/edge": "admin"})
+class TestReverseSync(unittest.TestCase):
+    """ReverseSyncクラスのテスト"""
+
+    def setUp(self):
+        """テストの前処理"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "sync_ledger.json")
+        self.notion_client = MagicMock()
+        self.notion_client.get_database_schema.return_value = SCHEMA
+        self.notion_client.update_page.return_value = {"last_edited_time": "2024-06-01T10:01:00.000Z"}
+        self.notion_client._parse_page.return_value = {
+            "notion_id": PAGE_UUID, "status": "Done", "due_date": "2024-06-30", "tags": ["admin"],
+            "last_edited_time": "2024-06-01T10:01:00.000Z"
+        }
+        self.github_client = MagicMock()
+
+    def tearDown(self):
+        """テストの後処理"""
+        self.temp_dir.cleanup()
+
+    def test_writes_only_changed_properties(self):
+        """変更されたプロパティだけをNotionに書き込み、書き込みを台帳に記録するかのテスト"""
+        ledger = SyncLedger(self.path)
+        ledger.record_github("PVTI_1", {"status": "In Progress", "due_date": "2024-06-30", "labels": "admin"})
+        self.github_client.iter_items.return_value = [make_item(status="Done")]
+
+        counts = ReverseSync(self.notion_client, self.github_client, ledger).run()
+
+        self.assertEqual(counts, {"checked": 1, "updated": 1, "unchanged": 0, "failed": 0})
+        self.notion_client.update_page.assert_called_once_with(PAGE_UUID, {"Status": {"status": {"name": "Done"}}})
+        self.notion_client.get_task.assert_not_called()
+
+        # 書き込みによるNotionの変更はエコーとして扱う
+        reloaded = SyncLedger(self.path)
+        self.assertEqual(reloaded.watermark, "2024-06-01T10:00:00Z")
+        self.assertTrue(reloaded.is_echo(self.notion_client._parse_page.return_value))
+        self.assertFalse(reloaded.is_echo(dict(self.notion_client._parse_page.return_value, status="In Progress")))
+
+    def test_compares_with_notion_without_ledger(self):
+        """台帳に記録がないアイテムはNotionの値と比較するかのテスト"""
+        self.notion_client.get_task.return_value = {"status": "In Progress", "due_date": "2024-06-30", "tags": ["admin"]}
+        self.github_client.iter_items.return_value = [make_item()]
+
+        counts = ReverseSync(self.notion_client, self.github_client, SyncLedger(self.path)).run()
+
+        self.assertEqual(counts["unchanged"], 1)
+        self.notion_client.get_task.assert_called_once_with(PAGE_UUID)
+        self.notion_client.update_page.assert_not_called()
+
+    def test_skips_items_before_watermark(self):
+        """ウォーターマークより前に更新されたアイテムを書き戻さないかのテスト"""
+        ledger = SyncLedger(self.path)
+        ledger.watermark = "2024-06-02T00:00:00Z"
+        self.github_client.iter_items.return_value = [make_item(status="Done")]
+
+        counts = ReverseSync(self.notion_client, self.github_client, ledger).run()
+
+        self.assertEqual(counts["checked"], 0)
+        self.notion_client.update_page.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+snapshotのテスト
+
+タスクのスナップショットの書き出しと読み込みをテストします。
+"""
+
+import unittest
+import gzip
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import snapshot
+from snapshot import SnapshotWriter, export_snapshot, iter_snapshot, read_header
+
+TASKS = [
+    {"notion_id": "page1", "title": "タスク1", "tags": ["bug"]},
+    {"notion_id": "page2", "title": "タスク2", "status": "Done"}
+]
+
+class TestSnapshot(unittest.TestCase):
+    """スナップショットのテスト"""
+    
+    def setUp(self):
+        """テストの前処理"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "tasks.jsonl.gz")
+    
+    def tearDown(self):
+        """テストの後処理"""
+        self.temp_dir.cleanup()
+    
+    def write_lines(self, lines):
+        """テスト用にスナップショットの行を書き換える"""
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            f.writelines(lines)
+    
+    def read_lines(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            return f.readlines()
+    
+    def test_round_trip(self):
+        """書き出したタスクをそのまま読み込めるかのテスト"""
+        with SnapshotWriter(self.path, {"database_id": "db1"}) as writer:
+            for task in TASKS:
+                writer.write(task)
+        
+        header = read_header(self.path)
+        self.assertEqual(header["database_id"], "db1")
+        self.assertEqual(header["version"], snapshot.SNAPSHOT_VERSION)
+        self.assertEqual(list(iter_snapshot(self.path)), TASKS)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+    
+    def test_corrupted_record(self):
+        """ハッシュが一致しないタスクを検出するかのテスト"""
+        with SnapshotWriter(self.path, {}) as writer:
+            for task in TASKS:
+                writer.write(task)
+        lines = self.read_lines()
+        lines[2] = lines[2].replace("タスク2", "改ざん")
+        self.write_lines(lines)
+        
+        tasks = iter_snapshot(self.path)
+        self.assertEqual(next(tasks), TASKS[0])
+        with self.assertRaises(ValueError):
+            next(tasks)
+    
+    def test_truncated(self):
+        """末尾の件数がないファイルを検出するかのテスト"""
+        with SnapshotWriter(self.path, {}) as writer:
+            for task in TASKS:
+                writer.write(task)
+        self.write_lines(self.read_lines()[:-1])
+        
+        with self.assertRaises(ValueError):
+            list(iter_snapshot(self.path))
+    
+    def test_aborted_write(self):
+        """書き出し中の例外で既存のスナップショットを残すかのテスト"""
+        with SnapshotWriter(self.path, {}) as writer:
+            writer.write(TASKS[0])
+        
+        with self.assertRaises(RuntimeError):
+            with SnapshotWriter(self.path, {}) as writer:
+                writer.write(TASKS[1])
+                raise RuntimeError("中断")
+        
+        self.assertEqual(list(iter_snapshot(self.path)), [TASKS[0]])
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+    
+    def test_export_snapshot_with_body(self):
+        """ページ本文をまとめて取得しながら書き出すかのテスト"""
+        notion_client = MagicMock()
+        notion_client.database_id = "db1"
+        notion_client.get_database_schema.return_value = {"Name": {"id": "title", "type": "title"}}
+        notion_client.iter_tasks.return_value = iter([dict(task) for task in TASKS])
+        
+        def fetch_page_bodies(tasks):
+            for task in tasks:
+                task["body"] = f"本文 {task['notion_id']}"
+        notion_client.fetch_page_bodies.side_effect = fetch_page_bodies
+        
+        original_chunk_size = snapshot.BODY_CHUNK_SIZE
+        snapshot.BODY_CHUNK_SIZE = 1
+        try:
+            count = export_snapshot(notion_client, self.path, {"status": ["Done"]}, include_body=True)
+        finally:
+            snapshot.BODY_CHUNK_SIZE = original_chunk_size
+        
+        self.assertEqual(count, 2)
+        self.assertEqual(notion_client.fetch_page_bodies.call_count, 2)
+        header = read_header(self.path)
+        self.assertEqual(header["schema"], {"Name": "title"})
+        self.assertEqual(header["criteria"], {"status": ["Done"]})
+        self.assertEqual([task["body"] for task in iter_snapshot(self.path)], ["本文 page1", "本文 page2"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+timeoutsのテスト
+
+実行全体の期限、応答時間のパーセンタイル、読み取りクエリのヘッジをテストします。
+"""
+
+import threading
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from timeouts import Deadline, DeadlineExceeded, HedgedReader, LatencyTracker
+from task_importer import TaskImporter, new_stats
+from github_client import GitHubClient
+import config
+
+class FakeClock:
+    """テスト用の時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestDeadline(unittest.TestCase):
+    """Deadlineクラスのテスト"""
+
+    def test_no_deadline(self):
+        """期限がない場合のテスト"""
+        deadline = Deadline(0)
+        self.assertIsNone(deadline.remaining())
+        self.assertFalse(deadline.expired())
+        self.assertEqual(deadline.timeout(30), 30)
+        self.assertIsNone(deadline.timeout(0))
+
+    def test_timeout_is_capped(self):
+        """リクエストのタイムアウトが期限までの残り時間に収まるかのテスト"""
+        clock = FakeClock()
+        deadline = Deadline(60, clock=clock)
+        self.assertEqual(deadline.timeout(30), 30)
+
+        clock.now = 50
+        self.assertEqual(deadline.timeout(30), 10)
+
+        clock.now = 60
+        self.assertTrue(deadline.expired())
+        with self.assertRaises(DeadlineExceeded):
+            deadline.timeout(30)
+
+class TestHedgedReader(unittest.TestCase):
+    """LatencyTrackerとHedgedReaderクラスのテスト"""
+
+    def test_percentile(self):
+        """応答時間のパーセンタイルのテスト"""
+        tracker = LatencyTracker()
+        self.assertIsNone(tracker.percentile(95))
+        for value in range(1, 101):
+            tracker.record(value / 100)
+        self.assertEqual(tracker.percentile(95), 0.95)
+        self.assertEqual(tracker.percentile(50), 0.5)
+
+    def test_no_hedge_without_samples(self):
+        """サンプルが少ない間はヘッジしないかのテスト"""
+        reader = HedgedReader(min_samples=5)
+        request = MagicMock(return_value="result")
+
+        self.assertEqual(reader.call(request), "result")
+        self.assertEqual(request.call_count, 1)
+        self.assertIsNone(reader.delay())
+        self.assertEqual(len(reader.latency), 1)
+
+    def test_hedge_wins_when_primary_stalls(self):
+        """最初のリクエストが遅い場合に2つ目の応答を使うかのテスト"""
+        reader = HedgedReader(min_samples=1)
+        reader.latency.record(0.01)
+        release = threading.Event()
+
+        def stalled():
+            release.wait(5)
+            return "slow"
+
+        try:
+            self.assertEqual(reader.call(stalled, lambda: "fast"), "fast")
+        finally:
+            release.set()
+        self.assertEqual(reader.hedged, 1)
+        self.assertEqual(reader.hedge_wins, 1)
+
+    def test_fast_primary_is_not_hedged(self):
+        """最初のリクエストが速い場合はヘッジしないかのテスト"""
+        reader = HedgedReader(min_samples=1, min_delay=5)
+        reader.latency.record(0.01)
+        hedge = MagicMock()
+
+        self.assertEqual(reader.call(lambda: "result", hedge), "result")
+        hedge.assert_not_called()
+        self.assertEqual(reader.hedged, 0)
+
+class TestRequestTimeouts(unittest.TestCase):
+    """GitHubClientとTaskImporterの期限の扱いのテスト"""
+
+    def setUp(self):
+        """テストの前処理"""
+        self.original = (config.GITHUB_TOKEN, config.GITHUB_OWNER, config.GITHUB_PROJECT_NUMBER)
+        config.GITHUB_TOKEN = "test_github_token"
+        config.GITHUB_OWNER = "test_owner"
+        config.GITHUB_PROJECT_NUMBER = "42"
+
+    def tearDown(self):
+        """テストの後処理"""
+        config.GITHUB_TOKEN, config.GITHUB_OWNER, config.GITHUB_PROJECT_NUMBER = self.original
+
+    def test_post_graphql_sets_timeout(self):
+        """GraphQLのリクエストにタイムアウトを指定するかのテスト"""
+        session = MagicMock()
+        session.post.return_value.ok = True
+        session.post.return_value.json.return_value = {"data": {}}
+        client = GitHubClient(session=session)
+
+        client._post_graphql("query { viewer { login } }", {})
+        self.assertEqual(session.post.call_args[1]["timeout"], config.GITHUB_REQUEST_TIMEOUT)
+
+    def test_importer_stops_after_deadline(self):
+        """期限を過ぎたら新しいタスクをインポートしないかのテスト"""
+        clock = FakeClock()
+        github_client = MagicMock()
+        github_client.import_task.return_value = (True, None)
+        stats = new_stats()
+        importer = TaskImporter(github_client, stats, deadline=Deadline(10, clock=clock))
+
+        self.assertTrue(importer.import_task({"title": "Task 1", "notion_id": "page-1"}))
+        clock.now = 10
+        self.assertFalse(importer.import_task({"title": "Task 2", "notion_id": "page-2"}))
+        self.assertFalse(importer.import_task({"title": "Task 3", "notion_id": "page-3"}))
+
+        self.assertEqual(github_client.import_task.call_count, 1)
+        self.assertEqual(stats["success"], 1)
+        self.assertEqual(stats["failed"], 0)
+        self.assertEqual(stats["deadline_skipped"], 2)
+
+    def test_deadline_during_import_is_not_failure(self):
+        """インポート中に期限を過ぎたタスクを失敗にせず、次回に再開する未処理として数えるかのテスト"""
+        github_client = GitHubClient()
+        github_client.create_draft_item = MagicMock(side_effect=DeadlineExceeded("期限切れ"))
+        with self.assertRaises(DeadlineExceeded):
+            github_client.import_task({"title": "Task 1"})
+
+        stats = new_stats()
+        dead_letter = MagicMock()
+        github_client = MagicMock()
+        github_client.import_task.side_effect = DeadlineExceeded("期限切れ")
+        importer = TaskImporter(github_client, stats, dead_letter_file=None, deadline=Deadline(0))
+        importer.dead_letter = dead_letter
+
+        self.assertFalse(importer.import_task({"title": "Task 1", "notion_id": "page-1"}))
+        self.assertEqual(stats["failed"], 0)
+        self.assertEqual(stats["failures"], [])
+        self.assertEqual(stats["deadline_skipped"], 1)
+        dead_letter.append.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
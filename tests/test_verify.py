@@ -0,0 +1,75 @@
+"""
+verifyのテスト
+
+NotionのタスクとGitHub Projectのアイテムの突き合わせをテストします。
+"""
+
+import io
+import json
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from verify import verify_migration
+
+def item(item_id, title, url=None, **fields):
+    """テスト用のアイテム"""
+    body = f"説明\n\n*From Notion: {url}*" if url else ""
+    return {"id": item_id, "title": title, "body": body, "fields": fields}
+
+class TestVerify(unittest.TestCase):
+    """verify_migrationのテスト"""
+    
+    def test_verify_migration(self):
+        """不足・余分・不一致が書き出されるかのテスト"""
+        notion_client = MagicMock()
+        notion_client.iter_tasks.return_value = iter([
+            {"notion_id": "page1", "url": "https://www.notion.so/page1", "title": "一致",
+             "status": "Done", "due_date": "2024-12-31", "tags": ["sdk"]},
+            {"notion_id": "page2", "url": "https://www.notion.so/page2", "title": "不一致",
+             "status": "In Progress", "assignees": ["Toi"]},
+            {"notion_id": "page3", "url": "https://www.notion.so/page3", "title": "未移行"},
+            # 移行後にページの名前を変えてURLが変わっても、ページIDで照合する
+            {"notion_id": "83c75a51-b3fe-4a1a-ad9f-0cbe6d75c89e", "title": "新しい名前",
+             "url": "https://www.notion.so/New-83c75a51b3fe4a1aad9f0cbe6d75c89e"}
+        ])
+        
+        github_client = MagicMock()
+        # Assigneesフィールドはプロジェクトにないので比較しない
+        github_client.get_field_ids.return_value = {"Status": "F1", "Status:Done": "O1", "Due Date": "F2", "Labels": "F3"}
+        github_client.iter_items.return_value = iter([
+            item("PVTI_1", "一致", "https://www.notion.so/page1", **{"Status": "Done", "Due Date": "2024-12-31", "Labels": "sdk"}),
+            item("PVTI_2", "不一致（改名）", "https://www.notion.so/page2", Status="Done"),
+            item("PVTI_3", "重複", "https://www.notion.so/page1"),
+            item("PVTI_4", "手動で作成"),
+            item("PVTI_5", "削除済み", "https://www.notion.so/page9"),
+            item("PVTI_6", "新しい名前", "https://www.notion.so/Old-83c75a51b3fe4a1aad9f0cbe6d75c89e")
+        ])
+        
+        stream = io.StringIO()
+        counts = verify_migration(notion_client, github_client, stream)
+        
+        self.assertEqual(counts, {"matched": 2, "missing": 1, "extra": 3, "mismatch": 1})
+        
+        entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(entries[-1]["type"], "summary")
+        
+        mismatch = next(entry for entry in entries if entry["type"] == "mismatch")
+        self.assertEqual(mismatch["item_id"], "PVTI_2")
+        self.assertEqual(mismatch["fields"], {
+            "title": {"notion": "不一致", "github": "不一致（改名）"},
+            "Status": {"notion": "In Progress", "github": "Done"}
+        })
+        
+        missing = next(entry for entry in entries if entry["type"] == "missing")
+        self.assertEqual(missing["notion_id"], "page3")
+        
+        extra_reasons = {entry["item_id"]: entry["reason"] for entry in entries if entry["type"] == "extra"}
+        self.assertEqual(extra_reasons, {"PVTI_3": "duplicate", "PVTI_4": "no_notion_url", "PVTI_5": "not_in_notion"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+webhook_serverのテスト
+
+Webhookの署名の検証、アイテムごとのイベントの集約と、まとめての書き戻しをテストします。
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from webhook_server import WebhookReceiver, make_server, replay_events, serve, sign, verify_signature
+
+SECRET = "test-secret"
+
+class FakeClock:
+    """テスト用の時計"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_event(item_id, action="edited", project_id="PVT_1"):
+    """テスト用のprojects_v2_itemイベントの本文"""
+    return json.dumps({
+        "action": action,
+        "projects_v2_item": {"node_id": item_id, "project_node_id": project_id}
+    }).encode("utf-8")
+
+class TestWebhookReceiver(unittest.TestCase):
+    """WebhookReceiverクラスのテスト"""
+
+    def setUp(self):
+        """テストの前処理"""
+        self.clock = FakeClock()
+        self.reverse_sync = MagicMock()
+        self.reverse_sync.github_client.get_project_id.return_value = "PVT_1"
+        self.reverse_sync.github_client.get_items.side_effect = lambda ids: [{"id": item_id} for item_id in ids]
+        self.receiver = WebhookReceiver(self.reverse_sync, secret=SECRET, window=2, batch_size=2, clock=self.clock)
+
+    def post(self, body, event="projects_v2_item", signature=None):
+        """署名付きでイベントを処理する"""
+        return self.receiver.handle(event, body, signature or sign(SECRET, body))
+
+    def test_signature(self):
+        """署名が一致しないリクエストを拒否するかのテスト"""
+        body = make_event("PVTI_1")
+        self.assertTrue(verify_signature(SECRET, body, sign(SECRET, body)))
+        self.assertFalse(verify_signature(SECRET, body, sign("other", body)))
+        self.assertFalse(verify_signature("", body, sign("", body)))
+
+        self.assertEqual(self.post(body, signature="sha256=00")[0], 401)
+        self.assertEqual(self.receiver.counts["rejected"], 1)
+        self.assertEqual(len(self.receiver.coalescer), 0)
+
+    def test_ignores_other_events(self):
+        """他のプロジェクトや書き戻す値のないイベントを無視するかのテスト"""
+        self.assertEqual(self.post(b"{}", event="ping"), (200, "pong"))
+        self.assertEqual(self.post(make_event("PVTI_1", project_id="PVT_other"))[1], "ignored")
+        self.assertEqual(self.post(make_event("PVTI_1", action="deleted"))[1], "ignored")
+        self.assertEqual(self.post(make_event("PVTI_1"), event="issues")[1], "ignored")
+        self.assertEqual(len(self.receiver.coalescer), 0)
+
+    def test_coalesces_and_flushes_in_batches(self):
+        """同じアイテムのイベントをまとめ、落ち着いてからまとめて書き戻すかのテスト"""
+        for item_id in ("PVTI_1", "PVTI_1", "PVTI_2", "PVTI_3"):
+            self.assertEqual(self.post(make_event(item_id)), (202, "queued"))
+
+        # まとめる時間が過ぎるまでは書き戻さない
+        self.assertEqual(self.receiver.flush(), 0)
+
+        # 続けて編集されたアイテムは、最後のイベントから待つ
+        self.clock.now += 1
+        self.post(make_event("PVTI_2"))
+        self.clock.now += 1.5
+        self.assertEqual(self.receiver.flush(), 2)
+        get_items = self.reverse_sync.github_client.get_items
+        self.assertEqual([call[0][0] for call in get_items.call_args_list], [["PVTI_1", "PVTI_3"]])
+
+        self.assertEqual(self.receiver.flush(force=True), 1)
+        self.assertEqual(get_items.call_args[0][0], ["PVTI_2"])
+        self.assertEqual(self.reverse_sync.apply_items.call_count, 2)
+
+    def test_failed_read_is_retried(self):
+        """アイテムの読み込みに失敗した場合、次回に再度書き戻すかのテスト"""
+        self.post(make_event("PVTI_1"))
+        self.reverse_sync.github_client.get_items.side_effect = [RuntimeError("timeout"), [{"id": "PVTI_1"}]]
+
+        self.assertEqual(self.receiver.flush(force=True), 0)
+        self.assertEqual(self.receiver.flush(force=True), 1)
+        self.reverse_sync.apply_items.assert_called_once_with([{"id": "PVTI_1"}])
+
+    def test_project_unavailable(self):
+        """プロジェクトのIDを取得できない場合、イベントを受け付けずに503を返すかのテスト"""
+        self.reverse_sync.github_client.get_project_id.side_effect = [RuntimeError("timeout"), "PVT_1"]
+
+        self.assertEqual(self.post(make_event("PVTI_1")), (503, "project unavailable"))
+        self.assertEqual(len(self.receiver.coalescer), 0)
+        self.assertEqual(self.post(make_event("PVTI_1")), (202, "queued"))
+
+class TestReplayEvents(unittest.TestCase):
+    """replay_eventsのテスト"""
+
+    def test_replay_to_server(self):
+        """記録したイベントを署名付きでサーバーに送り直すかのテスト"""
+        reverse_sync = MagicMock()
+        reverse_sync.github_client.get_project_id.return_value = "PVT_1"
+        receiver = WebhookReceiver(reverse_sync, secret=SECRET, window=0)
+        server = make_server(receiver, "127.0.0.1", 0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "events.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for item_id in ("PVTI_1", "PVTI_2"):
+                    payload = json.loads(make_event(item_id))
+                    f.write(json.dumps({"event": "projects_v2_item", "payload": payload}) + "\n")
+            try:
+                url = f"http://127.0.0.1:{server.server_address[1]}/"
+                self.assertEqual(replay_events(path, url, secret=SECRET), 2)
+                self.assertEqual(replay_events(path, url, secret="other"), 0)
+            finally:
+                server.shutdown()
+                server.server_close()
+
+        self.assertEqual(receiver.counts["queued"], 2)
+        self.assertEqual(receiver.counts["rejected"], 2)
+        self.assertEqual(len(receiver.coalescer), 2)
+
+    def test_serve_resolves_project_before_start(self):
+        """サーバーの開始前にプロジェクトのIDを取得し、取得できなければ開始しないかのテスト"""
+        reverse_sync = MagicMock()
+        reverse_sync.github_client.get_project_id.side_effect = RuntimeError("Bad credentials")
+        receiver = WebhookReceiver(reverse_sync, secret=SECRET, window=0)
+
+        with self.assertRaises(RuntimeError):
+            serve(receiver, "127.0.0.1", 0, should_stop=lambda: True)
+        reverse_sync.apply_items.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
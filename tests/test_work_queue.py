@@ -0,0 +1,171 @@
+"""
+work_queueのテスト
+
+リース付きのワークキューと、キューを使ったワーカーをテストします。
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+# テスト対象のモジュールをインポートするためにパスを追加
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from work_queue import QueueWorker, WorkQueue
+from task_importer import TaskImporter, new_stats, run_importer
+from timeouts import DeadlineExceeded
+import config
+
+TASKS = [
+    {"notion_id": "page1", "title": "親タスク"},
+    {"notion_id": "page2", "title": "子タスク", "parent_id": "page1"}
+]
+
+class FakeClock:
+    """テスト用の時計"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestWorkQueue(unittest.TestCase):
+    """WorkQueueクラスのテスト"""
+
+    def setUp(self):
+        """テストの前処理"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "queue.sqlite3")
+        self.clock = FakeClock()
+        self.queue = WorkQueue(self.path, lease_seconds=60, max_attempts=2, clock=self.clock)
+
+    def tearDown(self):
+        """テストの後処理"""
+        self.queue.close()
+        self.temp_dir.cleanup()
+
+    def test_enqueue_and_claim_in_order(self):
+        """登録した順に取り出し、同じタスクを重複して登録しないかのテスト"""
+        self.assertEqual(self.queue.enqueue(TASKS), 2)
+        self.assertEqual(self.queue.enqueue(TASKS), 0)
+
+        self.assertEqual(self.queue.claim("worker-a")["notion_id"], "page1")
+        self.assertEqual(self.queue.claim("worker-b")["notion_id"], "page2")
+        self.assertIsNone(self.queue.claim("worker-a"))
+        self.assertEqual(self.queue.counts()["leased"], 2)
+
+    def test_expired_lease_is_reclaimed(self):
+        """リースの期限が切れたタスクを別のワーカーが取り出すかのテスト"""
+        self.queue.enqueue(TASKS[:1])
+        self.queue.claim("worker-a")
+        self.assertIsNone(self.queue.claim("worker-b"))
+
+        self.clock.now += 61
+        self.assertEqual(self.queue.claim("worker-b")["notion_id"], "page1")
+
+        # 期限切れが続いたタスクは失敗にする
+        self.clock.now += 61
+        self.assertIsNone(self.queue.claim("worker-c"))
+        self.assertEqual(self.queue.counts()["failed"], 1)
+
+        # 再度登録すると待機中に戻る
+        self.assertEqual(self.queue.enqueue(TASKS[:1]), 1)
+        self.assertEqual(self.queue.counts()["pending"], 1)
+
+    def test_import_state_interface(self):
+        """作成したアイテムを記録し、取り出し直しても再利用できるかのテスト"""
+        self.queue.enqueue(TASKS[:1])
+        self.assertIsNone(self.queue.get("page1"))
+
+        self.queue.record_created("page1", "PVTI_1")
+        self.queue.record_step("page1", "body")
+        self.assertEqual(self.queue.get("page1"), {"item_id": "PVTI_1", "steps": ["create", "body"], "done": False})
+
+        # 別のプロセスから開いても同じ状態が見える
+        other = WorkQueue(self.path)
+        try:
+            self.assertEqual(other.get("page1")["item_id"], "PVTI_1")
+        finally:
+            other.close()
+
+        self.queue.mark_done("page1")
+        self.assertTrue(self.queue.is_done("page1"))
+        self.assertEqual(list(self.queue), [("page1", {"item_id": "PVTI_1", "steps": ["create", "body"], "done": True})])
+
+class TestQueueWorker(unittest.TestCase):
+    """QueueWorkerクラスのテスト"""
+
+    def setUp(self):
+        """テストの前処理"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.queue = WorkQueue(os.path.join(self.temp_dir.name, "queue.sqlite3"))
+        self.queue.enqueue(TASKS)
+
+    def tearDown(self):
+        """テストの後処理"""
+        self.queue.close()
+        self.temp_dir.cleanup()
+
+    def test_worker_acks_and_fails(self):
+        """インポートの結果をキューに記録するかのテスト"""
+        github_client = MagicMock()
+        github_client.import_task.side_effect = [(True, None), (False, "validation error")]
+        stats = new_stats()
+        importer = TaskImporter(github_client, stats, state_store=self.queue)
+        worker = QueueWorker(self.queue, importer, "worker-a", sleep=MagicMock())
+
+        for position, task in worker.entries():
+            worker.import_task(task, position)
+
+        self.assertEqual(worker.claimed, 2)
+        self.assertEqual(self.queue.counts(), {"pending": 0, "leased": 0, "done": 1, "failed": 1})
+        self.assertEqual(stats["success"], 1)
+        self.assertIs(github_client.import_task.call_args[1]["state_store"], self.queue)
+
+    def test_worker_matches_failures_by_page_id(self):
+        """同じタイトルのタスクがあっても、失敗したタスクだけを失敗として記録するかのテスト"""
+        self.queue.enqueue([{"notion_id": "page3", "title": "親タスク"}])
+        github_client = MagicMock()
+        github_client.import_task.side_effect = [
+            (False, "validation error"), (True, None), DeadlineExceeded("期限切れ")
+        ]
+        importer = TaskImporter(github_client, new_stats(), state_store=self.queue)
+        worker = QueueWorker(self.queue, importer, "worker-a", sleep=MagicMock())
+
+        for position, task in worker.entries():
+            worker.import_task(task, position)
+            if task["notion_id"] == "page3":
+                break
+
+        # 期限切れのタスクは失敗にせず、待機中に戻す
+        self.assertEqual(self.queue.counts(), {"pending": 1, "leased": 0, "done": 1, "failed": 1})
+
+    def test_concurrent_worker_records_unexpected_errors(self):
+        """並行インポートのワーカースレッドで発生した例外を失敗として記録するかのテスト"""
+        github_client = MagicMock()
+        github_client.imported_items = {}
+        github_client.import_task.side_effect = lambda task, **kwargs: (
+            (True, None) if task["notion_id"] == "page1" else {}["status"]
+        )
+        stats = new_stats()
+        importer = TaskImporter(github_client, stats, state_store=self.queue)
+        worker = QueueWorker(self.queue, importer, "worker-a", sleep=MagicMock())
+
+        original_max_concurrency = config.GITHUB_MAX_CONCURRENCY
+        try:
+            config.GITHUB_MAX_CONCURRENCY = 2
+            run_importer(worker, worker.entries())
+        finally:
+            config.GITHUB_MAX_CONCURRENCY = original_max_concurrency
+
+        self.assertEqual(stats["success"], 1)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["failures"][0]["notion_id"], "page2")
+        self.assertIn("status", stats["failures"][0]["error"])
+        self.assertEqual(self.queue.counts(), {"pending": 0, "leased": 0, "done": 1, "failed": 1})
+
+if __name__ == '__main__':
+    unittest.main()
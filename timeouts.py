@@ -0,0 +1,256 @@
+"""
+リクエストのタイムアウト、実行全体の期限、読み取りクエリのヘッジ
+
+- 実行全体の期限（RUN_DEADLINE_SECONDS / --deadline）を過ぎると、新しいタスクのインポートを始めずに終了します。
+  各リクエストのタイムアウトは、GITHUB_REQUEST_TIMEOUTと期限までの残り時間の短い方です。
+- 冪等な読み取りクエリ（プロジェクトID・フィールド・アイテムの取得）は、応答が最近の応答時間の
+  95パーセンタイルを過ぎても返らない場合に同じリクエストをもう1つ送り、先に返った応答を使います。
+  一部の遅いリクエストが全体の所要時間を引き延ばすのを防ぎます。
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# ヘッジの待ち時間の計算に使う応答時間のサンプル数と、ヘッジを始めるまでに必要なサンプル数
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+
+class DeadlineExceeded(Exception):
+    """
+    実行全体の期限を過ぎたことを示す例外
+    """
+
+
+class Deadline:
+    """
+    実行全体の期限
+    """
+
+    def __init__(self, seconds: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Deadlineの初期化
+
+        Args:
+            seconds: 現在からの期限（秒）。Noneまたは0以下なら期限なし
+            clock: 現在時刻を返す関数（テスト用に差し替え可能）
+        """
+        self._clock = clock
+        self.expires_at = clock() + seconds if seconds and seconds > 0 else None
+
+    def remaining(self) -> Optional[float]:
+        """
+        期限までの残り秒数を返します。期限がない場合はNone。
+        """
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+    def expired(self) -> bool:
+        """
+        期限を過ぎたかどうかを返します。
+        """
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout(self, request_timeout: Optional[float]) -> Optional[float]:
+        """
+        リクエストのタイムアウトを、期限までの残り時間に収めて返します。
+
+        Args:
+            request_timeout: リクエストごとのタイムアウト（秒）。Noneまたは0以下なら無制限
+
+        Returns:
+            リクエストに指定するタイムアウト（秒）。制限しない場合はNone
+
+        Raises:
+            DeadlineExceeded: 既に期限を過ぎている場合
+        """
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("実行の期限を過ぎたため、リクエストを送信しません")
+        timeouts = [value for value in (request_timeout, remaining) if value and value > 0]
+        return min(timeouts) if timeouts else None
+
+
+_run_deadline = Deadline()
+
+
+def start_run_deadline(seconds: Optional[float]) -> Deadline:
+    """
+    実行全体の期限を現在から開始します。
+
+    Args:
+        seconds: 期限（秒）。Noneまたは0以下なら期限なし
+
+    Returns:
+        開始した期限
+    """
+    global _run_deadline
+    _run_deadline = Deadline(seconds)
+    if _run_deadline.expires_at is not None:
+        logger.info(f"実行の期限: {seconds:g} 秒")
+    return _run_deadline
+
+
+def run_deadline() -> Deadline:
+    """
+    実行全体の期限を返します（start_run_deadlineを呼び出していない場合は期限なし）。
+    """
+    return _run_deadline
+
+
+class LatencyTracker:
+    """
+    直近の応答時間からパーセンタイルを求めるスレッドセーフなクラス
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """
+        LatencyTrackerの初期化
+
+        Args:
+            window: 保持するサンプル数
+        """
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """
+        応答時間を記録します。
+        """
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        応答時間のパーセンタイルを返します（最近傍法）。サンプルがない場合はNone。
+
+        Args:
+            percent: パーセンタイル（0〜100）
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(percent / 100 * len(samples)))
+        return samples[min(rank, len(samples)) - 1]
+
+
+class HedgedReader:
+    """
+    冪等な読み取りリクエストをヘッジするクラス
+
+    リクエストが応答時間のpercentileパーセンタイル（min_delay以上）を過ぎても返らない場合に、
+    2つ目のリクエストを送り、先に成功した応答を返します。サンプルが少ない間はヘッジしません。
+    """
+
+    def __init__(self, percentile: float = 95, min_delay: float = 0.0,
+                 min_samples: int = HEDGE_MIN_SAMPLES, max_workers: int = 4,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        HedgedReaderの初期化
+
+        Args:
+            percentile: 待ち時間に使う応答時間のパーセンタイル
+            min_delay: 2つ目のリクエストを送るまでの最小の待ち時間（秒）
+            min_samples: ヘッジを始めるまでに必要な応答時間のサンプル数
+            max_workers: リクエストを実行するスレッド数
+            clock: 現在時刻を返す関数（テスト用に差し替え可能）
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.latency = LatencyTracker()
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._clock = clock
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def delay(self) -> Optional[float]:
+        """
+        2つ目のリクエストを送るまでの待ち時間を返します。サンプルが少ない場合はNone（ヘッジしない）。
+        """
+        if len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latency.percentile(self.percentile) or 0.0)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="hedge")
+            return self._executor
+
+    def _timed(self, call: Callable[[], Any]) -> Callable[[], Any]:
+        # 応答時間は成功したリクエストだけを記録する
+        def run() -> Any:
+            started = self._clock()
+            result = call()
+            self.latency.record(self._clock() - started)
+            return result
+        return run
+
+    def call(self, request: Callable[[], Any], hedge: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        リクエストを実行し、遅い場合はヘッジします。
+
+        Args:
+            request: リクエストを行う関数
+            hedge: 2つ目のリクエストを行う関数。指定しない場合は request と同じ
+
+        Returns:
+            先に成功したリクエストの結果
+        """
+        delay = self.delay()
+        if delay is None:
+            return self._timed(request)()
+
+        executor = self._get_executor()
+        primary = executor.submit(self._timed(request))
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        secondary = executor.submit(self._timed(hedge or request))
+        with self._lock:
+            self.hedged += 1
+        logger.debug(f"応答が {delay * 1000:.0f}ms を超えたため、同じ読み取りリクエストをもう1つ送信しました")
+
+        pending = {primary, secondary}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+        # 両方のリクエストが失敗した場合は、最初のリクエストの例外を送出する
+        raise primary.exception()  # type: ignore[misc]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        ヘッジの状況を返します（移行結果の表示用）。
+
+        Returns:
+            {"hedged", "hedge_wins", "delay_ms"}
+        """
+        delay = self.delay()
+        return {
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "delay_ms": round(delay * 1000) if delay is not None else None
+        }
+
@@ -0,0 +1,203 @@
+"""
+移行結果の検証
+
+NotionのデータベースとGitHub Projectの両方を一括で読み込み、NotionのページIDで突き合わせて
+不足（Notionにあってプロジェクトにない）・余分（プロジェクトにあってNotionにない）・
+フィールドの不一致をJSONL形式のレポートに書き出します。
+
+プロジェクト側のアイテムだけをページIDをキーにした辞書に保持し、Notionのタスクは1件ずつ
+読みながら照合してレポートに書き出すため、件数に比例した時間で検証できます。
+NotionのURLにはタイトルが含まれるため、移行後に名前を変えたページもページIDで照合します。
+"""
+
+import json
+import logging
+from typing import Any, Dict, IO, Iterable, List, Tuple
+
+from project_index import notion_url_of, page_key, task_page_keys
+import config
+
+logger = logging.getLogger(__name__)
+
+MISSING = "missing"
+EXTRA = "extra"
+MISMATCH = "mismatch"
+
+
+def expected_fields(task: Dict[str, Any]) -> Dict[str, str]:
+    """
+    タスクから、プロジェクトに設定されているはずのフィールドの値を作成します。
+
+    Args:
+        task: タスクデータ
+
+    Returns:
+        GitHub Projectのフィールド名から値への辞書
+    """
+    fields = config.GITHUB_PROJECT_FIELDS
+    return {
+        fields["status"]: task.get('status') or "",
+        fields["due_date"]: task.get('due_date') or "",
+        fields["assignees"]: ", ".join(task.get('assignees') or []),
+        fields["labels"]: ", ".join(task.get('tags') or [])
+    }
+
+
+def compare_task(task: Dict[str, Any], item: Tuple[str, str, Dict[str, Any], str],
+                 field_names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    タスクとアイテムのタイトルとフィールドを比較します。
+
+    Args:
+        task: タスクデータ
+        item: (アイテムID, タイトル, フィールドの値, NotionのURL)
+        field_names: プロジェクトに存在するフィールド名（存在しないフィールドは比較しない）
+
+    Returns:
+        不一致のフィールド名から {"notion": 値, "github": 値} への辞書
+    """
+    _, title, values, _ = item
+    differences: Dict[str, Dict[str, Any]] = {}
+
+    if (task.get('title') or "") != title:
+        differences["title"] = {"notion": task.get('title') or "", "github": title}
+
+    existing = set(field_names)
+    for field_name, expected in expected_fields(task).items():
+        if field_name not in existing:
+            continue
+        actual = values.get(field_name)
+        actual = "" if actual is None else str(actual)
+        if expected != actual:
+            differences[field_name] = {"notion": expected, "github": actual}
+
+    return differences
+
+
+class VerificationReport:
+    """
+    検証結果をJSONL形式で書き出すレポート
+    """
+
+    def __init__(self, stream: IO[str]):
+        """
+        VerificationReportの初期化
+
+        Args:
+            stream: 書き出し先
+        """
+        self.stream = stream
+        self.counts = {"matched": 0, MISSING: 0, EXTRA: 0, MISMATCH: 0}
+
+    def write(self, entry_type: str, **fields: Any) -> None:
+        """
+        不一致を1件書き出します。
+
+        Args:
+            entry_type: "missing" / "extra" / "mismatch"
+            fields: 記録する内容
+        """
+        self.counts[entry_type] += 1
+        self.stream.write(json.dumps(dict(type=entry_type, **fields), ensure_ascii=False) + "\n")
+
+    def matched(self) -> None:
+        """
+        一致したタスクを数えます。
+        """
+        self.counts["matched"] += 1
+
+    def close(self) -> Dict[str, int]:
+        """
+        集計を書き出します。
+
+        Returns:
+            種類ごとの件数
+        """
+        self.stream.write(json.dumps(dict(type="summary", **self.counts)) + "\n")
+        return dict(self.counts)
+
+
+def index_items(items: Iterable[Dict[str, Any]],
+                report: VerificationReport) -> Dict[str, Tuple[str, str, Dict[str, Any], str]]:
+    """
+    プロジェクトのアイテムを、説明に埋め込まれたNotionのページIDをキーにした辞書にします。
+
+    NotionのURLがないアイテムと、同じページの2件目以降のアイテムは余分なアイテムとして書き出します。
+
+    Args:
+        items: プロジェクトのアイテム（GitHubClient.iter_itemsの形式）
+        report: レポート
+
+    Returns:
+        照合用のキー（project_index.page_key）から (アイテムID, タイトル, フィールドの値, NotionのURL) への辞書
+    """
+    index: Dict[str, Tuple[str, str, Dict[str, Any], str]] = {}
+    for item in items:
+        url = notion_url_of(item.get("body", ""))
+        key = page_key(url)
+        if not key:
+            report.write(EXTRA, item_id=item["id"], title=item.get("title", ""), reason="no_notion_url")
+        elif key in index:
+            report.write(EXTRA, item_id=item["id"], title=item.get("title", ""), url=url, reason="duplicate")
+        else:
+            # 本文は比較に使わないので保持しない
+            index[key] = (item["id"], item.get("title", ""), item.get("fields", {}), url)
+    return index
+
+
+def verify_migration(notion_client: Any, github_client: Any, stream: IO[str]) -> Dict[str, int]:
+    """
+    NotionのデータベースとGitHub Projectを突き合わせ、不一致をレポートに書き出します。
+
+    Args:
+        notion_client: NotionのAPIクライアント
+        github_client: GitHubのAPIクライアント
+        stream: レポートの書き出し先
+
+    Returns:
+        種類ごとの件数（matched / missing / extra / mismatch）
+    """
+    report = VerificationReport(stream)
+    field_names: List[str] = list(github_client.get_field_ids())
+
+    logger.info("GitHub Projectのアイテムを読み込んでいます...")
+    index = index_items(github_client.iter_items(), report)
+
+    logger.info("Notionのタスクと照合しています...")
+    for task in notion_client.iter_tasks():
+        key = next((key for key in task_page_keys(task) if key in index), None)
+        item = index.pop(key) if key else None
+        if item is None:
+            report.write(MISSING, notion_id=task.get('notion_id'), url=task.get('url'), title=task.get('title', ""))
+            continue
+
+        differences = compare_task(task, item, field_names)
+        if differences:
+            report.write(MISMATCH, notion_id=task.get('notion_id'), url=task.get('url'),
+                         item_id=item[0], fields=differences)
+        else:
+            report.matched()
+
+    # 照合されずに残ったアイテムはNotionに存在しない
+    for item_id, title, _, url in index.values():
+        report.write(EXTRA, item_id=item_id, title=title, url=url, reason="not_in_notion")
+
+    return report.close()
+
+
+def run_verification(notion_client: Any, github_client: Any, report_path: str) -> Dict[str, int]:
+    """
+    検証を実行し、レポートをファイルに書き出します。
+
+    Args:
+        notion_client: NotionのAPIクライアント
+        github_client: GitHubのAPIクライアント
+        report_path: レポートファイルのパス
+
+    Returns:
+        種類ごとの件数
+    """
+    with open(report_path, "w", encoding="utf-8") as f:
+        counts = verify_migration(notion_client, github_client, f)
+    logger.info(f"検証レポートを '{report_path}' に書き出しました。")
+    return counts
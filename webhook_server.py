@@ -0,0 +1,345 @@
+"""
+GitHubのWebhookを受け取ってNotionに書き戻すサーバー
+
+GitHub Projectのアイテムが変更されると、GitHubは projects_v2_item イベントを送信します。
+このサーバーはイベントを受け取って署名（X-Hub-Signature-256）を検証し、短い時間内に同じアイテムに
+届いたイベントを1つにまとめてから、対象のアイテムだけをまとめて読み込み、逆方向の同期（reverse_sync）で
+Notionに書き戻します。プロジェクト全体を定期的に読み込むより少ないリクエストで、すぐに反映されます。
+
+イベントにはフィールドの値が含まれないため、値は書き戻す直前にアイテムを読み込んで取得します。
+同じ同期台帳を使うため、--daemon や --reverse-sync と同時に使用してもエコーは発生しません。
+
+replay_events は、記録したイベントを署名付きでサーバーに送り直します（動作確認用）。
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+import config
+
+logger = logging.getLogger(__name__)
+
+EVENT_NAME = "projects_v2_item"
+# フィールドの値が変わりうるアクション（archived / deleted / reordered は書き戻す値がない）
+APPLIED_ACTIONS = ("created", "edited", "restored", "converted")
+
+
+def sign(secret: str, body: bytes) -> str:
+    """
+    本文の署名をX-Hub-Signature-256の形式で作成します。
+
+    Args:
+        secret: Webhookのシークレット
+        body: リクエストの本文
+
+    Returns:
+        "sha256=<16進数>"
+    """
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """
+    X-Hub-Signature-256の署名を検証します。
+
+    Args:
+        secret: Webhookのシークレット
+        body: リクエストの本文
+        signature: X-Hub-Signature-256ヘッダーの値
+
+    Returns:
+        署名が正しければTrue
+    """
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign(secret, body), signature)
+
+
+class EventCoalescer:
+    """
+    アイテムごとにイベントをまとめるクラス
+
+    最後のイベントから window 秒間、同じアイテムにイベントが届かなければ反映の対象にします。
+    続けて編集されたアイテムは、編集が落ち着いてから1回だけ反映します。
+    """
+
+    def __init__(self, window: float, clock: Callable[[], float] = time.monotonic):
+        """
+        EventCoalescerの初期化
+
+        Args:
+            window: イベントをまとめる時間（秒）
+            clock: 現在時刻を返す関数（テスト用に差し替え可能）
+        """
+        self.window = window
+        self.clock = clock
+        # アイテムIDから最後にイベントが届いた時刻（最初に届いた順）
+        self._pending: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, item_id: str) -> None:
+        """
+        アイテムのイベントを追加します。
+        """
+        with self._lock:
+            self._pending[item_id] = self.clock()
+
+    def due(self, limit: int, force: bool = False) -> List[str]:
+        """
+        反映の対象になったアイテムを取り出します。
+
+        Args:
+            limit: 取り出す最大件数
+            force: Trueなら待たずに全て取り出す（終了時など）
+
+        Returns:
+            アイテムIDのリスト（最初にイベントが届いた順）
+        """
+        now = self.clock()
+        with self._lock:
+            ready = [
+                item_id for item_id, last in self._pending.items()
+                if force or now - last >= self.window
+            ][:limit]
+            for item_id in ready:
+                del self._pending[item_id]
+        return ready
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+class WebhookReceiver:
+    """
+    Webhookのイベントを検証・集約し、まとめてNotionに書き戻すクラス
+    """
+
+    def __init__(self, reverse_sync: Any, secret: Optional[str] = None, window: Optional[float] = None,
+                 batch_size: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        WebhookReceiverの初期化
+
+        Args:
+            reverse_sync: 書き戻しに使用するReverseSync
+            secret: Webhookのシークレット。指定しない場合は設定ファイルの値
+            window: イベントをまとめる時間（秒）。指定しない場合は設定ファイルの値
+            batch_size: 1回に読み込むアイテムの最大数。指定しない場合は設定ファイルの値
+            clock: 現在時刻を返す関数（テスト用に差し替え可能）
+        """
+        self.reverse_sync = reverse_sync
+        self.secret = secret if secret is not None else config.WEBHOOK_SECRET
+        self.batch_size = batch_size or config.WEBHOOK_BATCH_SIZE
+        self.coalescer = EventCoalescer(
+            window if window is not None else config.WEBHOOK_COALESCE_SECONDS, clock=clock
+        )
+        self.counts = {"received": 0, "rejected": 0, "ignored": 0, "queued": 0, "batches": 0}
+        self._project_id: Optional[str] = None
+        self._flush_lock = threading.Lock()
+        self._counts_lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        # リクエストは複数のスレッドで処理される
+        with self._counts_lock:
+            self.counts[key] += 1
+
+    @property
+    def project_id(self) -> str:
+        if self._project_id is None:
+            self._project_id = self.reverse_sync.github_client.get_project_id()
+        return self._project_id
+
+    def handle(self, event: Optional[str], body: bytes, signature: Optional[str]) -> Tuple[int, str]:
+        """
+        1件のWebhookのリクエストを処理します。
+
+        Args:
+            event: X-GitHub-Eventヘッダーの値
+            body: リクエストの本文
+            signature: X-Hub-Signature-256ヘッダーの値
+
+        Returns:
+            (HTTPのステータスコード, 応答の本文)
+        """
+        self._count("received")
+        if not verify_signature(self.secret, body, signature):
+            self._count("rejected")
+            logger.warning("署名が一致しないWebhookのリクエストを拒否しました")
+            return 401, "invalid signature"
+
+        if event == "ping":
+            return 200, "pong"
+        if event != EVENT_NAME:
+            self._count("ignored")
+            return 202, "ignored"
+
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except ValueError:
+            self._count("rejected")
+            return 400, "invalid payload"
+
+        try:
+            project_id = self.project_id
+        except Exception as e:
+            # GitHubが再送できるように、受け付けずにエラーを返す
+            logger.error(f"GitHub ProjectのIDの取得に失敗しました: {e}")
+            return 503, "project unavailable"
+
+        item = payload.get("projects_v2_item") or {}
+        if (
+            payload.get("action") not in APPLIED_ACTIONS
+            or not item.get("node_id")
+            or item.get("project_node_id") != project_id
+        ):
+            self._count("ignored")
+            return 202, "ignored"
+
+        self.coalescer.add(item["node_id"])
+        self._count("queued")
+        return 202, "queued"
+
+    def flush(self, force: bool = False) -> int:
+        """
+        反映の対象になったアイテムをまとめて読み込み、Notionに書き戻します。
+
+        読み込みに失敗したアイテムは、次回の反映の対象に戻します。
+
+        Args:
+            force: Trueなら待たずに全て反映する（終了時など）
+
+        Returns:
+            書き戻しを試みたアイテム数
+        """
+        applied = 0
+        with self._flush_lock:
+            while True:
+                item_ids = self.coalescer.due(self.batch_size, force=force)
+                if not item_ids:
+                    return applied
+                try:
+                    items = self.reverse_sync.github_client.get_items(item_ids)
+                except Exception as e:
+                    logger.error(f"Webhookで通知されたアイテムの取得に失敗しました: {e}")
+                    for item_id in item_ids:
+                        self.coalescer.add(item_id)
+                    return applied
+                self._count("batches")
+                logger.info(f"Webhookで通知されたアイテムを書き戻します: {len(items)} 件")
+                self.reverse_sync.apply_items(items)
+                applied += len(items)
+
+
+def make_server(receiver: WebhookReceiver, host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Webhookを受け取るHTTPサーバーを作成します。
+
+    Args:
+        receiver: リクエストを処理するWebhookReceiver
+        host: 待ち受けるアドレス
+        port: 待ち受けるポート
+
+    Returns:
+        HTTPサーバー
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length)
+            status, message = receiver.handle(
+                self.headers.get("X-GitHub-Event"), body, self.headers.get("X-Hub-Signature-256")
+            )
+            response = message.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def serve(receiver: WebhookReceiver, host: Optional[str] = None, port: Optional[int] = None,
+          should_stop: Callable[[], bool] = lambda: False) -> Dict[str, int]:
+    """
+    Webhookを受け取り、まとめたイベントを定期的にNotionに書き戻します。
+
+    プロジェクトのIDはサーバーの開始前に取得します（取得できない場合は開始しない）。
+    Ctrl+Cか should_stop で終了し、終了時に残っているイベントを反映します。
+
+    Args:
+        receiver: リクエストを処理するWebhookReceiver
+        host: 待ち受けるアドレス。指定しない場合は設定ファイルの値
+        port: 待ち受けるポート。指定しない場合は設定ファイルの値
+        should_stop: Trueを返したら終了する関数（実行の期限など）
+
+    Returns:
+        書き戻しの結果（ReverseSync.counts）
+    """
+    # リクエストを処理するスレッドからGitHubのAPIを呼び出さないように、開始前に取得する
+    project_id = receiver.project_id
+    server = make_server(receiver, host or config.WEBHOOK_HOST, port or config.WEBHOOK_PORT)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info(
+        f"Webhookを待ち受けています: http://{server.server_address[0]}:{server.server_address[1]}/ "
+        f"(プロジェクト: {project_id})"
+    )
+
+    interval = max(0.1, receiver.coalescer.window / 2)
+    try:
+        while not should_stop():
+            time.sleep(interval)
+            receiver.flush()
+    except KeyboardInterrupt:
+        logger.info("Webhookの受信を停止します。")
+    finally:
+        server.shutdown()
+        server.server_close()
+        receiver.flush(force=True)
+    return receiver.reverse_sync.counts
+
+
+def replay_events(path: str, url: str, secret: Optional[str] = None) -> int:
+    """
+    記録したイベントを、署名を付けてWebhookのサーバーに送り直します。
+
+    ファイルは1行に1件の {"event": イベント名, "payload": 本文} のJSONLです。
+
+    Args:
+        path: イベントを記録したファイル
+        url: WebhookのサーバーのURL
+        secret: 署名に使うシークレット。指定しない場合は設定ファイルの値
+
+    Returns:
+        サーバーが受け付けたイベント数
+    """
+    secret = secret if secret is not None else config.WEBHOOK_SECRET
+    accepted = 0
+    with requests.Session() as session, open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = json.dumps(record["payload"], ensure_ascii=False).encode("utf-8")
+            response = session.post(url, data=body, headers={
+                "Content-Type": "application/json",
+                "X-GitHub-Event": record.get("event", EVENT_NAME),
+                "X-Hub-Signature-256": sign(secret, body)
+            }, timeout=config.GITHUB_REQUEST_TIMEOUT)
+            if response.status_code < 300:
+                accepted += 1
+            else:
+                logger.warning(f"イベントが受け付けられませんでした: {response.status_code} {response.text}")
+    return accepted
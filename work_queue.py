@@ -0,0 +1,421 @@
+"""
+リース付きのワークキュー
+
+大きな移行を複数のプロセス（共有ストレージを使う別のホストを含む）に分散するためのキューです。
+コーディネーター（--enqueue）がNotionから取得したタスクをSQLiteのキューに登録し、
+ワーカー（--worker）はタスクをリースして取り出し、インポートが終わったら完了を記録します。
+リースの期限内に完了しなかったタスク（ワーカーが停止した場合など）は、別のワーカーが取り出し直します。
+
+キューはインポート状態の記録（ImportStateStoreと同じインターフェース）も兼ねます。
+Draftアイテムを作成した時点でアイテムIDをキューに記録するため、取り出し直したワーカーは
+アイテムを作り直さずに残りのステップから再開し、アイテムの作成は1回だけになります。
+
+SQLiteのWALモードはネットワークファイルシステムでは使えないため、既定のジャーナルモードで
+1件ずつ排他的なトランザクション（BEGIN IMMEDIATE）で更新します。
+"""
+
+import contextlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# キューのタスクの状態
+QUEUE_PENDING = "pending"
+QUEUE_LEASED = "leased"
+QUEUE_DONE = "done"
+QUEUE_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    notion_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    item_id TEXT,
+    steps TEXT NOT NULL DEFAULT '[]',
+    error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, position);
+"""
+
+
+def default_worker_id() -> str:
+    """
+    ホスト名とプロセスIDからワーカーIDを作成します。
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    SQLiteのファイルに保存するリース付きのタスクキュー
+    """
+
+    def __init__(self, path: str, lease_seconds: Optional[float] = None,
+                 max_attempts: Optional[int] = None, clock: Callable[[], float] = time.time):
+        """
+        WorkQueueの初期化
+
+        Args:
+            path: キューのファイルのパス
+            lease_seconds: リースの期限（秒）。指定しない場合は設定ファイルの値
+            max_attempts: リースの期限切れで取り出し直す最大回数。指定しない場合は設定ファイルの値
+            clock: 現在時刻を返す関数（ホスト間で比較するため時刻はUNIX時間）
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds or config.QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts or config.QUEUE_MAX_ATTEMPTS
+        self._clock = clock
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 複数のスレッドからインポートする場合に、接続を1つずつ使うためのロック
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        書き込みのロックを取得したトランザクションを実行します。
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """
+        キューのファイルを閉じます。
+        """
+        self._conn.close()
+
+    def enqueue(self, tasks: Iterable[Dict[str, Any]]) -> int:
+        """
+        タスクをキューに登録します。
+
+        登録済みのタスクは内容を更新し、失敗したタスクは待機中に戻します。完了したタスクは変更しません。
+        タスクは登録した順に取り出されます（親タスクを先に登録してください）。
+
+        Args:
+            tasks: タスク（notion_idのないタスクは登録しない）
+
+        Returns:
+            新たに待機中になったタスク数
+        """
+        queued = 0
+        with self._transaction() as conn:
+            position = conn.execute("SELECT COALESCE(MAX(position), 0) FROM tasks").fetchone()[0]
+            for task in tasks:
+                notion_id = task.get('notion_id')
+                if not notion_id:
+                    logger.warning(f"NotionのページIDがないタスクはキューに登録しません: {task.get('title', 'No Title')}")
+                    continue
+                row = conn.execute("SELECT status FROM tasks WHERE notion_id = ?", (notion_id,)).fetchone()
+                payload = json.dumps(task, ensure_ascii=False)
+                if row is None:
+                    position += 1
+                    conn.execute(
+                        "INSERT INTO tasks (notion_id, position, payload, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+                        (notion_id, position, payload, QUEUE_PENDING, self._clock())
+                    )
+                    queued += 1
+                elif row["status"] == QUEUE_FAILED:
+                    conn.execute(
+                        "UPDATE tasks SET payload = ?, status = ?, attempts = 0, error = NULL, updated_at = ? "
+                        "WHERE notion_id = ?",
+                        (payload, QUEUE_PENDING, self._clock(), notion_id)
+                    )
+                    queued += 1
+                elif row["status"] != QUEUE_DONE:
+                    conn.execute("UPDATE tasks SET payload = ? WHERE notion_id = ?", (payload, notion_id))
+        return queued
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        待機中のタスク（またはリースの期限が切れたタスク）を1件リースして取り出します。
+
+        リースの期限切れがmax_attempts回続いたタスクは、失敗として取り出しません。
+
+        Args:
+            worker_id: ワーカーID
+
+        Returns:
+            タスクデータ。取り出せるタスクがない場合はNone
+        """
+        with self._transaction() as conn:
+            while True:
+                now = self._clock()
+                row = conn.execute(
+                    "SELECT notion_id, payload, attempts FROM tasks "
+                    "WHERE status = ? OR (status = ? AND lease_expires < ?) ORDER BY position LIMIT 1",
+                    (QUEUE_PENDING, QUEUE_LEASED, now)
+                ).fetchone()
+                if row is None:
+                    return None
+
+                if row["attempts"] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                        "WHERE notion_id = ?",
+                        (QUEUE_FAILED, "リースの期限切れが続いたため中止しました", now, row["notion_id"])
+                    )
+                    logger.error(f"タスク {row['notion_id']} はリースの期限切れが続いたため失敗にしました")
+                    continue
+
+                conn.execute(
+                    "UPDATE tasks SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE notion_id = ?",
+                    (QUEUE_LEASED, worker_id, now + self.lease_seconds, now, row["notion_id"])
+                )
+                return json.loads(row["payload"])
+
+    def ack(self, notion_id: str) -> None:
+        """
+        タスクの完了を記録し、リースを解放します。
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires = NULL, error = NULL, updated_at = ? "
+                "WHERE notion_id = ?",
+                (QUEUE_DONE, self._clock(), notion_id)
+            )
+
+    def fail(self, notion_id: str, error_message: Optional[str]) -> None:
+        """
+        タスクの失敗を記録し、リースを解放します（再度登録すると待機中に戻ります）。
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE notion_id = ? AND status != ?",
+                (QUEUE_FAILED, error_message, self._clock(), notion_id, QUEUE_DONE)
+            )
+
+    def release(self, notion_id: str) -> None:
+        """
+        リースを解放し、タスクを待機中に戻します。
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated_at = ? WHERE notion_id = ? AND status = ?",
+                (QUEUE_PENDING, self._clock(), notion_id, QUEUE_LEASED)
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """
+        状態ごとのタスク数を返します。
+
+        Returns:
+            {"pending", "leased", "done", "failed"}
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        counts = {QUEUE_PENDING: 0, QUEUE_LEASED: 0, QUEUE_DONE: 0, QUEUE_FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def iter_tasks(self, status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        キューのタスクを登録順に返します。
+
+        Args:
+            status: 指定した状態のタスクだけを返す
+        """
+        with self._lock:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT payload FROM tasks WHERE status = ? ORDER BY position", (status,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT payload FROM tasks ORDER BY position").fetchall()
+        for row in rows:
+            yield json.loads(row["payload"])
+
+    # 以下はImportStateStoreと同じインターフェース（GitHubClient.import_taskなどから使用）
+
+    def get(self, notion_id: str) -> Optional[Dict[str, Any]]:
+        """
+        タスクのインポート状態を取得します。
+
+        Returns:
+            {"item_id", "steps", "done"} の辞書。アイテムが未作成で完了もしていなければNone
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT item_id, steps, status FROM tasks WHERE notion_id = ?", (notion_id,)
+            ).fetchone()
+        if row is None or (not row["item_id"] and row["status"] != QUEUE_DONE):
+            return None
+        return {"item_id": row["item_id"], "steps": json.loads(row["steps"]), "done": row["status"] == QUEUE_DONE}
+
+    def is_done(self, notion_id: str) -> bool:
+        """
+        タスクのインポートが完了しているかを返します。
+        """
+        record = self.get(notion_id)
+        return bool(record and record["done"])
+
+    def record_created(self, notion_id: str, item_id: str) -> None:
+        """
+        Draftアイテムの作成を記録します。
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET item_id = ?, steps = ? WHERE notion_id = ?",
+                (item_id, json.dumps(["create"]), notion_id)
+            )
+
+    def record_step(self, notion_id: str, step: str) -> None:
+        """
+        ステップの完了を記録します。
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT steps FROM tasks WHERE notion_id = ?", (notion_id,)).fetchone()
+            if row is None:
+                return
+            steps = json.loads(row["steps"])
+            if step not in steps:
+                steps.append(step)
+                conn.execute("UPDATE tasks SET steps = ? WHERE notion_id = ?", (json.dumps(steps), notion_id))
+
+    def mark_done(self, notion_id: str) -> None:
+        """
+        タスクのインポート完了を記録します。
+        """
+        self.ack(notion_id)
+
+    def forget(self, notion_id: str) -> None:
+        """
+        タスクのアイテムの記録を削除します（ロールバック後など）。
+        """
+        with self._transaction() as conn:
+            conn.execute("UPDATE tasks SET item_id = NULL, steps = '[]' WHERE notion_id = ?", (notion_id,))
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT notion_id, item_id, steps, status FROM tasks WHERE item_id IS NOT NULL"
+            ).fetchall()
+        return iter([
+            (row["notion_id"], {
+                "item_id": row["item_id"],
+                "steps": json.loads(row["steps"]),
+                "done": row["status"] == QUEUE_DONE
+            })
+            for row in rows
+        ])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+
+class QueueWorker:
+    """
+    キューからタスクを取り出してインポートするワーカー
+
+    task_importer.run_importerにTaskImporterの代わりに渡すと、インポートの結果をキューに記録します。
+    """
+
+    def __init__(self, queue: WorkQueue, importer: Any, worker_id: Optional[str] = None,
+                 poll_seconds: Optional[float] = None, sleep: Callable[[float], None] = time.sleep):
+        """
+        QueueWorkerの初期化
+
+        Args:
+            queue: ワークキュー（importerのstate_storeにも指定してください）
+            importer: タスクインポーター
+            worker_id: ワーカーID。指定しない場合はホスト名とプロセスID
+            poll_seconds: 他のワーカーがリース中のタスクの完了を待つ間隔（秒）。指定しない場合は設定ファイルの値
+            sleep: 待機に使用する関数（テスト用に差し替え可能）
+        """
+        self.queue = queue
+        self.importer = importer
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_seconds = poll_seconds if poll_seconds is not None else config.QUEUE_POLL_SECONDS
+        self.sleep = sleep
+        self.claimed = 0
+
+    def entries(self, should_stop: Callable[[], bool] = lambda: False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        キューからタスクを取り出して返します。
+
+        取り出せるタスクがなくても他のワーカーがリース中のタスクがある間は、
+        リースの期限切れに備えて待機します。
+
+        Args:
+            should_stop: Trueを返したら取り出しをやめる関数（実行の期限など）
+
+        Yields:
+            (進捗の表示, タスク)
+        """
+        while not should_stop():
+            task = self.queue.claim(self.worker_id)
+            if task is None:
+                if not self.queue.counts()[QUEUE_LEASED]:
+                    return
+                self.sleep(self.poll_seconds)
+                continue
+            self.claimed += 1
+            yield f"#{self.claimed}", task
+
+    def import_task(self, task: Dict[str, Any], position: str = "") -> bool:
+        """
+        タスクをインポートし、結果をキューに記録します。
+
+        Returns:
+            インポートに成功した（またはインポート済みだった）かどうか
+        """
+        try:
+            success = self.importer.import_task(task, position)
+        except Exception as e:
+            # 予期しないエラーのタスクは失敗にし、並行するワーカーがすぐに取り出し直さないようにする
+            self.queue.fail(task['notion_id'], str(e))
+            raise
+        except BaseException:
+            self.queue.release(task['notion_id'])
+            raise
+
+        if success:
+            # インポート済み・既存アイテムのスキップでは完了が記録されないため、ここで記録する
+            self.queue.ack(task['notion_id'])
+            return True
+
+        # タイトルは重複しうるため、失敗はページIDで探す
+        errors = [
+            failure["error"] for failure in list(self.importer.stats["failures"])
+            if failure.get("notion_id") == task['notion_id']
+        ]
+        if errors:
+            self.queue.fail(task['notion_id'], errors[-1])
+        else:
+            # 実行の期限で始めなかったタスクは、他のワーカーが取り出せるように戻す
+            self.queue.release(task['notion_id'])
+        return False
+
+    def record_failure(self, task: Dict[str, Any], error_message: Optional[str], position: str = "") -> None:
+        """
+        インポート中に例外が発生したタスクの失敗を、インポーターとキューに記録します。
+        """
+        self.importer.record_failure(task, error_message, position)
+        self.queue.fail(task['notion_id'], error_message)